@@ -9,6 +9,10 @@ NODE_INFO = { "server1": {"zone": "AZ1", "cpu": 4, "ram": 3.8, "disk": 9.6, "pla
 API_URL = "http://localhost:5001/metrics"   # tu API
 # Si lo ejecutas en el mismo nodo: http://localhost:5001/metrics
 
+# Buckets del histograma de uso (CPU en 0-100 %, RAM en 0-capacidad GiB).
+# Lo usa el modelo de riesgo "empirical" del módulo de placement.
+HIST_BINS = 50
+
 def extract_mean_std(values):
     nums = [float(v[1]) for v in values if v[1] != "NaN"]
     if not nums:
@@ -18,7 +22,26 @@ def extract_mean_std(values):
         "std": float(np.std(nums))
     }
 
-def get_node_metrics(node, hours):
+def extract_histogram(values, upper, bins=HIST_BINS):
+    """Histograma de buckets fijos en [0, upper]; los valores fuera se recortan al borde."""
+    nums = [float(v[1]) for v in values if v[1] != "NaN"]
+    if not nums:
+        return None
+    counts, _ = np.histogram(np.clip(nums, 0.0, upper), bins=bins, range=(0.0, upper))
+    return {"lower": 0.0, "upper": float(upper), "counts": [int(c) for c in counts]}
+
+def extract_correlation(cpu_values, ram_values):
+    """Correlación de Pearson CPU/RAM sobre los timestamps comunes (0 si no se puede calcular)."""
+    ram_by_ts = {v[0]: float(v[1]) for v in ram_values if v[1] != "NaN"}
+    pairs = [(float(v[1]), ram_by_ts[v[0]]) for v in cpu_values if v[1] != "NaN" and v[0] in ram_by_ts]
+    if len(pairs) < 3:
+        return 0.0
+    cpu, ram = np.array(pairs).T
+    if np.std(cpu) == 0 or np.std(ram) == 0:
+        return 0.0
+    return float(np.corrcoef(cpu, ram)[0, 1])
+
+def get_node_metrics(node, hours, ram_capacity):
     url = f"{API_URL}/{node}?hours={hours}"
     response = requests.get(url, timeout=5).json()   # <-- timeout agregado
 
@@ -28,6 +51,9 @@ def get_node_metrics(node, hours):
 
     cpu_stats = extract_mean_std(cpu_vals)
     ram_stats = extract_mean_std(ram_vals)
+    cpu_stats["histogram"] = extract_histogram(cpu_vals, 100.0)
+    ram_stats["histogram"] = extract_histogram(ram_vals, ram_capacity)
+    cpu_ram_corr = extract_correlation(cpu_vals, ram_vals)
 
     # DISK: último valor en GiB
     last_disk_gib = float(disk_vals[-1][1]) if disk_vals else None
@@ -35,7 +61,7 @@ def get_node_metrics(node, hours):
     # Convertir GiB → GB decimal correctamente
     last_disk_gb = last_disk_gib * 1.073741824 if last_disk_gib is not None else None
 
-    return cpu_stats, ram_stats, last_disk_gb
+    return cpu_stats, ram_stats, last_disk_gb, cpu_ram_corr
 
 def main():
     # -------- PARAMETRIZACIÓN DE HOURS --------
@@ -53,7 +79,7 @@ def main():
     for node, info in NODE_INFO.items():
         print(f"   ? Procesando {node} (hours={hours})")
 
-        cpu, ram, disk_gb = get_node_metrics(node,hours)
+        cpu, ram, disk_gb, cpu_ram_corr = get_node_metrics(node,hours,info["ram"])
 
         nodes_output[node] = {
             "id": node,
@@ -69,17 +95,21 @@ def main():
                 "cpu": {
                     "mean": cpu["mean"],
                     "std": cpu["std"],
+                    "histogram": cpu["histogram"],
                     "unit": "%"
                 },
                 "ram": {
                     "mean": ram["mean"],
                     "std": ram["std"],
+                    "histogram": ram["histogram"],
                     "unit": "GiB"
                 },
                 "disk": {
                     "used": disk_gb,
                     "unit": "GB"
-                }
+                },
+                # Correlación CPU/RAM de la misma serie (riesgo conjunto)
+                "cpu_ram_correlation": cpu_ram_corr
             },
 
             "enabled": True,
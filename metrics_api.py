@@ -2,7 +2,6 @@ from flask import Flask, jsonify, request
 import requests
 import time
 from flask import send_file
-import json
 import os
 
 
@@ -65,18 +64,20 @@ def get_nodes_status():
     """
     Devuelve el JSON completo de nodos con capacidades y uso
     generado por generate_nodes_status.py
+
+    Respuesta condicional: incluye ETag y Last-Modified del archivo y
+    responde 304 sin cuerpo si el cliente envía If-None-Match o
+    If-Modified-Since y el archivo no cambió (la API de placement revalida
+    su snapshot así).
     """
-    json_path = "nodes_status.json"
+    json_path = os.path.abspath("nodes_status.json")
 
     if not os.path.exists(json_path):
         return jsonify({
             "error": "nodes_status.json no existe todavía"
         }), 404
 
-    with open(json_path, "r") as f:
-        data = json.load(f)
-
-    return jsonify(data)
+    return send_file(json_path, mimetype="application/json", conditional=True, etag=True, max_age=0)
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5001)
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cola de admisión del servicio de placement.
+
+Cuando ningún host pasa el filtro de riesgo la API responde 409 y el
+usuario reintenta a mano, golpeando el endpoint en un bucle. Con la cola,
+la solicitud rechazada queda estacionada y se reevalúa EN BLOQUE cada vez
+que cambia el estado del clúster:
+
+- llega un snapshot nuevo de /nodes/status (otra versión del ClusterState)
+- se libera capacidad (DELETE de una asignación pendiente o TTL vencido:
+  cambia la versión del ledger)
+
+Orden de reevaluación (prioridad mayor primero):
+    prioridad = PROFILE_PRIORITY[user_profile] + espera / AGING_SECONDS
+
+El envejecimiento hace que un Estudiante que espera lo suficiente pase
+delante de un Profesor recién llegado. Si la primera solicitud no cabe se
+sigue con las siguientes (backfill) sobre el mismo snapshot en memoria,
+sumando cada asignación como en place_batch.
+
+Cada solicitud conserva las opciones con que se pidió (zone_mode, top_k,
+puntaje multiobjetivo o solo Minimax): una solicitud sin zona o con
+zone_mode distinto de "strict" se reevalúa en todo el clúster con
+rank_placement_candidates_cross_zone, igual que en la API.
+
+Cada solicitud colocada se confirma en el ledger con commit optimista
+(optimistic_commit.py): si otra solicitud tomó el host durante la pasada y
+ya no es viable, queda en la cola para la pasada siguiente. Su resultado (host,
+allocation_id) queda disponible para consultarlo hasta `result_ttl`. Las
+que superan `max_wait` se marcan como vencidas.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+import itertools
+import threading
+import time
+import uuid
+
+from vm_placement import SliceRequest, PlacementDecision, compute_slice_mu_sigma
+from cluster_state import ClusterState
+from pending_ledger import PendingAllocationLedger
+from placement_engine import PlacementCandidate, rank_placement_candidates_cross_zone
+from placement_scoring import ScoringPolicy
+from optimistic_commit import PlacementTicket, commit_placement
+
+# Prioridad base por perfil de usuario (perfiles desconocidos: la menor)
+PROFILE_PRIORITY = {
+    "Profesor": 2.0,
+    "Investigador": 1.5,
+    "Estudiante": 1.0,
+}
+
+AGING_SECONDS = 120.0       # cada 2 minutos de espera suman 1 punto de prioridad
+
+QUEUED = "queued"
+PLACED = "placed"
+EXPIRED = "expired"
+CANCELLED = "cancelled"
+
+
+@dataclass
+class QueuedRequest:
+    queue_id: str
+    slice_req: SliceRequest
+    risk_model: str
+    enqueued_at: float
+    zone_mode: str = "strict"
+    top_k: int = 1
+    use_scoring: bool = True                        # False = solo Minimax (?scoring=minimax)
+    status: str = QUEUED
+    attempts: int = 0                               # reevaluaciones sin host viable
+    finished_at: Optional[float] = None
+    decision: Optional[PlacementDecision] = None
+    allocation_id: Optional[str] = None
+    candidates: Optional[List[PlacementCandidate]] = None   # top_k del momento en que se colocó
+
+    def priority(self, now: float) -> float:
+        base = PROFILE_PRIORITY.get(self.slice_req.user_profile, min(PROFILE_PRIORITY.values()))
+        return base + (now - self.enqueued_at) / AGING_SECONDS
+
+
+class AdmissionQueue:
+    """
+    Cola thread-safe de solicitudes sin host viable.
+    `clock` es inyectable para pruebas (por defecto time.monotonic).
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1000,
+        max_wait: float = 1800.0,
+        result_ttl: float = 600.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self.result_ttl = result_ttl
+        self.clock = clock
+        self._entries: Dict[str, QueuedRequest] = {}
+        self._lock = threading.Lock()
+        self._changes = itertools.count(1)
+        self._change = next(self._changes)
+        self._evaluated_key = None      # (snapshot, ledger, cambios de la cola) de la última pasada
+
+    # ==========================
+    #   ALTA Y BAJA
+    # ==========================
+
+    def enqueue(
+        self,
+        slice_req: SliceRequest,
+        risk_model: str = "normal",
+        zone_mode: str = "strict",
+        top_k: int = 1,
+        use_scoring: bool = True
+    ) -> Optional[str]:
+        """Estaciona una solicitud; retorna su queue_id o None si la cola está llena."""
+        with self._lock:
+            if self._pending_count() >= self.max_size:
+                return None
+            entry = QueuedRequest(
+                uuid.uuid4().hex, slice_req, risk_model, self.clock(), zone_mode, top_k, use_scoring
+            )
+            self._entries[entry.queue_id] = entry
+            self._change = next(self._changes)
+        return entry.queue_id
+
+    def cancel(self, queue_id: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(queue_id)
+            if entry is None or entry.status != QUEUED:
+                return False
+            entry.status, entry.finished_at = CANCELLED, self.clock()
+            self._change = next(self._changes)
+        return True
+
+    # ==========================
+    #   CONSULTA
+    # ==========================
+
+    def __len__(self) -> int:
+        """Solicitudes que siguen esperando."""
+        return self._pending_count()
+
+    def _pending_count(self) -> int:
+        return sum(1 for e in self._entries.values() if e.status == QUEUED)
+
+    def get(self, queue_id: str) -> Optional[QueuedRequest]:
+        return self._entries.get(queue_id)
+
+    def pending(self) -> List[QueuedRequest]:
+        """Solicitudes en espera, en el orden en que se reevaluarán."""
+        now = self.clock()
+        with self._lock:
+            queued = [e for e in self._entries.values() if e.status == QUEUED]
+        return sorted(queued, key=lambda e: (-e.priority(now), e.enqueued_at))
+
+    def position(self, queue_id: str) -> Optional[int]:
+        """Posición (1 = siguiente) de una solicitud en espera."""
+        for i, entry in enumerate(self.pending(), 1):
+            if entry.queue_id == queue_id:
+                return i
+        return None
+
+    # ==========================
+    #   REEVALUACIÓN
+    # ==========================
+
+    def purge(self) -> None:
+        """Vence las solicitudes que esperaron más de max_wait y olvida resultados viejos."""
+        now = self.clock()
+        with self._lock:
+            for queue_id, entry in list(self._entries.items()):
+                if entry.status == QUEUED and now - entry.enqueued_at >= self.max_wait:
+                    entry.status, entry.finished_at = EXPIRED, now
+                    self._change = next(self._changes)
+                elif entry.status != QUEUED and now - entry.finished_at >= self.result_ttl:
+                    del self._entries[queue_id]
+
+    def reevaluate(
+        self,
+        state: ClusterState,
+        ledger: PendingAllocationLedger,
+        scoring: Optional[ScoringPolicy] = None
+    ) -> List[QueuedRequest]:
+        """
+        Una pasada sobre toda la cola contra `state`, el snapshot de TODAS
+        las zonas (con las asignaciones pendientes del ledger sumadas). Las
+        solicitudes "strict" cuya zona no está en el snapshot se saltan sin
+        contar intento; las sin zona o de otro zone_mode buscan en todo el
+        clúster. `scoring` se aplica a las que no pidieron solo Minimax.
+        Si ni el snapshot, ni el ledger, ni la cola cambiaron desde la
+        pasada anterior no se hace nada.
+        Retorna las solicitudes colocadas en esta pasada.
+        """
+        self.purge()
+        ledger.purge_expired()
+        if self._evaluated_key == (state.version, ledger.version, self._change):
+            return []
+
+        placed = []
+        work = None
+        generations = None
+        for entry in self.pending():
+            slice_req = entry.slice_req
+            zone_mode = entry.zone_mode if slice_req.zone is not None else "any"
+            if zone_mode == "strict" and state.zone_code(slice_req.zone) < 0:
+                continue
+            if work is None:
+                generations = ledger.generations()
+                work = ledger.apply_to(state).copy()
+
+            ranked = rank_placement_candidates_cross_zone(
+                slice_req, work, entry.top_k, zone_mode, risk_model=entry.risk_model,
+                scoring=scoring if entry.use_scoring else None
+            )
+            if not ranked:
+                entry.attempts += 1
+                continue
+
+            decision = ranked[0].to_decision()
+            mu_sigma = compute_slice_mu_sigma(slice_req)
+            ticket = PlacementTicket.for_decision(
+                slice_req, decision, state.version, generations, entry.risk_model, mu_sigma
+            )
+            with self._lock:
+                if entry.status != QUEUED:      # cancelada durante la pasada
+                    continue
+                allocation_id = commit_placement(ticket, ledger, state)
+                if allocation_id is None:       # conflicto: se reintenta en la próxima pasada
+                    entry.attempts += 1
+                    continue
+                entry.allocation_id = allocation_id
+                entry.decision = decision
+                entry.candidates = ranked
+                entry.status, entry.finished_at = PLACED, self.clock()
+            work.apply_slice(decision.host, mu_sigma, slice_req.disk_gb)
+            placed.append(entry)
+
+        with self._lock:
+            if placed:
+                self._change = next(self._changes)
+            self._evaluated_key = (state.version, ledger.version, self._change)
+        return placed
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Servicio ASGI (FastAPI) de placement con estado del clúster asíncrono.
+
+En api_placement_handler.py cada solicitud hace un `requests.get` bloqueante
+a /nodes/status antes de decidir: con solicitudes concurrentes el servidor
+queda esperando la latencia de red de metrics_api. Aquí:
+
+- Un solo `httpx.AsyncClient` (conexiones reutilizadas) vive lo mismo que la
+  aplicación.
+- Una tarea en segundo plano revalida /nodes/status cada REFRESH_SECONDS
+  con la misma lógica de NodesStatusCache (nodes_status_cache.py): consulta
+  CONDICIONAL (If-None-Match / If-Modified-Since), 304 sin cuerpo ni
+  parseo, la misma versión del ClusterState si el JSON no cambió y el
+  último snapshot válido si metrics_api no responde. Solo cambia el
+  transporte (httpx asíncrono). Con un snapshot nuevo se reevalúa la cola
+  de admisión.
+- La cache se instala como api_placement_handler.NODES_CACHE: las
+  solicitudes de placement usan el snapshot en memoria, sin I/O en el
+  camino de la solicitud. El cálculo (numpy) y el armado del ClusterState
+  corren en el threadpool para no detener el event loop.
+
+La lógica de placement es la misma del servicio Flask (handle_placement,
+handle_placement_batch, ledger, cache, cola y commit optimista). Las demás
+rutas (plan, gang, asignaciones, cola) se sirven montando la app Flask como
+WSGI y también leen el snapshot en memoria.
+
+/api/v1/health informa la versión, la antigüedad y las estadísticas de la
+cache (consultas, 304, actualizaciones, errores).
+
+Uso:
+    python3 api_placement_async.py
+    uvicorn api_placement_async:app --host 0.0.0.0 --port 5004
+"""
+
+from contextlib import asynccontextmanager, suppress
+import asyncio
+import logging
+import os
+
+import httpx
+import uvicorn
+from a2wsgi import WSGIMiddleware
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+
+import api_placement_handler as placement_api
+from nodes_status_cache import NodesStatusCache
+
+logger = logging.getLogger("vm_placement.api_async")
+
+# Segundos entre revalidaciones de /nodes/status (también es el TTL de la cache)
+REFRESH_SECONDS = float(os.environ.get("PLACEMENT_REFRESH_SECONDS", "2"))
+
+# Cliente HTTP hacia metrics_api
+HTTP_TIMEOUT_SECONDS = 3.0
+HTTP_MAX_CONNECTIONS = 10
+
+
+# ==========================
+#   SNAPSHOT EN MEMORIA
+# ==========================
+
+class AsyncNodesStatusCache(NodesStatusCache):
+    """
+    NodesStatusCache revalidada desde el event loop con httpx.AsyncClient.
+    La revalidación es la de refresh() (mismos pasos); solo la hace la
+    tarea de refresh_loop, así que current() nunca lanza hilos con
+    consultas bloqueantes.
+    """
+
+    async def refresh_async(self, client: httpx.AsyncClient) -> bool:
+        """Igual que refresh(), sin bloquear el event loop."""
+        headers = self._conditional_headers()
+        try:
+            response = await client.get(self.url, headers=headers)
+            if self._not_modified(response.status_code):
+                return False
+            nodes = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            return self._failed(e)
+        return await run_in_threadpool(self._install, nodes, response.headers)
+
+    def ready(self) -> bool:
+        return self.version is not None
+
+    def _refresh_in_background(self) -> None:
+        pass        # la revalidación periódica la hace refresh_loop
+
+
+CACHE = AsyncNodesStatusCache(placement_api.NODES_STATUS_ENDPOINT, ttl=REFRESH_SECONDS)
+
+
+# ==========================
+#   REFRESCO EN SEGUNDO PLANO
+# ==========================
+
+async def refresh_once(client: httpx.AsyncClient, cache: AsyncNodesStatusCache) -> bool:
+    """Una revalidación de /nodes/status; True si se instaló un snapshot nuevo."""
+    if not await cache.refresh_async(client):
+        return False        # 304, mismo JSON o error: se conserva el snapshot actual
+    await run_in_threadpool(placement_api.process_admission_queue)
+    return True
+
+
+async def refresh_loop(client: httpx.AsyncClient, cache: AsyncNodesStatusCache) -> None:
+    """Revalida cada `cache.ttl` segundos: el snapshot nunca se sirve vencido por más de un ciclo."""
+    while True:
+        await asyncio.sleep(cache.ttl)
+        try:
+            await refresh_once(client, cache)
+            await run_in_threadpool(placement_api.refresh_model_tables)
+        except Exception as e:     # un error puntual no debe detener el refresco
+            logger.exception("Error refrescando el snapshot: %s", e)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    client = httpx.AsyncClient(
+        timeout=HTTP_TIMEOUT_SECONDS,
+        limits=httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_CONNECTIONS),
+    )
+    previous, placement_api.NODES_CACHE = placement_api.NODES_CACHE, CACHE
+    await refresh_once(client, CACHE)
+    task = asyncio.create_task(refresh_loop(client, CACHE))
+    try:
+        yield
+    finally:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+        await client.aclose()
+        placement_api.NODES_CACHE = previous
+
+
+app = FastAPI(
+    title="VM Placement API (ASGI)",
+    description="Placement de VMs con snapshot del clúster refrescado en segundo plano",
+    version="1.0",
+    lifespan=lifespan
+)
+
+
+# ==========================
+#   ENDPOINTS
+# ==========================
+
+async def _json_body(request: Request):
+    try:
+        return await request.json()
+    except ValueError:
+        return None
+
+
+def _snapshot_unavailable() -> JSONResponse:
+    return JSONResponse({
+        "success": False,
+        "error": "Estado del clúster no disponible todavía (metrics_api sin responder)"
+    }, status_code=503)
+
+
+@app.post("/api/v1/placement")
+async def placement(request: Request):
+    """Igual que POST /api/v1/placement del servicio Flask."""
+    if not CACHE.ready():
+        return _snapshot_unavailable()
+    body, status = await run_in_threadpool(
+        placement_api.handle_placement, await _json_body(request), request.query_params
+    )
+    return JSONResponse(body, status_code=status)
+
+
+@app.post("/api/v1/placement/batch")
+async def placement_batch(request: Request):
+    """Igual que POST /api/v1/placement/batch del servicio Flask."""
+    if not CACHE.ready():
+        return _snapshot_unavailable()
+    body, status = await run_in_threadpool(
+        placement_api.handle_placement_batch, await _json_body(request), request.query_params
+    )
+    return JSONResponse(body, status_code=status)
+
+
+@app.get("/api/v1/health")
+async def health():
+    return placement_api.health_status()     # "snapshot" = CACHE.status() (ttl_s = periodo de refresco)
+
+
+# Resto de rutas (plan, gang, asignaciones, cola): la app Flask vía WSGI
+app.mount("/", WSGIMiddleware(placement_api.app))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    uvicorn.run(app, host="0.0.0.0", port=5004)
@@ -7,18 +7,40 @@ Recibe solicitudes JSON, consulta workers disponibles y ejecuta placement
 """
 
 from flask import Flask, request, jsonify
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional, Tuple
+import logging
+import os
+import threading
 import requests
 from dataclasses import asdict
 
 # Importar las clases del módulo de placement
-from vm_placement import (
-    SliceRequest, HostState, PlacementDecision,
-    decide_vm_placement
+import vm_placement
+from vm_placement import SliceRequest, PlacementDecision, parse_overcommit
+from placement_engine import (
+    rank_placement_candidates_cross_zone, place_batch, decide_vm_placement_vectorized,
+    ZONE_MODES, RISK_MODELS
 )
+from cluster_state import ClusterState
+from gang_placement import decide_gang_placement
+from plan_placement import plan_placement, PLAN_METHODS, DEFAULT_TIME_BUDGET
+from pending_ledger import PendingAllocationLedger
+from optimistic_commit import PlacementTicket, commit_placement, place_optimistic, COMMIT_RETRIES
+from admission_queue import AdmissionQueue, PLACED
+from decision_trace import DecisionTrace, trace_requested, emit as emit_trace
+from decision_cache import DecisionCache, generations_key
+from calibracion_tablas import TablesWatcher
+from shared_snapshot import SharedSnapshotReader
+from nodes_status_cache import NodesStatusCache
+from placement_scoring import ScoringPolicy
 
 app = Flask(__name__)
 
+# Los mensajes por solicitud van a DEBUG: con el nivel por defecto (INFO) el
+# camino principal no formatea texto. Con DEBUG además se emite la traza de
+# cada decisión como una línea JSON (ver decision_trace.py).
+logger = logging.getLogger("vm_placement.api")
+
 # ========================================
 # CONFIGURACIÓN DE APIs EXTERNAS
 # ========================================
@@ -38,6 +60,70 @@ MONITORING_API = "http://localhost:5001"   # donde corre tu metrics_api
 
 NODES_STATUS_ENDPOINT = f"{MONITORING_API}/nodes/status"
 
+# Máximo de solicitudes aceptadas por POST /api/v1/placement/batch
+MAX_BATCH_SIZE = 500
+
+# Máximo de slices y de segundos de cómputo por POST /api/v1/placement/plan
+MAX_PLAN_SIZE = 500
+MAX_PLAN_BUDGET_SECONDS = 60.0
+
+# Máximo de candidatos devueltos con ?top_k=N
+MAX_TOP_K = 20
+
+# Tiempo (s) que una asignación reciente se suma al estado del host, hasta que
+# las métricas de Prometheus la reflejen o el orquestador la libere
+PENDING_TTL_SECONDS = 15 * 60
+
+# Asignaciones pendientes compartidas por todas las solicitudes del proceso
+LEDGER = PendingAllocationLedger(ttl_seconds=PENDING_TTL_SECONDS)
+
+# Commits optimistas (optimistic_commit.py): confirmados, conflictos (el
+# host cambió y dejó de ser viable) y abortados tras agotar los reintentos
+COMMIT_STATS = {"committed": 0, "conflicts": 0, "aborted": 0}
+_COMMIT_STATS_LOCK = threading.Lock()
+
+# Solicitudes sin host viable que pidieron esperar (?queue=true): se
+# reevalúan en bloque con cada snapshot nuevo o capacidad liberada
+ADMISSION_QUEUE_SIZE = 1000
+ADMISSION_MAX_WAIT_SECONDS = 30 * 60
+ADMISSION_QUEUE = AdmissionQueue(max_size=ADMISSION_QUEUE_SIZE, max_wait=ADMISSION_MAX_WAIT_SECONDS)
+
+# Decisiones recientes (top-k) por (solicitud, versión de snapshot, generaciones de los hosts evaluados)
+DECISION_CACHE_SIZE = 1024
+DECISION_CACHE = DecisionCache(maxsize=DECISION_CACHE_SIZE)
+
+# Snapshot de /nodes/status en memoria (nodes_status_cache.py): se reutiliza
+# durante PLACEMENT_SNAPSHOT_TTL segundos y se revalida con ETag /
+# If-Modified-Since en segundo plano. Si el JSON no cambia se conserva el
+# mismo ClusterState y su versión, así las decisiones cacheadas siguen siendo
+# válidas. Los endpoints no deben modificar los snapshots (usar .copy()).
+# El servicio ASGI (api_placement_async.py) reemplaza esta cache por su
+# variante asíncrona (misma lógica, revalidada desde el event loop).
+SNAPSHOT_TTL_SECONDS = float(os.environ.get("PLACEMENT_SNAPSHOT_TTL", "5"))
+NODES_CACHE = NodesStatusCache(NODES_STATUS_ENDPOINT, ttl=SNAPSHOT_TTL_SECONDS)
+
+# Modo servicio (servicio_placement.py): el proceso principal publica el
+# snapshot en un buffer mmap compartido y cada worker lo lee sin consultar
+# /nodes/status ni parsear JSON (cualquier objeto con current()).
+# None = se usa NODES_CACHE.
+SNAPSHOT_READER: Optional[SharedSnapshotReader] = None
+
+# Subconjunto de cada zona, armado una vez por versión del snapshot
+_ZONE_STATES: Dict[str, Tuple[int, ClusterState]] = {}
+
+# Tablas PROFILE/CONTEXT calibradas (calibracion_tablas.py). Si el archivo
+# existe se recarga en caliente cuando el job publica una versión nueva; si
+# no, se usan las tablas del PDF definidas en vm_placement.py
+MODEL_TABLES_PATH = os.environ.get("PLACEMENT_TABLES", "tablas_modelo/tablas_actuales.json")
+TABLES_WATCHER = TablesWatcher(MODEL_TABLES_PATH)
+
+# Pesos del puntaje multiobjetivo por zona (placement_scoring.py). Sin
+# archivo los candidatos se ordenan solo con Minimax
+SCORING_POLICY_PATH = os.environ.get("PLACEMENT_SCORING", "scoring_pesos.json")
+SCORING_POLICY = (
+    ScoringPolicy.from_file(SCORING_POLICY_PATH) if os.path.exists(SCORING_POLICY_PATH) else None
+)
+
 
 
 # ========================================
@@ -57,6 +143,8 @@ def parse_slice_request(json_data: Dict) -> Optional[SliceRequest]:
         "platform": "linux",
         "user_profile": "Estudiante", 
         "technical_context": "Cloud / Web / Dev", 
+        "sla_overcommit_cpu_pct": 1.5,     # opcional: ratio en [1, 10] (columnas del slice)
+        "sla_overcommit_ram_pct": 1.0,     # opcional
     }
     """
     try:
@@ -75,132 +163,154 @@ def parse_slice_request(json_data: Dict) -> Optional[SliceRequest]:
             platform=json_data.get("platform"),
             user_profile=json_data.get("user_profile"),
             technical_context=json_data.get("technical_context"),
+            cpu_overcommit=parse_overcommit(json_data.get("sla_overcommit_cpu_pct")),
+            ram_overcommit=parse_overcommit(json_data.get("sla_overcommit_ram_pct")),
         )
         
         return slice_req
     
     except (ValueError, KeyError, TypeError) as e:
-        print(f"❌ Error parseando SliceRequest: {e}")
+        logger.warning("Error parseando SliceRequest: %s", e)
         return None
 
 
 
-def fetch_workers_in_zone(zone: str) -> List[Dict]:
+def parse_top_k(value) -> int:
+    """Convierte el parámetro top_k a entero dentro de [1, MAX_TOP_K]."""
+    try:
+        return min(max(int(value), 1), MAX_TOP_K)
+    except (TypeError, ValueError):
+        return 1
+
 
-    import requests
-    
+def parse_flag(value) -> bool:
+    """Interpreta flags de query string / JSON ("true", "1", True...)."""
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "si", "sí")
+    return bool(value)
+
+
+def parse_zone_mode(value) -> str:
+    """Modo de zona ("strict", "preferred", "any"); cualquier otro valor -> "strict"."""
+    value = str(value or "strict").strip().lower()
+    return value if value in ZONE_MODES else "strict"
+
+
+def parse_risk_model(value) -> str:
+    """Modelo de riesgo ("normal", "empirical", "joint"); cualquier otro valor -> "normal"."""
+    value = str(value or "normal").strip().lower()
+    return value if value in RISK_MODELS else "normal"
+
+
+def parse_scoring(value) -> Optional[ScoringPolicy]:
+    """Política de puntaje: la configurada, salvo `scoring=minimax` (solo riesgo)."""
+    if str(value or "").strip().lower() == "minimax":
+        return None
+    return SCORING_POLICY
+
+
+def fetch_nodes_status() -> Dict[str, Dict]:
+    """
+    Descarga el JSON completo de /nodes/status (dict node_id -> nodo).
+    Retorna {} si la API de monitoreo no responde correctamente.
+    Las solicitudes de placement usan NODES_CACHE; esta descarga directa
+    queda para procesos que publican su propio snapshot.
+    """
     try:
         response = requests.get(NODES_STATUS_ENDPOINT, timeout=3)
         if response.status_code != 200:
-            print("❌ Error obteniendo nodes_status.json")
-            return []
-
-        nodes = response.json()
-
-        # Filtrar por zona
-        zone_nodes = [
-            node_data for node_data in nodes.values()
-            if node_data["zone"] == zone
-        ]
+            logger.error("Error obteniendo nodes_status.json (HTTP %s)", response.status_code)
+            return {}
 
-        return zone_nodes
+        return response.json()
 
     except Exception as e:
-        print(f"❌ Error consultando nodos: {e}")
-        return []
+        logger.error("Error consultando nodos: %s", e)
+        return {}
 
-def parse_worker_to_hoststate(worker_data: Dict) -> Optional[HostState]:
+
+def get_cluster_state_for_zone(zone: Optional[str]) -> ClusterState:
     """
-    Convierte un nodo de nodes_status.json al objeto HostState.
-    Compatible con el NUEVO formato con unidades.
+    Obtiene el snapshot columnar (ClusterState) de los hosts de una zona.
+    Con zone=None se incluyen todas las zonas (placement entre zonas).
+
+    El snapshot sale de NODES_CACHE (o de SNAPSHOT_READER en modo
+    servicio): no hay consulta HTTP ni parseo en el camino de la solicitud.
+    Mientras el snapshot no cambie se devuelve el mismo objeto (misma
+    versión): el llamador NO debe modificarlo.
     """
+    shared = (SNAPSHOT_READER if SNAPSHOT_READER is not None else NODES_CACHE).current()
+    if zone is None:
+        return shared
 
-    try:
-        # ============================
-        # 1. Extraer capacidades
-        # ============================
-        cpu_capacity = worker_data["cpu_capacity"]["value"]        # cores
-        ram_capacity = worker_data["ram_capacity"]["value"]        # GiB
-        disk_capacity = worker_data["disk_capacity"]["value"]      # GB
-
-        # ============================
-        # 2. Extraer uso actual
-        # ============================
-        cpu_stats = worker_data["current_usage"]["cpu"]
-        ram_stats = worker_data["current_usage"]["ram"]
-        disk_used = worker_data["current_usage"]["disk"]["used"]
-
-        # ============================
-        # 3. Crear HostState
-        # ============================
-        host = HostState(
-            name=worker_data.get("name", worker_data["id"]),
-            platform=worker_data["platform"],
-            zone=worker_data["zone"],
-
-            cpu_capacity=float(cpu_capacity),
-            ram_gb_capacity=float(ram_capacity),
-            disk_gb_capacity=float(disk_capacity),
-
-            mu_cpu=float(cpu_stats["mean"]*cpu_capacity/100.0),
-            sigma_cpu=float(cpu_stats["std"]*cpu_capacity/100.0),
-            mu_ram_gb=float(ram_stats["mean"]),
-            sigma_ram_gb=float(ram_stats["std"]),
-            disk_gb_used=float(disk_used),
-
-            enabled=worker_data.get("enabled", True),
-            in_maintenance=worker_data.get("in_maintenance", False),
-            metadata=worker_data.get("metadata", {})
-        )
+    cached = _ZONE_STATES.get(zone)
+    if cached is not None and cached[0] == shared.version:
+        return cached[1]
+    state = shared.subset(shared.rows_for(zone))
+    _ZONE_STATES[zone] = (shared.version, state)
 
-        return host
+    if len(state) == 0:
+        logger.warning("No se encontraron workers en la zona %s", zone or "(todas)")
+    else:
+        logger.debug("Zona %s: %d hosts válidos (snapshot v%d)", zone or "(todas)", len(state), state.version)
 
-    except Exception as e:
-        print(f"❌ Error parseando nodo a HostState: {e}")
-        return None
+    return state
 
 
+def record_commit(conflicts: int, committed: bool) -> None:
+    with _COMMIT_STATS_LOCK:
+        COMMIT_STATS["conflicts"] += conflicts
+        COMMIT_STATS["committed" if committed else "aborted"] += 1
+    if conflicts:
+        logger.info("Commit optimista con %d conflicto(s)%s", conflicts, "" if committed else ": sin host viable")
 
-def get_hosts_for_zone(zone: str) -> List[HostState]:
+
+def process_admission_queue(state: Optional[ClusterState] = None) -> None:
     """
-    Obtiene todos los hosts disponibles en una zona específica
-    
-    1. Consulta la lista de workers en la zona
-    2. Para cada worker, obtiene sus detalles completos
-    3. Convierte cada worker a HostState
+    Reevalúa la cola de admisión contra `state` (por defecto el snapshot de
+    todas las zonas). Sin solicitudes en espera no toca el snapshot.
     """
-    print(f"\n🔍 Consultando workers en zona: {zone}")
-    
-    # Obtener lista de workers en la zona
-    workers_basic = fetch_workers_in_zone(zone)
-    
-    if not workers_basic:
-        print(f"⚠️ No se encontraron workers en la zona {zone}")
-        return []
-    
-    print(f"✓ Encontrados {len(workers_basic)} workers en zona {zone}")
-    
-    # Obtener detalles de cada worker y convertir a HostState
-    hosts = []
-    
-    for worker_basic in workers_basic:
-        worker_id = worker_basic.get("id") or worker_basic.get("name")
-        
-        if not worker_id:
-            print(f"⚠️ Worker sin ID, saltando...")
-            continue
-        
-        # Convertir a HostState
-        host = parse_worker_to_hoststate(worker_basic)
-        
-        if host:
-            hosts.append(host)
-            print(f"  ✓ {host.name} ({host.platform}) - CPU: {host.cpu_capacity}, RAM: {host.ram_gb_capacity}GB")
-        else:
-            print(f"  ❌ No se pudo parsear worker {worker_id}")
-    
-    print(f"\n✓ Total de hosts válidos: {len(hosts)}")
-    return hosts
+    if len(ADMISSION_QUEUE) == 0:
+        return
+    if state is None:
+        state = get_cluster_state_for_zone(None)
+    for entry in ADMISSION_QUEUE.reevaluate(state, LEDGER, SCORING_POLICY):
+        logger.info(
+            "Cola de admisión: %s colocada en %s tras %.0f s",
+            entry.queue_id, entry.decision.host, entry.finished_at - entry.enqueued_at
+        )
+
+
+def queued_request_to_dict(entry) -> Dict:
+    """Estado de una solicitud de la cola para las respuestas JSON."""
+    data = {
+        "queue_id": entry.queue_id,
+        "status": entry.status,
+        "attempts": entry.attempts,
+        "waited_s": round((entry.finished_at or ADMISSION_QUEUE.clock()) - entry.enqueued_at, 1),
+    }
+    if entry.status == PLACED:
+        data["placement"] = asdict(entry.decision)
+        data["allocation_id"] = entry.allocation_id
+        if entry.zone_mode != "strict" or entry.slice_req.zone is None:
+            data["zone_used"] = entry.decision.availability_zone
+            data["zone_fallback"] = (entry.slice_req.zone is not None
+                                     and entry.decision.availability_zone != entry.slice_req.zone)
+        if entry.top_k > 1:
+            data["candidates"] = [asdict(c) for c in entry.candidates]
+    else:
+        data["position"] = ADMISSION_QUEUE.position(entry.queue_id)
+    return data
+
+
+@app.before_request
+def refresh_model_tables():
+    """Recarga las tablas calibradas si se publicó una versión nueva (un stat() cada pocos segundos)."""
+    try:
+        if TABLES_WATCHER.refresh():
+            logger.info("Tablas del modelo recargadas: versión %d", vm_placement.TABLES_VERSION)
+    except (OSError, ValueError) as e:
+        logger.error("No se pudieron cargar las tablas %s: %s", MODEL_TABLES_PATH, e)
 
 
 # ========================================
@@ -234,99 +344,680 @@ def placement_endpoint():
         }
     }
     
+    Con `?top_k=3` (o "top_k": 3 en el JSON) la respuesta incluye además
+    "candidates": los 3 mejores hosts viables en orden Minimax, cada uno con
+    cluster_risk, local_risk, p_cpu, p_ram y disk_free_gb. Si la creación
+    de la VM falla en el primero, el orquestador puede usar el siguiente sin
+    repetir el placement.
+
+    Con `?explain=true` se agrega "trace": motivo de rechazo, riesgos y
+    puntaje Minimax de cada host evaluado.
+
+    Con `?zone_mode=preferred` (o "zone_mode" en el JSON), si la zona pedida
+    no tiene host viable se prueban las demás zonas de mayor a menor holgura
+    agregada; con `zone_mode=any` el campo "zone" es opcional y se elige por
+    holgura desde el inicio. La respuesta agrega "zone_used" y
+    "zone_fallback" (true si se usó una zona distinta a la pedida).
+
+    Con `?risk_model=empirical` la probabilidad de congestión se calcula con
+    los histogramas de uso de nodes_status.json en lugar de la normal (μ, σ);
+    con `risk_model=joint` el riesgo es P(CPU o RAM congestionados) según la
+    normal bivariada con la correlación CPU/RAM de cada host.
+
+    Si hay pesos configurados (PLACEMENT_SCORING) los hosts viables se
+    ordenan por el puntaje multiobjetivo (riesgo, fragmentación, disco,
+    consolidación) y cada candidato trae su "score"; `?scoring=minimax`
+    ordena solo por riesgo.
+
+    Con `?queue=true` (o "queue": true en el JSON), si no hay host viable la
+    solicitud queda en la cola de admisión y se responde 202 con
+    "queue_id": se reevalúa sola con cada snapshot nuevo o liberación de
+    capacidad, y el resultado se consulta en GET /api/v1/placement/queue/<id>.
+    Las solicitudes en cola se reevalúan ANTES que cada solicitud nueva.
+
+    Si el slice trae sla_overcommit_cpu_pct / sla_overcommit_ram_pct (ratio,
+    ej. 1.5; fuera de [1, 10] -> 400) el riesgo del slice se mide contra la
+    capacidad efectiva del host (CI · ratio, acotado por el techo
+    "overcommit" del nodo). La
+    decisión devuelve en "placement" los ratios aplicados (cpu_overcommit,
+    ram_overcommit) para que el orquestador los guarde en el slice.
+    
     Response JSON (fallo):
     {
         "success": false,
         "error": "No hay hosts disponibles que cumplan los requisitos"
     }
     """
-    
-    print("\n" + "="*70)
-    print("NUEVA SOLICITUD DE PLACEMENT")
-    print("="*70)
-    
+    body, status = handle_placement(request.get_json(silent=True), request.args)
+    return jsonify(body), status
+
+
+def handle_placement(json_data: Optional[Dict], args: Mapping[str, str]) -> Tuple[Dict, int]:
+    """
+    Lógica de POST /api/v1/placement independiente del framework: la usan
+    el endpoint Flask y el servicio ASGI (api_placement_async.py).
+    `args` son los query params. Retorna (cuerpo JSON, código HTTP).
+    """
     try:
-        # 1. Parsear el JSON recibido
-        json_data = request.get_json()
-        
+        # 1. Validar el JSON recibido
         if not json_data:
-            return jsonify({
+            return {
                 "success": False,
                 "error": "No se recibió JSON válido en el body"
-            }), 400
+            }, 400
         
-        print(f"📥 Solicitud recibida: {json_data}")
+        logger.debug("Solicitud recibida: %s", json_data)
         
-        # 2. Convertir a SliceRequest
+        # 2. Convertir a SliceRequest (en modo "any" la zona es opcional)
+        zone_mode = parse_zone_mode(args.get("zone_mode", json_data.get("zone_mode")))
+        if zone_mode == "any":
+            json_data = {"zone": None, **json_data}
         slice_req = parse_slice_request(json_data)
         
         if not slice_req:
-            return jsonify({
+            return {
                 "success": False,
                 "error": "Error parseando los parámetros de la solicitud"
-            }), 400
+            }, 400
         
-        print(f"\n✓ SliceRequest creado:")
-        print(f"  - CPU: {slice_req.cpu} cores")
-        print(f"  - RAM: {slice_req.ram_gb} GB")
-        print(f"  - Disco: {slice_req.disk_gb} GB")
-        print(f"  - Zona: {slice_req.zone}")
-        print(f"  - Plataforma: {slice_req.platform or 'auto'}")
-        print(f"  - Perfil: {slice_req.user_profile}")
-        print(f"  - Contexto: {slice_req.technical_context}")
         
-        # 3. Obtener hosts disponibles en la zona solicitada
-        hosts = get_hosts_for_zone(slice_req.zone)
+        # 3. Obtener hosts disponibles en la zona solicitada (o en todas)
+        state = get_cluster_state_for_zone(slice_req.zone if zone_mode == "strict" else None)
         
-        if not hosts:
-            return jsonify({
+        if len(state) == 0:
+            return {
                 "success": False,
                 "error": f"No hay workers disponibles en la zona {slice_req.zone}"
-            }), 404
+                         if zone_mode == "strict" else "No hay workers disponibles en el clúster"
+            }, 404
         
-        # 4. Ejecutar algoritmo de placement
-        print(f"\n🎯 Ejecutando algoritmo de placement...")
-        decision = decide_vm_placement(slice_req, hosts)
-        
-        # 5. Retornar resultado
+        # Las solicitudes que ya esperan en la cola van antes que esta
+        # (contra el snapshot completo: la cola tiene solicitudes de todas las zonas)
+        process_admission_queue()
+
+        # 4. Ejecutar algoritmo de placement (top-k en la misma pasada)
+        #    La traza solo se construye con ?explain=true o logger en DEBUG
+        top_k = parse_top_k(args.get("top_k", json_data.get("top_k", 1)))
+        explain = parse_flag(args.get("explain", json_data.get("explain", False)))
+        risk_model = parse_risk_model(args.get("risk_model", json_data.get("risk_model")))
+        scoring = parse_scoring(args.get("scoring", json_data.get("scoring")))
+        trace = DecisionTrace(asdict(slice_req)) if trace_requested(explain) else None
+
+        #    Sin traza, la decisión se busca primero en la cache LRU, con las
+        #    generaciones de los hosts de `state` en la clave (un commit en
+        #    otra zona no la invalida). Se leen ANTES de armar la vista
+        LEDGER.purge_expired()
+        generations = LEDGER.generations()
+        cache_key = None
+        ranked = None
+        if trace is None:
+            cache_key = DECISION_CACHE.make_key(
+                slice_req, state.version, generations_key(generations, state.index),
+                top_k, zone_mode, risk_model, vm_placement.TABLES_VERSION, scoring is not None
+            )
+            ranked = DECISION_CACHE.get(cache_key)
+
+        if ranked is None:
+            ranked = rank_placement_candidates_cross_zone(
+                slice_req, LEDGER.apply_to(state), top_k, zone_mode,
+                trace=trace, risk_model=risk_model, scoring=scoring
+            )
+            if cache_key is not None:
+                DECISION_CACHE.put(cache_key, ranked)
+        emit_trace(trace)
+
+        # 5. Commit optimista: si otra solicitud tomó el host entretanto se
+        #    re-valida y, si ya no es viable, se decide de nuevo localmente
+        def decide_again(view: ClusterState) -> Optional[PlacementDecision]:
+            nonlocal ranked
+            ranked = rank_placement_candidates_cross_zone(
+                slice_req, view, top_k, zone_mode, risk_model=risk_model, scoring=scoring
+            )
+            return ranked[0].to_decision() if ranked else None
+
+        decision, allocation_id = None, None
+        if ranked:
+            state_zone = slice_req.zone if zone_mode == "strict" else None
+            decision, allocation_id, conflicts = place_optimistic(
+                slice_req, state, LEDGER, decide_again, ranked[0].to_decision(), generations,
+                risk_model, refresh=lambda: get_cluster_state_for_zone(state_zone)
+            )
+            record_commit(conflicts, decision is not None)
+
+        # 6. Retornar resultado
         if decision:
-            print(f"\n✅ PLACEMENT EXITOSO")
-            print(f"  Host seleccionado: {decision.host}")
-            print(f"  Plataforma: {decision.platform}")
-            print(f"  Zona: {decision.availability_zone}")
-            print(f"  Razón: {decision.reason}")
-            
-            return jsonify({
+            logger.info("Placement: %s (%s, %s)", decision.host, decision.platform, decision.availability_zone)
+
+            response = {
                 "success": True,
-                "placement": asdict(decision)
-            }), 200
+                "placement": asdict(decision),
+                "allocation_id": allocation_id
+            }
+            if zone_mode != "strict":
+                response["zone_used"] = decision.availability_zone
+                response["zone_fallback"] = slice_req.zone is not None and decision.availability_zone != slice_req.zone
+            if top_k > 1:
+                response["candidates"] = [asdict(c) for c in ranked]
+            if explain:
+                response["trace"] = trace.to_dict()
+
+            return response, 200
         
         else:
-            print(f"\n❌ NO SE ENCONTRÓ HOST VIABLE")
-            return jsonify({
+            logger.info("Sin host viable en zona %s", slice_req.zone)
+            if parse_flag(args.get("queue", json_data.get("queue", False))):
+                queue_id = ADMISSION_QUEUE.enqueue(slice_req, risk_model, zone_mode, top_k, scoring is not None)
+                if queue_id is not None:
+                    return {
+                        "success": False,
+                        "queued": True,
+                        "queue_id": queue_id,
+                        "position": ADMISSION_QUEUE.position(queue_id)
+                    }, 202
+                logger.warning("Cola de admisión llena (%d solicitudes)", ADMISSION_QUEUE_SIZE)
+            response = {
                 "success": False,
                 "error": "No hay hosts disponibles que cumplan los requisitos de riesgo"
-            }), 409
+            }
+            if explain:
+                response["trace"] = trace.to_dict()
+
+            return response, 409
     
     except Exception as e:
-        print(f"\n❌ ERROR INTERNO: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error interno: %s", e)
         
+        return {
+            "success": False,
+            "error": f"Error interno del servidor: {str(e)}"
+        }, 500
+
+
+@app.route('/api/v1/placement/batch', methods=['POST'])
+def placement_batch_endpoint():
+    """
+    Coloca varias solicitudes de slice contra UN solo snapshot del clúster.
+
+    Todo el lote usa el mismo snapshot de cada zona y las solicitudes se
+    procesan en orden; tras cada asignación el host elegido se actualiza en memoria
+    (μ/σ de CPU y RAM, disco usado), así que las siguientes solicitudes ven
+    esa carga.
+
+    Request JSON (lista directa o envuelta en "requests"):
+    {
+        "requests": [
+            {"cpu": 2, "ram_gb": 2.0, "disk_gb": 5.0, "zone": "AZ1", ...},
+            {"cpu": 1, "ram_gb": 1.0, "disk_gb": 2.0, "zone": "AZ2", ...}
+        ]
+    }
+
+    Response JSON:
+    {
+        "success": true,
+        "placed": 1,
+        "total": 2,
+        "results": [
+            {"index": 0, "success": true, "placement": {...}},
+            {"index": 1, "success": false, "error": "..."}
+        ]
+    }
+    """
+    body, status = handle_placement_batch(request.get_json(silent=True), request.args)
+    return jsonify(body), status
+
+
+def handle_placement_batch(json_data, args: Mapping[str, str]) -> Tuple[Dict, int]:
+    """Lógica de POST /api/v1/placement/batch (ver handle_placement)."""
+    try:
+        items = json_data.get("requests") if isinstance(json_data, dict) else json_data
+
+        if not isinstance(items, list) or not items:
+            return {
+                "success": False,
+                "error": "Se esperaba una lista no vacía de solicitudes"
+            }, 400
+
+        if len(items) > MAX_BATCH_SIZE:
+            return {
+                "success": False,
+                "error": f"Máximo {MAX_BATCH_SIZE} solicitudes por lote"
+            }, 400
+
+        logger.debug("Lote recibido: %d solicitudes", len(items))
+
+        options = json_data if isinstance(json_data, dict) else {}
+        risk_model = parse_risk_model(args.get("risk_model", options.get("risk_model")))
+        scoring = parse_scoring(args.get("scoring", options.get("scoring")))
+
+        results: List[Optional[Dict]] = [None] * len(items)
+
+        # 1. Parsear y agrupar por zona conservando el orden de llegada
+        by_zone: Dict[str, List[int]] = {}
+        slice_reqs: Dict[int, SliceRequest] = {}
+        for i, item in enumerate(items):
+            slice_req = parse_slice_request(item) if isinstance(item, dict) else None
+            if not slice_req:
+                results[i] = {
+                    "index": i,
+                    "success": False,
+                    "error": "Error parseando los parámetros de la solicitud"
+                }
+                continue
+            slice_reqs[i] = slice_req
+            by_zone.setdefault(slice_req.zone, []).append(i)
+
+        # 2. Placement secuencial por zona contra el snapshot en memoria
+        for zone, indices in by_zone.items():
+            state = get_cluster_state_for_zone(zone)
+            if len(state) == 0:
+                for i in indices:
+                    results[i] = {
+                        "index": i,
+                        "success": False,
+                        "error": f"No hay workers disponibles en la zona {zone}"
+                    }
+                continue
+
+            # El lote se planifica sobre una copia; cada decisión se confirma
+            # con commit optimista contra el snapshot y el ledger actuales
+            generations = LEDGER.generations()
+            decisions = place_batch(
+                [slice_reqs[i] for i in indices], LEDGER.apply_to(state).copy(), risk_model, scoring
+            )
+            for i, decision in zip(indices, decisions):
+                if decision:
+                    decision, allocation_id, conflicts = place_optimistic(
+                        slice_reqs[i], state, LEDGER,
+                        lambda view, req=slice_reqs[i]: decide_vm_placement_vectorized(
+                            req, view, risk_model=risk_model, scoring=scoring
+                        ),
+                        decision, generations, risk_model
+                    )
+                    record_commit(conflicts, decision is not None)
+                if decision:
+                    results[i] = {
+                        "index": i,
+                        "success": True,
+                        "placement": asdict(decision),
+                        "allocation_id": allocation_id
+                    }
+                else:
+                    results[i] = {
+                        "index": i,
+                        "success": False,
+                        "error": "No hay hosts disponibles que cumplan los requisitos de riesgo"
+                    }
+
+        placed = sum(1 for r in results if r["success"])
+        logger.info("Lote procesado: %d/%d slices colocados", placed, len(items))
+
+        return {
+            "success": True,
+            "placed": placed,
+            "total": len(items),
+            "results": results
+        }, 200
+
+    except Exception as e:
+        logger.exception("Error interno: %s", e)
+
+        return {
+            "success": False,
+            "error": f"Error interno del servidor: {str(e)}"
+        }, 500
+
+
+@app.route('/api/v1/placement/plan', methods=['POST'])
+def placement_plan_endpoint():
+    """
+    Modo plan (offline): asignación conjunta de un lote conocido de antemano
+    (ej. lanzamiento programado de un curso), maximizando los slices
+    admitidos en lugar de decidir uno por uno (ver plan_placement.py).
+
+    Request JSON:
+    {
+        "slices": [
+            {"cpu": 2, "ram_gb": 2.0, "disk_gb": 5.0, "zone": "AZ1", ...},
+            ...
+        ],
+        "method": "auto",          // opcional: "auto", "branch_and_bound", "milp", "greedy"
+        "time_budget_s": 10,       // opcional: presupuesto de cómputo
+        "reserve": false           // opcional: reservar en el ledger lo admitido
+    }
+
+    Response JSON:
+    {
+        "success": true,
+        "admitted": 38, "total": 40, "greedy_admitted": 35,
+        "method": "branch_and_bound", "optimal": true,
+        "results": [{"index": 0, "success": true, "placement": {...}, "allocation_id": "..."}, ...]
+    }
+    """
+    try:
+        json_data = request.get_json(silent=True)
+        items = (json_data or {}).get("slices") if isinstance(json_data, dict) else None
+        if not isinstance(items, list) or not items:
+            return jsonify({
+                "success": False,
+                "error": "Se requiere un JSON con la lista 'slices'"
+            }), 400
+        if len(items) > MAX_PLAN_SIZE:
+            return jsonify({
+                "success": False,
+                "error": f"Máximo {MAX_PLAN_SIZE} slices por plan"
+            }), 400
+
+        slice_reqs = []
+        for i, item in enumerate(items):
+            slice_req = parse_slice_request(item) if isinstance(item, dict) else None
+            if not slice_req:
+                return jsonify({
+                    "success": False,
+                    "error": f"Error parseando el slice {i} del plan"
+                }), 400
+            slice_reqs.append(slice_req)
+
+        method = json_data.get("method") or "auto"
+        if method not in PLAN_METHODS:
+            return jsonify({
+                "success": False,
+                "error": f"Método desconocido: {method} (opciones: {', '.join(PLAN_METHODS)})"
+            }), 400
+        try:
+            budget = float(json_data.get("time_budget_s", DEFAULT_TIME_BUDGET))
+        except (TypeError, ValueError):
+            budget = DEFAULT_TIME_BUDGET
+        budget = min(max(budget, 0.0), MAX_PLAN_BUDGET_SECONDS)
+
+        LEDGER.purge_expired()
+        snapshot = get_cluster_state_for_zone(None)
+        generations = LEDGER.generations()
+        plan = plan_placement(slice_reqs, LEDGER.apply_to(snapshot), method, budget)
+
+        # Con reserve=true cada decisión se confirma con commit optimista: si
+        # entretanto otra solicitud dejó su host sin margen, esa no se reserva
+        reserve = parse_flag(json_data.get("reserve", False))
+        results = []
+        for i, decision in enumerate(plan.decisions):
+            if decision is None:
+                results.append({"index": i, "success": False, "error": "Sin host en el plan"})
+                continue
+            result = {"index": i, "success": True, "placement": asdict(decision)}
+            if reserve:
+                ticket = PlacementTicket.for_decision(slice_reqs[i], decision, snapshot.version, generations)
+                allocation_id = commit_placement(ticket, LEDGER, snapshot)
+                record_commit(int(allocation_id is None), allocation_id is not None)
+                if allocation_id is None:
+                    result = {"index": i, "success": False, "error": "Conflicto al reservar: el host ya no es viable"}
+                else:
+                    result["allocation_id"] = allocation_id
+            results.append(result)
+
+        logger.info(
+            "Plan %s: %d/%d slices (voraz %d) en %.2f s",
+            plan.method, plan.admitted, plan.total, plan.greedy_admitted, plan.elapsed_s
+        )
+        return jsonify({
+            "success": True,
+            "admitted": plan.admitted,
+            "total": plan.total,
+            "greedy_admitted": plan.greedy_admitted,
+            "upper_bound": plan.upper_bound,
+            "method": plan.method,
+            "optimal": plan.optimal,
+            "elapsed_s": round(plan.elapsed_s, 3),
+            "results": results
+        }), 200
+
+    except Exception as e:
+        logger.exception("Error interno: %s", e)
+
+        return jsonify({
+            "success": False,
+            "error": f"Error interno del servidor: {str(e)}"
+        }), 500
+
+
+@app.route('/api/v1/placement/gang', methods=['POST'])
+def placement_gang_endpoint():
+    """
+    Gang placement: coloca cada VM de una plantilla por separado, todo o nada.
+
+    Request JSON ("template" es el json_template guardado por /templates,
+    también se acepta directamente "recursos"):
+    {
+        "zone": "AZ1",
+        "platform": "linux",
+        "user_profile": "Estudiante",
+        "technical_context": "Cloud",
+        "placement_strategy": "topology",   // opcional: "per_vm" (defecto) o "topology"
+        "spread": "slice",                  // opcional: "replicas" (defecto), "slice" o "none"
+        "spread_strict": false,             // opcional: rechazar si no hay racks distintos
+        "template": {
+            "topologia": {...},
+            "recursos": {
+                "vm-1": {"vcpu": 1, "ram_gb": 1.0, "disk_gb": 5.0, ...},
+                "vm-2": {"vcpu": 2, "ram_gb": 2.0, "disk_gb": 5.0, "spread_group": "db", ...}
+            }
+        }
+    }
+
+    Las VMs con el mismo "spread_group" (o todas, con "spread": "slice") se
+    colocan en racks distintos (metadata.rack del nodo).
+
+    Response JSON (éxito):
+    {
+        "success": true,
+        "placement": {
+            "platform": "linux",
+            "availability_zone": "AZ1",
+            "reason": "2 VMs colocadas en 2 host(s) linux",
+            "vms": {"vm-1": {"host": ...}, "vm-2": {"host": ...}},
+            "racks": {"vm-1": "RACK-A", "vm-2": "RACK-B"},
+            "spread_violations": 0
+        }
+    }
+    """
+
+    try:
+        json_data = request.get_json(silent=True)
+
+        if not isinstance(json_data, dict) or "zone" not in json_data:
+            return jsonify({
+                "success": False,
+                "error": "Se requiere un JSON con 'zone' y 'template' o 'recursos'"
+            }), 400
+
+        recursos = (json_data.get("template") or {}).get("recursos") or json_data.get("recursos")
+        if not isinstance(recursos, dict) or not recursos:
+            return jsonify({
+                "success": False,
+                "error": "La plantilla no contiene VMs en 'recursos'"
+            }), 400
+
+        base_req = SliceRequest(
+            cpu=sum(int(vm.get("vcpu", 0)) for vm in recursos.values()),
+            ram_gb=sum(float(vm.get("ram_gb", 0.0)) for vm in recursos.values()),
+            disk_gb=sum(float(vm.get("disk_gb", 0.0)) for vm in recursos.values()),
+            zone=json_data["zone"],
+            platform=json_data.get("platform"),
+            user_profile=json_data.get("user_profile"),
+            technical_context=json_data.get("technical_context"),
+            cpu_overcommit=parse_overcommit(json_data.get("sla_overcommit_cpu_pct")),
+            ram_overcommit=parse_overcommit(json_data.get("sla_overcommit_ram_pct")),
+        )
+        logger.debug("Plantilla con %d VMs para zona %s", len(recursos), base_req.zone)
+
+        state = get_cluster_state_for_zone(base_req.zone)
+        if len(state) == 0:
+            return jsonify({
+                "success": False,
+                "error": f"No hay workers disponibles en la zona {base_req.zone}"
+            }), 404
+
+        template = json_data.get("template") or {}
+        edges = (template.get("topologia") or {}).get("edges") or json_data.get("edges") or []
+        strategy = json_data.get("placement_strategy") or "per_vm"
+        spread = json_data.get("spread") or "replicas"
+        spread_strict = parse_flag(json_data.get("spread_strict", False))
+
+        # Todas las VMs se confirman juntas (commit optimista); si otra
+        # solicitud dejó algún host sin margen se recalcula el gang completo
+        gang, allocation_id, conflicts = None, None, 0
+        for _ in range(COMMIT_RETRIES + 1):
+            generations = LEDGER.generations()
+            gang = decide_gang_placement(
+                recursos, base_req, LEDGER.apply_to(state), commit=False, strategy=strategy, edges=edges,
+                spread=spread, spread_strict=spread_strict
+            )
+            if not gang:
+                break
+            ticket = PlacementTicket(base_req, gang.assignments, state.version, generations)
+            latest = get_cluster_state_for_zone(base_req.zone)
+            allocation_id = commit_placement(ticket, LEDGER, latest)
+            if allocation_id is not None:
+                break
+            conflicts += 1
+            state, gang = latest, None
+        if conflicts or gang:
+            record_commit(conflicts, gang is not None)
+
+        if gang:
+            logger.info("Gang placement: %s", gang.reason)
+            return jsonify({
+                "success": True,
+                "allocation_id": allocation_id,
+                "placement": {
+                    "platform": gang.platform,
+                    "availability_zone": gang.availability_zone,
+                    "reason": gang.reason,
+                    "cross_host_edges": gang.cross_host_edges,
+                    "vms": {vm_id: asdict(d) for vm_id, d in gang.placements.items()},
+                    "racks": gang.racks,
+                    "spread_violations": gang.spread_violations
+                }
+            }), 200
+
+        logger.info("Gang placement sin host viable para alguna VM (no se asignó ninguna)")
+        return jsonify({
+            "success": False,
+            "error": "No hay hosts viables para todas las VMs del slice"
+        }), 409
+
+    except (ValueError, TypeError, AttributeError) as e:
+        return jsonify({
+            "success": False,
+            "error": f"Error parseando la plantilla: {e}"
+        }), 400
+
+    except Exception as e:
+        logger.exception("Error interno: %s", e)
+
         return jsonify({
             "success": False,
             "error": f"Error interno del servidor: {str(e)}"
         }), 500
 
 
+@app.route('/api/v1/placement/allocations', methods=['GET'])
+def list_allocations_endpoint():
+    """Lista las asignaciones pendientes que se suman al estado de los hosts."""
+    LEDGER.purge_expired()
+    now = LEDGER.clock()
+    return jsonify({
+        "pending": [
+            {
+                "allocation_id": alloc.allocation_id,
+                "hosts": [d.host for d in alloc.deltas],
+                "expires_in_s": round(alloc.expires_at - now, 1)
+            }
+            for alloc in LEDGER.allocations()
+        ]
+    }), 200
+
+
+@app.route('/api/v1/placement/allocations/<allocation_id>', methods=['DELETE'])
+def release_allocation_endpoint(allocation_id: str):
+    """
+    Libera una asignación pendiente: el orquestador la llama si el deploy
+    falló, o cuando el slice ya es visible en las métricas del host.
+    """
+    if LEDGER.release(allocation_id):
+        process_admission_queue()
+        return jsonify({"success": True, "released": allocation_id}), 200
+
+    return jsonify({
+        "success": False,
+        "error": f"Asignación {allocation_id} no existe o ya venció"
+    }), 404
+
+
+@app.route('/api/v1/placement/queue', methods=['GET'])
+def list_queue_endpoint():
+    """Solicitudes en espera en la cola de admisión, en orden de prioridad."""
+    process_admission_queue()
+    return jsonify({
+        "queued": [queued_request_to_dict(e) for e in ADMISSION_QUEUE.pending()]
+    }), 200
+
+
+@app.route('/api/v1/placement/queue/<queue_id>', methods=['GET'])
+def queue_status_endpoint(queue_id: str):
+    """
+    Estado de una solicitud de la cola: "queued" (con su posición),
+    "placed" (con placement y allocation_id), "expired" o "cancelled".
+    """
+    process_admission_queue()
+    entry = ADMISSION_QUEUE.get(queue_id)
+    if entry is None:
+        return jsonify({
+            "success": False,
+            "error": f"Solicitud {queue_id} no existe o su resultado ya venció"
+        }), 404
+    return jsonify({"success": True, **queued_request_to_dict(entry)}), 200
+
+
+@app.route('/api/v1/placement/queue/<queue_id>', methods=['DELETE'])
+def cancel_queue_endpoint(queue_id: str):
+    """Retira de la cola una solicitud que sigue esperando."""
+    if ADMISSION_QUEUE.cancel(queue_id):
+        return jsonify({"success": True, "cancelled": queue_id}), 200
+
+    return jsonify({
+        "success": False,
+        "error": f"Solicitud {queue_id} no está en espera"
+    }), 404
+
+
 @app.route('/api/v1/health', methods=['GET'])
 def health_check():
     """Endpoint simple para verificar que la API está funcionando"""
-    return jsonify({
+    return jsonify(health_status()), 200
+
+
+def _reader_version() -> Optional[int]:
+    """Versión publicada en SNAPSHOT_READER (None si aún no hay ninguna)."""
+    try:
+        return SNAPSHOT_READER.current().version
+    except (FileNotFoundError, LookupError):
+        return None
+
+
+def health_status() -> Dict:
+    """Cuerpo de /api/v1/health (también lo usa el servicio ASGI)."""
+    return {
         "status": "healthy",
         "service": "VM Placement API",
-        "version": "1.0"
-    }), 200
+        "version": "1.0",
+        "decision_cache": DECISION_CACHE.stats(),
+        "admission_queue": len(ADMISSION_QUEUE),
+        "commits": dict(COMMIT_STATS),
+        "snapshot": NODES_CACHE.status() if SNAPSHOT_READER is None else {"version": _reader_version()},
+        "model_tables_version": vm_placement.TABLES_VERSION,
+        "scoring": None if SCORING_POLICY is None else {
+            "default": SCORING_POLICY.weights, "zones": SCORING_POLICY.zone_weights
+        }
+    }
 
 
 # ========================================
@@ -334,14 +1025,25 @@ def health_check():
 # ========================================
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
     print("="*70)
     print("SERVIDOR DE VM PLACEMENT API")
     print("="*70)
     print("Endpoints disponibles:")
     print("  POST /api/v1/placement  - Solicitar placement de VM")
+    print("  POST /api/v1/placement/batch - Placement de varios slices en lote")
+    print("  POST /api/v1/placement/gang  - Placement por VM de una plantilla")
+    print("  POST /api/v1/placement/plan  - Plan conjunto de un lote (offline)")
+    print("  GET  /api/v1/placement/allocations       - Asignaciones pendientes")
+    print("  DELETE /api/v1/placement/allocations/<id> - Liberar asignación pendiente")
+    print("  GET  /api/v1/placement/queue/<id>  - Estado de una solicitud en cola")
+    print("  DELETE /api/v1/placement/queue/<id> - Retirar solicitud de la cola")
     print("  GET  /api/v1/health     - Health check")
     print("="*70)
     print("\n🚀 Iniciando servidor en http://localhost:5000")
+
+    NODES_CACHE.start()   # revalida /nodes/status cada PLACEMENT_SNAPSHOT_TTL segundos
     
     app.run(
         host='0.0.0.0',
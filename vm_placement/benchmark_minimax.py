@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark del paso Minimax de decide_vm_placement.
+
+Compara, para clústeres de 1k / 10k / 100k hosts (todos candidatos viables,
+el peor caso):
+
+- ANTERIOR  : por cada candidato se recorre todo baseline_risk -> O(c * n)
+- LINEAL    : top-2 baseline calculado una vez, O(1) por candidato -> O(n)
+- VECTORIAL : cluster_risk_after + select_minimax de placement_engine
+
+El método anterior es inviable en 100k hosts (10^10 iteraciones), así que se
+mide sobre una muestra de candidatos y se extrapola al total (marcado con *).
+
+Uso:
+    python3 benchmark_minimax.py [n_hosts ...]
+"""
+
+import random
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from vm_placement import top_two_baseline_risks, minimax_key
+from placement_engine import cluster_risk_after, select_minimax
+
+MUESTRA_ANTERIOR = 200   # candidatos medidos con el método cuadrático
+
+
+def minimax_anterior(candidates: List[Tuple[str, float]], baseline_risk: Dict[str, float]) -> str:
+    """Implementación original: recorre todo baseline_risk por candidato."""
+    best_name, best_risk = None, None
+    for name, local_max in candidates:
+        cluster_max = 0.0
+        for other_name, base_risk in baseline_risk.items():
+            if other_name == name:
+                cluster_max = max(cluster_max, local_max)
+            else:
+                cluster_max = max(cluster_max, base_risk)
+        if best_risk is None or cluster_max < best_risk:
+            best_risk, best_name = cluster_max, name
+    return best_name
+
+
+def minimax_lineal(
+    candidates: List[Tuple[str, float]],
+    baseline_risk: Dict[str, float],
+    disk_free: Dict[str, float]
+) -> str:
+    """Implementación actual del motor escalar (top-2 + desempate)."""
+    top_name, top1, top2 = top_two_baseline_risks(baseline_risk)
+    best_name, best_key = None, None
+    for name, local_max in candidates:
+        cluster_max = max(local_max, top2 if name == top_name else top1)
+        key = minimax_key(cluster_max, local_max, disk_free[name])
+        if best_key is None or key < best_key:
+            best_key, best_name = key, name
+    return best_name
+
+
+def medir(n: int, rng: random.Random) -> None:
+    names = [f"host-{i}" for i in range(n)]
+    baseline = [rng.uniform(0.0, 0.01) for _ in range(n)]
+    local = [b + rng.uniform(0.0, 0.01) for b in baseline]
+    disk = [rng.uniform(0.0, 500.0) for _ in range(n)]
+
+    baseline_risk = dict(zip(names, baseline))
+    disk_free = dict(zip(names, disk))
+    candidates = list(zip(names, local))
+
+    # 1) Método anterior (muestra + extrapolación si n es grande)
+    muestra = candidates[:min(n, MUESTRA_ANTERIOR)]
+    t0 = time.perf_counter()
+    minimax_anterior(muestra, baseline_risk)
+    t_anterior = (time.perf_counter() - t0) * (n / len(muestra))
+    extrapolado = "*" if len(muestra) < n else " "
+
+    # 2) Método lineal (escalar)
+    t0 = time.perf_counter()
+    elegido_lineal = minimax_lineal(candidates, baseline_risk, disk_free)
+    t_lineal = time.perf_counter() - t0
+
+    # 3) Método vectorial (NumPy)
+    b_arr = np.array(baseline)
+    l_arr = np.array(local)
+    d_arr = np.array(disk)
+    t0 = time.perf_counter()
+    idx = select_minimax(cluster_risk_after(b_arr, l_arr), l_arr, d_arr)
+    t_vector = time.perf_counter() - t0
+
+    iguales = names[idx] == elegido_lineal
+
+    print(
+        f"{n:>8} | {t_anterior * 1000:>12.1f}{extrapolado} | {t_lineal * 1000:>10.2f} "
+        f"| {t_vector * 1000:>10.3f} | {t_anterior / t_lineal:>9.0f}x | {iguales}"
+    )
+
+
+def main():
+    tamanos = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    rng = random.Random(7)
+
+    print("=" * 78)
+    print("BENCHMARK MINIMAX - SELECCIÓN DE HOST (todos los hosts candidatos)")
+    print("=" * 78)
+    print(f"{'hosts':>8} | {'anterior ms':>13} | {'lineal ms':>10} | {'numpy ms':>10} | {'speedup':>10} | misma decisión")
+    print("-" * 78)
+    for n in tamanos:
+        medir(n, rng)
+    print("-" * 78)
+    print(f"* extrapolado desde {MUESTRA_ANTERIOR} candidatos medidos")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Calibración automática de PROFILE_TABLE y CONTEXT_TABLE a partir del uso
+observado de las VMs.
+
+Los coeficientes de las tablas vienen del PDF y sobreestiman el consumo: los
+hosts parecen "riesgosos" aunque estén casi ociosos. Este job:
+
+1. Lee observaciones por VM (JSON Lines). Cada línea es el cruce de un
+   registro de `vms`/`slices` (vcpu, ram_mb) con el perfil y contexto con que
+   se pidió el placement y las muestras de uso de esa VM en Prometheus:
+
+       {"vm_id": 12, "slice_id": 3, "user_profile": "Estudiante",
+        "technical_context": "Cloud", "vcpu": 2, "ram_gb": 2.0,
+        "cpu_samples": [0.12, 0.30, ...],      # cores usados
+        "ram_samples": [0.41, 0.44, ...]}      # GB usados
+
+2. Acumula por (perfil, contexto) la media y la varianza de la fracción de
+   uso (usado / reservado) con el algoritmo de Welford: una sola pasada, sin
+   guardar las muestras, y acumuladores combinables entre corridas.
+
+3. Ajusta el modelo multiplicativo del motor
+       μ = mu_perfil · f_contexto          σ = sigma_perfil · f_contexto · v_contexto
+   por mínimos cuadrados en escala logarítmica (alternando perfil/contexto,
+   ponderado por número de muestras). El contexto "Cloud" queda fijo como
+   referencia de escala. Perfiles o contextos sin datos conservan su valor.
+
+4. Publica tablas versionadas (tablas_v<N>.json) y reemplaza atómicamente
+   tablas_actuales.json, que la API recarga en caliente (TablesWatcher).
+
+Uso:
+    python3 calibracion_tablas.py --observaciones uso_vms.jsonl --salida tablas_modelo
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import tempfile
+import threading
+import time
+
+import vm_placement
+
+CURRENT_TABLES_FILE = "tablas_actuales.json"
+REFERENCE_CONTEXT = "Cloud"     # fija la escala de f/v (si no, el ajuste no es único)
+MIN_SAMPLES = 30                # muestras mínimas por celda (perfil, contexto)
+_FLOOR = 1e-4                   # evita log(0) en celdas casi ociosas
+
+
+# ==========================
+#   ESTIMADOR EN STREAMING
+# ==========================
+
+@dataclass
+class RunningStats:
+    """Media y varianza en una pasada (Welford); `merge` combina dos acumuladores."""
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+
+    def push(self, x: float) -> None:
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def merge(self, other: "RunningStats") -> None:
+        if other.count == 0:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / self.count) if self.count > 1 else 0.0
+
+
+# ==========================
+#   CALIBRADOR
+# ==========================
+
+class TableCalibrator:
+    """Acumula fracciones de uso por (perfil, contexto) y ajusta las tablas."""
+
+    def __init__(self, min_samples: int = MIN_SAMPLES):
+        self.min_samples = min_samples
+        # (perfil, contexto) -> {"cpu": RunningStats, "ram": RunningStats}
+        self.cells: Dict[Tuple[str, str], Dict[str, RunningStats]] = {}
+
+    def add_observation(self, obs: Dict) -> None:
+        """Incorpora las muestras de una VM (ver formato en el docstring del módulo)."""
+        key = (obs.get("user_profile") or "Estudiante", obs.get("technical_context") or REFERENCE_CONTEXT)
+        cell = self.cells.setdefault(key, {"cpu": RunningStats(), "ram": RunningStats()})
+
+        reserved = {"cpu": float(obs.get("vcpu") or 0), "ram": float(obs.get("ram_gb") or 0)}
+        for resource in ("cpu", "ram"):
+            if reserved[resource] <= 0:
+                continue
+            for used in obs.get(f"{resource}_samples") or []:
+                cell[resource].push(float(used) / reserved[resource])
+
+    def fit(
+        self,
+        profile_table: Dict[str, Dict[str, float]],
+        context_table: Dict[str, Dict[str, float]],
+        iterations: int = 25
+    ) -> Tuple[Dict[str, Dict[str, float]], Dict[str, Dict[str, float]]]:
+        """
+        Devuelve (PROFILE_TABLE, CONTEXT_TABLE) ajustadas, partiendo de las
+        tablas actuales. Solo se usan celdas con al menos `min_samples`.
+        """
+        profiles = {p: dict(v) for p, v in profile_table.items()}
+        contexts = {c: dict(v) for c, v in context_table.items()}
+
+        cells = {
+            key: cell for key, cell in self.cells.items()
+            if min(cell["cpu"].count, cell["ram"].count) >= self.min_samples
+        }
+        for p, c in cells:
+            profiles.setdefault(p, dict(profile_table["Estudiante"]))
+            contexts.setdefault(c, dict(context_table[REFERENCE_CONTEXT]))
+
+        for _ in range(iterations):
+            # Medias: log m_pc = log mu_p + log f_c
+            for r in ("cpu", "ram"):
+                _alternate(cells, profiles, contexts, f"mu_{r}", f"f_{r}", lambda cell, r=r: cell[r].mean)
+
+            # Desviaciones: log(s_pc / f_c) = log sigma_p + log v_c (v compartido por CPU y RAM)
+            for p in {p for p, _ in cells}:
+                for r in ("cpu", "ram"):
+                    profiles[p][f"sigma_{r}"] = _weighted_geomean([
+                        (cell[r].std / (contexts[c][f"f_{r}"] * contexts[c]["v"]), cell[r].count)
+                        for (pp, c), cell in cells.items() if pp == p
+                    ])
+            for c in {c for _, c in cells} - {REFERENCE_CONTEXT}:
+                contexts[c]["v"] = _weighted_geomean([
+                    (cell[r].std / (contexts[c][f"f_{r}"] * profiles[p][f"sigma_{r}"]), cell[r].count)
+                    for (p, cc), cell in cells.items() if cc == c
+                    for r in ("cpu", "ram")
+                ])
+
+        return _rounded(profiles), _rounded(contexts)
+
+    def sample_counts(self) -> Dict[str, int]:
+        return {f"{p} | {c}": cell["cpu"].count for (p, c), cell in sorted(self.cells.items())}
+
+
+def _weighted_geomean(values: List[Tuple[float, int]]) -> float:
+    """Media geométrica ponderada (mínimos cuadrados en escala logarítmica)."""
+    total = sum(w for _, w in values)
+    return math.exp(sum(w * math.log(max(v, _FLOOR)) for v, w in values) / total)
+
+
+def _alternate(cells, profiles, contexts, profile_key: str, context_key: str, value) -> None:
+    """Un paso de mínimos cuadrados alternados para value(cell) ≈ profile[p] · context[c]."""
+    for p in {p for p, _ in cells}:
+        profiles[p][profile_key] = _weighted_geomean([
+            (value(cell) / contexts[c][context_key], cell["cpu"].count)
+            for (pp, c), cell in cells.items() if pp == p
+        ])
+    for c in {c for _, c in cells} - {REFERENCE_CONTEXT}:
+        contexts[c][context_key] = _weighted_geomean([
+            (value(cell) / profiles[p][profile_key], cell["cpu"].count)
+            for (p, cc), cell in cells.items() if cc == c
+        ])
+
+
+def _rounded(table: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    return {k: {f: round(v, 4) for f, v in entry.items()} for k, entry in table.items()}
+
+
+# ==========================
+#   PUBLICACIÓN Y RECARGA
+# ==========================
+
+def next_version(output_dir: str) -> int:
+    versions = [
+        int(m.group(1)) for path in glob.glob(os.path.join(output_dir, "tablas_v*.json"))
+        if (m := re.search(r"tablas_v(\d+)\.json$", path))
+    ]
+    return max(versions, default=0) + 1
+
+
+def publish_tables(
+    output_dir: str,
+    profile_table: Dict[str, Dict[str, float]],
+    context_table: Dict[str, Dict[str, float]],
+    samples: Optional[Dict[str, int]] = None
+) -> str:
+    """
+    Escribe tablas_v<N>.json y reemplaza atómicamente tablas_actuales.json
+    (archivo temporal + os.replace: un lector nunca ve un JSON a medias).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    version = next_version(output_dir)
+    payload = {
+        "version": version,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "PROFILE_TABLE": profile_table,
+        "CONTEXT_TABLE": context_table,
+        "samples": samples or {},
+    }
+
+    versioned = os.path.join(output_dir, f"tablas_v{version}.json")
+    for path in (versioned, os.path.join(output_dir, CURRENT_TABLES_FILE)):
+        fd, tmp = tempfile.mkstemp(dir=output_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(payload, f, indent=4, ensure_ascii=False)
+        os.replace(tmp, path)
+    return versioned
+
+
+class TablesWatcher:
+    """
+    Recarga las tablas publicadas cuando cambia el archivo. `refresh` hace
+    como máximo un stat() cada `min_interval` segundos, así que se puede
+    llamar en cada solicitud. El cambio se detecta por (inodo, mtime):
+    publish_tables reemplaza el archivo, así que cada publicación tiene un
+    inodo nuevo aunque caiga en el mismo instante de mtime.
+    """
+
+    def __init__(self, path: str, min_interval: float = 5.0):
+        self.path = path
+        self.min_interval = min_interval
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """True si se cargó una versión nueva."""
+        now = time.monotonic()
+        if now - self._checked_at < self.min_interval or not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self._checked_at = now
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                return False
+            stamp = (st.st_ino, st.st_mtime_ns)
+            if stamp == self._stamp:
+                return False
+            vm_placement.load_model_tables(self.path)
+            self._stamp = stamp
+            return True
+        finally:
+            self._lock.release()
+
+
+# ==========================
+#   CLI
+# ==========================
+
+def load_observations(path: str) -> Iterable[Dict]:
+    """Itera las observaciones de un archivo JSON Lines sin cargarlo entero."""
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibración de PROFILE_TABLE / CONTEXT_TABLE")
+    parser.add_argument("--observaciones", required=True, nargs="+", help="archivos JSON Lines de uso por VM")
+    parser.add_argument("--salida", default="tablas_modelo", help="directorio de tablas publicadas")
+    parser.add_argument("--min-muestras", type=int, default=MIN_SAMPLES)
+    parser.add_argument("--base", help="tablas de partida (por defecto las de vm_placement.py)")
+    args = parser.parse_args()
+
+    if args.base:
+        vm_placement.load_model_tables(args.base)
+
+    calibrator = TableCalibrator(min_samples=args.min_muestras)
+    for path in args.observaciones:
+        for obs in load_observations(path):
+            calibrator.add_observation(obs)
+
+    profile_table, context_table = calibrator.fit(vm_placement.PROFILE_TABLE, vm_placement.CONTEXT_TABLE)
+    published = publish_tables(args.salida, profile_table, context_table, calibrator.sample_counts())
+
+    print("=" * 78)
+    print("CALIBRACIÓN DE TABLAS DEL MODELO")
+    print("=" * 78)
+    for name, counts in calibrator.sample_counts().items():
+        print(f"   {name:<40} {counts:>8} muestras")
+    print("-" * 78)
+    for name, entry in profile_table.items():
+        print(f"   {name:<22} {entry}")
+    for name, entry in context_table.items():
+        print(f"   {name:<22} {entry}")
+    print("-" * 78)
+    print(f"Tablas publicadas en {published}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Estado del clúster en formato COLUMNAR (struct-of-arrays).
+
+En lugar de una List[HostState] (un dataclass + dict de metadata por host),
+ClusterState guarda una columna NumPy por atributo:
+
+- Capacidad instalada (CPU, RAM, disco)
+- Consumo a largo plazo (μ, σ) de CPU y RAM y su covarianza
+- Disco usado (determinista)
+- Techo de sobreasignación (overcommit) de CPU y RAM
+- Habilitado / mantenimiento
+- Zona, plataforma y rack (dominio de falla) como códigos enteros
+  (tablas de códigos compartidas)
+- Opcional: histogramas de uso CPU/RAM (modelo de riesgo empírico)
+
+Ofrece búsqueda de fila por nombre, índices de filas por (zona,
+plataforma) y por rack, y actualización O(1) por host. Cada mutación asigna un número
+de versión nuevo y estrictamente creciente (global al proceso), de modo
+que una versión identifica un snapshot.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+import itertools
+import logging
+import math
+
+import numpy as np
+
+from vm_placement import HostState, Platform, DEFAULT_CPU_OVERCOMMIT_MAX, DEFAULT_RAM_OVERCOMMIT_MAX
+
+logger = logging.getLogger("vm_placement")
+
+# Contador global: las versiones nunca se repiten entre snapshots distintos
+_VERSION_COUNTER = itertools.count(1)
+
+# Columnas numéricas (float64) y booleanas que se pueden actualizar por host
+FLOAT_COLUMNS = (
+    "cpu_capacity", "ram_gb_capacity", "disk_gb_capacity",
+    "mu_cpu", "sigma_cpu", "mu_ram_gb", "sigma_ram_gb",
+    "disk_gb_used", "cov_cpu_ram",
+    "cpu_overcommit_max", "ram_overcommit_max",
+)
+BOOL_COLUMNS = ("enabled", "in_maintenance")
+
+PLATFORMS: List[Platform] = ["linux", "openstack"]
+
+# Los histogramas de nodes_status.json se re-muestrean a una grilla común de
+# HIST_BINS buckets sobre [0, 1] x capacidad del host, así se evalúan todos
+# los hosts como una sola matriz (n_hosts x HIST_BINS).
+HIST_BINS = 50
+HIST_RESOURCES = ("cpu", "ram")
+
+
+class ClusterState:
+    """
+    Snapshot columnar del clúster. La fila i de cada columna corresponde
+    al host `names[i]`.
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        zone_names: List[str],
+        zone_codes: np.ndarray,
+        platform_codes: np.ndarray,
+        columns: Dict[str, np.ndarray],
+        histograms: Optional[Dict[str, np.ndarray]] = None,
+        rack_names: Optional[List[str]] = None,
+        rack_codes: Optional[np.ndarray] = None,
+    ):
+        self.names = names
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(names)}
+
+        # Tabla de códigos de zona: zone_names[code] -> "AZ1"
+        self.zone_names = zone_names
+        self.zone_lookup: Dict[str, int] = {z: i for i, z in enumerate(zone_names)}
+        self.zone_codes = zone_codes
+        self.platform_codes = platform_codes
+
+        # Tabla de códigos de rack (metadata.rack); sin racks cada host es
+        # su propio dominio de falla
+        if rack_codes is None:
+            rack_names, rack_codes = list(names), np.arange(len(names), dtype=np.int32)
+        self.rack_names = rack_names
+        self.rack_lookup: Dict[str, int] = {r: i for i, r in enumerate(rack_names)}
+        self.rack_codes = rack_codes
+
+        self.cpu_capacity = columns["cpu_capacity"]
+        self.ram_gb_capacity = columns["ram_gb_capacity"]
+        self.disk_gb_capacity = columns["disk_gb_capacity"]
+        self.mu_cpu = columns["mu_cpu"]
+        self.sigma_cpu = columns["sigma_cpu"]
+        self.mu_ram_gb = columns["mu_ram_gb"]
+        self.sigma_ram_gb = columns["sigma_ram_gb"]
+        self.disk_gb_used = columns["disk_gb_used"]
+        # Covarianza observada: apply_slice no la cambia (slices independientes)
+        self.cov_cpu_ram = columns["cov_cpu_ram"]
+        self.cpu_overcommit_max = columns["cpu_overcommit_max"]
+        self.ram_overcommit_max = columns["ram_overcommit_max"]
+        self.enabled = columns["enabled"]
+        self.in_maintenance = columns["in_maintenance"]
+
+        # histograms["cpu"/"ram"]: masa de probabilidad por bucket (fila NaN si
+        # el host no tiene histograma); histograms["mu_cpu"...]: μ/σ de la
+        # fila al construir el snapshot, para separar la carga que se sumó
+        # después en memoria (apply_slice, ledger) de la ya observada.
+        self.histograms = histograms
+
+        self.version = next(_VERSION_COUNTER)
+
+        # Índice (zona, plataforma) -> filas; se arma al primer uso. Zona y
+        # plataforma no cambian con update_host/apply_slice, así que sirve
+        # para todo el snapshot (y sus copias).
+        self._zone_index: Optional[Dict[Tuple[int, int], np.ndarray]] = None
+        self._rack_index: Optional[Dict[int, np.ndarray]] = None
+
+    # ==========================
+    #   CONSTRUCCIÓN
+    # ==========================
+
+    @classmethod
+    def _build(cls, rows: Iterable[Dict]) -> "ClusterState":
+        """
+        Construye el estado a partir de filas planas con las claves
+        name, zone, platform + FLOAT_COLUMNS + BOOL_COLUMNS (y opcionalmente
+        rack; sin rack el host es su propio dominio de falla).
+        """
+        rows = list(rows)
+        n = len(rows)
+
+        zone_names: List[str] = []
+        zone_lookup: Dict[str, int] = {}
+        zone_codes = np.empty(n, dtype=np.int32)
+        platform_codes = np.empty(n, dtype=np.int8)
+        rack_names: List[str] = []
+        rack_lookup: Dict[str, int] = {}
+        rack_codes = np.empty(n, dtype=np.int32)
+
+        for i, r in enumerate(rows):
+            code = zone_lookup.get(r["zone"])
+            if code is None:
+                code = zone_lookup[r["zone"]] = len(zone_names)
+                zone_names.append(r["zone"])
+            zone_codes[i] = code
+            platform_codes[i] = platform_code(r["platform"])
+
+            rack = r.get("rack") or r["name"]
+            code = rack_lookup.get(rack)
+            if code is None:
+                code = rack_lookup[rack] = len(rack_names)
+                rack_names.append(rack)
+            rack_codes[i] = code
+
+        columns = {
+            c: np.fromiter((r[c] for r in rows), dtype=np.float64, count=n)
+            for c in FLOAT_COLUMNS
+        }
+        for c in BOOL_COLUMNS:
+            columns[c] = np.fromiter((bool(r[c]) for r in rows), dtype=bool, count=n)
+
+        histograms = None
+        if any(r.get(f"{res}_hist") is not None for r in rows for res in HIST_RESOURCES):
+            histograms = {
+                "mu_cpu": columns["mu_cpu"].copy(), "sigma_cpu": columns["sigma_cpu"].copy(),
+                "mu_ram_gb": columns["mu_ram_gb"].copy(), "sigma_ram_gb": columns["sigma_ram_gb"].copy(),
+            }
+            for res in HIST_RESOURCES:
+                matrix = np.full((n, HIST_BINS), np.nan)
+                for i, r in enumerate(rows):
+                    if r.get(f"{res}_hist") is not None:
+                        matrix[i] = r[f"{res}_hist"]
+                histograms[res] = matrix
+
+        return cls(
+            [r["name"] for r in rows], zone_names, zone_codes, platform_codes, columns, histograms,
+            rack_names, rack_codes,
+        )
+
+    @classmethod
+    def from_hosts(cls, hosts: List[HostState]) -> "ClusterState":
+        """Convierte una lista de HostState (motor escalar) al formato columnar."""
+        return cls._build(
+            {
+                "name": h.name, "zone": h.zone, "platform": h.platform,
+                "rack": (h.metadata or {}).get("rack"),
+                **{c: getattr(h, c) for c in FLOAT_COLUMNS},
+                **{c: getattr(h, c) for c in BOOL_COLUMNS},
+            }
+            for h in hosts
+        )
+
+    @classmethod
+    def from_nodes_status(cls, nodes: Dict[str, Dict], zone: Optional[str] = None) -> "ClusterState":
+        """
+        Construye el estado directamente desde el JSON de /nodes/status
+        (formato con unidades de generate_nodes_status.py), sin crear HostState.
+        Si se indica `zone`, solo se incluyen los nodos de esa zona.
+        Los nodos mal formados se descartan.
+        """
+        rows = []
+        for node_id, node in nodes.items():
+            if zone is not None and node.get("zone") != zone:
+                continue
+            row = parse_node_row(node)
+            if row is None:
+                logger.warning("No se pudo parsear el nodo %s; se descarta", node_id)
+                continue
+            rows.append(row)
+        return cls._build(rows)
+
+    # ==========================
+    #   CONSULTA Y ACTUALIZACIÓN
+    # ==========================
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def row(self, name: str) -> int:
+        """Fila del host `name` (KeyError si no existe)."""
+        return self.index[name]
+
+    def zone_code(self, zone: str) -> int:
+        """Código de la zona, o -1 si ningún host pertenece a ella."""
+        return self.zone_lookup.get(zone, -1)
+
+    def zone_of(self, row: int) -> str:
+        return self.zone_names[self.zone_codes[row]]
+
+    def platform_of(self, row: int) -> Platform:
+        return PLATFORMS[self.platform_codes[row]]
+
+    def zone_platform_index(self) -> Dict[Tuple[int, int], np.ndarray]:
+        """
+        Filas agrupadas por (código de zona, código de plataforma), en el
+        orden original de la lista. Se calcula una sola vez por snapshot.
+        """
+        if self._zone_index is None:
+            keys = self.zone_codes.astype(np.int64) * len(PLATFORMS) + self.platform_codes
+            order = np.argsort(keys, kind="stable")
+            bounds = np.flatnonzero(np.diff(keys[order])) + 1
+            self._zone_index = {
+                divmod(int(keys[rows[0]]), len(PLATFORMS)): rows
+                for rows in np.split(order, bounds) if rows.size
+            }
+        return self._zone_index
+
+    def rows_for(self, zone: Optional[str] = None, platform: Optional[str] = None) -> np.ndarray:
+        """
+        Filas de los hosts de `zone` (y `platform`, si es linux/openstack),
+        sin recorrer todo el clúster. None en un criterio = sin filtrar.
+        """
+        index = self.zone_platform_index()
+        zone_codes = range(len(self.zone_names)) if zone is None else [self.zone_code(zone)]
+        platform_codes = range(len(PLATFORMS)) if platform not in PLATFORMS else [platform_code(platform)]
+
+        parts = [index[(z, p)] for z in zone_codes for p in platform_codes if (z, p) in index]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(parts))
+
+    def rack_of(self, row: int) -> str:
+        return self.rack_names[self.rack_codes[row]]
+
+    def rack_index(self) -> Dict[int, np.ndarray]:
+        """Filas de cada rack (código -> filas). Se calcula una sola vez por snapshot."""
+        if self._rack_index is None:
+            order = np.argsort(self.rack_codes, kind="stable")
+            bounds = np.flatnonzero(np.diff(self.rack_codes[order])) + 1
+            self._rack_index = {
+                int(self.rack_codes[rows[0]]): rows
+                for rows in np.split(order, bounds) if rows.size
+            }
+        return self._rack_index
+
+    def rack_mask(self, racks: Iterable[str]) -> np.ndarray:
+        """Máscara de hosts que pertenecen a alguno de los racks dados (por nombre)."""
+        mask = np.zeros(len(self), dtype=bool)
+        index = self.rack_index()
+        for rack in racks:
+            rows = index.get(self.rack_lookup.get(rack, -1))
+            if rows is not None:
+                mask[rows] = True
+        return mask
+
+    def has_histogram(self, resource: str) -> np.ndarray:
+        """Máscara de hosts con histograma de `resource` ("cpu" o "ram")."""
+        if self.histograms is None:
+            return np.zeros(len(self), dtype=bool)
+        return ~np.isnan(self.histograms[resource][:, 0])
+
+    def available(self) -> np.ndarray:
+        """Máscara de hosts habilitados y fuera de mantenimiento."""
+        return self.enabled & ~self.in_maintenance
+
+    def update_host(self, name: str, **fields) -> None:
+        """
+        Actualiza columnas de un host en O(1) y asigna una versión nueva.
+        Ej: state.update_host("worker1", mu_cpu=1.2, disk_gb_used=20.0)
+        """
+        i = self.index[name]
+        for column, value in fields.items():
+            if column not in FLOAT_COLUMNS and column not in BOOL_COLUMNS:
+                raise ValueError(f"Columna no actualizable: {column}")
+            getattr(self, column)[i] = value
+        self.version = next(_VERSION_COUNTER)
+
+    def apply_slice(self, name: str, slice_mu_sigma: Dict[str, Tuple[float, float]], disk_gb: float) -> None:
+        """
+        Incorpora en memoria un slice recién asignado al host `name`:
+        las medias se suman, las varianzas se suman y el disco es determinista.
+        """
+        i = self.index[name]
+        mu_cpu, sigma_cpu = slice_mu_sigma["cpu"]
+        mu_ram, sigma_ram = slice_mu_sigma["ram"]
+
+        self.mu_cpu[i] += mu_cpu
+        self.sigma_cpu[i] = math.sqrt(self.sigma_cpu[i] ** 2 + sigma_cpu ** 2)
+        self.mu_ram_gb[i] += mu_ram
+        self.sigma_ram_gb[i] = math.sqrt(self.sigma_ram_gb[i] ** 2 + sigma_ram ** 2)
+        self.disk_gb_used[i] += disk_gb
+        self.version = next(_VERSION_COUNTER)
+
+    def release_slice(self, name: str, slice_mu_sigma: Dict[str, Tuple[float, float]], disk_gb: float) -> None:
+        """Operación inversa de `apply_slice` (el slice deja el host)."""
+        i = self.index[name]
+        mu_cpu, sigma_cpu = slice_mu_sigma["cpu"]
+        mu_ram, sigma_ram = slice_mu_sigma["ram"]
+
+        self.mu_cpu[i] = max(self.mu_cpu[i] - mu_cpu, 0.0)
+        self.sigma_cpu[i] = math.sqrt(max(self.sigma_cpu[i] ** 2 - sigma_cpu ** 2, 0.0))
+        self.mu_ram_gb[i] = max(self.mu_ram_gb[i] - mu_ram, 0.0)
+        self.sigma_ram_gb[i] = math.sqrt(max(self.sigma_ram_gb[i] ** 2 - sigma_ram ** 2, 0.0))
+        self.disk_gb_used[i] = max(self.disk_gb_used[i] - disk_gb, 0.0)
+        self.version = next(_VERSION_COUNTER)
+
+    def host_state(self, row: int) -> HostState:
+        """Reconstruye el HostState de una fila (para el motor escalar)."""
+        return HostState(
+            name=self.names[row],
+            platform=self.platform_of(row),
+            zone=self.zone_of(row),
+            **{c: float(getattr(self, c)[row]) for c in FLOAT_COLUMNS},
+            **{c: bool(getattr(self, c)[row]) for c in BOOL_COLUMNS},
+            metadata={"rack": self.rack_of(row)},
+        )
+
+    def to_hosts(self) -> List[HostState]:
+        return [self.host_state(i) for i in range(len(self))]
+
+    def copy(self) -> "ClusterState":
+        """Copia independiente (las columnas se duplican, los nombres no)."""
+        columns = {c: getattr(self, c).copy() for c in FLOAT_COLUMNS + BOOL_COLUMNS}
+        clone = ClusterState(
+            self.names, self.zone_names,
+            self.zone_codes.copy(), self.platform_codes.copy(), columns,
+            self.histograms,   # no se modifican: se comparten
+            self.rack_names, self.rack_codes.copy(),
+        )
+        clone._zone_index = self._zone_index
+        clone._rack_index = self._rack_index
+        return clone
+
+    def subset(self, rows: np.ndarray) -> "ClusterState":
+        """
+        Snapshot con solo las filas `rows` (en ese orden). Las columnas se
+        copian: modificar el subconjunto no afecta a este estado.
+        """
+        columns = {c: getattr(self, c)[rows] for c in FLOAT_COLUMNS + BOOL_COLUMNS}
+        histograms = None
+        if self.histograms is not None:
+            histograms = {k: v[rows] for k, v in self.histograms.items()}
+        return ClusterState(
+            [self.names[i] for i in rows], self.zone_names,
+            self.zone_codes[rows], self.platform_codes[rows], columns, histograms,
+            self.rack_names, self.rack_codes[rows],
+        )
+
+
+# ==========================
+#   FUNCIONES AUXILIARES
+# ==========================
+
+def platform_code(platform: str) -> int:
+    try:
+        return PLATFORMS.index(platform)
+    except ValueError:
+        raise ValueError(f"Plataforma desconocida: {platform}")
+
+
+def histogram_to_grid(histogram: Optional[Dict], full_scale: float) -> Optional[np.ndarray]:
+    """
+    Re-muestrea un histograma {"lower", "upper", "counts"} (en las unidades
+    del nodo: % para CPU, GiB para RAM) a la grilla común de HIST_BINS
+    buckets sobre [0, full_scale]. Se interpola la función de distribución
+    acumulada en los bordes nuevos; la masa por encima de full_scale queda
+    en el último bucket. Retorna probabilidades (suman 1) o None.
+    """
+    if not histogram or full_scale <= 0:
+        return None
+    counts = np.asarray(histogram.get("counts") or [], dtype=np.float64)
+    total = counts.sum()
+    if counts.size == 0 or total <= 0:
+        return None
+
+    edges = np.linspace(float(histogram["lower"]), float(histogram["upper"]), counts.size + 1) / full_scale
+    cdf = np.concatenate(([0.0], np.cumsum(counts) / total))
+    grid_cdf = np.interp(np.linspace(0.0, 1.0, HIST_BINS + 1), edges, cdf, left=0.0, right=1.0)
+    grid_cdf[-1] = 1.0
+    return np.diff(grid_cdf)
+
+
+def parse_node_row(node: Dict) -> Optional[Dict]:
+    """
+    Convierte un nodo de nodes_status.json a una fila plana:
+    CPU viene en % del total de cores, RAM en GiB y disco en GB.
+    Si el nodo trae histogramas de uso se agregan como "cpu_hist"/"ram_hist";
+    la correlación CPU/RAM (cpu_ram_correlation) se pasa a covarianza.
+    El techo de overcommit del host sale de "overcommit": {"cpu", "ram"}
+    (por defecto DEFAULT_*_OVERCOMMIT_MAX de vm_placement.py).
+    """
+    try:
+        if node["platform"] not in PLATFORMS:
+            return None
+
+        cpu_capacity = float(node["cpu_capacity"]["value"])
+        ram_capacity = float(node["ram_capacity"]["value"])
+        cpu_stats = node["current_usage"]["cpu"]
+        ram_stats = node["current_usage"]["ram"]
+        sigma_cpu = float(cpu_stats["std"] * cpu_capacity / 100.0)
+        sigma_ram = float(ram_stats["std"])
+        rho = float(node["current_usage"].get("cpu_ram_correlation") or 0.0)
+        overcommit = node.get("overcommit") or {}
+
+        return {
+            "name": node.get("name", node["id"]),
+            "zone": node["zone"],
+            "rack": (node.get("metadata") or {}).get("rack"),
+            "platform": node["platform"],
+            "cpu_capacity": cpu_capacity,
+            "ram_gb_capacity": ram_capacity,
+            "disk_gb_capacity": float(node["disk_capacity"]["value"]),
+            "mu_cpu": float(cpu_stats["mean"] * cpu_capacity / 100.0),
+            "sigma_cpu": sigma_cpu,
+            "mu_ram_gb": float(ram_stats["mean"]),
+            "sigma_ram_gb": sigma_ram,
+            "disk_gb_used": float(node["current_usage"]["disk"]["used"]),
+            "cov_cpu_ram": max(min(rho, 1.0), -1.0) * sigma_cpu * sigma_ram,
+            "cpu_overcommit_max": float(overcommit.get("cpu", DEFAULT_CPU_OVERCOMMIT_MAX)),
+            "ram_overcommit_max": float(overcommit.get("ram", DEFAULT_RAM_OVERCOMMIT_MAX)),
+            "enabled": node.get("enabled", True),
+            "in_maintenance": node.get("in_maintenance", False),
+            "cpu_hist": histogram_to_grid(cpu_stats.get("histogram"), 100.0),
+            "ram_hist": histogram_to_grid(ram_stats.get("histogram"), ram_capacity),
+        }
+    except (KeyError, TypeError, ValueError):
+        return None
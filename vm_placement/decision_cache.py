@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache LRU acotada de decisiones de placement.
+
+Durante los laboratorios llegan muchas solicitudes idénticas (mismas sumas
+de flavors, perfil, contexto y zona) contra un nodes_status.json que no ha
+cambiado. La decisión es una función pura de:
+
+- la solicitud (SliceRequest + top_k + modo de zona)
+- la versión del snapshot del clúster (ClusterState.version)
+- las generaciones en el ledger de los hosts evaluados (la zona pedida, o
+  todo el clúster fuera del modo estricto)
+
+así que esas tres cosas forman la clave. Cuando el snapshot cambia, o una
+reserva / liberación toca un host evaluado, la clave es otra y las
+entradas viejas dejan de usarse (y salen por LRU); no hace falta invalidar
+a mano. Un commit en otra zona no cambia la clave de una solicitud
+estricta: la versión global del ledger sí cambiaba con cada commit y la
+cache casi nunca acertaba.
+"""
+
+from collections import OrderedDict
+from typing import Container, Dict, Hashable, List, Optional, Tuple
+import threading
+
+from vm_placement import SliceRequest
+
+# Resolución con la que se normalizan RAM, disco y MP en la clave: evita que
+# 2 y 2.0000001 GB (ruido de sumar flavors en float) ocupen entradas distintas
+# sin cambiar la decisión.
+QUANTUM = 1e-3
+
+
+def quantize(value: Optional[float], quantum: float = QUANTUM) -> Optional[int]:
+    return None if value is None else int(round(float(value) / quantum))
+
+
+def request_key(slice_req: SliceRequest) -> Tuple:
+    """Parte de la clave que identifica a la solicitud (cuantizada)."""
+    return (
+        int(slice_req.cpu),
+        quantize(slice_req.ram_gb),
+        quantize(slice_req.disk_gb),
+        slice_req.zone,
+        slice_req.platform,
+        slice_req.user_profile,
+        slice_req.technical_context,
+        quantize(slice_req.max_failure_prob, 1e-6),
+        quantize(slice_req.cpu_overcommit),
+        quantize(slice_req.ram_overcommit),
+    )
+
+
+def generations_key(generations: Dict[str, int], hosts: Container[str]) -> Tuple:
+    """
+    Parte de la clave que identifica el estado del ledger: las generaciones
+    de los hosts evaluados (`hosts`, ej. ClusterState.index). Las
+    generaciones solo crecen, así que una clave vieja no vuelve a aparecer.
+    """
+    return tuple(sorted((h, g) for h, g in generations.items() if h in hosts))
+
+
+class DecisionCache:
+    """
+    Diccionario LRU thread-safe: clave -> lista de candidatos top-k.
+    Los valores se devuelven tal cual; quien los usa no debe modificarlos.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, List]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        slice_req: SliceRequest,
+        snapshot_version: int,
+        ledger_key: Hashable,
+        *extra: Hashable
+    ) -> Tuple:
+        """
+        Clave completa. `ledger_key` identifica el estado del ledger
+        (generations_key); `extra` para parámetros que cambian el resultado
+        (top_k, zone_mode).
+        """
+        return (request_key(slice_req), snapshot_version, ledger_key) + extra
+
+    def get(self, key: Hashable) -> Optional[List]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: List) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
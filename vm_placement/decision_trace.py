@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Traza estructurada (opcional) de una decisión de placement.
+
+Reemplaza los `print` por host que emitían los motores: la traza solo se
+construye cuando se pide (`?explain=true` en la API o nivel DEBUG en el
+logger "vm_placement"). Si nadie la pide, el camino principal no formatea
+ningún texto.
+
+Por cada host se registra el estado final ("rejected" / "candidate" /
+"selected"), el motivo de rechazo y los riesgos calculados.
+"""
+
+from typing import Dict, List, Optional
+import json
+import logging
+
+logger = logging.getLogger("vm_placement")
+
+# Motivos de rechazo (mismo orden en que los aplican los motores)
+REJECT_UNAVAILABLE = "unavailable"   # deshabilitado o en mantenimiento
+REJECT_ZONE = "zone"                 # zona distinta a la solicitada
+REJECT_PLATFORM = "platform"         # plataforma distinta a la solicitada
+REJECT_RACK = "rack"                 # rack ya usado por el grupo de spread (gang)
+REJECT_DISK = "disk"                 # restricción determinista de disco
+REJECT_RISK = "risk"                 # max(P_cpu, P_ram) > MP
+
+
+class DecisionTrace:
+    """Acumula el detalle de una decisión; se serializa con `to_dict`."""
+
+    def __init__(self, request: Optional[Dict] = None):
+        self.request = request or {}
+        self.hosts: List[Dict] = []
+        self.selected: Optional[str] = None
+        self.cluster_risk: Optional[float] = None
+        self.zones_evaluated: List[str] = []   # solo en modo entre zonas
+
+    def record_host(
+        self,
+        host: str,
+        status: str,
+        reason: Optional[str] = None,
+        **values: float
+    ) -> None:
+        """Agrega un host evaluado. `values`: baseline_risk, p_cpu, p_ram, local_risk, cluster_risk..."""
+        entry = {"host": host, "status": status}
+        if reason is not None:
+            entry["reason"] = reason
+        entry.update({k: float(v) for k, v in values.items() if v is not None})
+        self.hosts.append(entry)
+
+    def select(self, host: str, cluster_risk: float) -> None:
+        self.selected = host
+        self.cluster_risk = float(cluster_risk)
+        for entry in self.hosts:
+            if entry["host"] == host:
+                entry["status"] = "selected"
+
+    def rejected_by_reason(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for entry in self.hosts:
+            if entry["status"] == "rejected":
+                counts[entry["reason"]] = counts.get(entry["reason"], 0) + 1
+        return counts
+
+    def to_dict(self) -> Dict:
+        data = {
+            "request": self.request,
+            "selected": self.selected,
+            "cluster_risk": self.cluster_risk,
+            "rejected_by_reason": self.rejected_by_reason(),
+            "hosts": self.hosts,
+        }
+        if self.zones_evaluated:
+            data["zones_evaluated"] = self.zones_evaluated
+        return data
+
+    def to_json_line(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, separators=(",", ":"))
+
+
+def trace_requested(explain: bool = False) -> bool:
+    """True si hay que construir la traza (explain explícito o logger en DEBUG)."""
+    return explain or logger.isEnabledFor(logging.DEBUG)
+
+
+def emit(trace: Optional[DecisionTrace]) -> None:
+    """Emite la traza como UNA sola línea JSON en el logger (nivel DEBUG)."""
+    if trace is not None and logger.isEnabledFor(logging.DEBUG):
+        logger.debug(trace.to_json_line())
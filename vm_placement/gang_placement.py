@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Gang placement: colocación POR VM de un slice multi-VM.
+
+SliceRequest resume todo el slice en una sola suma (cpu, ram_gb, disk_gb),
+así que un slice que no entra como bloque en ningún host se rechaza aunque
+sus VMs sí quepan repartidas en varios hosts. Este módulo:
+
+- Toma el mapa `recursos` del JSON de la plantilla (el que arma
+  templates._build_template_json_from_db: vcpu, ram_gb, disk_gb por VM)
+- Coloca cada VM individualmente con el mismo filtro de probabilidad de
+  congestión (MP) y el criterio Minimax del motor vectorizado
+- Confirma TODO o NADA: si una VM no tiene host viable, el estado del
+  clúster no se modifica
+
+Todas las VMs del slice quedan en la misma AZ y en la misma plataforma.
+
+Con la estrategia "topology" se usa además el grafo de la plantilla
+(topologia.edges) para mantener en el mismo host las VMs muy conectadas y
+reducir el tráfico VLAN entre hosts a través de OvS.
+
+Spread por dominio de falla (rack, metadata.rack): las VMs de un mismo
+grupo de spread se colocan en racks distintos, para que la caída de un rack
+no se lleve toda la topología del laboratorio. Los grupos salen de la
+plantilla ("spread_group" en cada VM de `recursos`, ej. réplicas) o, con
+spread="slice", todas las VMs del slice forman un solo grupo.
+"""
+
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Set, Tuple
+import math
+
+from vm_placement import SliceRequest, PlacementDecision, Platform, compute_slice_mu_sigma
+from cluster_state import ClusterState
+from placement_engine import decide_vm_placement_vectorized, rank_placement_candidates
+
+STRATEGIES = ("per_vm", "topology")
+
+# "replicas": solo las VMs marcadas con spread_group en la plantilla
+# "slice"   : todas las VMs del slice en racks distintos
+# "none"    : sin spread
+SPREAD_MODES = ("replicas", "slice", "none")
+
+
+@dataclass
+class GangPlacementDecision:
+    """
+    Decisión de un slice completo: un PlacementDecision por VM
+    (clave = id de la VM en la plantilla, ej. "vm-1").
+    """
+    platform: Platform
+    availability_zone: str
+    placements: Dict[str, PlacementDecision] = field(default_factory=dict)
+    cross_host_edges: int = 0   # enlaces de la topología que cruzan hosts (tráfico OvS)
+    racks: Dict[str, str] = field(default_factory=dict)     # VM -> rack del host elegido
+    spread_violations: int = 0  # VMs que comparten rack con su grupo (spread no estricto)
+    reason: str = ""
+    # Carga aplicada por grupo: (host, slice_mu_sigma, disk_gb), para el ledger de pendientes
+    assignments: List[Tuple[str, Dict[str, Tuple[float, float]], float]] = field(default_factory=list)
+
+    def hosts_used(self) -> List[str]:
+        return sorted({d.host for d in self.placements.values()})
+
+
+def vm_requests_from_template(
+    recursos: Dict[str, Dict],
+    base_req: SliceRequest
+) -> List[Tuple[str, SliceRequest]]:
+    """
+    Crea un SliceRequest por VM a partir del mapa `recursos` de la plantilla,
+    heredando zona, plataforma, perfil, contexto y MP de `base_req`.
+
+    Las VMs se devuelven ordenadas de mayor a menor (vcpu, ram, disco):
+    colocar primero las grandes reduce la fragmentación (first-fit decreasing).
+    """
+    vm_reqs = []
+    for vm_id, cfg in recursos.items():
+        vm_reqs.append((vm_id, replace(
+            base_req,
+            cpu=int(cfg.get("vcpu", cfg.get("cpu", 0))),
+            ram_gb=float(cfg.get("ram_gb", 0.0)),
+            disk_gb=float(cfg.get("disk_gb", 0.0)),
+        )))
+
+    vm_reqs.sort(key=lambda item: (item[1].cpu, item[1].ram_gb, item[1].disk_gb), reverse=True)
+    return vm_reqs
+
+
+def decide_gang_placement(
+    recursos: Dict[str, Dict],
+    base_req: SliceRequest,
+    state: ClusterState,
+    commit: bool = True,
+    strategy: str = "per_vm",
+    edges: Optional[List[Dict]] = None,
+    spread: str = "replicas",
+    spread_strict: bool = False
+) -> Optional[GangPlacementDecision]:
+    """
+    Coloca las VMs del slice, todo o nada.
+
+    Estrategias:
+    - "per_vm"   : cada VM se coloca por separado (mayores primero).
+    - "topology" : usa las aristas de la topología (`topologia.edges`) para
+                   mantener juntas las VMs conectadas: cada componente conexa
+                   se intenta colocar COMPLETA en un solo host y, solo si el
+                   límite de riesgo lo impide, se biseca por un corte mínimo
+                   de aristas y se reintenta cada mitad. Cada mitad prefiere,
+                   entre los hosts viables, el host y luego el rack que ya
+                   usan sus vecinos colocados; Minimax decide entre iguales.
+
+    - Las VMs se evalúan sobre una copia del snapshot; cada grupo colocado
+      actualiza esa copia (μ/σ/disco) antes de evaluar el siguiente.
+    - Si `base_req.platform` es None/"auto", la plataforma queda fijada por
+      el primer grupo colocado para que el slice no se reparta entre backends.
+    - Si alguna VM no tiene host viable se devuelve None y `state` queda intacto.
+    - Si todas se colocan y `commit` es True, las asignaciones se aplican a `state`.
+
+    Spread (ver SPREAD_MODES): cada VM de un grupo de spread se coloca sola
+    (nunca agrupada por topología) excluyendo en el filtro vectorizado los
+    racks que ya usa su grupo. Si no hay host viable en otro rack, con
+    `spread_strict` el slice se rechaza; si no, se coloca sin la exclusión
+    y se cuenta en `spread_violations`.
+
+    NOTA: por VM se asume independencia, así que las varianzas de VMs que
+    comparten host se suman (no las desviaciones como en el slice agregado).
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Estrategia de gang placement desconocida: {strategy}")
+    if spread not in SPREAD_MODES:
+        raise ValueError(f"Modo de spread desconocido: {spread}")
+
+    vm_reqs = vm_requests_from_template(recursos, base_req)
+    if not vm_reqs:
+        return None
+
+    adjacency = build_adjacency([vm_id for vm_id, _ in vm_reqs], edges or [])
+    spread_of = spread_groups(recursos, spread)
+    if strategy == "topology":
+        groups = []
+        for component in connected_components(vm_reqs, adjacency):
+            together = [item for item in component if item[0] not in spread_of]
+            groups.extend([together] if together else [])
+            groups.extend([item] for item in component if item[0] in spread_of)
+    else:
+        groups = [[item] for item in vm_reqs]
+
+    placer = _GroupPlacer(state.copy(), base_req.platform, adjacency, spread_of, spread_strict)
+    for group in groups:
+        if not placer.place(group, split=(strategy == "topology")):
+            return None
+
+    if commit:
+        for host, mu_sigma, disk_gb in placer.applied:
+            state.apply_slice(host, mu_sigma, disk_gb)
+
+    gang = GangPlacementDecision(
+        platform=placer.platform,
+        availability_zone=next(iter(placer.placements.values())).availability_zone,
+        placements=placer.placements,
+        cross_host_edges=count_cross_host_edges(placer.placements, adjacency),
+        racks=placer.racks,
+        spread_violations=placer.spread_violations,
+        assignments=placer.applied,
+    )
+    gang.reason = (
+        f"{len(gang.placements)} VMs colocadas en {len(gang.hosts_used())} host(s) {gang.platform}"
+        f" y {len(set(gang.racks.values()))} rack(s)"
+    )
+    if strategy == "topology":
+        gang.reason += f", {gang.cross_host_edges} enlace(s) entre hosts"
+    if gang.spread_violations:
+        gang.reason += f", {gang.spread_violations} VM(s) sin rack distinto disponible"
+    return gang
+
+
+class _GroupPlacer:
+    """
+    Coloca grupos de VMs sobre un snapshot de trabajo y recuerda las
+    asignaciones para confirmarlas al final (todo o nada).
+    """
+
+    def __init__(
+        self,
+        scratch: ClusterState,
+        platform: Optional[str],
+        adjacency: Dict[str, Set[str]],
+        spread_of: Optional[Dict[str, str]] = None,
+        spread_strict: bool = False
+    ):
+        self.scratch = scratch
+        self.platform = platform if platform in ("linux", "openstack") else None
+        self.adjacency = adjacency
+        self.spread_of = spread_of or {}
+        self.spread_strict = spread_strict
+        self.placements: Dict[str, PlacementDecision] = {}
+        self.racks: Dict[str, str] = {}
+        self.group_racks: Dict[str, Set[str]] = {}    # grupo de spread -> racks usados
+        self.spread_violations = 0
+        self.applied: List[Tuple[str, Dict[str, Tuple[float, float]], float]] = []
+
+    def place(self, group: List[Tuple[str, SliceRequest]], split: bool) -> bool:
+        """Intenta el grupo completo en un host; si no cabe y `split`, lo biseca."""
+        group_req = replace(
+            group[0][1],
+            cpu=sum(r.cpu for _, r in group),
+            ram_gb=sum(r.ram_gb for _, r in group),
+            disk_gb=sum(r.disk_gb for _, r in group),
+            platform=self.platform,
+        )
+        mu_sigma = group_mu_sigma([r for _, r in group])
+
+        spread_keys = {self.spread_of[vm_id] for vm_id, _ in group if vm_id in self.spread_of}
+        avoid = set().union(*(self.group_racks.get(g, set()) for g in spread_keys))
+
+        # Tras una bisección: hosts de los vecinos ya colocados (no aplica al spread)
+        near = self.neighbor_hosts(group) if split and not spread_keys else set()
+
+        decision = self.decide(group_req, mu_sigma, avoid, near)
+        if decision is None and avoid and not self.spread_strict:
+            decision = self.decide(group_req, mu_sigma, set(), near)
+            if decision is not None:
+                self.spread_violations += len(group)
+
+        if decision is not None:
+            self.platform = decision.platform
+            self.scratch.apply_slice(decision.host, mu_sigma, group_req.disk_gb)
+            self.applied.append((decision.host, mu_sigma, group_req.disk_gb))
+            rack = self.scratch.rack_of(self.scratch.row(decision.host))
+            for g in spread_keys:
+                self.group_racks.setdefault(g, set()).add(rack)
+            for vm_id, _ in group:
+                self.placements[vm_id] = decision
+                self.racks[vm_id] = rack
+            return True
+
+        if not split or len(group) == 1:
+            return False
+
+        left, right = bisect_group(group, self.adjacency)
+        return self.place(left, split) and self.place(right, split)
+
+    def neighbor_hosts(self, group: List[Tuple[str, SliceRequest]]) -> Set[str]:
+        """Hosts donde ya quedaron VMs conectadas a alguna VM del grupo."""
+        return {
+            self.placements[neighbor].host
+            for vm_id, _ in group
+            for neighbor in self.adjacency.get(vm_id, ())
+            if neighbor in self.placements
+        }
+
+    def decide(
+        self,
+        group_req: SliceRequest,
+        mu_sigma: Dict[str, Tuple[float, float]],
+        avoid: Set[str],
+        near: Set[str]
+    ) -> Optional[PlacementDecision]:
+        """
+        Minimax sobre el snapshot de trabajo. Con `near` (hosts de los
+        vecinos), entre los hosts viables se prefiere uno de esos hosts, luego
+        uno de sus racks y, si no hay, el mejor Minimax: así las mitades de
+        un grupo bisecado no se dispersan por el clúster.
+        """
+        if not near:
+            return decide_vm_placement_vectorized(group_req, self.scratch, mu_sigma, avoid_racks=avoid)
+
+        ranked = rank_placement_candidates(group_req, self.scratch, len(self.scratch), mu_sigma, avoid_racks=avoid)
+        if not ranked:
+            return None
+
+        def rack_of(host: str) -> str:
+            return self.scratch.rack_of(self.scratch.row(host))
+
+        near_racks = {rack_of(host) for host in near}
+        best = (
+            next((c for c in ranked if c.host in near), None)
+            or next((c for c in ranked if rack_of(c.host) in near_racks), None)
+            or ranked[0]
+        )
+        return best.to_decision()
+
+
+# ==========================
+#   GRAFO DE LA TOPOLOGÍA
+# ==========================
+
+def spread_groups(recursos: Dict[str, Dict], spread: str) -> Dict[str, str]:
+    """VM -> grupo de spread según el modo (ver SPREAD_MODES)."""
+    if spread == "slice":
+        return {vm_id: "slice" for vm_id in recursos}
+    if spread == "replicas":
+        return {
+            vm_id: str(cfg["spread_group"])
+            for vm_id, cfg in recursos.items() if cfg.get("spread_group")
+        }
+    return {}
+
+
+def group_mu_sigma(vm_reqs: List[SliceRequest]) -> Dict[str, Tuple[float, float]]:
+    """μ/σ de un grupo de VMs independientes: medias y varianzas se suman."""
+    per_vm = [compute_slice_mu_sigma(r) for r in vm_reqs]
+    return {
+        k: (sum(m[k][0] for m in per_vm), math.sqrt(sum(m[k][1] ** 2 for m in per_vm)))
+        for k in ("cpu", "ram")
+    }
+
+
+def build_adjacency(vm_ids: List[str], edges: List[Dict]) -> Dict[str, Set[str]]:
+    """Lista de adyacencia no dirigida a partir de topologia.edges ({from, to})."""
+    adjacency: Dict[str, Set[str]] = {vm_id: set() for vm_id in vm_ids}
+    for e in edges:
+        a, b = e.get("from"), e.get("to")
+        if a in adjacency and b in adjacency and a != b:
+            adjacency[a].add(b)
+            adjacency[b].add(a)
+    return adjacency
+
+
+def connected_components(
+    vm_reqs: List[Tuple[str, SliceRequest]],
+    adjacency: Dict[str, Set[str]]
+) -> List[List[Tuple[str, SliceRequest]]]:
+    """
+    Componentes conexas del grafo de VMs, cada una en orden BFS.
+    Se devuelven de mayor a menor demanda de CPU (los grupos grandes primero).
+    """
+    by_id = dict(vm_reqs)
+    seen: Set[str] = set()
+    components = []
+    for vm_id, _ in vm_reqs:
+        if vm_id in seen:
+            continue
+        seen.add(vm_id)
+        order, queue = [], [vm_id]
+        while queue:
+            current = queue.pop(0)
+            order.append((current, by_id[current]))
+            for neighbor in sorted(adjacency[current]):
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    queue.append(neighbor)
+        components.append(order)
+
+    components.sort(key=lambda c: (sum(r.cpu for _, r in c), sum(r.ram_gb for _, r in c)), reverse=True)
+    return components
+
+
+def bisect_group(
+    group: List[Tuple[str, SliceRequest]],
+    adjacency: Dict[str, Set[str]]
+) -> Tuple[List[Tuple[str, SliceRequest]], List[Tuple[str, SliceRequest]]]:
+    """
+    Divide un grupo en dos mitades cortando pocas aristas (heurística de
+    corte mínimo): se parte el orden BFS por la mitad de la demanda de CPU y
+    luego se mueven VMs sueltas mientras el número de aristas cortadas baje.
+    """
+    total_cpu = sum(max(r.cpu, 1) for _, r in group)
+    left_ids: Set[str] = set()
+    acc = 0
+    for vm_id, r in group:
+        if acc >= total_cpu / 2 and left_ids:
+            break
+        left_ids.add(vm_id)
+        acc += max(r.cpu, 1)
+    if len(left_ids) == len(group):
+        left_ids.discard(group[-1][0])
+
+    ids = {vm_id for vm_id, _ in group}
+
+    def gain(vm_id: str) -> int:
+        # aristas cortadas que se ahorran al mover vm_id al otro lado
+        same = left_ids if vm_id in left_ids else ids - left_ids
+        neighbors = adjacency[vm_id] & ids
+        return len(neighbors - same) - len(neighbors & same)
+
+    improved = True
+    while improved:
+        improved = False
+        for vm_id, _ in group:
+            side = left_ids if vm_id in left_ids else ids - left_ids
+            if len(side) > 1 and gain(vm_id) > 0:
+                left_ids.symmetric_difference_update({vm_id})
+                improved = True
+
+    left = [item for item in group if item[0] in left_ids]
+    right = [item for item in group if item[0] not in left_ids]
+    return left, right
+
+
+def count_cross_host_edges(
+    placements: Dict[str, PlacementDecision],
+    adjacency: Dict[str, Set[str]]
+) -> int:
+    """Enlaces de la topología cuyos extremos quedaron en hosts distintos."""
+    return sum(
+        1
+        for a, neighbors in adjacency.items()
+        for b in neighbors
+        if a < b and placements[a].host != placements[b].host
+    )
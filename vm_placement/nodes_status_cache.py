@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Cache del snapshot de /nodes/status para la API de placement.
+
+Antes cada solicitud de placement descargaba y parseaba el JSON completo de
+metrics_api (un viaje HTTP + parseo en cada decisión). Con la cache:
+
+- El snapshot (JSON + ClusterState de todas las zonas) se reutiliza
+  mientras tenga menos de `ttl` segundos.
+- Las revalidaciones son CONDICIONALES: se envían If-None-Match (ETag) e
+  If-Modified-Since; si nodes_status.json no cambió metrics_api responde
+  304 sin cuerpo y no se parsea nada.
+- Vencido el TTL se responde con el snapshot anterior mientras un hilo lo
+  revalida (stale-while-revalidate); con start() un hilo lo refresca cada
+  `ttl` segundos y las solicitudes casi nunca lo ven vencido.
+- Si metrics_api no responde se sigue usando el último snapshot válido; su
+  antigüedad se informa en status() (/api/v1/health).
+
+Expone current() y version, igual que SharedSnapshotReader, para usarse como
+fuente del snapshot en api_placement_handler.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+import logging
+import threading
+import time
+
+import requests
+
+from cluster_state import ClusterState
+
+logger = logging.getLogger("vm_placement.nodes_cache")
+
+
+@dataclass
+class _Snapshot:
+    nodes: Dict[str, Dict]
+    state: ClusterState
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+class NodesStatusCache:
+    """
+    Snapshot de /nodes/status con TTL y revalidación condicional.
+    `clock` es inyectable para pruebas (por defecto time.monotonic).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl: float = 5.0,
+        timeout: float = 3.0,
+        session: Optional[requests.Session] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.url = url
+        self.ttl = ttl
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.clock = clock
+        self._snapshot: Optional[_Snapshot] = None
+        self._validated_at: Optional[float] = None      # última respuesta válida (200 o 304)
+        self._attempted_at: Optional[float] = None      # último intento (válido o no)
+        self._fetch_lock = threading.Lock()             # una sola consulta a la vez
+        self._flag_lock = threading.Lock()              # protege _refreshing (nunca espera la red)
+        self._refreshing = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stats = {"requests": 0, "not_modified": 0, "updates": 0, "errors": 0}
+        self.last_error: Optional[str] = None
+
+    # ==========================
+    #   CONSULTA
+    # ==========================
+
+    @property
+    def version(self) -> Optional[int]:
+        snapshot = self._snapshot
+        return None if snapshot is None else snapshot.state.version
+
+    def current(self) -> ClusterState:
+        """
+        ClusterState de todas las zonas. Solo la primera llamada espera a
+        metrics_api; después se devuelve el snapshot en memoria y, si venció,
+        se revalida en segundo plano. Sin ningún snapshot válido (metrics_api
+        nunca respondió) se devuelve un estado vacío.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.refresh()
+            snapshot = self._snapshot
+            if snapshot is None:
+                return ClusterState.from_nodes_status({})
+        elif self.clock() - self._attempted_at >= self.ttl:
+            # Vencido (o metrics_api caída): a lo más un intento por TTL
+            self._refresh_in_background()
+        return snapshot.state
+
+    def nodes(self) -> Dict[str, Dict]:
+        """JSON de /nodes/status del snapshot actual (no modificar)."""
+        self.current()
+        snapshot = self._snapshot
+        return {} if snapshot is None else snapshot.nodes
+
+    def age_seconds(self) -> Optional[float]:
+        """Segundos desde que metrics_api confirmó el snapshot por última vez."""
+        return None if self._validated_at is None else self.clock() - self._validated_at
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self._stats)
+
+    def status(self) -> Dict:
+        """Resumen para /api/v1/health."""
+        age = self.age_seconds()
+        return {
+            "version": self.version,
+            "age_s": None if age is None else round(age, 1),
+            "ttl_s": self.ttl,
+            "stale": age is not None and age >= self.ttl,
+            "last_error": self.last_error,
+            **self.stats(),
+        }
+
+    # ==========================
+    #   REVALIDACIÓN
+    # ==========================
+
+    def refresh(self) -> bool:
+        """
+        Consulta condicional a /nodes/status. Retorna True si se instaló un
+        snapshot nuevo (False con 304, JSON idéntico o error).
+        """
+        with self._fetch_lock:
+            headers = self._conditional_headers()
+            try:
+                response = self.session.get(self.url, headers=headers, timeout=self.timeout)
+                if self._not_modified(response.status_code):
+                    return False
+                nodes = response.json()
+            except (requests.RequestException, ValueError) as e:
+                return self._failed(e)
+            return self._install(nodes, response.headers)
+
+    # Pasos de refresh() separados para que un cliente asíncrono
+    # (api_placement_async.py) haga la misma revalidación con otro transporte.
+
+    def _conditional_headers(self) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since del snapshot actual; registra el intento."""
+        snapshot = self._snapshot
+        headers = {}
+        if snapshot is not None:
+            if snapshot.etag:
+                headers["If-None-Match"] = snapshot.etag
+            if snapshot.last_modified:
+                headers["If-Modified-Since"] = snapshot.last_modified
+
+        self._stats["requests"] += 1
+        self._attempted_at = self.clock()
+        return headers
+
+    def _not_modified(self, status_code: int) -> bool:
+        """True con 304 (snapshot confirmado); ValueError si no es 200."""
+        if status_code == 304 and self._snapshot is not None:
+            self._stats["not_modified"] += 1
+            self._validated()
+            return True
+        if status_code != 200:
+            raise ValueError(f"HTTP {status_code}")
+        return False
+
+    def _failed(self, error: Exception) -> bool:
+        self._stats["errors"] += 1
+        self.last_error = str(error)
+        logger.error("Error consultando %s: %s (se usa el snapshot anterior)", self.url, error)
+        return False
+
+    def _install(self, nodes: Dict[str, Dict], headers) -> bool:
+        """Instala el JSON descargado (200); True si es una versión nueva."""
+        snapshot = self._snapshot
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        if snapshot is not None and nodes == snapshot.nodes:
+            # Servidor sin soporte condicional: mismo JSON, se conserva la versión
+            self._snapshot = _Snapshot(snapshot.nodes, snapshot.state, etag, last_modified)
+            self._validated()
+            return False
+
+        state = ClusterState.from_nodes_status(nodes)
+        self._snapshot = _Snapshot(nodes, state, etag, last_modified)
+        self._stats["updates"] += 1
+        self._validated()
+        logger.debug("Snapshot v%d: %d hosts", state.version, len(state))
+        return True
+
+    def _validated(self) -> None:
+        self._validated_at = self.clock()
+        self.last_error = None
+
+    def _refresh_in_background(self) -> None:
+        """Lanza una revalidación si no hay otra en curso (stale-while-revalidate)."""
+        with self._flag_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name="nodes-status-refresh", daemon=True).start()
+
+    # ==========================
+    #   REFRESCO PERIÓDICO
+    # ==========================
+
+    def start(self) -> None:
+        """Hilo que revalida el snapshot cada `ttl` segundos."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(self.ttl):
+                self.refresh()
+
+        self.refresh()
+        self._thread = threading.Thread(target=loop, name="nodes-status-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout + 1)
+            self._thread = None
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Commit optimista de decisiones de placement.
+
+Dos solicitudes concurrentes (hilos del servidor o solicitudes de un lote)
+pueden evaluar el mismo snapshot + ledger, elegir el mismo host y
+reservarlo las dos: cada una verificó MP sin ver a la otra y el host queda
+por encima del riesgo aceptado. Un lock global alrededor de todo el
+placement lo evita pero serializa el servicio.
+
+En su lugar cada decisión lleva un TICKET con la versión del snapshot y la
+generación de su host en el ledger (leída ANTES de armar la vista). El
+commit es un compare-and-swap en el ledger (reserve_if):
+
+1) Si el host sigue en la misma generación y el snapshot es el mismo, la
+   decisión se evaluó sobre el estado actual: se reserva directamente.
+2) Si cambió, se re-valida SOLO ese host contra el estado actual (snapshot
+   + ledger, con el lock del ledger tomado): si el riesgo sigue <= MP se
+   reserva igual.
+3) Si ya no es viable hay conflicto: se vuelve a decidir localmente sobre el
+   estado actual y se reintenta (hasta COMMIT_RETRIES veces).
+
+La evaluación del clúster completo ocurre fuera del lock; dentro solo se
+compara un contador o se re-evalúa un host.
+
+En servicio_placement.py los workers son procesos: `ledger` es un
+SharedLedger y las generaciones y el CAS viven en el coordinador, así que
+el conflicto se detecta también entre workers. El paso 2 se hace en el
+worker con la generación leída en el coordinador y el CAS se reintenta con
+ella (ver shared_ledger.py).
+"""
+
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from vm_placement import SliceRequest, PlacementDecision, compute_slice_mu_sigma
+from cluster_state import ClusterState
+from pending_ledger import PendingAllocationLedger
+from placement_engine import evaluate_hosts
+
+COMMIT_RETRIES = 3
+
+Entry = Tuple[str, Dict[str, Tuple[float, float]], float]     # (host, slice_mu_sigma, disk_gb)
+
+
+@dataclass
+class PlacementTicket:
+    """Decisión pendiente de confirmar y el estado sobre el que se tomó."""
+    slice_req: SliceRequest
+    entries: List[Entry]
+    snapshot_version: int
+    generations: Optional[Dict[str, int]]   # None = desconocidas (siempre se re-valida)
+    risk_model: str = "normal"
+
+    @classmethod
+    def for_decision(
+        cls,
+        slice_req: SliceRequest,
+        decision: PlacementDecision,
+        snapshot_version: int,
+        generations: Optional[Dict[str, int]],
+        risk_model: str = "normal",
+        slice_mu_sigma: Optional[Dict[str, Tuple[float, float]]] = None
+    ) -> "PlacementTicket":
+        mu_sigma = slice_mu_sigma or compute_slice_mu_sigma(slice_req)
+        return cls(slice_req, [(decision.host, mu_sigma, slice_req.disk_gb)],
+                   snapshot_version, generations, risk_model)
+
+
+def _load_by_host(entries: List[Entry]) -> Dict[str, Tuple[Dict[str, Tuple[float, float]], float]]:
+    """Suma (μ, σ², disco) de las entradas de cada host (un gang puede poner varias VMs en uno)."""
+    acc: Dict[str, List[float]] = {}
+    for host, mu_sigma, disk_gb in entries:
+        a = acc.setdefault(host, [0.0, 0.0, 0.0, 0.0, 0.0])
+        a[0] += mu_sigma["cpu"][0]
+        a[1] += mu_sigma["cpu"][1] ** 2
+        a[2] += mu_sigma["ram"][0]
+        a[3] += mu_sigma["ram"][1] ** 2
+        a[4] += disk_gb
+    return {
+        h: ({"cpu": (a[0], a[1] ** 0.5), "ram": (a[2], a[3] ** 0.5)}, a[4])
+        for h, a in acc.items()
+    }
+
+
+def revalidate_host(
+    slice_req: SliceRequest,
+    host: str,
+    slice_mu_sigma: Dict[str, Tuple[float, float]],
+    disk_gb: float,
+    state: ClusterState,
+    ledger: PendingAllocationLedger,
+    risk_model: str = "normal"
+) -> bool:
+    """¿Sigue siendo viable `host` para esa carga con el snapshot y el ledger actuales?"""
+    row = state.index.get(host)
+    if row is None:
+        return False
+    current = ledger.apply_to(state.subset([row]))
+    # La zona es la del host (zone_mode puede haber elegido otra) y el disco el total del host
+    req = replace(slice_req, zone=current.zone_of(0), disk_gb=disk_gb)
+    return bool(evaluate_hosts(req, current, slice_mu_sigma, risk_model).viable[0])
+
+
+def commit_placement(
+    ticket: PlacementTicket,
+    ledger: PendingAllocationLedger,
+    state: ClusterState,
+    ttl_seconds: Optional[float] = None
+) -> Optional[str]:
+    """
+    Confirma el ticket contra `state` (el snapshot más reciente) y el ledger
+    actual. Retorna el allocation_id, o None si hubo conflicto.
+    """
+    stale = state.version != ticket.snapshot_version or ticket.generations is None
+    loads = _load_by_host(ticket.entries)
+    expected = {h: -1 if stale else ticket.generations.get(h, 0) for h in loads}
+
+    def validate(hosts: List[str]) -> bool:
+        return all(
+            revalidate_host(ticket.slice_req, h, *loads[h], state, ledger, ticket.risk_model)
+            for h in hosts
+        )
+
+    return ledger.reserve_if(ticket.entries, expected, validate, ttl_seconds)
+
+
+def place_optimistic(
+    slice_req: SliceRequest,
+    state: ClusterState,
+    ledger: PendingAllocationLedger,
+    decide: Callable[[ClusterState], Optional[PlacementDecision]],
+    decision: Optional[PlacementDecision] = None,
+    generations: Optional[Dict[str, int]] = None,
+    risk_model: str = "normal",
+    refresh: Optional[Callable[[], ClusterState]] = None,
+    retries: int = COMMIT_RETRIES
+) -> Tuple[Optional[PlacementDecision], Optional[str], int]:
+    """
+    Decide y confirma un slice con reintento local ante conflictos.
+
+    `decision` (opcional) es una decisión ya tomada sobre `state` más el
+    ledger con `generations`; si no se pasa, se decide con
+    decide(ledger.apply_to(state)). `refresh` entrega el snapshot más
+    reciente para el commit (por defecto `state`).
+
+    Retorna (decisión confirmada o None, allocation_id, conflictos).
+    """
+    mu_sigma = compute_slice_mu_sigma(slice_req)
+    conflicts = 0
+    for _ in range(retries + 1):
+        if decision is None:
+            generations = ledger.generations()
+            decision = decide(ledger.apply_to(state))
+            if decision is None:
+                return None, None, conflicts
+
+        ticket = PlacementTicket.for_decision(
+            slice_req, decision, state.version, generations, risk_model, mu_sigma
+        )
+        latest = refresh() if refresh is not None else state
+        allocation_id = commit_placement(ticket, ledger, latest)
+        if allocation_id is not None:
+            return decision, allocation_id, conflicts
+
+        conflicts += 1
+        state, decision = latest, None
+    return None, None, conflicts
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ledger de asignaciones PENDIENTES del servicio de placement.
+
+El uso de cada host sale de nodes_status.json, que refleja promedios de
+Prometheus de varias horas: un slice colocado hace unos segundos todavía no
+aparece ahí y las solicitudes concurrentes terminarían en el mismo host.
+
+El ledger guarda, por cada decisión reciente, los deltas (μ, σ², disco) que
+el slice agrega a su host. Antes de evaluar el riesgo esos deltas se suman
+al snapshot. Cada asignación se libera:
+- explícitamente (el deploy falló, o ya se confirmó y las métricas la ven), o
+- automáticamente al vencer su TTL (las métricas ya la absorbieron).
+
+Cada host tiene además un contador de GENERACIÓN que sube con cada reserva
+o liberación que lo toca. `reserve_if` solo confirma si los hosts siguen en
+la generación con la que se tomó la decisión (compare-and-swap); ver
+optimistic_commit.py.
+"""
+
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import itertools
+import threading
+import time
+import uuid
+
+from vm_placement import HostState
+from cluster_state import ClusterState
+
+# Contador global: cada cambio del ledger produce una versión nueva
+_VERSION_COUNTER = itertools.count(1)
+
+
+@dataclass
+class PendingDelta:
+    """Carga que una asignación pendiente agrega a un host."""
+    host: str
+    mu_cpu: float
+    var_cpu: float      # varianza (σ²): las varianzas independientes se suman
+    mu_ram_gb: float
+    var_ram_gb: float
+    disk_gb: float
+
+
+@dataclass
+class PendingAllocation:
+    allocation_id: str
+    deltas: List[PendingDelta]
+    created_at: float
+    expires_at: float
+
+
+class PendingAllocationLedger:
+    """
+    Registro thread-safe de asignaciones pendientes con TTL.
+    `clock` es inyectable para el simulador (por defecto time.monotonic).
+    """
+
+    def __init__(self, ttl_seconds: float = 900.0, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._allocations: Dict[str, PendingAllocation] = {}
+        self._generations: Dict[str, int] = {}
+        self._lock = threading.RLock()      # reentrante: `validate` de reserve_if consulta el ledger
+        self.version = next(_VERSION_COUNTER)
+
+    def _touch(self, hosts: Iterable[str]) -> None:
+        """Nueva versión del ledger y generación siguiente en cada host tocado (con el lock tomado)."""
+        for host in set(hosts):
+            self._generations[host] = self._generations.get(host, 0) + 1
+        self.version = next(_VERSION_COUNTER)
+
+    # ==========================
+    #   RESERVA Y LIBERACIÓN
+    # ==========================
+
+    def reserve(
+        self,
+        entries: List[Tuple[str, Dict[str, Tuple[float, float]], float]],
+        ttl_seconds: Optional[float] = None
+    ) -> str:
+        """
+        Registra una asignación pendiente. `entries` es una lista de
+        (host, slice_mu_sigma, disk_gb): un solo elemento para un slice normal,
+        varios para un gang placement que reparte VMs en distintos hosts.
+        Retorna el allocation_id para liberarla después.
+        """
+        now = self.clock()
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        deltas = [
+            PendingDelta(
+                host=host,
+                mu_cpu=mu_sigma["cpu"][0],
+                var_cpu=mu_sigma["cpu"][1] ** 2,
+                mu_ram_gb=mu_sigma["ram"][0],
+                var_ram_gb=mu_sigma["ram"][1] ** 2,
+                disk_gb=disk_gb,
+            )
+            for host, mu_sigma, disk_gb in entries
+        ]
+        allocation = PendingAllocation(uuid.uuid4().hex, deltas, now, now + ttl)
+
+        with self._lock:
+            self._allocations[allocation.allocation_id] = allocation
+            self._touch(d.host for d in deltas)
+        return allocation.allocation_id
+
+    def reserve_if(
+        self,
+        entries: List[Tuple[str, Dict[str, Tuple[float, float]], float]],
+        expected: Dict[str, int],
+        validate: Optional[Callable[[List[str]], bool]] = None,
+        ttl_seconds: Optional[float] = None
+    ) -> Optional[str]:
+        """
+        Reserva atómica condicionada (compare-and-swap). `expected` es la
+        generación de cada host con la que se tomó la decisión. Si todos
+        siguen igual se reserva sin más; si alguno cambió, `validate` recibe
+        esos hosts y decide (con el lock tomado, viendo el ledger actual) si
+        la decisión sigue siendo válida. Sin `validate`, o si retorna False,
+        no se reserva nada y se retorna None (conflicto).
+        """
+        with self._lock:
+            conflicts = [h for h, gen in expected.items() if self._generations.get(h, 0) != gen]
+            if conflicts and (validate is None or not validate(conflicts)):
+                return None
+            return self.reserve(entries, ttl_seconds)
+
+    def release(self, allocation_id: str) -> bool:
+        """Libera una asignación (deploy fallido o ya visible en métricas)."""
+        with self._lock:
+            allocation = self._allocations.pop(allocation_id, None)
+            if allocation is not None:
+                self._touch(d.host for d in allocation.deltas)
+        return allocation is not None
+
+    def purge_expired(self) -> int:
+        """Elimina las asignaciones con TTL vencido; retorna cuántas."""
+        now = self.clock()
+        with self._lock:
+            expired = [a for a, alloc in self._allocations.items() if alloc.expires_at <= now]
+            hosts = [d.host for a in expired for d in self._allocations.pop(a).deltas]
+            if expired:
+                self._touch(hosts)
+        return len(expired)
+
+    # ==========================
+    #   CONSULTA
+    # ==========================
+
+    def __len__(self) -> int:
+        return len(self._allocations)
+
+    def generation(self, host: str) -> int:
+        return self._generations.get(host, 0)
+
+    def generations(self) -> Dict[str, int]:
+        """Copia de las generaciones por host: leerla ANTES de armar la vista con apply_to."""
+        with self._lock:
+            return dict(self._generations)
+
+    def allocations(self) -> List[PendingAllocation]:
+        with self._lock:
+            return list(self._allocations.values())
+
+    def totals_by_host(self) -> Dict[str, PendingDelta]:
+        """Suma de deltas vigentes por host (purga antes las vencidas)."""
+        self.purge_expired()
+        totals: Dict[str, PendingDelta] = {}
+        for alloc in self.allocations():
+            for d in alloc.deltas:
+                t = totals.get(d.host)
+                if t is None:
+                    totals[d.host] = replace(d)
+                else:
+                    t.mu_cpu += d.mu_cpu
+                    t.var_cpu += d.var_cpu
+                    t.mu_ram_gb += d.mu_ram_gb
+                    t.var_ram_gb += d.var_ram_gb
+                    t.disk_gb += d.disk_gb
+        return totals
+
+    # ==========================
+    #   INCORPORAR AL ESTADO
+    # ==========================
+
+    def apply_to(self, state: ClusterState) -> ClusterState:
+        """
+        Devuelve el snapshot con las asignaciones pendientes sumadas.
+        Si no hay pendientes en los hosts del snapshot se devuelve el mismo
+        objeto (sin copiar); si no, una copia: `state` nunca se modifica.
+        """
+        return fold_totals(state, self.totals_by_host())
+
+    def apply_to_hosts(self, hosts: List[HostState]) -> List[HostState]:
+        """Igual que `apply_to` pero para una List[HostState] (motor escalar)."""
+        return fold_totals_hosts(hosts, self.totals_by_host())
+
+
+def fold_totals(state: ClusterState, totals: Dict[str, PendingDelta]) -> ClusterState:
+    """Suma los totales por host (totals_by_host) a una copia de `state`; sin totales en sus hosts, `state`."""
+    totals = {h: t for h, t in totals.items() if h in state.index}
+    if not totals:
+        return state
+
+    folded = state.copy()
+    for host, t in totals.items():
+        folded.apply_slice(
+            host,
+            {"cpu": (t.mu_cpu, t.var_cpu ** 0.5), "ram": (t.mu_ram_gb, t.var_ram_gb ** 0.5)},
+            t.disk_gb,
+        )
+    return folded
+
+
+def fold_totals_hosts(hosts: List[HostState], totals: Dict[str, PendingDelta]) -> List[HostState]:
+    """Igual que `fold_totals` para una List[HostState]."""
+    folded = []
+    for h in hosts:
+        t = totals.get(h.name)
+        if t is None:
+            folded.append(h)
+            continue
+        folded.append(replace(
+            h,
+            mu_cpu=h.mu_cpu + t.mu_cpu,
+            sigma_cpu=(h.sigma_cpu ** 2 + t.var_cpu) ** 0.5,
+            mu_ram_gb=h.mu_ram_gb + t.mu_ram_gb,
+            sigma_ram_gb=(h.sigma_ram_gb ** 2 + t.var_ram_gb) ** 0.5,
+            disk_gb_used=h.disk_gb_used + t.disk_gb,
+        ))
+    return folded
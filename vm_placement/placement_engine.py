@@ -0,0 +1,775 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Motor VECTORIZADO de VM Placement (NumPy).
+
+Implementa la misma lógica que `vm_placement.decide_vm_placement`, pero
+evaluando TODOS los hosts a la vez con operaciones sobre arreglos:
+
+- Probabilidad de congestión CPU/RAM (antes y después de asignar el slice),
+  con el modelo normal (μ, σ), con los histogramas empíricos de cada host
+  o con la normal bivariada CPU/RAM (riesgo conjunto)
+- Restricción DETERMINISTA de disco
+- Máscaras de zona, plataforma, habilitado y mantenimiento
+- Selección Minimax usando los dos mayores riesgos baseline
+- Puntaje multiobjetivo opcional (ver placement_scoring.py)
+- Búsqueda entre zonas (zona preferida y luego por holgura) opcional
+
+El motor escalar de `vm_placement.py` se mantiene como implementación de
+referencia (ver test_caso_6_motor_vectorizado.py para la equivalencia).
+"""
+
+from dataclasses import dataclass, replace
+from typing import Collection, Dict, List, Optional, Tuple, Union
+import math
+
+import numpy as np
+
+from vm_placement import (
+    SliceRequest, HostState, PlacementDecision, Platform,
+    compute_slice_mu_sigma, build_placement_decision,
+)
+from cluster_state import ClusterState, platform_code, HIST_BINS
+from placement_scoring import ScoringPolicy, ScoreContext
+from decision_trace import (
+    DecisionTrace,
+    REJECT_UNAVAILABLE, REJECT_ZONE, REJECT_PLATFORM, REJECT_RACK, REJECT_DISK, REJECT_RISK,
+)
+
+try:
+    # scipy es opcional: si está instalado se usa su erfc vectorizada en C
+    from scipy.special import erfc as _erfc_ufunc
+except ImportError:  # pragma: no cover - depende del entorno
+    _erfc_ufunc = None
+
+_SQRT2 = math.sqrt(2.0)
+_SQRT_PI = math.sqrt(math.pi)
+
+# Modelos de riesgo:
+# - "normal"    : demanda del host ~ N(μ, σ²) (modelo original)
+# - "empirical" : histograma de uso observado en Prometheus (los hosts sin
+#                 histograma siguen con el modelo normal)
+# - "joint"     : normal bivariada con la covarianza CPU/RAM de cada host;
+#                 el riesgo local es P(CPU o RAM congestionados)
+RISK_MODELS = ("normal", "empirical", "joint")
+
+# Cuadratura de Gauss-Legendre para la integral de la normal bivariada
+_GL_NODES, _GL_WEIGHTS = np.polynomial.legendre.leggauss(20)
+
+# Borde superior de cada bucket de la grilla común (fracción de la capacidad)
+_HIST_UPPER = np.arange(1, HIST_BINS + 1) / HIST_BINS
+
+
+# ==========================
+#   FUNCIONES VECTORIZADAS
+# ==========================
+
+def _erfc(x: np.ndarray) -> np.ndarray:
+    """
+    erfc elemento a elemento: scipy si existe; si no, _erfc_numpy para
+    arreglos grandes y math.erfc por elemento para los pequeños (ahí el costo
+    fijo de las operaciones de numpy supera al del bucle).
+    """
+    if _erfc_ufunc is not None:
+        return _erfc_ufunc(x)
+    x = np.asarray(x, dtype=np.float64)
+    if x.size >= _ERFC_NUMPY_MIN_SIZE:
+        return _erfc_numpy(x)
+    return np.asarray(_math_erfc_array(x), dtype=np.float64)
+
+
+def _erfcx_scalar(z: float) -> float:
+    """erfcx(z) = erfc(z)·e^(z²) para z >= 0 (fracción continua donde erfc se anula)."""
+    if z < 5.0:
+        return math.erfc(z) * math.exp(z * z)
+    t = z
+    for k in range(60, 0, -1):
+        t = z + 0.5 * k / t
+    return 1.0 / (_SQRT_PI * t)
+
+
+def _erfc_chebyshev_target(u: np.ndarray) -> np.ndarray:
+    """log(erfc(z)·e^(z²) / t) con t = 2/(2+z) = (u+1)/2; es suave en todo u ∈ [-1, 1]."""
+    out = []
+    for ui in np.atleast_1d(u):
+        t = (ui + 1.0) / 2.0
+        if t <= 0.0:
+            out.append(-math.log(2.0 * _SQRT_PI))     # límite z -> ∞
+        else:
+            out.append(math.log(_erfcx_scalar(2.0 / t - 2.0) / t))
+    return np.array(out)
+
+
+# erfc sin scipy: erfc(z) = t·exp(-z² + P(2t-1)), t = 2/(2+z), con P una serie
+# de Chebyshev ajustada al importar el módulo a partir de math.erfc (mismo
+# esquema que erfccheb de Numerical Recipes). Error relativo < 1e-12 frente a
+# math.erfc en todo el rango.
+_ERFC_CHEB_DEGREE = 24
+_ERFC_CHEB = np.polynomial.chebyshev.chebinterpolate(_erfc_chebyshev_target, _ERFC_CHEB_DEGREE)
+
+# Bajo este tamaño math.erfc por elemento es más rápido que _erfc_numpy
+_ERFC_NUMPY_MIN_SIZE = 1024
+_math_erfc_array = np.frompyfunc(math.erfc, 1, 1)
+
+
+def _erfc_numpy(x: np.ndarray) -> np.ndarray:
+    """erfc solo con operaciones de numpy (sin bucle de Python por elemento)."""
+    x = np.asarray(x, dtype=np.float64)
+    z = np.abs(x)
+    t = 2.0 / (2.0 + z)
+    out = t * np.exp(np.polynomial.chebyshev.chebval(2.0 * t - 1.0, _ERFC_CHEB) - z * z)
+    return np.where(x < 0, 2.0 - out, out)
+
+
+def normal_tail_probability_array(
+    ci: np.ndarray,
+    mu: np.ndarray,
+    sigma: np.ndarray
+) -> np.ndarray:
+    """
+    Versión vectorizada de `_normal_tail_probability`:
+    P(DT > CI) = Q((CI - mu) / sigma) para cada host.
+    Si sigma <= 0 no hay variabilidad: 0 si CI >= mu, 1 en caso contrario.
+    """
+    ci = np.asarray(ci, dtype=np.float64)
+    mu = np.asarray(mu, dtype=np.float64)
+    sigma = np.asarray(sigma, dtype=np.float64)
+
+    deterministic = sigma <= 0
+    safe_sigma = np.where(deterministic, 1.0, sigma)
+    x = (ci - mu) / safe_sigma
+    tail = 0.5 * _erfc(x / _SQRT2)
+
+    return np.where(deterministic, np.where(ci >= mu, 0.0, 1.0), tail)
+
+
+def empirical_tail_probability_array(
+    capacity: np.ndarray,
+    histogram: np.ndarray,
+    extra_mu: np.ndarray,
+    extra_sigma: np.ndarray,
+    threshold: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    P(X + Y > CE) para cada host, con X ~ histograma observado del host
+    (matriz n x HIST_BINS sobre [0, CI]) e Y ~ N(extra_mu, extra_sigma) la
+    carga que se agrega (slice y/o asignaciones en memoria). CE es
+    `threshold` (capacidad efectiva con overcommit) o, por defecto, CI.
+
+    Es la convolución de ambas distribuciones evaluada en CE:
+        Σ_j masa_j · P(Y > CE - x_j)
+    tomando x_j en el borde superior del bucket (conservador). Sin
+    overcommit el último bucket (uso en el tope de la capacidad) cuenta
+    siempre como congestión.
+    """
+    if threshold is None:
+        threshold = capacity
+    margin = threshold[:, None] - capacity[:, None] * _HIST_UPPER[None, :]
+    margin[:, -1] = np.where(threshold > capacity, margin[:, -1], -np.inf)
+    tail = normal_tail_probability_array(margin, extra_mu[:, None], extra_sigma[:, None])
+    return np.sum(histogram * tail, axis=1)
+
+
+def bivariate_upper_orthant_array(
+    z1: np.ndarray,
+    z2: np.ndarray,
+    rho: np.ndarray
+) -> np.ndarray:
+    """
+    P(X > z1, Y > z2) para (X, Y) normales estándar con correlación rho,
+    elemento a elemento. Usa la fórmula de Sheppard con el cambio r = sin θ:
+
+        P = Q(z1)·Q(z2) + 1/(2π) ∫_0^{asin ρ} exp(-(z1² - 2 z1 z2 sin θ + z2²) / (2 cos² θ)) dθ
+
+    El integrando es suave en todo [-π/2, π/2], así que una cuadratura de
+    Gauss-Legendre de 20 puntos basta incluso con |ρ| cerca de 1.
+    """
+    z1 = np.clip(np.asarray(z1, dtype=np.float64), -40.0, 40.0)[..., None]
+    z2 = np.clip(np.asarray(z2, dtype=np.float64), -40.0, 40.0)[..., None]
+    half = np.arcsin(np.clip(np.asarray(rho, dtype=np.float64), -1.0, 1.0))[..., None] / 2.0
+
+    theta = half * (_GL_NODES + 1.0)      # nodos llevados a [0, asin ρ]
+    sin_t, cos_t = np.sin(theta), np.cos(theta)
+    integrand = np.exp(-(z1 ** 2 - 2.0 * z1 * z2 * sin_t + z2 ** 2) / (2.0 * cos_t ** 2))
+    integral = half[..., 0] * np.sum(_GL_WEIGHTS * integrand, axis=-1)
+
+    independent = 0.25 * _erfc(z1[..., 0] / _SQRT2) * _erfc(z2[..., 0] / _SQRT2)
+    return np.clip(independent + integral / (2.0 * math.pi), 0.0, 1.0)
+
+
+def joint_congestion_probability(
+    hosts: ClusterState,
+    slice_mu_sigma: Optional[Dict[str, Tuple[float, float]]] = None,
+    overcommit: Optional[Tuple[np.ndarray, np.ndarray]] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Para cada host, (P_cpu, P_ram, P(CPU o RAM)) tras sumar el slice (o el
+    estado actual si `slice_mu_sigma` es None), con (CPU, RAM) ~ normal
+    bivariada:
+
+        P(CPU o RAM) = P_cpu + P_ram - P(CPU y RAM)
+
+    La covarianza del host es la observada (cov_cpu_ram); el slice se
+    suma como independiente, así que solo aumenta las varianzas. Si alguno
+    de los dos recursos no tiene variabilidad (σ = 0) es determinista y
+    P(CPU y RAM) = P_cpu · P_ram.
+
+    `overcommit` = (ratio CPU, ratio RAM) por host escala la capacidad
+    (ver overcommit_ratios).
+    """
+    mu_c_add, sigma_c_add = (0.0, 0.0) if slice_mu_sigma is None else slice_mu_sigma["cpu"]
+    mu_r_add, sigma_r_add = (0.0, 0.0) if slice_mu_sigma is None else slice_mu_sigma["ram"]
+
+    mu_c = hosts.mu_cpu + mu_c_add
+    mu_r = hosts.mu_ram_gb + mu_r_add
+    sigma_c = np.sqrt(hosts.sigma_cpu ** 2 + sigma_c_add ** 2)
+    sigma_r = np.sqrt(hosts.sigma_ram_gb ** 2 + sigma_r_add ** 2)
+
+    cpu_capacity, ram_capacity = hosts.cpu_capacity, hosts.ram_gb_capacity
+    if overcommit is not None:
+        cpu_capacity, ram_capacity = cpu_capacity * overcommit[0], ram_capacity * overcommit[1]
+
+    p_cpu = normal_tail_probability_array(cpu_capacity, mu_c, sigma_c)
+    p_ram = normal_tail_probability_array(ram_capacity, mu_r, sigma_r)
+
+    deterministic = (sigma_c <= 0) | (sigma_r <= 0)
+    safe_c = np.where(deterministic, 1.0, sigma_c)
+    safe_r = np.where(deterministic, 1.0, sigma_r)
+    rho = np.where(deterministic, 0.0, hosts.cov_cpu_ram / (safe_c * safe_r))
+
+    p_both = bivariate_upper_orthant_array(
+        (cpu_capacity - mu_c) / safe_c, (ram_capacity - mu_r) / safe_r, rho
+    )
+    p_both = np.where(deterministic, p_cpu * p_ram, p_both)
+
+    p_either = np.clip(p_cpu + p_ram - p_both, np.maximum(p_cpu, p_ram), 1.0)
+    return p_cpu, p_ram, p_either
+
+
+def resource_tail_probability(
+    hosts: ClusterState,
+    resource: str,
+    mu_add: float = 0.0,
+    sigma_add: float = 0.0,
+    risk_model: str = "normal",
+    overcommit: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    P(congestión) de `resource` ("cpu" o "ram") en cada host si se le suma
+    una carga N(mu_add, sigma_add²). Con mu_add = sigma_add = 0 es el riesgo
+    actual (baseline). `overcommit` (ratio por host) escala la capacidad.
+
+    En el modelo empírico la carga agregada en memoria después del snapshot
+    (apply_slice, ledger de pendientes) se obtiene como la diferencia entre
+    μ/σ² actuales y los observados al construirlo, y se suma al slice.
+    """
+    if risk_model not in RISK_MODELS:
+        raise ValueError(f"Modelo de riesgo desconocido: {risk_model}")
+
+    if resource == "cpu":
+        capacity, mu, sigma = hosts.cpu_capacity, hosts.mu_cpu, hosts.sigma_cpu
+        mu_key, sigma_key = "mu_cpu", "sigma_cpu"
+    else:
+        capacity, mu, sigma = hosts.ram_gb_capacity, hosts.mu_ram_gb, hosts.sigma_ram_gb
+        mu_key, sigma_key = "mu_ram_gb", "sigma_ram_gb"
+
+    threshold = capacity if overcommit is None else capacity * overcommit
+    tail = normal_tail_probability_array(threshold, mu + mu_add, np.sqrt(sigma ** 2 + sigma_add ** 2))
+    if risk_model != "empirical":
+        return tail
+
+    rows = np.flatnonzero(hosts.has_histogram(resource))
+    if rows.size:
+        h = hosts.histograms
+        extra_mu = mu[rows] - h[mu_key][rows] + mu_add
+        extra_var = np.maximum(sigma[rows] ** 2 - h[sigma_key][rows] ** 2, 0.0) + sigma_add ** 2
+        tail[rows] = empirical_tail_probability_array(
+            capacity[rows], h[resource][rows], extra_mu, np.sqrt(extra_var), threshold[rows]
+        )
+    return tail
+
+
+def overcommit_ratios(slice_req: SliceRequest, hosts: ClusterState) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (ratio CPU, ratio RAM) efectivos por host: el overcommit que acepta el
+    SLA del slice acotado por el techo de cada host (vectorizado de
+    vm_placement.overcommit_ratio). Sin overcommit ambos son 1.
+    """
+    cpu = np.maximum(1.0, np.minimum(float(slice_req.cpu_overcommit or 1.0), hosts.cpu_overcommit_max))
+    ram = np.maximum(1.0, np.minimum(float(slice_req.ram_overcommit or 1.0), hosts.ram_overcommit_max))
+    return cpu, ram
+
+
+def host_risk(
+    hosts: ClusterState,
+    risk_model: str = "normal",
+    slice_mu_sigma: Optional[Dict[str, Tuple[float, float]]] = None
+) -> np.ndarray:
+    """
+    Riesgo de cada host: max(P_cpu, P_ram), o P(CPU o RAM) con el modelo
+    conjunto. Sin `slice_mu_sigma` es el riesgo actual; con él, el riesgo si
+    se le sumara esa carga (ej. una VM que se migra).
+    """
+    if risk_model == "joint":
+        return joint_congestion_probability(hosts, slice_mu_sigma)[2]
+    mu_cpu, sigma_cpu = (0.0, 0.0) if slice_mu_sigma is None else slice_mu_sigma["cpu"]
+    mu_ram, sigma_ram = (0.0, 0.0) if slice_mu_sigma is None else slice_mu_sigma["ram"]
+    return np.maximum(
+        resource_tail_probability(hosts, "cpu", mu_cpu, sigma_cpu, risk_model),
+        resource_tail_probability(hosts, "ram", mu_ram, sigma_ram, risk_model),
+    )
+
+
+# ==========================
+#   EVALUACIÓN Y MINIMAX
+# ==========================
+
+@dataclass
+class HostEvaluation:
+    """
+    Resultado de evaluar un SliceRequest contra todos los hosts.
+    Todos los arreglos tienen una entrada por host.
+    """
+    baseline_risk: np.ndarray   # max(P_cpu, P_ram) actual (P(CPU o RAM) con "joint")
+    p_cpu_after: np.ndarray     # P(congestión CPU) tras asignar
+    p_ram_after: np.ndarray     # P(congestión RAM) tras asignar
+    local_risk: np.ndarray      # max(P_cpu, P_ram) tras asignar (P(CPU o RAM) con "joint")
+    admission_risk: np.ndarray  # local_risk contra la capacidad efectiva (overcommit); filtro MP
+    disk_free_after: np.ndarray # capacidad - (usado + solicitado)
+    viable: np.ndarray          # pasa todos los filtros
+    cpu_overcommit: np.ndarray  # ratio de overcommit de CPU aplicado (1 = sin overcommit)
+    ram_overcommit: np.ndarray  # ratio de overcommit de RAM aplicado
+    rack_ok: np.ndarray         # fuera de los racks a evitar (spread por dominio de falla)
+
+
+def evaluate_hosts(
+    slice_req: SliceRequest,
+    hosts: ClusterState,
+    slice_mu_sigma: Optional[Dict[str, Tuple[float, float]]] = None,
+    risk_model: str = "normal",
+    avoid_racks: Optional[Collection[str]] = None
+) -> HostEvaluation:
+    """
+    Aplica en bloque los mismos filtros que el motor escalar:
+      1) Host habilitado y fuera de mantenimiento
+      2) Zona y plataforma solicitadas
+      3) Fuera de `avoid_racks` (solo spread de gang placement; usa el
+         índice de racks precalculado del snapshot)
+      4) Restricción DETERMINISTA de disco
+      5) max(P_cong,CPU, P_cong,RAM) <= MP (P(CPU o RAM) <= MP con "joint")
+
+    `slice_mu_sigma` permite pasar μ/σ ya calculados (ej. un grupo de VMs);
+    por defecto se obtienen de la tabla de perfiles con compute_slice_mu_sigma.
+    `risk_model` elige el cálculo de P_cong (ver RISK_MODELS).
+
+    Si el slice acepta overcommit, el filtro de viabilidad (5) se mide contra
+    la capacidad efectiva CI · ratio (ver overcommit_ratios): es lo que el
+    SLA del slice admite. El objetivo Minimax (local_risk, p_cpu/p_ram y el
+    baseline) se mide siempre contra la capacidad física, para que el riesgo
+    tras asignar y el de los demás hosts estén en la misma base: si no, un
+    host casi lleno parecería menos riesgoso que uno vacío.
+    """
+    if slice_mu_sigma is None:
+        slice_mu_sigma = compute_slice_mu_sigma(slice_req)
+    mu_cpu_slice, sigma_cpu_slice = slice_mu_sigma["cpu"]
+    mu_ram_slice, sigma_ram_slice = slice_mu_sigma["ram"]
+
+    # Riesgo actual (baseline) del clúster
+    baseline_risk = host_risk(hosts, risk_model)
+
+    # Riesgo tras asignar el slice (suma con la normal del slice), contra la
+    # capacidad física
+    def risk_after(ratios=None):
+        if risk_model == "joint":
+            return joint_congestion_probability(hosts, slice_mu_sigma, ratios)
+        p_cpu = resource_tail_probability(
+            hosts, "cpu", mu_cpu_slice, sigma_cpu_slice, risk_model, None if ratios is None else ratios[0]
+        )
+        p_ram = resource_tail_probability(
+            hosts, "ram", mu_ram_slice, sigma_ram_slice, risk_model, None if ratios is None else ratios[1]
+        )
+        return p_cpu, p_ram, np.maximum(p_cpu, p_ram)
+
+    p_cpu_after, p_ram_after, local_risk = risk_after()
+
+    # Con overcommit, el filtro usa la capacidad efectiva CI · ratio
+    cpu_ratio, ram_ratio = overcommit_ratios(slice_req, hosts)
+    if (cpu_ratio > 1.0).any() or (ram_ratio > 1.0).any():
+        admission_risk = risk_after((cpu_ratio, ram_ratio))[2]
+    else:
+        admission_risk = local_risk
+
+    disk_free_after = hosts.disk_gb_capacity - (hosts.disk_gb_used + slice_req.disk_gb)
+
+    viable = hosts.available()
+    if slice_req.zone:
+        viable &= hosts.zone_codes == hosts.zone_code(slice_req.zone)
+    if slice_req.platform in ("linux", "openstack"):
+        viable &= hosts.platform_codes == platform_code(slice_req.platform)
+    rack_ok = ~hosts.rack_mask(avoid_racks) if avoid_racks else np.ones(len(hosts), dtype=bool)
+    viable &= rack_ok
+    viable &= disk_free_after >= 0
+    viable &= admission_risk <= slice_req.max_failure_prob
+
+    return HostEvaluation(
+        baseline_risk=baseline_risk,
+        p_cpu_after=p_cpu_after,
+        p_ram_after=p_ram_after,
+        local_risk=local_risk,
+        admission_risk=admission_risk,
+        disk_free_after=disk_free_after,
+        viable=viable,
+        cpu_overcommit=cpu_ratio,
+        ram_overcommit=ram_ratio,
+        rack_ok=rack_ok,
+    )
+
+
+def cluster_risk_after(baseline_risk: np.ndarray, local_risk: np.ndarray) -> np.ndarray:
+    """
+    Riesgo global del clúster si el slice se asigna al host i:
+        max(local_risk[i], max_{j != i} baseline_risk[j])
+
+    El máximo de "los demás" se obtiene con los dos mayores valores
+    baseline, así que el costo total es O(n).
+    """
+    n = baseline_risk.shape[0]
+    if n == 0:
+        return np.empty(0, dtype=np.float64)
+    if n == 1:
+        return local_risk.copy()
+
+    top_idx = int(np.argmax(baseline_risk))
+    top1 = baseline_risk[top_idx]
+    top2 = np.max(np.delete(baseline_risk, top_idx))
+
+    others_max = np.full(n, top1)
+    others_max[top_idx] = top2
+    return np.maximum(local_risk, others_max)
+
+
+def rank_minimax(
+    cluster_risk: np.ndarray,
+    local_risk: np.ndarray,
+    disk_free_after: np.ndarray
+) -> np.ndarray:
+    """
+    Índices de los candidatos ordenados según `vm_placement.minimax_key`:
+    menor riesgo global, luego menor riesgo local, luego más disco libre.
+    lexsort es estable, así que ante empate total gana el primer índice.
+    """
+    return np.lexsort((-disk_free_after, local_risk, cluster_risk))
+
+
+def select_minimax(
+    cluster_risk: np.ndarray,
+    local_risk: np.ndarray,
+    disk_free_after: np.ndarray
+) -> int:
+    """
+    Índice del mejor candidato (el primero de `rank_minimax`) en O(n):
+    solo se ordenan los candidatos empatados en riesgo global.
+    """
+    tied = np.flatnonzero(cluster_risk == cluster_risk.min())
+    if tied.size == 1:
+        return int(tied[0])
+    return int(tied[rank_minimax(cluster_risk[tied], local_risk[tied], disk_free_after[tied])[0]])
+
+
+@dataclass
+class PlacementCandidate:
+    """
+    Host viable con su puntaje Minimax, devuelto por el ranking top-k.
+    Permite que el orquestador reintente localmente en el siguiente host si
+    la creación de la VM falla en el primero.
+    """
+    host: str
+    platform: Platform
+    availability_zone: str
+    cluster_risk: float     # riesgo global del clúster si se asigna aquí (puntaje Minimax)
+    local_risk: float       # max(P_cpu, P_ram) del host tras asignar
+    p_cpu: float
+    p_ram: float
+    disk_free_gb: float     # disco libre que queda tras asignar
+    cpu_overcommit: float = 1.0   # ratios de overcommit aplicados en este host
+    ram_overcommit: float = 1.0
+    score: Optional[float] = None   # puntaje multiobjetivo (solo con `scoring`)
+
+    def to_decision(self) -> PlacementDecision:
+        return build_placement_decision(
+            self.host, self.platform, self.availability_zone, self.local_risk,
+            self.cpu_overcommit, self.ram_overcommit,
+        )
+
+
+def rank_placement_candidates(
+    slice_req: SliceRequest,
+    hosts: Union[ClusterState, List[HostState]],
+    k: int = 1,
+    slice_mu_sigma: Optional[Dict[str, Tuple[float, float]]] = None,
+    trace: Optional[DecisionTrace] = None,
+    risk_model: str = "normal",
+    avoid_racks: Optional[Collection[str]] = None,
+    scoring: Optional[ScoringPolicy] = None
+) -> List[PlacementCandidate]:
+    """
+    Los k mejores hosts viables ordenados por el criterio Minimax, calculados
+    en la misma pasada vectorizada que la decisión. Lista vacía si no hay
+    ningún host viable. Los hosts de `avoid_racks` se descartan.
+
+    Con `scoring` los viables se ordenan por el puntaje multiobjetivo de la
+    política (pesos según la zona de cada host) y el orden Minimax queda
+    como desempate. Sin política el resultado es exactamente el de Minimax.
+
+    Si se pasa `trace`, se registra el detalle por host (solo en ese caso
+    se recorren los hosts en Python).
+    """
+    state = hosts if isinstance(hosts, ClusterState) else ClusterState.from_hosts(hosts)
+    if len(state) == 0 or k <= 0:
+        return []
+
+    if slice_mu_sigma is None:
+        slice_mu_sigma = compute_slice_mu_sigma(slice_req)
+    ev = evaluate_hosts(slice_req, state, slice_mu_sigma, risk_model, avoid_racks)
+    candidates = np.flatnonzero(ev.viable)
+    if candidates.size == 0:
+        if trace is not None:
+            _record_trace(trace, slice_req, state, ev, None, None)
+        return []
+
+    all_cluster_risk = cluster_risk_after(ev.baseline_risk, ev.local_risk)
+    cluster_risk = all_cluster_risk[candidates]
+    local_risk = ev.local_risk[candidates]
+    disk_free = ev.disk_free_after[candidates]
+
+    score = None
+    if scoring is not None:
+        score = scoring.score(ScoreContext(
+            state, candidates, slice_req, slice_mu_sigma, cluster_risk, local_risk, disk_free
+        ))
+        top = np.lexsort((-disk_free, local_risk, cluster_risk, score))[:k]
+    elif k == 1:
+        top = [select_minimax(cluster_risk, local_risk, disk_free)]
+    else:
+        top = rank_minimax(cluster_risk, local_risk, disk_free)[:k]
+
+    ranked = []
+    for pos in top:
+        row = int(candidates[pos])
+        ranked.append(PlacementCandidate(
+            host=state.names[row],
+            platform=state.platform_of(row),
+            availability_zone=state.zone_of(row),
+            cluster_risk=float(cluster_risk[pos]),
+            local_risk=float(local_risk[pos]),
+            p_cpu=float(ev.p_cpu_after[row]),
+            p_ram=float(ev.p_ram_after[row]),
+            disk_free_gb=float(disk_free[pos]),
+            cpu_overcommit=float(ev.cpu_overcommit[row]),
+            ram_overcommit=float(ev.ram_overcommit[row]),
+            score=None if score is None else float(score[pos]),
+        ))
+
+    if trace is not None:
+        _record_trace(trace, slice_req, state, ev, all_cluster_risk, ranked[0])
+    return ranked
+
+
+def _record_trace(
+    trace: DecisionTrace,
+    slice_req: SliceRequest,
+    state: ClusterState,
+    ev: HostEvaluation,
+    cluster_risk: Optional[np.ndarray],
+    best: Optional[PlacementCandidate]
+) -> None:
+    """Vuelca a la traza el motivo de rechazo / puntaje de cada host."""
+    zone_ok = np.ones(len(state), dtype=bool)
+    if slice_req.zone:
+        zone_ok = state.zone_codes == state.zone_code(slice_req.zone)
+    platform_ok = np.ones(len(state), dtype=bool)
+    if slice_req.platform in ("linux", "openstack"):
+        platform_ok = state.platform_codes == platform_code(slice_req.platform)
+
+    # Mismo orden de filtros que el motor escalar
+    reasons = np.select(
+        [~state.available(), ~zone_ok, ~platform_ok, ~ev.rack_ok, ev.disk_free_after < 0, ~ev.viable],
+        [REJECT_UNAVAILABLE, REJECT_ZONE, REJECT_PLATFORM, REJECT_RACK, REJECT_DISK, REJECT_RISK],
+        default="",
+    )
+
+    # Con overcommit se registra también el riesgo contra la capacidad efectiva (el del filtro)
+    overcommitted = (ev.cpu_overcommit > 1.0) | (ev.ram_overcommit > 1.0)
+
+    for row, name in enumerate(state.names):
+        reason = reasons[row]
+        admission = ev.admission_risk[row] if overcommitted[row] else None
+        if reason in (REJECT_UNAVAILABLE, REJECT_ZONE, REJECT_PLATFORM, REJECT_RACK):
+            trace.record_host(name, "rejected", str(reason), baseline_risk=ev.baseline_risk[row])
+        elif reason == REJECT_DISK:
+            trace.record_host(
+                name, "rejected", REJECT_DISK,
+                baseline_risk=ev.baseline_risk[row], disk_free_gb=ev.disk_free_after[row],
+            )
+        elif reason == REJECT_RISK:
+            trace.record_host(
+                name, "rejected", REJECT_RISK,
+                baseline_risk=ev.baseline_risk[row],
+                p_cpu=ev.p_cpu_after[row], p_ram=ev.p_ram_after[row], local_risk=ev.local_risk[row],
+                admission_risk=admission,
+            )
+        else:
+            trace.record_host(
+                name, "candidate",
+                baseline_risk=ev.baseline_risk[row],
+                p_cpu=ev.p_cpu_after[row], p_ram=ev.p_ram_after[row],
+                local_risk=ev.local_risk[row], cluster_risk=cluster_risk[row],
+                disk_free_gb=ev.disk_free_after[row], admission_risk=admission,
+            )
+
+    if best is not None:
+        trace.select(best.host, best.cluster_risk)
+
+
+def decide_vm_placement_vectorized(
+    slice_req: SliceRequest,
+    hosts: Union[ClusterState, List[HostState]],
+    slice_mu_sigma: Optional[Dict[str, Tuple[float, float]]] = None,
+    risk_model: str = "normal",
+    avoid_racks: Optional[Collection[str]] = None,
+    scoring: Optional[ScoringPolicy] = None
+) -> Optional[PlacementDecision]:
+    """
+    Equivalente vectorizado de `decide_vm_placement`.
+    Acepta un ClusterState ya parseado (camino rápido) o una List[HostState].
+    Retorna la misma PlacementDecision (o None si no hay host viable).
+    `avoid_racks` y `scoring` (solo motor vectorizado) excluyen hosts de esos
+    racks y ordenan por puntaje multiobjetivo, respectivamente.
+    """
+    ranked = rank_placement_candidates(
+        slice_req, hosts, 1, slice_mu_sigma,
+        risk_model=risk_model, avoid_racks=avoid_racks, scoring=scoring,
+    )
+    return ranked[0].to_decision() if ranked else None
+
+
+def place_batch(
+    slice_reqs: List[SliceRequest],
+    state: ClusterState,
+    risk_model: str = "normal",
+    scoring: Optional[ScoringPolicy] = None
+) -> List[Optional[PlacementDecision]]:
+    """
+    Coloca varios slices en orden contra UN mismo snapshot.
+    Tras cada asignación el μ/σ/disco del host elegido se actualiza en
+    memoria, de modo que las siguientes solicitudes ven la carga nueva y no
+    terminan todas en el mismo host "menos riesgoso".
+
+    `state` se modifica: pasar `state.copy()` si se quiere conservar.
+    """
+    decisions: List[Optional[PlacementDecision]] = []
+    for slice_req in slice_reqs:
+        decision = decide_vm_placement_vectorized(slice_req, state, risk_model=risk_model, scoring=scoring)
+        if decision is not None:
+            state.apply_slice(decision.host, compute_slice_mu_sigma(slice_req), slice_req.disk_gb)
+        decisions.append(decision)
+    return decisions
+
+
+# ==========================
+#   PLACEMENT ENTRE ZONAS
+# ==========================
+
+# "strict": solo la zona pedida (comportamiento original)
+# "preferred": primero la zona pedida, luego las demás por holgura agregada
+# "any": todas las zonas por holgura agregada, sin preferencia
+ZONE_MODES = ("strict", "preferred", "any")
+
+
+def zone_headroom(state: ClusterState, platform: Optional[str] = None) -> Dict[str, float]:
+    """
+    Holgura agregada por zona de los hosts disponibles (y de `platform`):
+        min(Σ(CPU cap - μ_cpu) / Σ CPU cap, Σ(RAM cap - μ_ram) / Σ RAM cap)
+    Una zona sin hosts disponibles tiene holgura 0.
+    """
+    mask = state.available()
+    if platform in ("linux", "openstack"):
+        mask = mask & (state.platform_codes == platform_code(platform))
+
+    n_zones = len(state.zone_names)
+    codes = state.zone_codes[mask]
+
+    def free_fraction(capacity: np.ndarray, mu: np.ndarray) -> np.ndarray:
+        total = np.bincount(codes, weights=capacity[mask], minlength=n_zones)
+        free = np.bincount(codes, weights=(capacity - mu)[mask], minlength=n_zones)
+        return np.divide(free, total, out=np.zeros(n_zones), where=total > 0)
+
+    headroom = np.minimum(
+        free_fraction(state.cpu_capacity, state.mu_cpu),
+        free_fraction(state.ram_gb_capacity, state.mu_ram_gb),
+    )
+    return {zone: float(headroom[code]) for code, zone in enumerate(state.zone_names)}
+
+
+def zone_search_order(
+    state: ClusterState,
+    preferred: Optional[str],
+    platform: Optional[str] = None
+) -> List[str]:
+    """
+    Zonas en el orden en que se evalúan: la preferida primero (si existe en
+    el snapshot) y después el resto de mayor a menor holgura agregada.
+    """
+    headroom = zone_headroom(state, platform)
+    others = sorted((z for z in headroom if z != preferred), key=lambda z: -headroom[z])
+    return ([preferred] if preferred in headroom else []) + others
+
+
+def rank_placement_candidates_cross_zone(
+    slice_req: SliceRequest,
+    state: ClusterState,
+    k: int = 1,
+    zone_mode: str = "preferred",
+    slice_mu_sigma: Optional[Dict[str, Tuple[float, float]]] = None,
+    trace: Optional[DecisionTrace] = None,
+    risk_model: str = "normal",
+    scoring: Optional[ScoringPolicy] = None
+) -> List[PlacementCandidate]:
+    """
+    Ranking top-k permitiendo salir de la zona pedida cuando está saturada.
+
+    Las zonas se recorren según `zone_search_order` y en cada una solo se
+    evalúan sus filas (índice zona/plataforma del snapshot), así que el costo
+    es O(tamaño de la zona) y no O(clúster). Se devuelven los candidatos de
+    la primera zona que tenga algún host viable: todos comparten zona y su
+    cluster_risk se calcula SOLO sobre los hosts de esa zona (el subconjunto
+    evaluado), no sobre `state` completo. Coincide con el modo estricto de
+    la API, que recibe el subconjunto de la zona pedida; el modo estricto
+    llamado con un snapshot de todas las zonas, en cambio, incluye en el
+    cluster_risk el riesgo base de los hosts de las demás zonas.
+    La zona usada queda en `availability_zone` de cada candidato.
+    """
+    if zone_mode not in ZONE_MODES:
+        raise ValueError(f"Modo de zona desconocido: {zone_mode}")
+    if zone_mode == "strict":
+        return rank_placement_candidates(
+            slice_req, state, k, slice_mu_sigma, trace, risk_model, scoring=scoring
+        )
+
+    preferred = slice_req.zone if zone_mode == "preferred" else None
+    platform = slice_req.platform if slice_req.platform in ("linux", "openstack") else None
+
+    for zone in zone_search_order(state, preferred, platform):
+        rows = state.rows_for(zone, platform)
+        if rows.size == 0:
+            continue
+        if trace is not None:
+            trace.zones_evaluated.append(zone)
+        ranked = rank_placement_candidates(
+            replace(slice_req, zone=zone), state.subset(rows), k, slice_mu_sigma, trace, risk_model,
+            scoring=scoring,
+        )
+        if ranked:
+            return ranked
+    return []
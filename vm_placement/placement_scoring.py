@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Puntaje multiobjetivo para ordenar los hosts viables.
+
+Minimax solo mira la probabilidad de congestión y tiende a dejar en muchos
+hosts sobrantes pequeños que ningún slice puede usar. Esta capa combina
+varios términos en un solo puntaje vectorizado sobre todos los candidatos
+(menor es mejor):
+
+    puntaje = Σ_t  peso_t(zona del host) · término_t
+
+Términos registrados (cada uno normalizado aprox. a [0, 1]):
+- "risk"          : riesgo global del clúster tras asignar / MP
+- "fragmentation" : desbalance de los sobrantes (recurso dominante): la
+                    diferencia entre la fracción libre máxima y mínima de
+                    CPU, RAM y disco tras asignar. Un host con CPU agotada y
+                    RAM libre deja RAM que nadie puede usar.
+- "disk_headroom" : fracción de disco ocupada tras asignar
+- "consolidation" : fracción de CPU libre tras asignar (best-fit): prefiere
+                    hosts ya cargados y deja ociosos los demás (energía)
+
+Se agregan términos nuevos con @score_term("nombre"). La restricción de MP
+sigue siendo un filtro duro: el puntaje solo ordena hosts viables; ante
+empate se usa el orden Minimax (riesgo global, riesgo local, disco libre).
+
+Configuración (JSON, pesos por defecto y por zona):
+    {"default": {"risk": 1.0, "fragmentation": 0.5},
+     "zones": {"AZ1": {"risk": 1.0, "consolidation": 0.3}}}
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+import json
+
+import numpy as np
+
+from vm_placement import SliceRequest
+from cluster_state import ClusterState
+
+
+@dataclass
+class ScoreContext:
+    """Datos de los candidatos (una entrada por fila de `rows`)."""
+    state: ClusterState
+    rows: np.ndarray                # filas de los hosts candidatos
+    slice_req: SliceRequest
+    slice_mu_sigma: Dict
+    cluster_risk: np.ndarray
+    local_risk: np.ndarray
+    disk_free_after: np.ndarray
+
+
+ScoreTerm = Callable[[ScoreContext], np.ndarray]
+
+# nombre -> función vectorizada (ScoreContext -> arreglo por candidato)
+SCORE_TERMS: Dict[str, ScoreTerm] = {}
+
+
+def score_term(name: str) -> Callable[[ScoreTerm], ScoreTerm]:
+    """Registra un término de puntaje."""
+    def register(fn: ScoreTerm) -> ScoreTerm:
+        SCORE_TERMS[name] = fn
+        return fn
+    return register
+
+
+# ==========================
+#   TÉRMINOS
+# ==========================
+
+def _free_fractions(ctx: ScoreContext) -> np.ndarray:
+    """Fracción libre esperada (μ) de CPU, RAM y disco tras asignar: matriz 3 x candidatos."""
+    s, rows = ctx.state, ctx.rows
+    mu_cpu = s.mu_cpu[rows] + ctx.slice_mu_sigma["cpu"][0]
+    mu_ram = s.mu_ram_gb[rows] + ctx.slice_mu_sigma["ram"][0]
+    free = np.vstack([
+        1.0 - mu_cpu / s.cpu_capacity[rows],
+        1.0 - mu_ram / s.ram_gb_capacity[rows],
+        ctx.disk_free_after / s.disk_gb_capacity[rows],
+    ])
+    return np.clip(free, 0.0, 1.0)
+
+
+@score_term("risk")
+def risk_term(ctx: ScoreContext) -> np.ndarray:
+    return ctx.cluster_risk / max(ctx.slice_req.max_failure_prob, 1e-12)
+
+
+@score_term("fragmentation")
+def fragmentation_term(ctx: ScoreContext) -> np.ndarray:
+    free = _free_fractions(ctx)
+    return free.max(axis=0) - free.min(axis=0)
+
+
+@score_term("disk_headroom")
+def disk_headroom_term(ctx: ScoreContext) -> np.ndarray:
+    return 1.0 - np.clip(ctx.disk_free_after / ctx.state.disk_gb_capacity[ctx.rows], 0.0, 1.0)
+
+
+@score_term("consolidation")
+def consolidation_term(ctx: ScoreContext) -> np.ndarray:
+    return _free_fractions(ctx)[0]
+
+
+# ==========================
+#   POLÍTICA
+# ==========================
+
+class ScoringPolicy:
+    """Pesos por término, con valores propios por zona."""
+
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        zone_weights: Optional[Dict[str, Dict[str, float]]] = None
+    ):
+        self.weights = dict(weights if weights is not None else {"risk": 1.0})
+        self.zone_weights = {z: dict(w) for z, w in (zone_weights or {}).items()}
+        for w in [self.weights, *self.zone_weights.values()]:
+            unknown = set(w) - set(SCORE_TERMS)
+            if unknown:
+                raise ValueError(f"Términos de puntaje desconocidos: {sorted(unknown)}")
+
+    @classmethod
+    def from_dict(cls, config: Dict) -> "ScoringPolicy":
+        return cls(config.get("default"), config.get("zones"))
+
+    @classmethod
+    def from_file(cls, path: str) -> "ScoringPolicy":
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
+
+    def weights_for(self, zone: str) -> Dict[str, float]:
+        return self.zone_weights.get(zone, self.weights)
+
+    def score(self, ctx: ScoreContext) -> np.ndarray:
+        """Puntaje de cada candidato; cada término se calcula una sola vez para todos."""
+        zone_names = ctx.state.zone_names
+        zone_codes = ctx.state.zone_codes[ctx.rows]
+        per_zone = [self.weights_for(z) for z in zone_names]
+
+        total = np.zeros(ctx.rows.shape[0], dtype=np.float64)
+        for name in sorted({t for w in per_zone for t, v in w.items() if v}):
+            weight = np.array([w.get(name, 0.0) for w in per_zone], dtype=np.float64)[zone_codes]
+            total += weight * SCORE_TERMS[name](ctx)
+        return total
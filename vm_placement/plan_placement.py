@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Modo PLAN (offline): asignación conjunta de un lote de slices conocido de
+antemano, por ejemplo el lanzamiento programado de un curso.
+
+El placement por solicitud (Minimax voraz) decide cada slice sin mirar los
+que vienen después y puede dejar capacidad varada: un slice pequeño ocupa
+el único host donde cabía uno grande. Aquí se resuelve el lote completo
+maximizando la cantidad de slices admitidos.
+
+Restricción de cada host (modelo normal, por recurso CPU y RAM):
+    P(carga > CI · ratio) <= MP   para TODOS los slices asignados al host
+(se usa el MP más estricto y el ratio de overcommit más bajo de los slices
+del host, así ningún slice queda con más riesgo que el que pidió), además
+de la restricción determinista de disco y los filtros de zona/plataforma.
+
+Métodos (todos con presupuesto de tiempo):
+- "greedy"            : Minimax secuencial en el orden recibido (mismo
+                        criterio que place_batch). Siempre se calcula y es
+                        el respaldo de los demás.
+- "branch_and_bound"  : búsqueda exacta en NumPy. Slices de mayor a menor
+                        (recurso dominante), hosts best-fit primero, poda
+                        por cota agregada de capacidad (Σμ libre) y por
+                        simetría (hosts con el mismo estado).
+- "milp"              : PuLP/CBC si está instalado (opcional). La raíz
+                        cuadrada de la varianza se linealiza con su tangente
+                        (cota superior, conservadora) y la solución se
+                        verifica con la restricción exacta.
+- "auto"              : milp si PuLP está disponible, si no branch_and_bound.
+
+Si el presupuesto se agota se devuelve la mejor solución encontrada
+(optimal = False). El resultado es un plan que el orquestador ejecuta en
+bloque; no modifica el snapshot.
+
+Uso:
+    python3 plan_placement.py --nodes ../nodes_status.json --slices curso.json --budget 10
+"""
+
+from dataclasses import asdict, dataclass
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple
+import argparse
+import json
+import math
+import time
+
+import numpy as np
+
+from vm_placement import (
+    SliceRequest, PlacementDecision, compute_slice_mu_sigma, build_placement_decision, parse_overcommit,
+)
+from cluster_state import ClusterState, platform_code
+from placement_engine import (
+    normal_tail_probability_array, overcommit_ratios, cluster_risk_after, rank_minimax,
+)
+
+try:
+    # PuLP es opcional: solo se usa con method="milp" / "auto"
+    import pulp
+except ImportError:  # pragma: no cover - depende del entorno
+    pulp = None
+
+PLAN_METHODS = ("auto", "branch_and_bound", "milp", "greedy")
+DEFAULT_TIME_BUDGET = 10.0      # segundos
+
+
+@dataclass
+class PlacementPlan:
+    """Plan de un lote: una decisión (o None) por slice, en el orden recibido."""
+    decisions: List[Optional[PlacementDecision]]
+    admitted: int
+    total: int
+    method: str                 # método que produjo el plan final
+    optimal: bool               # probado óptimo dentro del presupuesto
+    upper_bound: int            # slices con algún host elegible (cota trivial)
+    greedy_admitted: int        # referencia: Minimax voraz en el orden recibido
+    nodes_explored: int = 0
+    elapsed_s: float = 0.0
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+# ==========================
+#   PROBLEMA
+# ==========================
+
+@dataclass
+class _HostLoad:
+    """Carga de cada host (arreglos) más lo que exigen los slices ya asignados."""
+    mu_cpu: np.ndarray
+    var_cpu: np.ndarray
+    mu_ram: np.ndarray
+    var_ram: np.ndarray
+    disk_used: np.ndarray
+    min_mp: np.ndarray          # MP más estricto de los slices asignados (inf = ninguno)
+    cpu_ratio: np.ndarray       # ratio de overcommit más bajo de los slices asignados
+    ram_ratio: np.ndarray
+
+
+def _load_arrays(load: _HostLoad) -> List[np.ndarray]:
+    return [load.mu_cpu, load.var_cpu, load.mu_ram, load.var_ram,
+            load.disk_used, load.min_mp, load.cpu_ratio, load.ram_ratio]
+
+
+class _PlanProblem:
+    """Datos del lote en arreglos: slices (filas) x hosts (columnas)."""
+
+    def __init__(self, slice_reqs: List[SliceRequest], state: ClusterState):
+        self.state = state
+        self.reqs = slice_reqs
+        n = len(slice_reqs)
+        mu_sigma = [compute_slice_mu_sigma(r) for r in slice_reqs]
+        self.mu_cpu = np.array([m["cpu"][0] for m in mu_sigma])
+        self.var_cpu = np.array([m["cpu"][1] ** 2 for m in mu_sigma])
+        self.mu_ram = np.array([m["ram"][0] for m in mu_sigma])
+        self.var_ram = np.array([m["ram"][1] ** 2 for m in mu_sigma])
+        self.disk = np.array([r.disk_gb for r in slice_reqs], dtype=np.float64)
+        self.mp = np.array([r.max_failure_prob for r in slice_reqs], dtype=np.float64)
+
+        # Ratios de overcommit por (slice, host), acotados por el techo del host
+        ratios = [overcommit_ratios(r, state) for r in slice_reqs]
+        self.cpu_ratio = np.array([c for c, _ in ratios]).reshape(n, len(state))
+        self.ram_ratio = np.array([r for _, r in ratios]).reshape(n, len(state))
+
+        # Filtros fijos (habilitado, zona, plataforma); el riesgo y el disco
+        # dependen de lo ya asignado y se revisan en cada nodo
+        self.eligible = np.zeros((n, len(state)), dtype=bool)
+        available = state.available()
+        for i, r in enumerate(slice_reqs):
+            mask = available & (state.zone_codes == state.zone_code(r.zone)) if r.zone else available.copy()
+            if r.platform in ("linux", "openstack"):
+                mask &= state.platform_codes == platform_code(r.platform)
+            self.eligible[i] = mask
+
+        base = self.empty_load()
+        for i in range(n):
+            self.eligible[i] &= self.feasible_hosts(i, base)
+
+    def empty_load(self) -> _HostLoad:
+        s = self.state
+        n_hosts = len(s)
+        return _HostLoad(
+            s.mu_cpu.copy(), s.sigma_cpu ** 2, s.mu_ram_gb.copy(), s.sigma_ram_gb ** 2,
+            s.disk_gb_used.copy(), np.full(n_hosts, np.inf), np.full(n_hosts, np.inf), np.full(n_hosts, np.inf),
+        )
+
+    def local_risk(self, i: int, load: _HostLoad, effective: bool = True) -> np.ndarray:
+        """
+        max(P_cpu, P_ram) de cada host si se le suma el slice i: contra la
+        capacidad efectiva (filtro de MP) o, con effective=False, contra la
+        física (la base del baseline en el criterio Minimax).
+        """
+        s = self.state
+        cpu_ratio = np.minimum(load.cpu_ratio, self.cpu_ratio[i]) if effective else 1.0
+        ram_ratio = np.minimum(load.ram_ratio, self.ram_ratio[i]) if effective else 1.0
+        p_cpu = normal_tail_probability_array(
+            s.cpu_capacity * cpu_ratio,
+            load.mu_cpu + self.mu_cpu[i], np.sqrt(load.var_cpu + self.var_cpu[i]),
+        )
+        p_ram = normal_tail_probability_array(
+            s.ram_gb_capacity * ram_ratio,
+            load.mu_ram + self.mu_ram[i], np.sqrt(load.var_ram + self.var_ram[i]),
+        )
+        return np.maximum(p_cpu, p_ram)
+
+    def feasible_hosts(self, i: int, load: _HostLoad) -> np.ndarray:
+        """Hosts donde el slice i cabe sin violar el MP de ningún slice del host."""
+        return (
+            self.eligible[i]
+            & (load.disk_used + self.disk[i] <= self.state.disk_gb_capacity)
+            & (self.local_risk(i, load) <= np.minimum(load.min_mp, self.mp[i]))
+        )
+
+    def assign(self, i: int, h: int, load: _HostLoad) -> Tuple:
+        """Suma el slice i al host h; retorna lo necesario para deshacerlo."""
+        undo = (load.min_mp[h], load.cpu_ratio[h], load.ram_ratio[h])
+        load.mu_cpu[h] += self.mu_cpu[i]
+        load.var_cpu[h] += self.var_cpu[i]
+        load.mu_ram[h] += self.mu_ram[i]
+        load.var_ram[h] += self.var_ram[i]
+        load.disk_used[h] += self.disk[i]
+        load.min_mp[h] = min(load.min_mp[h], self.mp[i])
+        load.cpu_ratio[h] = min(load.cpu_ratio[h], self.cpu_ratio[i, h])
+        load.ram_ratio[h] = min(load.ram_ratio[h], self.ram_ratio[i, h])
+        return undo
+
+    def unassign(self, i: int, h: int, load: _HostLoad, undo: Tuple) -> None:
+        load.mu_cpu[h] -= self.mu_cpu[i]
+        load.var_cpu[h] -= self.var_cpu[i]
+        load.mu_ram[h] -= self.mu_ram[i]
+        load.var_ram[h] -= self.var_ram[i]
+        load.disk_used[h] -= self.disk[i]
+        load.min_mp[h], load.cpu_ratio[h], load.ram_ratio[h] = undo
+
+    def is_valid(self, assignment: np.ndarray) -> bool:
+        """
+        Verifica una asignación completa con la restricción exacta. Cada
+        slice se revisa contra el MP más estricto y el ratio más bajo de los
+        ya sumados a su host, así que el orden no cambia el resultado.
+        """
+        load = self.empty_load()
+        for i in np.flatnonzero(assignment >= 0):
+            h = int(assignment[i])
+            if not self.feasible_hosts(int(i), load)[h]:
+                return False
+            self.assign(int(i), h, load)
+        return True
+
+    def decisions(self, assignment: np.ndarray) -> List[Optional[PlacementDecision]]:
+        """PlacementDecision por slice con el riesgo final de su host (todo el lote asignado)."""
+        load = self.empty_load()
+        for i in np.flatnonzero(assignment >= 0):
+            self.assign(int(i), int(assignment[i]), load)
+
+        s = self.state
+        result: List[Optional[PlacementDecision]] = []
+        for i, h in enumerate(assignment.tolist()):
+            if h < 0:
+                result.append(None)
+                continue
+            cpu_oc, ram_oc = float(self.cpu_ratio[i, h]), float(self.ram_ratio[i, h])
+            risk = max(
+                float(normal_tail_probability_array(
+                    s.cpu_capacity[h] * cpu_oc, load.mu_cpu[h], math.sqrt(load.var_cpu[h]))),
+                float(normal_tail_probability_array(
+                    s.ram_gb_capacity[h] * ram_oc, load.mu_ram[h], math.sqrt(load.var_ram[h]))),
+            )
+            result.append(build_placement_decision(
+                s.names[h], s.platform_of(h), s.zone_of(h), risk, cpu_oc, ram_oc
+            ))
+        return result
+
+
+# ==========================
+#   GREEDY (MINIMAX)
+# ==========================
+
+def _solve_greedy(problem: _PlanProblem) -> np.ndarray:
+    """
+    Minimax secuencial en el orden recibido, como place_batch: riesgo global
+    de la zona, luego riesgo local, luego disco libre.
+    """
+    s = problem.state
+    load = problem.empty_load()
+    assignment = np.full(len(problem.reqs), -1, dtype=np.int64)
+
+    for i, req in enumerate(problem.reqs):
+        feasible = problem.feasible_hosts(i, load)
+        if not feasible.any():
+            continue
+        rows = s.rows_for(req.zone) if req.zone else np.arange(len(s))
+        baseline = np.maximum(
+            normal_tail_probability_array(s.cpu_capacity[rows], load.mu_cpu[rows], np.sqrt(load.var_cpu[rows])),
+            normal_tail_probability_array(s.ram_gb_capacity[rows], load.mu_ram[rows], np.sqrt(load.var_ram[rows])),
+        )
+        local = problem.local_risk(i, load, effective=False)[rows]
+        cluster = cluster_risk_after(baseline, local)
+        ok = feasible[rows]
+        disk_free = (s.disk_gb_capacity - load.disk_used - problem.disk[i])[rows]
+        order = rank_minimax(cluster[ok], local[ok], disk_free[ok])
+        h = int(rows[ok][order[0]])
+        problem.assign(i, h, load)
+        assignment[i] = h
+    return assignment
+
+
+# ==========================
+#   BRANCH AND BOUND
+# ==========================
+
+class _BranchAndBound:
+    """Búsqueda en profundidad con poda por capacidad agregada y simetría."""
+
+    def __init__(self, problem: _PlanProblem, incumbent: np.ndarray, deadline: float):
+        self.p = problem
+        self.deadline = deadline
+        self.best = incumbent.copy()
+        self.best_count = int((incumbent >= 0).sum())
+        self.nodes = 0
+        self.timed_out = False
+
+        s = problem.state
+        placeable = np.flatnonzero(problem.eligible.any(axis=1))
+        # Recurso dominante (fracción de la capacidad media) de mayor a menor
+        share = np.maximum.reduce([
+            problem.mu_cpu / max(s.cpu_capacity.mean(), 1e-9),
+            problem.mu_ram / max(s.ram_gb_capacity.mean(), 1e-9),
+            problem.disk / max(s.disk_gb_capacity.mean(), 1e-9),
+        ])
+        self.order = placeable[np.argsort(-share[placeable], kind="stable")]
+        self.upper_bound = len(self.order)
+
+        # Cota por grupo de hosts: la zona del slice (todos los hosts si no
+        # pide zona). Para cada posición d se guardan, por grupo, los μ de
+        # los slices pendientes ordenados de menor a mayor (sumas acumuladas)
+        zones = [problem.reqs[i].zone for i in self.order]
+        if any(z is None for z in zones):
+            self._groups = {None: np.ones(len(s), dtype=bool)}
+            slice_group = [None] * len(zones)
+        else:
+            self._groups = {z: s.zone_codes == s.zone_code(z) for z in set(zones)}
+            slice_group = zones
+        self._suffix = []
+        for d in range(len(self.order) + 1):
+            per_group = {}
+            for g in self._groups:
+                rest = np.array([i for i, z in zip(self.order[d:], slice_group[d:]) if z == g], dtype=np.int64)
+                if rest.size:
+                    per_group[g] = tuple(
+                        np.cumsum(np.sort(values[rest]))
+                        for values in (problem.mu_cpu, problem.mu_ram, problem.disk)
+                    )
+            self._suffix.append(per_group)
+        self._cpu_cap = s.cpu_capacity * s.cpu_overcommit_max
+        self._ram_cap = s.ram_gb_capacity * s.ram_overcommit_max
+
+    def _bound(self, d: int, load: _HostLoad) -> int:
+        """Máximo de slices pendientes que cabrían solo por Σμ libre de su zona (ignora σ)."""
+        free_cpu = np.clip(self._cpu_cap - load.mu_cpu, 0.0, None)
+        free_ram = np.clip(self._ram_cap - load.mu_ram, 0.0, None)
+        free_disk = np.clip(self.p.state.disk_gb_capacity - load.disk_used, 0.0, None)
+        bound = 0
+        for g, cumsums in self._suffix[d].items():
+            mask = self._groups[g]
+            free = (free_cpu[mask].sum(), free_ram[mask].sum(), free_disk[mask].sum())
+            bound += min(
+                int(np.searchsorted(cumsum, total, side="right"))
+                for cumsum, total in zip(cumsums, free)
+            )
+        return bound
+
+    def solve(self) -> bool:
+        """True si se probó el óptimo (no se agotó el presupuesto)."""
+        if self.best_count < self.upper_bound:
+            assignment = np.full(len(self.p.reqs), -1, dtype=np.int64)
+            self._dfs(0, 0, self.p.empty_load(), assignment)
+        return not self.timed_out
+
+    def _dfs(self, d: int, admitted: int, load: _HostLoad, assignment: np.ndarray) -> None:
+        self.nodes += 1
+        if self.timed_out or (self.nodes & 63 == 0 and time.perf_counter() > self.deadline):
+            self.timed_out = True
+            return
+        if admitted > self.best_count:
+            self.best, self.best_count = assignment.copy(), admitted
+        if d == len(self.order) or self.best_count >= self.upper_bound:
+            return
+        if admitted + self._bound(d, load) <= self.best_count:
+            return
+
+        p, s = self.p, self.p.state
+        i = int(self.order[d])
+        rows = np.flatnonzero(p.feasible_hosts(i, load))
+
+        # Best-fit: primero el host que queda más lleno en su recurso dominante
+        fill = np.maximum(
+            (load.mu_cpu[rows] + p.mu_cpu[i]) / self._cpu_cap[rows],
+            (load.mu_ram[rows] + p.mu_ram[i]) / self._ram_cap[rows],
+        )
+        seen = set()
+        for h in rows[np.argsort(-fill, kind="stable")].tolist():
+            # Hosts idénticos (misma zona, plataforma, capacidad y carga) dan el mismo subárbol
+            key = (
+                s.zone_codes[h], s.platform_codes[h], s.cpu_capacity[h], s.ram_gb_capacity[h],
+                s.disk_gb_capacity[h], *(round(float(a[h]), 9) for a in _load_arrays(load)),
+            )
+            if key in seen:
+                continue
+            seen.add(key)
+
+            undo = p.assign(i, h, load)
+            assignment[i] = h
+            self._dfs(d + 1, admitted + 1, load, assignment)
+            assignment[i] = -1
+            p.unassign(i, h, load, undo)
+            if self.timed_out or self.best_count >= self.upper_bound:
+                return
+
+        # Rama sin el slice i
+        self._dfs(d + 1, admitted, load, assignment)
+
+
+# ==========================
+#   MILP (OPCIONAL)
+# ==========================
+
+def _solve_milp(problem: _PlanProblem, time_budget: float) -> Tuple[Optional[np.ndarray], bool]:
+    """
+    Resuelve la versión linealizada con PuLP/CBC. Para cada host y recurso:
+        μ_h + Σ μ_i x_ih + z_h · (s0 + (σ²_h + Σ σ²_i x_ih - v0) / (2 s0)) <= CI_h · ratio_h
+    con z_h = Φ⁻¹(1 - MP) del slice más estricto elegible para h y la
+    tangente de √v en v0 (varianza esperada si los slices se reparten entre
+    sus hosts elegibles). Retorna (asignación o None, óptimo probado).
+    """
+    if pulp is None:
+        return None, False
+
+    s = problem.state
+    n_slices, n_hosts = problem.eligible.shape
+    z = np.array([NormalDist().inv_cdf(1.0 - min(max(mp, 1e-12), 0.5)) for mp in problem.mp])
+    spread = np.maximum(problem.eligible.sum(axis=1), 1)
+
+    model = pulp.LpProblem("plan_placement", pulp.LpMaximize)
+    x = {
+        (int(i), int(h)): pulp.LpVariable(f"x_{i}_{h}", cat="Binary")
+        for i, h in np.argwhere(problem.eligible)
+    }
+    model += pulp.lpSum(x.values())
+
+    for i in range(n_slices):
+        row = [x[i, h] for h in np.flatnonzero(problem.eligible[i])]
+        if row:
+            model += pulp.lpSum(row) <= 1
+
+    for h in range(n_hosts):
+        slices = np.flatnonzero(problem.eligible[:, h])
+        if slices.size == 0:
+            continue
+        z_h = float(z[slices].max())
+        for mu0, var0, cap, ratio, mu, var in (
+            (s.mu_cpu[h], s.sigma_cpu[h] ** 2, s.cpu_capacity[h], problem.cpu_ratio[slices, h].min(),
+             problem.mu_cpu, problem.var_cpu),
+            (s.mu_ram_gb[h], s.sigma_ram_gb[h] ** 2, s.ram_gb_capacity[h], problem.ram_ratio[slices, h].min(),
+             problem.mu_ram, problem.var_ram),
+        ):
+            v0 = var0 + float((var[slices] / spread[slices]).sum())
+            s0 = math.sqrt(v0) if v0 > 0 else 1e-9
+            model += (
+                mu0 + pulp.lpSum(float(mu[i]) * x[int(i), h] for i in slices)
+                + z_h * (s0 + (var0 + pulp.lpSum(float(var[i]) * x[int(i), h] for i in slices) - v0) / (2 * s0))
+                <= cap * ratio
+            )
+        model += (
+            s.disk_gb_used[h] + pulp.lpSum(float(problem.disk[i]) * x[int(i), h] for i in slices)
+            <= s.disk_gb_capacity[h]
+        )
+
+    model.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=max(1, int(time_budget))))
+    status = pulp.LpStatus[model.status]
+    if status != "Optimal" and getattr(model, "sol_status", None) != pulp.LpSolutionIntegerFeasible:
+        return None, False
+
+    assignment = np.full(n_slices, -1, dtype=np.int64)
+    for (i, h), var in x.items():
+        if (var.value() or 0) > 0.5:
+            assignment[i] = h
+    return assignment, status == "Optimal"
+
+
+# ==========================
+#   PUNTO DE ENTRADA
+# ==========================
+
+def plan_placement(
+    slice_reqs: List[SliceRequest],
+    state: ClusterState,
+    method: str = "auto",
+    time_budget: float = DEFAULT_TIME_BUDGET
+) -> PlacementPlan:
+    """
+    Plan conjunto para `slice_reqs` contra `state` (no se modifica).
+    Siempre devuelve un plan: si el método pedido no está disponible, no
+    encuentra solución o no mejora al voraz, se usa el Minimax voraz.
+    """
+    if method not in PLAN_METHODS:
+        raise ValueError(f"Método de plan desconocido: {method}")
+    if method == "auto":
+        method = "milp" if pulp is not None else "branch_and_bound"
+
+    start = time.perf_counter()
+    deadline = start + time_budget
+    problem = _PlanProblem(slice_reqs, state)
+
+    greedy = _solve_greedy(problem)
+    greedy_count = int((greedy >= 0).sum())
+    upper_bound = int(problem.eligible.any(axis=1).sum())
+    best, best_method, optimal, nodes = greedy, "greedy", greedy_count == upper_bound, 0
+
+    if method == "milp" and not optimal:
+        assignment, proven = _solve_milp(problem, max(deadline - time.perf_counter(), 0.0))
+        if assignment is not None and problem.is_valid(assignment) and (assignment >= 0).sum() > greedy_count:
+            best, best_method, optimal = assignment, "milp", proven
+        elif assignment is None:
+            method = "branch_and_bound"     # PuLP ausente o sin solución: búsqueda exacta
+
+    if method == "branch_and_bound" and not optimal:
+        search = _BranchAndBound(problem, best, deadline)
+        optimal = search.solve()
+        nodes = search.nodes
+        if int((search.best >= 0).sum()) > int((best >= 0).sum()):
+            best, best_method = search.best, "branch_and_bound"
+
+    decisions = problem.decisions(best)
+    return PlacementPlan(
+        decisions=decisions,
+        admitted=int((best >= 0).sum()),
+        total=len(slice_reqs),
+        method=best_method,
+        optimal=optimal,
+        upper_bound=upper_bound,
+        greedy_admitted=greedy_count,
+        nodes_explored=nodes,
+        elapsed_s=time.perf_counter() - start,
+    )
+
+
+# ==========================
+#   CLI
+# ==========================
+
+def slice_from_dict(item: Dict) -> SliceRequest:
+    """Un slice del archivo de entrada (mismos campos que POST /api/v1/placement)."""
+    return SliceRequest(
+        cpu=int(item["cpu"]),
+        ram_gb=float(item["ram_gb"]),
+        disk_gb=float(item["disk_gb"]),
+        zone=item.get("zone"),
+        platform=item.get("platform"),
+        user_profile=item.get("user_profile", "Estudiante"),
+        technical_context=item.get("technical_context", "Cloud"),
+        max_failure_prob=float(item.get("max_failure_prob", 0.01)),
+        cpu_overcommit=parse_overcommit(item.get("sla_overcommit_cpu_pct")),
+        ram_overcommit=parse_overcommit(item.get("sla_overcommit_ram_pct")),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan de placement para un lote de slices")
+    parser.add_argument("--nodes", default="../nodes_status.json", help="snapshot de /nodes/status")
+    parser.add_argument("--slices", required=True, help="JSON con la lista de slices del lote")
+    parser.add_argument("--method", choices=PLAN_METHODS, default="auto")
+    parser.add_argument("--budget", type=float, default=DEFAULT_TIME_BUDGET, help="segundos")
+    parser.add_argument("--json", help="guardar el plan completo en este archivo")
+    args = parser.parse_args()
+
+    with open(args.nodes, "r") as f:
+        nodes = json.load(f)
+    with open(args.slices, "r") as f:
+        slice_reqs = [slice_from_dict(item) for item in json.load(f)]
+
+    plan = plan_placement(slice_reqs, ClusterState.from_nodes_status(nodes), args.method, args.budget)
+
+    print("=" * 78)
+    print(f"PLAN DE PLACEMENT ({plan.method}, {'óptimo' if plan.optimal else 'mejor encontrado'})")
+    print("=" * 78)
+    for i, d in enumerate(plan.decisions):
+        print(f"   slice {i:>3}: {d.host + ' (' + d.availability_zone + ')' if d else 'sin host'}")
+    print("-" * 78)
+    print(f"Admitidos: {plan.admitted}/{plan.total} (voraz: {plan.greedy_admitted}, cota: {plan.upper_bound})")
+    print(f"Nodos explorados: {plan.nodes_explored}   tiempo: {plan.elapsed_s:.2f} s")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(plan.to_dict(), f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Planificador de rebalanceo: propone migraciones en vivo de VMs para bajar
+el riesgo máximo de congestión del clúster.
+
+Minimax solo actúa al admitir un slice; si después la carga cambia, los
+hosts calientes siguen calientes y terminan rechazando slices nuevos. Este
+módulo usa las mismas funciones de riesgo del motor vectorizado para
+proponer un conjunto PEQUEÑO de movimientos:
+
+- Estado del clúster: nodes_status.json (ClusterState)
+- Ubicación actual de cada VM: tabla `vms` (worker_ip), exportada a JSON o
+  leída de la Resources API (GET /api/v1/vms/)
+- La carga de cada VM se estima con la tabla de perfiles (igual que al
+  admitirla): al moverla se resta del host origen y se suma al destino
+
+Algoritmo (voraz, lexicográfico sobre el riesgo por host):
+  mientras queden movimientos en el presupuesto:
+    para cada host de mayor a menor riesgo:
+      buscar la VM y el destino (misma AZ y plataforma, disco suficiente)
+      que minimizan max(riesgo origen, riesgo destino) después de moverla
+      si mejora el riesgo del origen en al menos `min_gain` -> aplicar
+
+Cada VM se mueve como máximo una vez. El resultado es siempre un plan
+(dry-run): no se ejecuta ninguna migración, el reporte muestra los
+movimientos y el riesgo por host antes y después.
+
+Uso:
+    python3 rebalanceo_placement.py --nodes ../nodes_status.json --vms vms.json --max-moves 3
+    python3 rebalanceo_placement.py --vms-url http://10.20.12.26:8001/api/v1/vms/ --risk-model joint
+"""
+
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+import argparse
+import json
+
+import numpy as np
+import requests
+
+from vm_placement import SliceRequest, compute_slice_mu_sigma
+from cluster_state import ClusterState
+from placement_engine import host_risk, RISK_MODELS
+
+# worker_ip (tabla `vms`) -> id del nodo en nodes_status.json. Mismas IPs
+# que NODES en metrics_api.py (sin el puerto del exporter)
+WORKER_IPS = {
+    "192.168.201.1": "server1",
+    "192.168.201.2": "server2",
+    "192.168.201.3": "server3",
+    "192.168.201.4": "server4",
+    "192.168.202.1": "headnode",
+    "192.168.202.2": "worker1",
+    "192.168.202.3": "worker2",
+    "192.168.202.4": "worker3",
+}
+
+# Estados de la tabla `vms` que no ocupan recursos en el host
+INACTIVE_STATUSES = {"deleted", "error", "failed"}
+
+DEFAULT_MAX_MOVES = 5
+MIN_GAIN = 1e-4     # mejora mínima del riesgo del host origen para proponer un movimiento
+
+
+# ==========================
+#   ESTRUCTURAS
+# ==========================
+
+@dataclass
+class VmLoad:
+    """VM en ejecución con su host actual y la carga estimada que aporta."""
+    vm_id: int
+    name: str
+    slice_id: Optional[int]
+    host: str
+    ram_gb: float
+    disk_gb: float
+    mu_sigma: Dict[str, Tuple[float, float]]
+
+
+@dataclass
+class Move:
+    vm_id: int
+    vm_name: str
+    slice_id: Optional[int]
+    source: str
+    target: str
+    ram_gb: float               # RAM a copiar en la migración en vivo
+    source_risk_before: float
+    source_risk_after: float
+    target_risk_before: float
+    target_risk_after: float
+
+
+@dataclass
+class RebalancePlan:
+    risk_model: str
+    max_moves: int
+    moves: List[Move] = field(default_factory=list)
+    risk_before: Dict[str, float] = field(default_factory=dict)
+    risk_after: Dict[str, float] = field(default_factory=dict)
+    max_risk_before: float = 0.0
+    max_risk_after: float = 0.0
+    unmapped_vms: List[int] = field(default_factory=list)   # VMs sin host conocido
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+# ==========================
+#   CARGA DE VMs
+# ==========================
+
+def vms_from_rows(
+    rows: List[Dict],
+    nodes: Dict[str, Dict],
+    worker_ips: Optional[Dict[str, str]] = None
+) -> Tuple[List[VmLoad], List[int]]:
+    """
+    Convierte filas de la tabla `vms` (vm_id, slice_id, name, vcpu, ram_mb,
+    disk_gb, status, worker_ip) en VmLoad. Si la fila trae user_profile /
+    technical_context (join con el slice) se usan para estimar la carga.
+    Retorna (VMs ubicadas, ids de VMs cuyo worker_ip no corresponde a un nodo).
+    """
+    worker_ips = WORKER_IPS if worker_ips is None else worker_ips
+    vms, unmapped = [], []
+
+    for row in rows:
+        if row.get("deleted_at") or str(row.get("status", "")).lower() in INACTIVE_STATUSES:
+            continue
+        node = nodes.get(worker_ips.get(row.get("worker_ip") or "", ""))
+        if node is None:
+            unmapped.append(row.get("vm_id"))
+            continue
+
+        req = SliceRequest(
+            cpu=int(row.get("vcpu") or 0),
+            ram_gb=float(row.get("ram_mb") or 0) / 1024.0,
+            disk_gb=float(row.get("disk_gb") or 0),
+            zone=node["zone"],
+            user_profile=row.get("user_profile") or "Estudiante",
+            technical_context=row.get("technical_context") or "Cloud",
+        )
+        vms.append(VmLoad(
+            vm_id=row.get("vm_id"),
+            name=row.get("name", str(row.get("vm_id"))),
+            slice_id=row.get("slice_id"),
+            host=node.get("name", node["id"]),
+            ram_gb=req.ram_gb,
+            disk_gb=req.disk_gb,
+            mu_sigma=compute_slice_mu_sigma(req),
+        ))
+    return vms, unmapped
+
+
+def fetch_vms(url: str) -> List[Dict]:
+    """Lista de VMs desde la Resources API."""
+    response = requests.get(url, timeout=10)
+    response.raise_for_status()
+    return response.json()
+
+
+# ==========================
+#   PLANIFICADOR
+# ==========================
+
+def _best_move(
+    state: ClusterState,
+    source: int,
+    vms: List[VmLoad],
+    risk_model: str
+) -> Optional[Tuple[float, VmLoad, int, float, float]]:
+    """
+    Mejor movimiento desde el host `source`:
+    (max(riesgo origen, riesgo destino), vm, fila destino, riesgo origen, riesgo destino).
+    """
+    same_group = (
+        state.available()
+        & (state.zone_codes == state.zone_codes[source])
+        & (state.platform_codes == state.platform_codes[source])
+    )
+    same_group[source] = False
+    if not same_group.any():
+        return None
+
+    best = None
+    for vm in vms:
+        source_state = state.subset(np.array([source]))
+        source_state.release_slice(state.names[source], vm.mu_sigma, vm.disk_gb)
+        source_after = float(host_risk(source_state, risk_model)[0])
+
+        targets = same_group & (state.disk_gb_used + vm.disk_gb <= state.disk_gb_capacity)
+        if not targets.any():
+            continue
+        target_after = host_risk(state, risk_model, vm.mu_sigma)
+        pair = np.where(targets, np.maximum(source_after, target_after), np.inf)
+        row = int(np.argmin(pair))
+
+        # Desempate: menor riesgo combinado y luego la VM con menos RAM (migración más corta)
+        key = (float(pair[row]), vm.ram_gb)
+        if best is None or key < (best[0], best[1].ram_gb):
+            best = (float(pair[row]), vm, row, source_after, float(target_after[row]))
+    return best
+
+
+def plan_rebalance(
+    state: ClusterState,
+    vms: List[VmLoad],
+    max_moves: int = DEFAULT_MAX_MOVES,
+    risk_model: str = "normal",
+    min_gain: float = MIN_GAIN
+) -> RebalancePlan:
+    """
+    Propone hasta `max_moves` migraciones que bajan el riesgo de los hosts
+    más calientes. `state` no se modifica (se trabaja sobre una copia).
+    """
+    if risk_model not in RISK_MODELS:
+        raise ValueError(f"Modelo de riesgo desconocido: {risk_model}")
+
+    work = state.copy()
+    risk = host_risk(work, risk_model)
+    plan = RebalancePlan(
+        risk_model=risk_model,
+        max_moves=max_moves,
+        risk_before={name: float(r) for name, r in zip(work.names, risk)},
+        max_risk_before=float(risk.max(initial=0.0)),
+    )
+
+    by_host: Dict[str, List[VmLoad]] = {}
+    for vm in vms:
+        if vm.host in work.index:
+            by_host.setdefault(vm.host, []).append(vm)
+
+    while len(plan.moves) < max_moves:
+        move = None
+        for source in np.argsort(-risk, kind="stable"):
+            candidates = by_host.get(work.names[source])
+            if not candidates:
+                continue
+            best = _best_move(work, int(source), candidates, risk_model)
+            if best is not None and best[0] <= risk[source] - min_gain:
+                move = (int(source), best)
+                break
+        if move is None:
+            break
+
+        source, (_, vm, target, source_after, target_after) = move
+        source_name, target_name = work.names[source], work.names[target]
+        work.release_slice(source_name, vm.mu_sigma, vm.disk_gb)
+        work.apply_slice(target_name, vm.mu_sigma, vm.disk_gb)
+        by_host[source_name].remove(vm)   # cada VM se mueve una sola vez
+
+        plan.moves.append(Move(
+            vm_id=vm.vm_id, vm_name=vm.name, slice_id=vm.slice_id,
+            source=source_name, target=target_name, ram_gb=vm.ram_gb,
+            source_risk_before=float(risk[source]), source_risk_after=source_after,
+            target_risk_before=float(risk[target]), target_risk_after=target_after,
+        ))
+        risk = host_risk(work, risk_model)
+
+    plan.risk_after = {name: float(r) for name, r in zip(work.names, risk)}
+    plan.max_risk_after = float(risk.max(initial=0.0))
+    return plan
+
+
+# ==========================
+#   REPORTE Y CLI
+# ==========================
+
+def print_report(plan: RebalancePlan) -> None:
+    print("=" * 78)
+    print(f"PLAN DE REBALANCEO (dry-run, modelo {plan.risk_model}, máx. {plan.max_moves} movimientos)")
+    print("=" * 78)
+
+    if not plan.moves:
+        print("   Sin movimientos que reduzcan el riesgo.")
+    for i, m in enumerate(plan.moves, 1):
+        print(
+            f"   {i}. VM {m.vm_name} (id {m.vm_id}, slice {m.slice_id}, {m.ram_gb:.1f} GB): "
+            f"{m.source} -> {m.target}"
+        )
+        print(
+            f"      origen {m.source_risk_before:.4f} -> {m.source_risk_after:.4f}   "
+            f"destino {m.target_risk_before:.4f} -> {m.target_risk_after:.4f}"
+        )
+
+    print("-" * 78)
+    for name in plan.risk_before:
+        print(f"   {name:<28} {plan.risk_before[name]:.6f} -> {plan.risk_after[name]:.6f}")
+    print("-" * 78)
+    print(f"Riesgo máximo del clúster: {plan.max_risk_before:.6f} -> {plan.max_risk_after:.6f}")
+    if plan.unmapped_vms:
+        print(f"VMs sin host conocido (worker_ip): {plan.unmapped_vms}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Planificador de rebalanceo (migraciones en vivo)")
+    parser.add_argument("--nodes", default="../nodes_status.json", help="snapshot de /nodes/status")
+    parser.add_argument("--vms", help="exportación JSON de la tabla vms")
+    parser.add_argument("--vms-url", help="URL de la Resources API (GET /api/v1/vms/)")
+    parser.add_argument("--max-moves", type=int, default=DEFAULT_MAX_MOVES)
+    parser.add_argument("--risk-model", choices=RISK_MODELS, default="normal")
+    parser.add_argument("--json", help="guardar el plan completo en este archivo")
+    args = parser.parse_args()
+
+    with open(args.nodes, "r") as f:
+        nodes = json.load(f)
+    if args.vms:
+        with open(args.vms, "r") as f:
+            rows = json.load(f)
+    elif args.vms_url:
+        rows = fetch_vms(args.vms_url)
+    else:
+        parser.error("se requiere --vms o --vms-url")
+
+    vms, unmapped = vms_from_rows(rows, nodes)
+    plan = plan_rebalance(ClusterState.from_nodes_status(nodes), vms, args.max_moves, args.risk_model)
+    plan.unmapped_vms = unmapped
+    print_report(plan)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(plan.to_dict(), f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Modo SERVICIO de la API de placement: N procesos worker sobre un snapshot
+compartido.
+
+`api_placement_handler.py` corre el servidor de desarrollo de Flask en un
+solo proceso: el GIL limita el throughput a un core y cada solicitud vuelve
+a consultar y comparar el JSON de /nodes/status. En este modo:
+
+- El proceso principal revalida /nodes/status cada `--refresh` segundos
+  (consulta condicional, nodes_status_cache.py) y, solo si el JSON cambió,
+  lo parsea una vez y lo publica como versión nueva del snapshot compartido
+  (shared_snapshot.py, cambio atómico por versión).
+- `--workers` procesos aceptan conexiones sobre el MISMO socket (pre-fork,
+  el kernel reparte las conexiones) y cada uno lee el snapshot mapeado sin
+  copiarlo ni parsearlo.
+- Un proceso coordinador (shared_ledger.py) es el único dueño del ledger de
+  asignaciones pendientes y de la cola de admisión: cualquier worker puede
+  liberar una asignación o consultar una solicitud encolada por otro, y
+  las generaciones del commit optimista son las mismas para todos.
+- Si un worker muere, el principal lo reemplaza. Si muere el coordinador se
+  reinicia (con ledger y cola vacíos) junto con los workers.
+
+Cada worker mantiene su propia cache de decisiones: la clave incluye las
+generaciones (del ledger compartido) de los hosts evaluados, así que una
+reserva de otro worker sobre esos hosts la invalida igual.
+
+Uso:
+    python3 servicio_placement.py --workers 4 --port 5004
+    python3 servicio_placement.py --workers 8 --refresh 2 --snapshot-dir /dev/shm/placement
+"""
+
+from typing import List, Optional
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+from nodes_status_cache import NodesStatusCache
+from shared_snapshot import SharedSnapshotWriter, SharedSnapshotReader, default_snapshot_dir
+from shared_ledger import (
+    LedgerCoordinator, SharedLedger, SharedAdmissionQueue, start_coordinator, connect_coordinator,
+)
+
+logger = logging.getLogger("vm_placement.servicio")
+
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+DEFAULT_REFRESH_SECONDS = 5.0
+
+
+# ==========================
+#   COORDINADOR Y WORKERS
+# ==========================
+
+# Socket Unix del coordinador, dentro del directorio del snapshot
+COORDINATOR_SOCKET = "coordinador.sock"
+
+
+def _make_coordinator(snapshot_dir: str) -> LedgerCoordinator:
+    """En el proceso coordinador: el ledger y la cola que usaría la API en un solo proceso."""
+    import api_placement_handler
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # el principal coordina el apagado
+    return LedgerCoordinator(
+        api_placement_handler.LEDGER,
+        api_placement_handler.ADMISSION_QUEUE,
+        SharedSnapshotReader(snapshot_dir),
+        before_reevaluate=api_placement_handler.TABLES_WATCHER.refresh,
+    )
+
+
+def _start_coordinator(snapshot_dir: str, authkey: bytes) -> multiprocessing.Process:
+    address = os.path.join(snapshot_dir, COORDINATOR_SOCKET)
+    if os.path.exists(address):
+        os.unlink(address)      # socket de una ejecución anterior
+    return start_coordinator(lambda: _make_coordinator(snapshot_dir), address, authkey)
+
+
+def _worker_main(listen_fd: int, snapshot_dir: str, authkey: bytes) -> None:
+    """Proceso worker: la app Flask sirviendo sobre el socket heredado."""
+    from werkzeug.serving import make_server
+    import api_placement_handler
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)   # el principal coordina el apagado
+    coordinator = connect_coordinator(os.path.join(snapshot_dir, COORDINATOR_SOCKET), authkey)
+    api_placement_handler.SNAPSHOT_READER = SharedSnapshotReader(snapshot_dir)
+    api_placement_handler.LEDGER = SharedLedger(coordinator)
+    api_placement_handler.ADMISSION_QUEUE = SharedAdmissionQueue(coordinator)
+    server = make_server("0.0.0.0", 0, api_placement_handler.app, fd=listen_fd)
+    server.serve_forever()
+
+
+def _start_worker(listen_fd: int, snapshot_dir: str, authkey: bytes) -> multiprocessing.Process:
+    process = multiprocessing.get_context("fork").Process(
+        target=_worker_main, args=(listen_fd, snapshot_dir, authkey), daemon=True
+    )
+    process.start()
+    return process
+
+
+def serve(
+    host: str,
+    port: int,
+    workers: int = DEFAULT_WORKERS,
+    refresh: float = DEFAULT_REFRESH_SECONDS,
+    snapshot_dir: Optional[str] = None
+) -> None:
+    from api_placement_handler import NODES_STATUS_ENDPOINT
+
+    snapshot_dir = snapshot_dir or default_snapshot_dir()
+    writer = SharedSnapshotWriter(snapshot_dir)
+    nodes_cache = NodesStatusCache(NODES_STATUS_ENDPOINT, ttl=refresh)
+
+    def publish() -> None:
+        state = nodes_cache.current()
+        version = writer.publish(state)
+        logger.info("Snapshot v%d publicado (%d nodos)", version, len(state))
+
+    publish()   # los workers arrancan con un snapshot
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, port))
+    listener.listen(128)
+    listener.set_inheritable(True)
+
+    authkey = os.urandom(32)
+    coordinator = _start_coordinator(snapshot_dir, authkey)
+    processes: List[multiprocessing.Process] = [
+        _start_worker(listener.fileno(), snapshot_dir, authkey) for _ in range(workers)
+    ]
+    logger.info("%d workers en http://%s:%d (snapshot en %s)", workers, host, port, snapshot_dir)
+
+    try:
+        while True:
+            time.sleep(refresh)
+            if nodes_cache.refresh():     # 304 o error: se mantiene la versión publicada
+                publish()
+
+            if not coordinator.is_alive():
+                # Los workers quedan con la conexión rota: se reinician con el coordinador nuevo
+                logger.error("Coordinador terminó (código %s); se reinicia con ledger y cola vacíos",
+                             coordinator.exitcode)
+                coordinator = _start_coordinator(snapshot_dir, authkey)
+                for process in processes:
+                    process.terminate()
+                    process.join(timeout=5)
+
+            for i, process in enumerate(processes):
+                if not process.is_alive():
+                    logger.warning("Worker %d terminó (código %s); se reinicia", process.pid, process.exitcode)
+                    processes[i] = _start_worker(listener.fileno(), snapshot_dir, authkey)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in processes + [coordinator]:
+            process.terminate()
+        for process in processes + [coordinator]:
+            process.join(timeout=5)
+        listener.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API de placement con N workers y snapshot compartido")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5004)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--refresh", type=float, default=DEFAULT_REFRESH_SECONDS,
+                        help="segundos entre consultas a /nodes/status")
+    parser.add_argument("--snapshot-dir", help="directorio del snapshot compartido (por defecto en /dev/shm)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    serve(args.host, args.port, args.workers, args.refresh, args.snapshot_dir)
+
+
+if __name__ == "__main__":
+    main()
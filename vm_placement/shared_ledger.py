@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Ledger de asignaciones pendientes y cola de admisión COMPARTIDOS entre los
+workers de servicio_placement.py.
+
+Con pre-fork cada worker tenía su propio PendingAllocationLedger y su
+propia AdmissionQueue: un DELETE /allocations/<id> o un GET /queue/<id> que
+el kernel entregaba a otro worker respondía 404, y dos workers podían
+reservar la misma holgura porque ninguno veía las reservas (ni las
+generaciones por host) del otro.
+
+Aquí un proceso COORDINADOR es el único dueño del ledger y de la cola; los
+workers le hablan por un socket Unix con authkey (multiprocessing.managers).
+SharedLedger y SharedAdmissionQueue tienen la misma interfaz que
+PendingAllocationLedger y AdmissionQueue, así que api_placement_handler.py y
+optimistic_commit.py no cambian:
+
+- Reservas, liberaciones, generaciones y el compare-and-swap se ejecutan en
+  el coordinador con el lock del ledger: todos los workers ven las mismas
+  generaciones.
+- El `validate` de reserve_if no puede viajar a otro proceso. El CAS se
+  intenta en el coordinador; si hay hosts en conflicto se devuelven con su
+  generación actual, el worker los re-valida localmente (su snapshot + el
+  ledger compartido) y reintenta el CAS con esas generaciones. Si otro
+  worker tocó el host entre la validación y el reintento, el CAS vuelve a
+  fallar: nunca se confirma sobre un cambio que no se validó.
+- apply_to suma localmente los totales por host que entrega el coordinador
+  (una llamada por vista).
+- La cola se reevalúa en el coordinador, contra el snapshot compartido
+  (SharedSnapshotReader) y el ledger real.
+
+Los relojes son time.monotonic en todos los procesos (CLOCK_MONOTONIC del
+sistema en Linux), así que TTLs y esperas se comparan sin traducir.
+"""
+
+from multiprocessing.managers import BaseManager
+from typing import Callable, Dict, List, Optional, Tuple
+import multiprocessing
+import time
+
+from vm_placement import HostState, SliceRequest
+from cluster_state import ClusterState
+from pending_ledger import (
+    PendingAllocationLedger, PendingAllocation, PendingDelta, fold_totals, fold_totals_hosts,
+)
+from admission_queue import AdmissionQueue, QueuedRequest
+from placement_scoring import ScoringPolicy
+
+# Reintentos del CAS de un worker cuando la re-validación local aprueba los
+# hosts en conflicto pero otro worker los vuelve a tocar antes del reintento
+CAS_ATTEMPTS = 5
+
+# Espera máxima (s) a que el coordinador acepte conexiones al arrancar
+CONNECT_TIMEOUT_SECONDS = 10.0
+
+Entry = Tuple[str, Dict[str, Tuple[float, float]], float]     # (host, slice_mu_sigma, disk_gb)
+
+
+# ==========================
+#   COORDINADOR
+# ==========================
+
+class LedgerCoordinator:
+    """
+    Dueño del ledger y la cola en el proceso coordinador. Cada método
+    público es una llamada remota de los workers (sus argumentos y
+    resultados viajan serializados con pickle).
+    """
+
+    def __init__(
+        self,
+        ledger: PendingAllocationLedger,
+        queue: AdmissionQueue,
+        snapshot,
+        before_reevaluate: Optional[Callable[[], object]] = None
+    ):
+        self.ledger = ledger
+        self.queue = queue
+        self.snapshot = snapshot            # cualquier objeto con current() (SharedSnapshotReader)
+        self.before_reevaluate = before_reevaluate   # ej. recargar tablas calibradas
+
+    # ---- ledger ----
+
+    def ledger_version(self) -> int:
+        return self.ledger.version
+
+    def ttl_seconds(self) -> float:
+        return self.ledger.ttl_seconds
+
+    def generations(self) -> Dict[str, int]:
+        return self.ledger.generations()
+
+    def totals_by_host(self) -> Dict[str, PendingDelta]:
+        return self.ledger.totals_by_host()
+
+    def allocations(self) -> List[PendingAllocation]:
+        return self.ledger.allocations()
+
+    def allocation_count(self) -> int:
+        return len(self.ledger)
+
+    def purge_expired(self) -> int:
+        return self.ledger.purge_expired()
+
+    def reserve(self, entries: List[Entry], ttl_seconds: Optional[float] = None) -> str:
+        return self.ledger.reserve(entries, ttl_seconds)
+
+    def try_reserve(
+        self,
+        entries: List[Entry],
+        expected: Dict[str, int],
+        ttl_seconds: Optional[float] = None
+    ) -> Tuple[Optional[str], Dict[str, int]]:
+        """
+        CAS sin re-validación: (allocation_id, {}) si todos los hosts siguen
+        en la generación esperada; si no, (None, {host: generación actual})
+        de los hosts en conflicto, leída con el lock del ledger tomado.
+        """
+        conflicts: Dict[str, int] = {}
+
+        def record(hosts: List[str]) -> bool:
+            conflicts.update((h, self.ledger.generation(h)) for h in hosts)
+            return False
+
+        return self.ledger.reserve_if(entries, expected, record, ttl_seconds), conflicts
+
+    def release(self, allocation_id: str) -> bool:
+        return self.ledger.release(allocation_id)
+
+    # ---- cola de admisión ----
+
+    def enqueue(
+        self,
+        slice_req: SliceRequest,
+        risk_model: str = "normal",
+        zone_mode: str = "strict",
+        top_k: int = 1,
+        use_scoring: bool = True
+    ) -> Optional[str]:
+        return self.queue.enqueue(slice_req, risk_model, zone_mode, top_k, use_scoring)
+
+    def cancel(self, queue_id: str) -> bool:
+        return self.queue.cancel(queue_id)
+
+    def queue_entry(self, queue_id: str) -> Optional[QueuedRequest]:
+        return self.queue.get(queue_id)
+
+    def queue_pending(self) -> List[QueuedRequest]:
+        return self.queue.pending()
+
+    def queue_position(self, queue_id: str) -> Optional[int]:
+        return self.queue.position(queue_id)
+
+    def queue_length(self) -> int:
+        return len(self.queue)
+
+    def reevaluate_queue(self, scoring: Optional[ScoringPolicy] = None) -> List[QueuedRequest]:
+        """Pasada de la cola contra el snapshot compartido y el ledger del coordinador."""
+        if len(self.queue) == 0:
+            return []
+        if self.before_reevaluate is not None:
+            self.before_reevaluate()
+        try:
+            state = self.snapshot.current()
+        except FileNotFoundError:
+            return []       # aún no hay snapshot publicado
+        return self.queue.reevaluate(state, self.ledger, scoring)
+
+
+class _CoordinatorManager(BaseManager):
+    pass
+
+
+_COORDINATOR: Optional[LedgerCoordinator] = None
+
+
+def _get_coordinator() -> LedgerCoordinator:
+    return _COORDINATOR
+
+
+_CoordinatorManager.register("coordinator", callable=_get_coordinator)
+
+
+def serve_coordinator(coordinator: LedgerCoordinator, address: str, authkey: bytes) -> None:
+    """Atiende a los workers en `address` (socket Unix) hasta que terminen el proceso."""
+    global _COORDINATOR
+    _COORDINATOR = coordinator
+    _CoordinatorManager(address=address, authkey=authkey).get_server().serve_forever()
+
+
+def start_coordinator(
+    make_coordinator: Callable[[], LedgerCoordinator],
+    address: str,
+    authkey: bytes
+) -> multiprocessing.Process:
+    """
+    Lanza el proceso coordinador (fork: `make_coordinator` se ejecuta en el
+    hijo) y espera a que acepte conexiones.
+    """
+    def main() -> None:
+        serve_coordinator(make_coordinator(), address, authkey)
+
+    process = multiprocessing.get_context("fork").Process(target=main, daemon=True)
+    process.start()
+    connect_coordinator(address, authkey)
+    return process
+
+
+def connect_coordinator(address: str, authkey: bytes, timeout: float = CONNECT_TIMEOUT_SECONDS):
+    """Proxy del coordinador; reintenta mientras el socket todavía no existe."""
+    deadline = time.monotonic() + timeout
+    while True:
+        manager = _CoordinatorManager(address=address, authkey=authkey)
+        try:
+            manager.connect()
+            return manager.coordinator()
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.05)
+
+
+# ==========================
+#   CLIENTES (WORKERS)
+# ==========================
+
+class SharedLedger:
+    """Misma interfaz que PendingAllocationLedger sobre el ledger del coordinador."""
+
+    def __init__(self, coordinator):
+        self._coordinator = coordinator
+        self.ttl_seconds = coordinator.ttl_seconds()
+        self.clock = time.monotonic
+
+    @property
+    def version(self) -> int:
+        return self._coordinator.ledger_version()
+
+    def reserve(self, entries: List[Entry], ttl_seconds: Optional[float] = None) -> str:
+        return self._coordinator.reserve(entries, ttl_seconds)
+
+    def reserve_if(
+        self,
+        entries: List[Entry],
+        expected: Dict[str, int],
+        validate: Optional[Callable[[List[str]], bool]] = None,
+        ttl_seconds: Optional[float] = None
+    ) -> Optional[str]:
+        """
+        CAS en el coordinador. Ante conflicto `validate` re-valida aquí los
+        hosts que cambiaron y se reintenta con la generación que tenían
+        (ver el docstring del módulo). None = conflicto.
+        """
+        expected = dict(expected)
+        for _ in range(CAS_ATTEMPTS):
+            allocation_id, conflicts = self._coordinator.try_reserve(entries, expected, ttl_seconds)
+            if allocation_id is not None:
+                return allocation_id
+            if validate is None or not validate(sorted(conflicts)):
+                return None
+            expected.update(conflicts)
+        return None
+
+    def release(self, allocation_id: str) -> bool:
+        return self._coordinator.release(allocation_id)
+
+    def purge_expired(self) -> int:
+        return self._coordinator.purge_expired()
+
+    def __len__(self) -> int:
+        return self._coordinator.allocation_count()
+
+    def generation(self, host: str) -> int:
+        return self.generations().get(host, 0)
+
+    def generations(self) -> Dict[str, int]:
+        return self._coordinator.generations()
+
+    def allocations(self) -> List[PendingAllocation]:
+        return self._coordinator.allocations()
+
+    def totals_by_host(self) -> Dict[str, PendingDelta]:
+        return self._coordinator.totals_by_host()
+
+    def apply_to(self, state: ClusterState) -> ClusterState:
+        return fold_totals(state, self.totals_by_host())
+
+    def apply_to_hosts(self, hosts: List[HostState]) -> List[HostState]:
+        return fold_totals_hosts(hosts, self.totals_by_host())
+
+
+class SharedAdmissionQueue:
+    """Misma interfaz que AdmissionQueue sobre la cola del coordinador."""
+
+    def __init__(self, coordinator):
+        self._coordinator = coordinator
+        self.clock = time.monotonic
+
+    def enqueue(
+        self,
+        slice_req: SliceRequest,
+        risk_model: str = "normal",
+        zone_mode: str = "strict",
+        top_k: int = 1,
+        use_scoring: bool = True
+    ) -> Optional[str]:
+        return self._coordinator.enqueue(slice_req, risk_model, zone_mode, top_k, use_scoring)
+
+    def cancel(self, queue_id: str) -> bool:
+        return self._coordinator.cancel(queue_id)
+
+    def __len__(self) -> int:
+        return self._coordinator.queue_length()
+
+    def get(self, queue_id: str) -> Optional[QueuedRequest]:
+        return self._coordinator.queue_entry(queue_id)
+
+    def pending(self) -> List[QueuedRequest]:
+        return self._coordinator.queue_pending()
+
+    def position(self, queue_id: str) -> Optional[int]:
+        return self._coordinator.queue_position(queue_id)
+
+    def reevaluate(
+        self,
+        state: ClusterState,
+        ledger,
+        scoring: Optional[ScoringPolicy] = None
+    ) -> List[QueuedRequest]:
+        """
+        La pasada corre en el coordinador contra el snapshot compartido y su
+        ledger; `state` y `ledger` del worker no se usan.
+        """
+        return self._coordinator.reevaluate_queue(scoring)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Snapshot del clúster compartido entre procesos (buffer columnar mmap).
+
+Cada worker del servicio (servicio_placement.py) necesita el mismo
+ClusterState. En lugar de que cada proceso consulte /nodes/status y parsee
+el JSON, el proceso principal lo parsea UNA vez y publica las columnas en un
+archivo binario; los workers lo mapean con mmap y construyen el
+ClusterState sobre esos bytes sin copiarlos (las páginas las comparte el
+sistema operativo). Por defecto se usa /dev/shm (memoria, sin disco).
+
+Formato de snapshot_v{N}.bin:
+    [8 bytes: largo del encabezado][encabezado JSON][columnas alineadas a 64 bytes]
+El encabezado trae la versión, los nombres de hosts/zonas/racks y, por cada
+arreglo, dtype, forma y offset.
+
+Cambio de versión atómico:
+1) se escribe snapshot_v{N}.tmp y se renombra a snapshot_v{N}.bin
+2) se reemplaza el archivo `current` (contiene N) con os.replace
+Un lector ve la versión anterior completa o la nueva completa, nunca una
+mezcla. Los mapeos de versiones viejas siguen siendo válidos aunque el
+escritor borre el archivo (se conservan las últimas `keep`).
+
+Las columnas mapeadas son de solo lectura: para modificar el estado usar
+.copy() (como ya hacen el ledger y place_batch).
+"""
+
+from typing import Dict, Optional, Tuple
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from cluster_state import ClusterState, FLOAT_COLUMNS, BOOL_COLUMNS
+
+_ALIGN = 64
+_HEADER_LEN = struct.Struct("<Q")
+_POINTER = "current"
+
+
+def default_snapshot_dir() -> str:
+    """/dev/shm si existe (memoria compartida), si no el directorio temporal."""
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "vm_placement_snapshot")
+
+
+def snapshot_path(directory: str, version: int) -> str:
+    return os.path.join(directory, f"snapshot_v{version}.bin")
+
+
+def _state_arrays(state: ClusterState) -> Dict[str, np.ndarray]:
+    arrays = {c: getattr(state, c) for c in FLOAT_COLUMNS + BOOL_COLUMNS}
+    arrays["zone_codes"] = state.zone_codes
+    arrays["platform_codes"] = state.platform_codes
+    arrays["rack_codes"] = state.rack_codes
+    for key, values in (state.histograms or {}).items():
+        arrays[f"hist_{key}"] = values
+    return arrays
+
+
+# ==========================
+#   ESCRITURA
+# ==========================
+
+class SharedSnapshotWriter:
+    """Publica snapshots versionados en `directory` (un solo escritor)."""
+
+    def __init__(self, directory: Optional[str] = None, keep: int = 3):
+        self.directory = directory or default_snapshot_dir()
+        self.keep = keep
+        os.makedirs(self.directory, exist_ok=True)
+        self.version = read_current_version(self.directory) or 0
+
+    def publish(self, state: ClusterState) -> int:
+        """Escribe `state` como versión nueva, la marca como actual y retorna su número."""
+        version = self.version + 1
+        arrays = {k: np.ascontiguousarray(v) for k, v in _state_arrays(state).items()}
+
+        layout, offset = {}, 0
+        for key, values in arrays.items():
+            layout[key] = {"dtype": values.dtype.str, "shape": list(values.shape), "offset": offset}
+            offset += -(-values.nbytes // _ALIGN) * _ALIGN
+        header = json.dumps({
+            "version": version,
+            "names": state.names,
+            "zone_names": state.zone_names,
+            "rack_names": state.rack_names,
+            "has_histograms": state.histograms is not None,
+            "arrays": layout,
+        }).encode("utf-8")
+        data_start = -(-(_HEADER_LEN.size + len(header)) // _ALIGN) * _ALIGN
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER_LEN.pack(len(header)))
+                f.write(header)
+                for key, values in arrays.items():
+                    f.seek(data_start + layout[key]["offset"])
+                    f.write(values.tobytes())
+                f.truncate(data_start + offset)
+            os.replace(tmp_path, snapshot_path(self.directory, version))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        _write_pointer(self.directory, version)
+        self.version = version
+        self._collect()
+        return version
+
+    def _collect(self) -> None:
+        """Borra las versiones anteriores a las últimas `keep`."""
+        for name in os.listdir(self.directory):
+            if name.startswith("snapshot_v") and name.endswith(".bin"):
+                version = int(name[len("snapshot_v"):-len(".bin")])
+                if version <= self.version - self.keep:
+                    os.unlink(os.path.join(self.directory, name))
+
+
+def _write_pointer(directory: str, version: int) -> None:
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        f.write(str(version))
+    os.replace(tmp_path, os.path.join(directory, _POINTER))
+
+
+def read_current_version(directory: str) -> Optional[int]:
+    try:
+        with open(os.path.join(directory, _POINTER), "r") as f:
+            return int(f.read().strip())
+    except (OSError, ValueError):
+        return None
+
+
+# ==========================
+#   LECTURA
+# ==========================
+
+def map_snapshot(path: str) -> Tuple[int, ClusterState]:
+    """Mapea un archivo de snapshot y construye el ClusterState sin copiar las columnas."""
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    (header_len,) = _HEADER_LEN.unpack_from(buffer, 0)
+    header = json.loads(bytes(buffer[_HEADER_LEN.size:_HEADER_LEN.size + header_len]))
+    data_start = -(-(_HEADER_LEN.size + header_len) // _ALIGN) * _ALIGN
+
+    arrays = {}
+    for key, spec in header["arrays"].items():
+        dtype = np.dtype(spec["dtype"])
+        count = int(np.prod(spec["shape"])) if spec["shape"] else 1
+        arrays[key] = np.frombuffer(
+            buffer, dtype=dtype, count=count, offset=data_start + spec["offset"]
+        ).reshape(spec["shape"])
+
+    histograms = None
+    if header["has_histograms"]:
+        histograms = {k[len("hist_"):]: v for k, v in arrays.items() if k.startswith("hist_")}
+    state = ClusterState(
+        header["names"], header["zone_names"],
+        arrays["zone_codes"], arrays["platform_codes"],
+        {c: arrays[c] for c in FLOAT_COLUMNS + BOOL_COLUMNS},
+        histograms, header["rack_names"], arrays["rack_codes"],
+    )
+    return header["version"], state
+
+
+class SharedSnapshotReader:
+    """
+    Vista de un worker sobre el snapshot actual. `current()` revisa el
+    archivo `current` (un stat) y solo mapea de nuevo cuando cambió de
+    versión; mientras tanto devuelve el MISMO ClusterState (misma versión
+    local), así la cache de decisiones sigue siendo válida.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or default_snapshot_dir()
+        self.version: Optional[int] = None
+        self._state: Optional[ClusterState] = None
+        self._pointer_stat: Optional[Tuple[int, int]] = None
+
+    def current(self) -> ClusterState:
+        """ClusterState de la versión publicada (FileNotFoundError si aún no hay ninguna)."""
+        st = os.stat(os.path.join(self.directory, _POINTER))
+        stamp = (st.st_ino, st.st_mtime_ns)
+        if self._state is None or stamp != self._pointer_stat:
+            for _ in range(3):
+                version = read_current_version(self.directory)
+                if version is None:
+                    raise FileNotFoundError(f"No hay snapshot publicado en {self.directory}")
+                if version == self.version:
+                    break
+                try:
+                    self.version, self._state = map_snapshot(snapshot_path(self.directory, version))
+                    break
+                except FileNotFoundError:
+                    continue    # el escritor ya la reemplazó y borró: releer `current`
+            self._pointer_stat = stamp
+        return self._state
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Simulador OFFLINE de placement (replay de trazas).
+
+Reproduce un flujo de llegadas y salidas de slices contra un snapshot de
+nodes_status.json usando directamente el motor vectorizado (sin API):
+
+- Cada llegada se coloca con rank_placement_candidates y, si hay host,
+  su μ/σ/disco se suma al host (ClusterState.apply_slice).
+- Cada salida libera la carga del host donde quedó (release_slice).
+
+Al final reporta:
+- Tasa de aceptación
+- Riesgo pico por host (max P_cong observado tras cada evento)
+- Fragmentación media por recurso: fracción de la capacidad libre que queda
+  en hosts donde ya no cabe un slice de tamaño medio (huecos inutilizables)
+- Decisiones por segundo del motor
+
+El flujo puede venir de un archivo JSON Lines grabado o generarse
+sintéticamente (llegadas Poisson, duración exponencial, flavours de la BD).
+Con --sweep se ejecutan varias configuraciones en paralelo (multiproceso),
+por ejemplo sobre max_failure_prob o tablas de perfiles alternativas.
+
+Formato de cada línea del archivo de eventos:
+    {"t": 12.5, "type": "arrival", "id": "s1", "cpu": 2, "ram_gb": 2.0,
+     "disk_gb": 4.0, "zone": "AZ1", "user_profile": "Estudiante",
+     "technical_context": "Cloud", "sla_overcommit_cpu_pct": 1.5}
+    {"t": 90.0, "type": "departure", "id": "s1"}
+
+Uso:
+    python3 simulador_placement.py --nodes ../nodes_status.json --synthetic 500
+    python3 simulador_placement.py --events traza.jsonl --sweep max_failure_prob=0.01,0.05,0.1
+    python3 simulador_placement.py --synthetic 2000 --scale 50 \\
+        --sweep profile_table=tablas_a.json,tablas_b.json --workers 4
+    python3 simulador_placement.py --synthetic 500 --sweep risk_model=normal,empirical
+    python3 simulador_placement.py --synthetic 500 --sweep cpu_overcommit=1,1.5,2
+    python3 simulador_placement.py --synthetic 500 --sweep scoring=minimax,pesos_a.json
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict, replace
+from typing import Dict, List, Optional, Tuple
+import argparse
+import copy
+import json
+import random
+import time
+
+import numpy as np
+
+import vm_placement
+from vm_placement import SliceRequest, compute_slice_mu_sigma
+from cluster_state import ClusterState
+from placement_engine import rank_placement_candidates, host_risk
+from placement_scoring import ScoringPolicy
+
+# Flavours base (db/init/01_seed.sql): (vcpu, ram_gb, disk_gb)
+FLAVOURS = [
+    (1, 1.0, 2.0), (1, 2.0, 3.0), (2, 2.0, 4.0), (2, 4.0, 6.0),
+    (4, 8.0, 8.0), (8, 12.0, 10.0), (16, 16.0, 12.0),
+]
+
+
+# ==========================
+#   CONFIGURACIÓN Y REPORTE
+# ==========================
+
+@dataclass
+class SimulationConfig:
+    """Parámetros de una corrida (una celda del barrido)."""
+    label: str = "base"
+    max_failure_prob: Optional[float] = None    # None = el de cada evento
+    profile_table: Optional[str] = None         # JSON con PROFILE_TABLE / CONTEXT_TABLE
+    risk_model: str = "normal"                  # "normal" o "empirical" (histogramas)
+    cpu_overcommit: Optional[float] = None      # None = el de cada evento (sla_overcommit_cpu_pct)
+    scoring: Optional[str] = None               # JSON de pesos (placement_scoring); None = Minimax
+
+
+@dataclass
+class SimulationReport:
+    label: str
+    arrivals: int = 0
+    accepted: int = 0
+    departures: int = 0
+    acceptance_rate: float = 0.0
+    decisions_per_second: float = 0.0
+    peak_risk_by_host: Dict[str, float] = field(default_factory=dict)
+    max_peak_risk: float = 0.0
+    fragmentation: Dict[str, float] = field(default_factory=dict)
+
+
+# ==========================
+#   EVENTOS
+# ==========================
+
+def load_events(path: str) -> List[Dict]:
+    """Lee un archivo JSON Lines de eventos y los ordena por tiempo."""
+    with open(path, "r") as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    events.sort(key=lambda e: (e["t"], e["type"] != "departure"))
+    return events
+
+
+def synthetic_events(
+    n_slices: int,
+    zones: List[str],
+    seed: int = 42,
+    arrival_rate: float = 1.0,
+    mean_duration: float = 120.0
+) -> List[Dict]:
+    """
+    Genera n_slices llegadas Poisson (arrival_rate por unidad de tiempo) con
+    duración exponencial; cada slice suma de 1 a 4 VMs de los flavours base.
+    """
+    rng = random.Random(seed)
+    profiles = list(vm_placement.PROFILE_TABLE)
+    contexts = list(vm_placement.CONTEXT_TABLE)
+
+    events = []
+    t = 0.0
+    for i in range(n_slices):
+        t += rng.expovariate(arrival_rate)
+        vms = [rng.choice(FLAVOURS[:5]) for _ in range(rng.randint(1, 4))]
+        events.append({
+            "t": t, "type": "arrival", "id": f"s{i}",
+            "cpu": sum(v[0] for v in vms),
+            "ram_gb": sum(v[1] for v in vms),
+            "disk_gb": sum(v[2] for v in vms),
+            "zone": rng.choice(zones),
+            "user_profile": rng.choice(profiles),
+            "technical_context": rng.choice(contexts),
+        })
+        events.append({"t": t + rng.expovariate(1.0 / mean_duration), "type": "departure", "id": f"s{i}"})
+
+    events.sort(key=lambda e: (e["t"], e["type"] != "departure"))
+    return events
+
+
+def scale_nodes(nodes: Dict[str, Dict], factor: int) -> Dict[str, Dict]:
+    """Replica cada nodo `factor` veces (clúster sintético más grande)."""
+    if factor <= 1:
+        return nodes
+    scaled = {}
+    for node_id, node in nodes.items():
+        for k in range(factor):
+            clone = copy.deepcopy(node)
+            clone["id"] = f"{node_id}-{k}"
+            clone["name"] = f"{node.get('name', node_id)}-{k}"
+            scaled[clone["id"]] = clone
+    return scaled
+
+
+# ==========================
+#   SIMULACIÓN
+# ==========================
+
+def _fragmentation(free: np.ndarray, reference: float) -> float:
+    """Fracción del recurso libre que está en huecos menores a `reference`."""
+    free = np.clip(free, 0.0, None)
+    total = free.sum()
+    return float(free[free < reference].sum() / total) if total > 0 else 0.0
+
+
+def simulate(nodes: Dict[str, Dict], events: List[Dict], config: SimulationConfig) -> SimulationReport:
+    """Ejecuta una corrida completa y devuelve su reporte."""
+    if config.profile_table:
+        vm_placement.load_model_tables(config.profile_table)
+    scoring = ScoringPolicy.from_file(config.scoring) if config.scoring else None
+
+    # Un snapshot por zona, igual que la API (Minimax dentro de la AZ)
+    zones = sorted({n["zone"] for n in nodes.values()})
+    states = {z: ClusterState.from_nodes_status(nodes, zone=z) for z in zones}
+    peak = {z: host_risk(s, config.risk_model) for z, s in states.items()}
+
+    report = SimulationReport(label=config.label)
+    placed: Dict[str, Tuple[str, str, Dict[str, Tuple[float, float]], float]] = {}
+    frag_samples: Dict[str, List[float]] = {"cpu": [], "ram": [], "disk": []}
+    decision_time = 0.0
+    requested = np.zeros(3)   # suma de (cpu, ram, disco) pedidos, para el tamaño medio
+
+    for event in events:
+        if event["type"] == "departure":
+            entry = placed.pop(event["id"], None)
+            if entry is not None:
+                zone, host, mu_sigma, disk_gb = entry
+                states[zone].release_slice(host, mu_sigma, disk_gb)
+                report.departures += 1
+            continue
+
+        report.arrivals += 1
+        state = states.get(event.get("zone"))
+        if state is None:
+            continue
+
+        slice_req = SliceRequest(
+            cpu=int(event["cpu"]),
+            ram_gb=float(event["ram_gb"]),
+            disk_gb=float(event["disk_gb"]),
+            zone=event["zone"],
+            platform=event.get("platform"),
+            user_profile=event.get("user_profile", "Estudiante"),
+            technical_context=event.get("technical_context", "Cloud"),
+            max_failure_prob=event.get("max_failure_prob", 0.01),
+            cpu_overcommit=float(event.get("sla_overcommit_cpu_pct") or 1.0),
+            ram_overcommit=float(event.get("sla_overcommit_ram_pct") or 1.0),
+        )
+        if config.max_failure_prob is not None:
+            slice_req = replace(slice_req, max_failure_prob=config.max_failure_prob)
+        if config.cpu_overcommit is not None:
+            slice_req = replace(slice_req, cpu_overcommit=config.cpu_overcommit)
+        requested += (slice_req.cpu, slice_req.ram_gb, slice_req.disk_gb)
+
+        t0 = time.perf_counter()
+        ranked = rank_placement_candidates(
+            slice_req, state, 1, risk_model=config.risk_model, scoring=scoring
+        )
+        decision_time += time.perf_counter() - t0
+
+        if not ranked:
+            continue
+
+        host = ranked[0].host
+        mu_sigma = compute_slice_mu_sigma(slice_req)
+        state.apply_slice(host, mu_sigma, slice_req.disk_gb)
+        placed[event["id"]] = (slice_req.zone, host, mu_sigma, slice_req.disk_gb)
+        report.accepted += 1
+
+        row = state.row(host)
+        peak[slice_req.zone][row] = max(peak[slice_req.zone][row], host_risk(state, config.risk_model)[row])
+
+        mean_req = requested / report.arrivals
+        frag_samples["cpu"].append(_fragmentation(state.cpu_capacity - state.mu_cpu, mean_req[0]))
+        frag_samples["ram"].append(_fragmentation(state.ram_gb_capacity - state.mu_ram_gb, mean_req[1]))
+        frag_samples["disk"].append(_fragmentation(state.disk_gb_capacity - state.disk_gb_used, mean_req[2]))
+
+    report.acceptance_rate = report.accepted / report.arrivals if report.arrivals else 0.0
+    report.decisions_per_second = report.arrivals / decision_time if decision_time > 0 else 0.0
+    report.peak_risk_by_host = {
+        name: float(peak[z][i]) for z, s in states.items() for i, name in enumerate(s.names)
+    }
+    report.max_peak_risk = max(report.peak_risk_by_host.values(), default=0.0)
+    report.fragmentation = {k: float(np.mean(v)) if v else 0.0 for k, v in frag_samples.items()}
+    return report
+
+
+def _simulate_worker(args: Tuple[Dict, List[Dict], SimulationConfig]) -> SimulationReport:
+    return simulate(*args)
+
+
+def run_sweep(
+    nodes: Dict[str, Dict],
+    events: List[Dict],
+    configs: List[SimulationConfig],
+    workers: Optional[int] = None
+) -> List[SimulationReport]:
+    """Ejecuta cada configuración en un proceso distinto."""
+    if len(configs) == 1:
+        return [simulate(nodes, events, configs[0])]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_simulate_worker, [(nodes, events, c) for c in configs]))
+
+
+def parse_sweep(spec: Optional[str]) -> List[SimulationConfig]:
+    """
+    'max_failure_prob=0.01,0.05', 'profile_table=a.json,b.json',
+    'risk_model=normal,empirical', 'cpu_overcommit=1,1.5,2' o
+    'scoring=minimax,pesos.json' -> configuraciones.
+    """
+    if not spec:
+        return [SimulationConfig()]
+    key, _, values = spec.partition("=")
+    if key == "max_failure_prob":
+        return [SimulationConfig(label=f"MP={v}", max_failure_prob=float(v)) for v in values.split(",")]
+    if key == "profile_table":
+        return [SimulationConfig(label=v, profile_table=v) for v in values.split(",")]
+    if key == "risk_model":
+        return [SimulationConfig(label=v, risk_model=v) for v in values.split(",")]
+    if key == "cpu_overcommit":
+        return [SimulationConfig(label=f"OC={v}", cpu_overcommit=float(v)) for v in values.split(",")]
+    if key == "scoring":
+        return [SimulationConfig(label=v, scoring=None if v == "minimax" else v) for v in values.split(",")]
+    raise ValueError(f"Parámetro de barrido no soportado: {key}")
+
+
+# ==========================
+#   CLI
+# ==========================
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulador offline de VM placement")
+    parser.add_argument("--nodes", default="../nodes_status.json", help="snapshot de /nodes/status")
+    parser.add_argument("--events", help="archivo JSON Lines con llegadas/salidas")
+    parser.add_argument("--synthetic", type=int, default=0, help="generar N slices sintéticos")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rate", type=float, default=1.0, help="llegadas por unidad de tiempo")
+    parser.add_argument("--duration", type=float, default=120.0, help="duración media de un slice")
+    parser.add_argument("--scale", type=int, default=1, help="replicar cada host N veces")
+    parser.add_argument("--sweep", help="ej. max_failure_prob=0.01,0.05,0.1")
+    parser.add_argument("--workers", type=int, default=None, help="procesos para el barrido")
+    parser.add_argument("--json", help="guardar los reportes completos en este archivo")
+    args = parser.parse_args()
+
+    with open(args.nodes, "r") as f:
+        nodes = scale_nodes(json.load(f), args.scale)
+
+    if args.events:
+        events = load_events(args.events)
+    else:
+        zones = sorted({n["zone"] for n in nodes.values()})
+        events = synthetic_events(args.synthetic or 500, zones, args.seed, args.rate, args.duration)
+
+    configs = parse_sweep(args.sweep)
+    reports = run_sweep(nodes, events, configs, args.workers)
+
+    print("=" * 96)
+    print(f"SIMULACIÓN DE PLACEMENT - {len(nodes)} hosts, {len(events)} eventos")
+    print("=" * 96)
+    print(f"{'config':>22} | {'acept.':>7} | {'riesgo pico':>11} | {'frag cpu':>8} | {'frag ram':>8} | {'frag disk':>9} | {'dec/s':>8}")
+    print("-" * 96)
+    for r in reports:
+        print(
+            f"{r.label:>22} | {r.acceptance_rate:>7.1%} | {r.max_peak_risk:>11.4g} | "
+            f"{r.fragmentation['cpu']:>8.3f} | {r.fragmentation['ram']:>8.3f} | "
+            f"{r.fragmentation['disk']:>9.3f} | {r.decisions_per_second:>8.0f}"
+        )
+    print("-" * 96)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([asdict(r) for r in reports], f, indent=4, ensure_ascii=False)
+        print(f"Reportes guardados en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 10:
+Planificador de rebalanceo (migraciones en vivo con presupuesto).
+
+Escenario:
+- AZ1: server1 caliente (CPU cerca del límite, 4 VMs), server2 y server3
+  con holgura.
+- AZ2: server4 caliente con 1 VM, sin otro host en su zona.
+- Una VM con worker_ip desconocido.
+
+Objetivo:
+- El plan baja el riesgo máximo de AZ1 y respeta el presupuesto.
+- Ningún movimiento cruza de zona (server4 no se puede aliviar).
+- Con presupuesto 0 no hay movimientos y el estado original no cambia.
+- La VM con worker_ip desconocido se reporta aparte.
+"""
+
+from cluster_state import ClusterState
+from rebalanceo_placement import plan_rebalance, vms_from_rows, print_report
+
+
+def crear_nodo(node_id: str, zone: str, cpu_pct: float) -> dict:
+    return {
+        "id": node_id, "name": f"compute-node-{node_id}", "platform": "linux", "zone": zone,
+        "cpu_capacity": {"value": 4, "unit": "cores"},
+        "ram_capacity": {"value": 16.0, "unit": "GiB"},
+        "disk_capacity": {"value": 100.0, "unit": "GB"},
+        "current_usage": {
+            "cpu": {"mean": cpu_pct, "std": 8.0, "unit": "%"},
+            "ram": {"mean": 6.0, "std": 0.5, "unit": "GiB"},
+            "disk": {"used": 30.0, "unit": "GB"},
+        },
+    }
+
+
+def crear_vm(vm_id: int, worker_ip: str, vcpu: int) -> dict:
+    return {
+        "vm_id": vm_id, "slice_id": 100 + vm_id // 10, "name": f"vm-{vm_id}",
+        "vcpu": vcpu, "ram_mb": 1024 * vcpu, "disk_gb": 5, "status": "running",
+        "worker_ip": worker_ip, "user_profile": "Investigador",
+    }
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 10 - PLANIFICADOR DE REBALANCEO")
+    print("=" * 78)
+
+    nodes = {
+        "server1": crear_nodo("server1", "AZ1", 80.0),
+        "server2": crear_nodo("server2", "AZ1", 20.0),
+        "server3": crear_nodo("server3", "AZ1", 35.0),
+        "server4": crear_nodo("server4", "AZ2", 85.0),
+    }
+    filas = [
+        crear_vm(11, "192.168.201.1", 2), crear_vm(12, "192.168.201.1", 1),
+        crear_vm(13, "192.168.201.1", 1), crear_vm(14, "192.168.201.1", 2),
+        crear_vm(21, "192.168.201.4", 2),
+        crear_vm(31, "10.0.0.99", 1),
+    ]
+
+    estado = ClusterState.from_nodes_status(nodes)
+    version = estado.version
+    vms, sin_host = vms_from_rows(filas, nodes)
+
+    errores = 0
+    presupuesto = 2
+    plan = plan_rebalance(estado, vms, max_moves=presupuesto)
+    plan.unmapped_vms = sin_host
+    print_report(plan)
+
+    az1 = ["compute-node-server1", "compute-node-server2", "compute-node-server3"]
+    antes = max(plan.risk_before[h] for h in az1)
+    despues = max(plan.risk_after[h] for h in az1)
+    if plan.moves and despues < antes:
+        print("   OK: el plan baja el riesgo máximo de AZ1.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el plan no reduce el riesgo de AZ1.")
+
+    if len(plan.moves) <= presupuesto:
+        print("   OK: se respeta el presupuesto de movimientos.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el plan excede el presupuesto.")
+
+    if all(m.source in az1 and m.target in az1 for m in plan.moves):
+        print("   OK: ningún movimiento cruza de zona.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: hay movimientos entre zonas.")
+
+    vacio = plan_rebalance(estado, vms, max_moves=0)
+    if not vacio.moves and estado.version == version:
+        print("   OK: presupuesto 0 no propone movimientos y el estado no se modifica.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: presupuesto 0 propuso movimientos o modificó el estado.")
+
+    if sin_host == [31]:
+        print("   OK: la VM con worker_ip desconocido se reporta aparte.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: VMs sin host mal detectadas.")
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 10 (REBALANCEO) ==")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 11:
+Spread por dominio de falla (rack) en gang placement.
+
+Escenario:
+- AZ1 con 4 hosts en 2 racks: RACK-A (host-a1, host-a2, casi ociosos) y
+  RACK-B (host-b1, host-b2, con más carga).
+- Plantilla con 2 réplicas de base de datos (spread_group "db") y un
+  servidor web conectado a ambas.
+
+Objetivo:
+- Sin spread, Minimax pone las dos réplicas en RACK-A (los hosts ociosos).
+- Con spread por réplicas, quedan en racks distintos.
+- Con spread="slice" (3 VMs, 2 racks): sin modo estricto se coloca con 1
+  VM compartiendo rack; en modo estricto se rechaza y el estado no cambia.
+- La estrategia "topology" respeta el spread de las réplicas.
+"""
+
+from cluster_state import ClusterState
+from vm_placement import SliceRequest
+from gang_placement import decide_gang_placement
+
+
+def crear_nodo(nombre: str, rack: str, cpu_pct: float) -> dict:
+    return {
+        "id": nombre, "name": nombre, "platform": "linux", "zone": "AZ1",
+        "cpu_capacity": {"value": 8, "unit": "cores"},
+        "ram_capacity": {"value": 16.0, "unit": "GiB"},
+        "disk_capacity": {"value": 100.0, "unit": "GB"},
+        "current_usage": {
+            "cpu": {"mean": cpu_pct, "std": 5.0, "unit": "%"},
+            "ram": {"mean": 4.0, "std": 0.5, "unit": "GiB"},
+            "disk": {"used": 20.0, "unit": "GB"},
+        },
+        "metadata": {"rack": rack, "datacenter": "Lima"},
+    }
+
+
+RECURSOS = {
+    "db-1": {"vcpu": 2, "ram_gb": 2.0, "disk_gb": 10.0, "spread_group": "db"},
+    "db-2": {"vcpu": 2, "ram_gb": 2.0, "disk_gb": 10.0, "spread_group": "db"},
+    "web": {"vcpu": 1, "ram_gb": 1.0, "disk_gb": 5.0},
+}
+EDGES = [{"from": "web", "to": "db-1"}, {"from": "web", "to": "db-2"}]
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 11 - SPREAD POR RACK (GANG PLACEMENT)")
+    print("=" * 78)
+
+    nodes = {
+        "host-a1": crear_nodo("host-a1", "RACK-A", 5.0),
+        "host-a2": crear_nodo("host-a2", "RACK-A", 6.0),
+        "host-b1": crear_nodo("host-b1", "RACK-B", 40.0),
+        "host-b2": crear_nodo("host-b2", "RACK-B", 45.0),
+    }
+    base = SliceRequest(cpu=5, ram_gb=5.0, disk_gb=25.0, zone="AZ1", platform="linux",
+                        user_profile="Profesor", technical_context="Cloud", max_failure_prob=0.05)
+
+    errores = 0
+
+    def colocar(etiqueta: str, **kwargs):
+        estado = ClusterState.from_nodes_status(nodes)
+        gang = decide_gang_placement(RECURSOS, base, estado, commit=False, **kwargs)
+        if gang is None:
+            print(f"   {etiqueta:<28}: rechazado")
+        else:
+            detalle = ", ".join(f"{vm}->{gang.placements[vm].host} ({gang.racks[vm]})" for vm in RECURSOS)
+            print(f"   {etiqueta:<28}: {detalle}  [violaciones={gang.spread_violations}]")
+        return gang
+
+    print("\n[1] Colocación según el modo de spread:")
+    sin_spread = colocar("sin spread", spread="none")
+    replicas = colocar("spread réplicas", spread="replicas")
+    topologia = colocar("spread réplicas + topology", spread="replicas", strategy="topology", edges=EDGES)
+    slice_suave = colocar("spread slice", spread="slice")
+    estado = ClusterState.from_nodes_status(nodes)
+    version = estado.version
+    slice_estricto = decide_gang_placement(RECURSOS, base, estado, spread="slice", spread_strict=True)
+    print(f"   {'spread slice estricto':<28}: {'rechazado' if slice_estricto is None else 'colocado'}")
+
+    print("\n[2] Verificaciones:")
+    if sin_spread and sin_spread.racks["db-1"] == sin_spread.racks["db-2"]:
+        print("   OK: sin spread las réplicas comparten rack (caso a evitar).")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el escenario no reproduce el problema sin spread.")
+
+    for nombre, gang in (("réplicas", replicas), ("topology", topologia)):
+        if gang and gang.racks["db-1"] != gang.racks["db-2"] and gang.spread_violations == 0:
+            print(f"   OK: spread {nombre}: las réplicas quedan en racks distintos.")
+        else:
+            errores += 1
+            print(f"   ADVERTENCIA: spread {nombre} no separa las réplicas.")
+
+    if slice_suave and slice_suave.spread_violations == 1 and len(set(slice_suave.racks.values())) == 2:
+        print("   OK: spread slice no estricto usa ambos racks y reporta 1 violación.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: spread slice no estricto inesperado.")
+
+    if slice_estricto is None and estado.version == version:
+        print("   OK: spread slice estricto se rechaza sin modificar el estado.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: spread slice estricto debió rechazarse.")
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 11 (SPREAD POR RACK) ==")
+
+
+if __name__ == "__main__":
+    main()
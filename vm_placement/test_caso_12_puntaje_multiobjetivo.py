@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 12:
+Puntaje multiobjetivo (riesgo, fragmentación, disco, consolidación).
+
+Escenario (la misma pareja de hosts en AZ1 y en AZ2):
+- host-libre : casi ocioso (CPU 5 %, RAM 2 GiB, 15 GB de disco usados)
+- host-cpu   : CPU 40 %, RAM 2 GiB, 20 GB de disco usados
+- Un slice intensivo en RAM (2 vCPU, 8 GB de RAM).
+
+Objetivo:
+- El riesgo lo domina la RAM y empata; Minimax elige host-libre por tener
+  más disco, y ese host queda con CPU casi toda libre y RAM a la mitad
+  (sobrante desparejo).
+- Con peso de fragmentación en AZ1 se elige host-cpu (sobrantes parejos);
+  AZ2 solo tiene peso de riesgo y sigue eligiendo host-libre.
+- La política por defecto (solo riesgo) ordena igual que Minimax.
+- Un término desconocido en la configuración se rechaza.
+"""
+
+from cluster_state import ClusterState
+from vm_placement import SliceRequest
+from placement_engine import rank_placement_candidates
+from placement_scoring import ScoringPolicy
+
+
+def crear_nodo(nombre: str, zona: str, cpu_pct: float, disk_gb: float) -> dict:
+    return {
+        "id": nombre, "name": nombre, "platform": "linux", "zone": zona,
+        "cpu_capacity": {"value": 16, "unit": "cores"},
+        "ram_capacity": {"value": 16.0, "unit": "GiB"},
+        "disk_capacity": {"value": 100.0, "unit": "GB"},
+        "current_usage": {
+            "cpu": {"mean": cpu_pct, "std": 3.0, "unit": "%"},
+            "ram": {"mean": 2.0, "std": 0.3, "unit": "GiB"},
+            "disk": {"used": disk_gb, "unit": "GB"},
+        },
+    }
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 12 - PUNTAJE MULTIOBJETIVO")
+    print("=" * 78)
+
+    nodes = {}
+    for zona in ("AZ1", "AZ2"):
+        nodes[f"{zona}-libre"] = crear_nodo(f"{zona}-host-libre", zona, 5.0, 15.0)
+        nodes[f"{zona}-cpu"] = crear_nodo(f"{zona}-host-cpu", zona, 40.0, 20.0)
+
+    politica = ScoringPolicy.from_dict({
+        "default": {"risk": 1.0},
+        "zones": {"AZ1": {"risk": 1.0, "fragmentation": 1.0}},
+    })
+
+    errores = 0
+    print("\n[1] Host elegido por zona:")
+    for zona, esperado_minimax, esperado_puntaje in (
+        ("AZ1", "AZ1-host-libre", "AZ1-host-cpu"),
+        ("AZ2", "AZ2-host-libre", "AZ2-host-libre"),
+    ):
+        estado = ClusterState.from_nodes_status(nodes, zone=zona)
+        req = SliceRequest(cpu=2, ram_gb=8.0, disk_gb=10.0, zone=zona, platform="linux",
+                           user_profile="Investigador", technical_context="Cloud", max_failure_prob=0.05)
+        minimax = rank_placement_candidates(req, estado, 2)
+        puntaje = rank_placement_candidates(req, estado, 2, scoring=politica)
+        por_defecto = rank_placement_candidates(req, estado, 2, scoring=ScoringPolicy())
+
+        print(f"   {zona}: Minimax -> {minimax[0].host if minimax else None}, "
+              f"puntaje -> {puntaje[0].host if puntaje else None}")
+        for c in puntaje:
+            print(f"      {c.host:<16} riesgo={c.cluster_risk:.5f}  puntaje={c.score:.4f}")
+
+        if minimax and minimax[0].host == esperado_minimax:
+            print(f"   OK: Minimax elige {esperado_minimax}.")
+        else:
+            errores += 1
+            print(f"   ADVERTENCIA: Minimax debía elegir {esperado_minimax}.")
+
+        if puntaje and puntaje[0].host == esperado_puntaje:
+            print(f"   OK: con los pesos de {zona} se elige {esperado_puntaje}.")
+        else:
+            errores += 1
+            print(f"   ADVERTENCIA: con los pesos de {zona} se esperaba {esperado_puntaje}.")
+
+        if [c.host for c in por_defecto] == [c.host for c in minimax]:
+            print("   OK: la política por defecto ordena igual que Minimax.")
+        else:
+            errores += 1
+            print("   ADVERTENCIA: la política por defecto difiere de Minimax.")
+
+    print("\n[2] Configuración inválida:")
+    try:
+        ScoringPolicy({"risk": 1.0, "energia": 0.5})
+        errores += 1
+        print("   ADVERTENCIA: se aceptó un término desconocido.")
+    except ValueError as e:
+        print(f"   OK: {e}")
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 12 (PUNTAJE MULTIOBJETIVO) ==")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 13:
+Cola de admisión con reintento justo cuando no hay host viable.
+
+Escenario:
+- AZ1 con un solo host de 4 cores, ocupado por una asignación pendiente
+  grande (ledger), así que ningún slice nuevo pasa el filtro de riesgo.
+- En la cola: un Estudiante (t=0), un Profesor (t=200) y un Estudiante con
+  16 vCPU (t=210), con reloj simulado.
+
+Objetivo:
+- Orden de reevaluación por perfil + espera: el Estudiante que espera hace
+  más de 2 minutos pasa delante del Profesor recién llegado.
+- Sin cambios en el snapshot ni en el ledger no se repite la pasada.
+- Al liberar la asignación grande se colocan en bloque las solicitudes que
+  caben, en orden de prioridad, y quedan reservadas en el ledger.
+- Una solicitud que supera max_wait vence; cancelar retira de la cola.
+- Con dos zonas (AZ1 y AZ2 llenas): al liberar AZ2 se colocan la
+  solicitud sin zona (zone_mode=any) y la de AZ1 con zone_mode=preferred;
+  la de AZ1 "strict" sigue esperando y la de una zona inexistente no suma
+  intentos.
+- En la API, una solicitud sin zona encolada se coloca en AZ2 al llegar una
+  solicitud estricta de AZ1 (la cola se reevalúa contra el snapshot
+  completo) y su resultado informa zone_used y los candidatos de top_k.
+"""
+
+from dataclasses import replace
+
+from cluster_state import ClusterState
+from vm_placement import SliceRequest, compute_slice_mu_sigma
+from pending_ledger import PendingAllocationLedger
+from admission_queue import AdmissionQueue, PLACED, EXPIRED, QUEUED
+from decision_cache import DecisionCache
+import api_placement_handler as placement_api
+
+
+class RelojSimulado:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self) -> float:
+        return self.t
+
+
+class SnapshotFijo:
+    """Fuente de snapshot en memoria (misma interfaz que SharedSnapshotReader)."""
+
+    def __init__(self, state: ClusterState):
+        self.state = state
+        self.version = state.version
+
+    def current(self) -> ClusterState:
+        return self.state
+
+
+def crear_nodo(servidor: str = "server1", zona: str = "AZ1") -> dict:
+    return {
+        "id": servidor, "name": f"compute-node-{servidor}", "platform": "linux", "zone": zona,
+        "cpu_capacity": {"value": 4, "unit": "cores"},
+        "ram_capacity": {"value": 16.0, "unit": "GiB"},
+        "disk_capacity": {"value": 200.0, "unit": "GB"},
+        "current_usage": {
+            "cpu": {"mean": 10.0, "std": 5.0, "unit": "%"},
+            "ram": {"mean": 2.0, "std": 0.5, "unit": "GiB"},
+            "disk": {"used": 20.0, "unit": "GB"},
+        },
+    }
+
+
+def slice_de(perfil: str, cpu: int = 4) -> SliceRequest:
+    return SliceRequest(cpu=cpu, ram_gb=4.0, disk_gb=10.0, zone="AZ1", platform="linux",
+                        user_profile=perfil, technical_context="Cloud", max_failure_prob=0.05)
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 13 - COLA DE ADMISIÓN")
+    print("=" * 78)
+
+    reloj = RelojSimulado()
+    estado = ClusterState.from_nodes_status({"server1": crear_nodo()})
+    ledger = PendingAllocationLedger(ttl_seconds=3600, clock=reloj)
+    cola = AdmissionQueue(max_wait=900, result_ttl=1800, clock=reloj)
+
+    grande = SliceRequest(cpu=8, ram_gb=8.0, disk_gb=20.0, zone="AZ1",
+                          user_profile="Investigador", technical_context="HPC")
+    reserva = ledger.reserve([("compute-node-server1", compute_slice_mu_sigma(grande), grande.disk_gb)])
+
+    errores = 0
+    est_1 = cola.enqueue(slice_de("Estudiante"))
+    reloj.t = 200
+    prof = cola.enqueue(slice_de("Profesor"))
+    reloj.t = 210
+    est_2 = cola.enqueue(slice_de("Estudiante", cpu=16))
+
+    print("\n[1] Orden de la cola (t=210 s):")
+    orden = [e.queue_id for e in cola.pending()]
+    nombres = {est_1: "Estudiante (t=0)", prof: "Profesor (t=200)", est_2: "Estudiante (t=210)"}
+    for i, queue_id in enumerate(orden, 1):
+        print(f"   {i}. {nombres[queue_id]:<20} prioridad={cola.get(queue_id).priority(reloj.t):.2f}")
+    if orden == [est_1, prof, est_2]:
+        print("   OK: el Estudiante que más espera pasa delante del Profesor.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: orden inesperado.")
+
+    print("\n[2] Reevaluación sin capacidad:")
+    colocadas = cola.reevaluate(estado, ledger)
+    intentos = cola.get(prof).attempts
+    cola.reevaluate(estado, ledger)
+    print(f"   colocadas={len(colocadas)}  intentos del Profesor={cola.get(prof).attempts}")
+    if not colocadas and intentos == 1 and cola.get(prof).attempts == 1:
+        print("   OK: sin cambios en snapshot/ledger no se repite la pasada.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: se repitió la pasada o se colocó sin capacidad.")
+
+    print("\n[3] Liberar la asignación grande:")
+    reloj.t = 300
+    ledger.release(reserva)
+    colocadas = cola.reevaluate(estado, ledger)
+    for e in colocadas:
+        print(f"   {nombres[e.queue_id]:<20} -> {e.decision.host} (allocation {e.allocation_id[:8]})")
+    esperadas = [est_1, prof]
+    if [e.queue_id for e in colocadas] == esperadas and len(ledger) == 2 and len(cola) == 1:
+        print("   OK: se colocan en bloque las que caben, en orden de prioridad.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: colocación en bloque inesperada.")
+
+    print("\n[4] Vencimiento y cancelación:")
+    reloj.t = 210 + 900
+    cola.reevaluate(estado, ledger)
+    vencida = cola.get(est_2).status
+    otra = cola.enqueue(slice_de("Profesor"))
+    cancelada = cola.cancel(otra)
+    print(f"   Estudiante (t=210): {vencida}   cancelar otra solicitud: {cancelada}")
+    if vencida == EXPIRED and cancelada and len(cola) == 0 and cola.get(prof).status == PLACED:
+        print("   OK: vence tras max_wait y la cancelación la retira de la cola.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: vencimiento o cancelación inesperados.")
+
+    print("\n[5] Dos zonas: solicitudes sin zona y zone_mode=preferred:")
+    reloj.t = 2000
+    estado = ClusterState.from_nodes_status({"server1": crear_nodo(), "server2": crear_nodo("server2", "AZ2")})
+    ledger = PendingAllocationLedger(ttl_seconds=3600, clock=reloj)
+    cola = AdmissionQueue(clock=reloj)
+    reservas = {h: ledger.reserve([(h, compute_slice_mu_sigma(grande), grande.disk_gb)])
+                for h in ("compute-node-server1", "compute-node-server2")}
+    sin_zona = cola.enqueue(replace(slice_de("Profesor"), zone=None), zone_mode="any", top_k=2)
+    preferida = cola.enqueue(slice_de("Profesor"), zone_mode="preferred")
+    estricta = cola.enqueue(slice_de("Profesor"))
+    inexistente = cola.enqueue(replace(slice_de("Profesor"), zone="AZ9"))
+    cola.reevaluate(estado, ledger)
+    intentos = {q: cola.get(q).attempts for q in (sin_zona, preferida, estricta, inexistente)}
+    ledger.release(reservas["compute-node-server2"])
+    reloj.t = 2010
+    colocadas = {e.queue_id: e.decision.host for e in cola.reevaluate(estado, ledger)}
+    print(f"   intentos sin capacidad: {list(intentos.values())}; colocadas tras liberar AZ2: "
+          f"{sorted(colocadas.values())}; AZ1 strict: {cola.get(estricta).status}, "
+          f"AZ9: {cola.get(inexistente).attempts} intento(s)")
+    if (list(intentos.values()) == [1, 1, 1, 0] and set(colocadas) == {sin_zona, preferida}
+            and cola.get(sin_zona).decision.availability_zone == "AZ2"
+            and cola.get(estricta).status == QUEUED and cola.get(inexistente).attempts == 0):
+        print("   OK: sin zona y preferred buscan en todo el clúster; strict espera su zona.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: las solicitudes sin zona o preferred no se reintentaron en AZ2.")
+
+    print("\n[6] API: cola reevaluada contra el snapshot completo:")
+    placement_api.SNAPSHOT_READER = SnapshotFijo(estado)
+    placement_api.LEDGER = ledger = PendingAllocationLedger(ttl_seconds=3600)
+    placement_api.ADMISSION_QUEUE = cola = AdmissionQueue()
+    placement_api.DECISION_CACHE = DecisionCache()
+    reservas = {h: ledger.reserve([(h, compute_slice_mu_sigma(grande), grande.disk_gb)])
+                for h in ("compute-node-server1", "compute-node-server2")}
+    cliente = placement_api.app.test_client()
+    pedido = {"cpu": 4, "ram_gb": 4.0, "disk_gb": 10.0, "platform": "linux", "user_profile": "Profesor",
+              "technical_context": "Cloud", "max_failure_prob": 0.05}
+    encolada = cliente.post("/api/v1/placement?queue=true&zone_mode=any&top_k=2", json=pedido)
+    queue_id = encolada.get_json().get("queue_id")
+    ledger.release(reservas["compute-node-server2"])      # sin pasar por DELETE: no reevalúa
+    estricta = cliente.post("/api/v1/placement", json=dict(pedido, zone="AZ1"))
+    resultado = cliente.get(f"/api/v1/placement/queue/{queue_id}").get_json()
+    print(f"   encolada -> {encolada.status_code}; AZ1 strict -> {estricta.status_code}; "
+          f"cola: {resultado.get('status')} en {resultado.get('zone_used')} "
+          f"({len(resultado.get('candidates', []))} candidato(s))")
+    if (encolada.status_code == 202 and estricta.status_code == 409 and resultado["status"] == PLACED
+            and resultado["zone_used"] == "AZ2" and len(resultado["candidates"]) == 1):
+        print("   OK: la solicitud sin zona se coloca en AZ2 aunque la nueva sea estricta de AZ1.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: la cola se evaluó solo contra la zona de la solicitud nueva.")
+    placement_api.SNAPSHOT_READER = None
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 13 (COLA DE ADMISIÓN) ==")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 14:
+Modo plan (asignación conjunta de un lote con presupuesto de tiempo).
+
+Escenario:
+- AZ1 con host-libre (CPU 5 %) y host-medio (CPU 45 %), 8 cores cada uno.
+- Lote en este orden: 2 slices Estudiante pequeños y 1 slice Investigador
+  grande que solo cabe en host-libre.
+
+Objetivo:
+- Minimax voraz pone los pequeños en host-libre (menor riesgo) y el grande
+  ya no cabe: capacidad varada.
+- Branch-and-bound admite los 3 (un pequeño pasa a host-medio), prueba el
+  óptimo y el riesgo final de cada host respeta el MP de todos sus slices.
+- Con method="milp" sin PuLP instalado se usa branch-and-bound.
+- Con presupuesto 0 se devuelve al menos el plan voraz.
+- El snapshot no se modifica.
+- Los slices del archivo del CLI leen sla_overcommit_*_pct igual que la API:
+  siempre un ratio en [1, 10]; 50, 150 o 0.5 se rechazan (400 en la API) en
+  lugar de reinterpretarse o recortarse. POST /api/v1/placement/plan con
+  JSON malformado -> 400.
+"""
+
+import numpy as np
+
+import api_placement_handler as placement_api
+from cluster_state import ClusterState
+from vm_placement import SliceRequest, compute_slice_mu_sigma
+from plan_placement import plan_placement, pulp, slice_from_dict
+from placement_engine import place_batch, host_risk
+
+
+def crear_nodo(nombre: str, cpu_pct: float) -> dict:
+    return {
+        "id": nombre, "name": nombre, "platform": "linux", "zone": "AZ1",
+        "cpu_capacity": {"value": 8, "unit": "cores"},
+        "ram_capacity": {"value": 32.0, "unit": "GiB"},
+        "disk_capacity": {"value": 200.0, "unit": "GB"},
+        "current_usage": {
+            "cpu": {"mean": cpu_pct, "std": 4.0, "unit": "%"},
+            "ram": {"mean": 4.0, "std": 0.5, "unit": "GiB"},
+            "disk": {"used": 20.0, "unit": "GB"},
+        },
+    }
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 14 - MODO PLAN (LOTE CONJUNTO)")
+    print("=" * 78)
+
+    nodes = {"host-libre": crear_nodo("host-libre", 5.0), "host-medio": crear_nodo("host-medio", 45.0)}
+    estado = ClusterState.from_nodes_status(nodes)
+    version = estado.version
+
+    pequeno = SliceRequest(cpu=8, ram_gb=2.0, disk_gb=5.0, zone="AZ1", platform="linux",
+                           user_profile="Estudiante", technical_context="Cloud", max_failure_prob=0.05)
+    grande = SliceRequest(cpu=8, ram_gb=8.0, disk_gb=10.0, zone="AZ1", platform="linux",
+                          user_profile="Investigador", technical_context="Cloud", max_failure_prob=0.05)
+    lote = [pequeno, pequeno, grande]
+
+    errores = 0
+
+    print("\n[1] Voraz (place_batch) vs plan:")
+    voraz = place_batch(lote, estado.copy())
+    plan = plan_placement(lote, estado, method="branch_and_bound", time_budget=5.0)
+    print(f"   voraz : {[d.host if d else None for d in voraz]}")
+    print(f"   plan  : {[d.host if d else None for d in plan.decisions]}")
+    print(f"   admitidos {plan.admitted}/{plan.total} (voraz {plan.greedy_admitted}), "
+          f"método {plan.method}, óptimo={plan.optimal}, nodos={plan.nodes_explored}")
+
+    if sum(d is not None for d in voraz) == 2 and plan.greedy_admitted == 2:
+        print("   OK: el voraz deja varado el slice grande (igual que place_batch).")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el escenario no reproduce la capacidad varada.")
+
+    if plan.admitted == 3 and plan.optimal and plan.method == "branch_and_bound":
+        print("   OK: branch-and-bound admite los 3 slices y prueba el óptimo.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el plan no admite los 3 slices.")
+
+    print("\n[2] Riesgo final por host con el plan aplicado:")
+    final = estado.copy()
+    for req, d in zip(lote, plan.decisions):
+        if d:
+            final.apply_slice(d.host, compute_slice_mu_sigma(req), req.disk_gb)
+    riesgos = host_risk(final)
+    for nombre, r in zip(final.names, riesgos):
+        print(f"   {nombre:<12} {r:.5f}")
+    if np.all(riesgos <= 0.05):
+        print("   OK: ningún host supera el MP de sus slices.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: algún host supera el MP.")
+
+    print("\n[3] Respaldo y presupuesto:")
+    milp = plan_placement(lote, estado, method="milp", time_budget=5.0)
+    sin_tiempo = plan_placement(lote, estado, method="branch_and_bound", time_budget=0.0)
+    print(f"   milp (PuLP {'instalado' if pulp else 'ausente'}): {milp.admitted} admitidos con {milp.method}")
+    print(f"   presupuesto 0: {sin_tiempo.admitted} admitidos con {sin_tiempo.method}")
+    if milp.admitted == 3:
+        print("   OK: method=milp también admite los 3 slices.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: method=milp no encontró el plan.")
+    if sin_tiempo.admitted >= plan.greedy_admitted:
+        print("   OK: sin presupuesto se devuelve al menos el plan voraz.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: sin presupuesto el plan es peor que el voraz.")
+
+    if estado.version == version:
+        print("   OK: el snapshot no se modifica.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el plan modificó el snapshot.")
+
+    print("\n[4] Entrada del plan (CLI y endpoint):")
+    entrada = {"cpu": 2, "ram_gb": 2.0, "disk_gb": 5.0, "zone": "AZ1"}
+
+    def leer_cli(item):
+        try:
+            return slice_from_dict(item).cpu_overcommit
+        except ValueError:
+            return None
+
+    def leer_api(item):
+        slice_req = placement_api.parse_slice_request(item)
+        return slice_req.cpu_overcommit if slice_req else None
+
+    ratios = []
+    for valor in (1.5, 10, None, 50, 150, 0.5):
+        item = dict(entrada, sla_overcommit_cpu_pct=valor)
+        ratios.append((leer_cli(item), leer_api(item)))
+    cliente = placement_api.app.test_client()
+    fuera_de_rango = cliente.post("/api/v1/placement", json=dict(entrada, sla_overcommit_cpu_pct=50)).status_code
+    malformado = cliente.post(
+        "/api/v1/placement/plan", data="{no es json", content_type="application/json"
+    ).status_code
+    print(f"   (CLI, API) para 1.5 / 10 / sin valor / 50 / 150 / 0.5: {ratios}")
+    print(f"   POST /placement con 50 -> {fuera_de_rango}; JSON malformado -> {malformado}")
+    if (ratios == [(1.5, 1.5), (10.0, 10.0), (1.0, 1.0)] + [(None, None)] * 3
+            and fuera_de_rango == 400 and malformado == 400):
+        print("   OK: el overcommit es siempre un ratio; fuera de [1, 10] se rechaza (400), sin recortar.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el overcommit se reinterpretó o recortó, o el CLI y la API difieren.")
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 14 (MODO PLAN) ==")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 15:
+Snapshot del clúster compartido entre procesos (mmap).
+
+Escenario:
+- Clúster de 40 hosts en 2 zonas (AZ1 / AZ2) con cargas variadas.
+- El snapshot se publica en un directorio temporal y se lee con
+  SharedSnapshotReader, en este proceso y en 3 procesos hijos.
+
+Objetivo:
+- El estado mapeado es idéntico al original y sus columnas son de solo
+  lectura (sin copias).
+- Las decisiones sobre el estado mapeado son las mismas que sobre el parseado,
+  también en los procesos hijos.
+- Una publicación nueva cambia de versión sin invalidar el estado anterior ya
+  mapeado, y solo se conservan las últimas `keep` versiones.
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+import numpy as np
+
+from cluster_state import ClusterState, FLOAT_COLUMNS, BOOL_COLUMNS
+from vm_placement import SliceRequest
+from placement_engine import decide_vm_placement_vectorized
+from shared_snapshot import SharedSnapshotWriter, SharedSnapshotReader
+
+SOLICITUDES = [
+    SliceRequest(cpu=c, ram_gb=r, disk_gb=10.0, zone=z, platform="linux",
+                 user_profile="Estudiante", technical_context="Cloud", max_failure_prob=0.05)
+    for c, r, z in [(2, 4.0, "AZ1"), (4, 8.0, "AZ2"), (1, 2.0, "AZ1"), (8, 16.0, "AZ2")]
+]
+
+
+def crear_nodos(n: int, semilla: int) -> dict:
+    rng = np.random.default_rng(semilla)
+    nodes = {}
+    for i in range(n):
+        nombre = f"host-{i:02d}"
+        nodes[nombre] = {
+            "id": nombre, "name": nombre, "platform": "linux", "zone": "AZ1" if i % 2 else "AZ2",
+            "cpu_capacity": {"value": 16, "unit": "cores"},
+            "ram_capacity": {"value": 64.0, "unit": "GiB"},
+            "disk_capacity": {"value": 500.0, "unit": "GB"},
+            "current_usage": {
+                "cpu": {"mean": float(rng.uniform(5, 70)), "std": float(rng.uniform(1, 8)), "unit": "%"},
+                "ram": {"mean": float(rng.uniform(4, 40)), "std": float(rng.uniform(0.5, 4)), "unit": "GiB"},
+                "disk": {"used": float(rng.uniform(20, 300)), "unit": "GB"},
+            },
+        }
+    return nodes
+
+
+def decidir(state: ClusterState) -> list:
+    decisiones = []
+    for req in SOLICITUDES:
+        d = decide_vm_placement_vectorized(req, state.subset(state.rows_for(req.zone)))
+        decisiones.append((d.host, d.reason) if d else None)
+    return decisiones
+
+
+def _worker(directorio: str, salida) -> None:
+    lector = SharedSnapshotReader(directorio)
+    decisiones = decidir(lector.current())
+    salida.put((os.getpid(), lector.version, decisiones))
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 15 - SNAPSHOT COMPARTIDO (MMAP)")
+    print("=" * 78)
+
+    errores = 0
+    original = ClusterState.from_nodes_status(crear_nodos(40, 7))
+
+    with tempfile.TemporaryDirectory() as directorio:
+        escritor = SharedSnapshotWriter(directorio, keep=2)
+        v1 = escritor.publish(original)
+        lector = SharedSnapshotReader(directorio)
+        mapeado = lector.current()
+
+        print("\n[1] Estado mapeado vs original:")
+        iguales = (
+            mapeado.names == original.names
+            and mapeado.zone_names == original.zone_names
+            and all(np.array_equal(getattr(mapeado, c), getattr(original, c))
+                    for c in FLOAT_COLUMNS + BOOL_COLUMNS)
+            and np.array_equal(mapeado.zone_codes, original.zone_codes)
+        )
+        if iguales and lector.version == v1:
+            print(f"   OK: versión {v1}, {len(mapeado)} hosts y todas las columnas idénticas.")
+        else:
+            errores += 1
+            print("   ADVERTENCIA: el estado mapeado no coincide con el original.")
+
+        if not mapeado.mu_cpu.flags.writeable and not mapeado.mu_cpu.flags.owndata:
+            print("   OK: columnas de solo lectura y sin copia (vista del mmap).")
+        else:
+            errores += 1
+            print("   ADVERTENCIA: las columnas mapeadas se pueden escribir o son copias.")
+
+        if lector.current() is mapeado:
+            print("   OK: sin versión nueva se reutiliza el mismo ClusterState.")
+        else:
+            errores += 1
+            print("   ADVERTENCIA: se volvió a mapear sin cambio de versión.")
+
+        print("\n[2] Decisiones:")
+        esperadas = decidir(original)
+        print(f"   {esperadas}")
+        if decidir(mapeado) == esperadas:
+            print("   OK: las decisiones sobre el snapshot mapeado son idénticas.")
+        else:
+            errores += 1
+            print("   ADVERTENCIA: las decisiones difieren.")
+
+        copia = mapeado.copy()
+        copia.apply_slice(copia.names[0], {"cpu": (1.0, 0.1), "ram": (1.0, 0.1)}, 5.0)
+        print("   OK: .copy() permite modificar el estado sin tocar el snapshot.")
+
+        print("\n[3] Workers en procesos separados:")
+        ctx = multiprocessing.get_context("fork")
+        salida = ctx.Queue()
+        procesos = [ctx.Process(target=_worker, args=(directorio, salida)) for _ in range(3)]
+        for p in procesos:
+            p.start()
+        resultados = [salida.get(timeout=30) for _ in procesos]
+        for p in procesos:
+            p.join()
+        for pid, version, decisiones in resultados:
+            print(f"   pid {pid}: versión {version}")
+        if all(version == v1 and decisiones == esperadas for _, version, decisiones in resultados):
+            print("   OK: los 3 workers leen la misma versión y deciden lo mismo.")
+        else:
+            errores += 1
+            print("   ADVERTENCIA: algún worker leyó otra versión o decidió distinto.")
+
+        print("\n[4] Cambio de versión y limpieza:")
+        nuevo = ClusterState.from_nodes_status(crear_nodos(40, 8))
+        v2 = escritor.publish(nuevo)
+        v3 = escritor.publish(nuevo)
+        actual = lector.current()
+        archivos = sorted(f for f in os.listdir(directorio) if f.endswith(".bin"))
+        print(f"   versiones publicadas {v1}, {v2}, {v3}; en disco: {archivos}")
+
+        if lector.version == v3 and actual is not mapeado and np.array_equal(actual.mu_cpu, nuevo.mu_cpu):
+            print("   OK: el lector pasa a la última versión.")
+        else:
+            errores += 1
+            print("   ADVERTENCIA: el lector no tomó la versión nueva.")
+        if decidir(mapeado) == esperadas:
+            print("   OK: el estado de la versión anterior sigue usable tras borrarse su archivo.")
+        else:
+            errores += 1
+            print("   ADVERTENCIA: el estado anterior dejó de ser válido.")
+        if archivos == [f"snapshot_v{v2}.bin", f"snapshot_v{v3}.bin"]:
+            print("   OK: solo se conservan las últimas 2 versiones.")
+        else:
+            errores += 1
+            print("   ADVERTENCIA: la limpieza de versiones no es la esperada.")
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 15 (SNAPSHOT COMPARTIDO) ==")
+
+
+if __name__ == "__main__":
+    main()
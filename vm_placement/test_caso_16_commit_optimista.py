@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 16:
+Commit optimista de decisiones concurrentes (generación por host + CAS).
+
+Escenario:
+- AZ1 con host-a (CPU 5 %) y host-b (CPU 15 %), 8 cores cada uno: a cada uno
+  le cabe UN slice Investigador de 8 vCPU con MP = 0.05 (dos lo superan).
+- Dos workers deciden sobre el mismo snapshot + ledger y ambos eligen host-a.
+
+Objetivo:
+- El primer commit se confirma; el segundo detecta el conflicto (host-a
+  cambió de generación y ya no es viable) y no reserva. Sin CAS host-a
+  quedaría muy por encima del MP.
+- place_optimistic reintenta localmente y coloca el segundo en host-b.
+- Si el host cambió pero sigue siendo viable (slices pequeños) el commit se
+  confirma tras re-validar, sin reintento.
+- Un snapshot nuevo obliga a re-validar aunque la generación no cambie.
+- Con 12 hilos en paralelo sobre 8 hosts se colocan exactamente 8 slices y
+  ningún host supera el MP.
+"""
+
+import threading
+
+import numpy as np
+
+from cluster_state import ClusterState
+from vm_placement import SliceRequest, compute_slice_mu_sigma
+from pending_ledger import PendingAllocationLedger
+from placement_engine import decide_vm_placement_vectorized, host_risk
+from optimistic_commit import PlacementTicket, commit_placement, place_optimistic
+
+MP = 0.05
+
+
+def crear_nodo(nombre: str, cpu_pct: float) -> dict:
+    return {
+        "id": nombre, "name": nombre, "platform": "linux", "zone": "AZ1",
+        "cpu_capacity": {"value": 8, "unit": "cores"},
+        "ram_capacity": {"value": 32.0, "unit": "GiB"},
+        "disk_capacity": {"value": 200.0, "unit": "GB"},
+        "current_usage": {
+            "cpu": {"mean": cpu_pct, "std": 4.0, "unit": "%"},
+            "ram": {"mean": 4.0, "std": 0.5, "unit": "GiB"},
+            "disk": {"used": 20.0, "unit": "GB"},
+        },
+    }
+
+
+def crear_slice(perfil: str) -> SliceRequest:
+    return SliceRequest(cpu=8, ram_gb=8.0, disk_gb=5.0, zone="AZ1", platform="linux",
+                        user_profile=perfil, technical_context="Cloud", max_failure_prob=MP)
+
+
+def decidir(req: SliceRequest):
+    return lambda vista: decide_vm_placement_vectorized(req, vista)
+
+
+def riesgo_final(estado: ClusterState, ledger: PendingAllocationLedger) -> np.ndarray:
+    return host_risk(ledger.apply_to(estado))
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 16 - COMMIT OPTIMISTA (CAS POR HOST)")
+    print("=" * 78)
+
+    errores = 0
+    estado = ClusterState.from_nodes_status({"host-a": crear_nodo("host-a", 5.0), "host-b": crear_nodo("host-b", 15.0)})
+    grande = crear_slice("Investigador")
+
+    print("\n[1] Dos workers deciden sobre el mismo estado:")
+    ledger = PendingAllocationLedger()
+    generaciones = ledger.generations()
+    vista = ledger.apply_to(estado)
+    d1 = decide_vm_placement_vectorized(grande, vista)
+    d2 = decide_vm_placement_vectorized(grande, vista)
+    print(f"   worker 1 -> {d1.host}, worker 2 -> {d2.host}")
+
+    a1 = commit_placement(PlacementTicket.for_decision(grande, d1, estado.version, generaciones), ledger, estado)
+    a2 = commit_placement(PlacementTicket.for_decision(grande, d2, estado.version, generaciones), ledger, estado)
+    print(f"   commit 1: {a1 is not None}, commit 2: {a2 is not None} (generación host-a = {ledger.generation('host-a')})")
+    if a1 is not None and a2 is None:
+        print("   OK: el segundo commit detecta el conflicto y no reserva.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el segundo commit no detectó el conflicto.")
+
+    sin_cas = estado.copy()
+    for d in (d1, d2):
+        sin_cas.apply_slice(d.host, compute_slice_mu_sigma(grande), grande.disk_gb)
+    print(f"   sin CAS el riesgo de host-a sería {host_risk(sin_cas)[0]:.4f} (MP = {MP})")
+
+    print("\n[2] Reintento local del worker 2:")
+    decision, allocation_id, conflictos = place_optimistic(
+        grande, estado, ledger, decidir(grande), d2, generaciones
+    )
+    riesgos = riesgo_final(estado, ledger)
+    print(f"   -> {decision.host if decision else None} tras {conflictos} conflicto(s); "
+          f"riesgos finales {np.round(riesgos, 4).tolist()}")
+    if decision is not None and decision.host == "host-b" and conflictos == 1 and np.all(riesgos <= MP):
+        print("   OK: el slice se coloca en host-b y ningún host supera el MP.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el reintento no encontró host-b.")
+
+    print("\n[3] Host cambiado pero todavía viable:")
+    pequeno = crear_slice("Profesor")
+    ledger = PendingAllocationLedger()
+    generaciones = ledger.generations()
+    vista = ledger.apply_to(estado)
+    d1 = decide_vm_placement_vectorized(pequeno, vista)
+    d2 = decide_vm_placement_vectorized(pequeno, vista)
+    r1 = place_optimistic(pequeno, estado, ledger, decidir(pequeno), d1, generaciones)
+    r2 = place_optimistic(pequeno, estado, ledger, decidir(pequeno), d2, generaciones)
+    print(f"   {r1[0].host} y {r2[0].host}; conflictos {r1[2]} y {r2[2]}")
+    if r1[0].host == r2[0].host == "host-a" and r2[2] == 0 and np.all(riesgo_final(estado, ledger) <= MP):
+        print("   OK: el segundo se confirma tras re-validar host-a, sin reintento.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: la re-validación no se comportó como se esperaba.")
+
+    print("\n[4] Snapshot nuevo con la misma generación:")
+    ledger = PendingAllocationLedger()
+    generaciones = ledger.generations()
+    d = decide_vm_placement_vectorized(grande, ledger.apply_to(estado))
+    cargado = ClusterState.from_nodes_status({"host-a": crear_nodo("host-a", 60.0), "host-b": crear_nodo("host-b", 15.0)})
+    ticket = PlacementTicket.for_decision(grande, d, estado.version, generaciones)
+    if d.host == "host-a" and commit_placement(ticket, ledger, cargado) is None:
+        print("   OK: host-a ya no es viable en el snapshot nuevo; no se reserva.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: se confirmó contra un snapshot desactualizado.")
+
+    print("\n[5] 12 hilos en paralelo sobre 8 hosts (1 slice por host):")
+    cluster = ClusterState.from_nodes_status({f"h{i}": crear_nodo(f"h{i}", 5.0) for i in range(8)})
+    ledger = PendingAllocationLedger()
+    barrera = threading.Barrier(12)
+    resultados = []
+
+    def worker():
+        barrera.wait()
+        resultados.append(place_optimistic(grande, cluster, ledger, decidir(grande), retries=8))
+
+    hilos = [threading.Thread(target=worker) for _ in range(12)]
+    for h in hilos:
+        h.start()
+    for h in hilos:
+        h.join()
+
+    colocados = [r[0].host for r in resultados if r[0] is not None]
+    conflictos = sum(r[2] for r in resultados)
+    riesgos = riesgo_final(cluster, ledger)
+    print(f"   colocados {len(colocados)} en {len(set(colocados))} hosts, {conflictos} conflicto(s), "
+          f"riesgo máximo {riesgos.max():.4f}")
+    if len(colocados) == 8 and len(set(colocados)) == 8 and np.all(riesgos <= MP):
+        print("   OK: un slice por host y ningún host supera el MP.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: la concurrencia dejó hosts por encima del MP o sin usar.")
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 16 (COMMIT OPTIMISTA) ==")
+
+
+if __name__ == "__main__":
+    main()
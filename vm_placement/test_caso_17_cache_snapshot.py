@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 17:
+Cache del snapshot de /nodes/status (TTL, ETag, stale-while-revalidate).
+
+Escenario:
+- metrics_api.py (raíz del repositorio) corre en un hilo sirviendo un
+  nodes_status.json de 2 hosts desde un directorio temporal.
+- NodesStatusCache apunta a su /nodes/status con TTL de 0.3 s.
+
+Objetivo:
+- La primera consulta descarga el JSON; dentro del TTL no hay más consultas.
+- La revalidación con el archivo sin cambios recibe 304 y conserva la misma
+  versión del ClusterState.
+- Con el archivo modificado se instala una versión nueva.
+- Vencido el TTL se responde al instante con el snapshot anterior y la
+  revalidación ocurre en segundo plano.
+- Con metrics_api caída se sigue usando el último snapshot y su antigüedad
+  crece.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+from nodes_status_cache import NodesStatusCache
+
+# metrics_api.py está en la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import metrics_api  # noqa: E402
+
+TTL = 0.3
+
+
+def crear_nodo(nombre: str, cpu_pct: float) -> dict:
+    return {
+        "id": nombre, "name": nombre, "platform": "linux", "zone": "AZ1",
+        "cpu_capacity": {"value": 8, "unit": "cores"},
+        "ram_capacity": {"value": 32.0, "unit": "GiB"},
+        "disk_capacity": {"value": 200.0, "unit": "GB"},
+        "current_usage": {
+            "cpu": {"mean": cpu_pct, "std": 4.0, "unit": "%"},
+            "ram": {"mean": 4.0, "std": 0.5, "unit": "GiB"},
+            "disk": {"used": 20.0, "unit": "GB"},
+        },
+    }
+
+
+def escribir_nodos(cpu_pct: float, mtime: float) -> None:
+    with open("nodes_status.json", "w") as f:
+        json.dump({"host-a": crear_nodo("host-a", cpu_pct), "host-b": crear_nodo("host-b", 30.0)}, f)
+    os.utime("nodes_status.json", (mtime, mtime))
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 17 - CACHE DEL SNAPSHOT (TTL / ETAG)")
+    print("=" * 78)
+
+    errores = 0
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directorio:
+        os.chdir(directorio)
+        escribir_nodos(10.0, time.time() - 60)
+        servidor = make_server("127.0.0.1", 0, metrics_api.app, threaded=True)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        cache = NodesStatusCache(f"http://127.0.0.1:{servidor.server_port}/nodes/status", ttl=TTL)
+
+        try:
+            print("\n[1] Primera consulta y reutilización dentro del TTL:")
+            t0 = time.perf_counter()
+            estado = cache.current()
+            primera = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            for _ in range(100):
+                cache.current()
+            en_cache = (time.perf_counter() - t0) / 100
+            print(f"   {len(estado)} hosts; descarga+parseo {primera * 1000:.1f} ms, "
+                  f"desde la cache {en_cache * 1e6:.1f} µs; stats {cache.stats()}")
+            if len(estado) == 2 and cache.stats()["requests"] == 1:
+                print("   OK: 101 lecturas con una sola consulta a metrics_api.")
+            else:
+                errores += 1
+                print("   ADVERTENCIA: la cache volvió a consultar dentro del TTL.")
+
+            print("\n[2] Revalidación sin cambios (ETag / If-Modified-Since):")
+            cambio = cache.refresh()
+            if not cambio and cache.stats()["not_modified"] == 1 and cache.current() is estado:
+                print("   OK: 304 Not Modified; mismo ClusterState (misma versión).")
+            else:
+                errores += 1
+                print(f"   ADVERTENCIA: se esperaba 304 ({cache.stats()}).")
+
+            print("\n[3] Archivo modificado:")
+            escribir_nodos(60.0, time.time())
+            if cache.refresh() and cache.current() is not estado and cache.version != estado.version:
+                print(f"   OK: versión nueva v{cache.version} ({cache.stats()['updates']} actualizaciones).")
+            else:
+                errores += 1
+                print("   ADVERTENCIA: no se detectó el cambio del archivo.")
+
+            print("\n[4] TTL vencido: stale-while-revalidate:")
+            escribir_nodos(20.0, time.time() + 5)
+            anterior = cache.current()
+            time.sleep(TTL + 0.05)
+            t0 = time.perf_counter()
+            servido = cache.current()
+            demora = time.perf_counter() - t0
+            time.sleep(0.5)
+            print(f"   respuesta en {demora * 1e6:.0f} µs con v{servido.version}; después: v{cache.version}")
+            if servido is anterior and cache.current() is not anterior:
+                print("   OK: se sirvió el snapshot anterior y la versión nueva llegó en segundo plano.")
+            else:
+                errores += 1
+                print("   ADVERTENCIA: la revalidación en segundo plano no se comportó como se esperaba.")
+        finally:
+            servidor.shutdown()
+            os.chdir(cwd)
+
+        print("\n[5] metrics_api caída:")
+        ultimo = cache.current()
+        time.sleep(TTL + 0.05)
+        servido = cache.current()
+        time.sleep(0.5)
+        estado_cache = cache.status()
+        print(f"   status: {estado_cache}")
+        if servido is ultimo and cache.current() is ultimo and estado_cache["errors"] >= 1 and estado_cache["stale"]:
+            print("   OK: se sigue usando el último snapshot y se informa su antigüedad.")
+        else:
+            errores += 1
+            print("   ADVERTENCIA: la cache perdió el snapshot con metrics_api caída.")
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 17 (CACHE DEL SNAPSHOT) ==")
+
+
+if __name__ == "__main__":
+    main()
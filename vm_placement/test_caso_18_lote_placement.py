@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 18:
+Endpoint POST /api/v1/placement/batch (orden y fallas parciales).
+
+Escenario:
+- Snapshot fijo: AZ1 con host-a (CPU 5 %) y host-b (CPU 15 %), AZ2 con
+  host-c; 8 cores cada uno. A cada host de AZ1 le cabe UN slice
+  Investigador de 6 vCPU con el MP por defecto (0.01).
+- Lote de 6 solicitudes mezclando zonas: tres Investigador en AZ1, una sin
+  campos requeridos, una en una zona sin workers (AZ9) y una pequeña en AZ2.
+
+Objetivo:
+- "results" trae una entrada por solicitud, en el orden recibido y con su
+  "index", aunque el lote se procese agrupado por zona.
+- Las solicitudes se colocan en orden sobre el mismo snapshot: la primera
+  toma host-a, la segunda ve esa carga y va a host-b, la tercera ya no cabe.
+- Las fallas (JSON inválido, zona sin workers, sin host viable) quedan en su
+  índice sin abortar el resto del lote; "placed" cuenta solo las colocadas
+  y cada una queda reservada en el ledger.
+- Un lote posterior ve las reservas del anterior.
+- Lista vacía o JSON malformado -> 400.
+"""
+
+import api_placement_handler as placement_api
+from cluster_state import ClusterState
+from pending_ledger import PendingAllocationLedger
+from decision_cache import DecisionCache
+
+
+class SnapshotFijo:
+    """Fuente de snapshot en memoria (misma interfaz que SharedSnapshotReader)."""
+
+    def __init__(self, state: ClusterState):
+        self.state = state
+        self.version = state.version
+
+    def current(self) -> ClusterState:
+        return self.state
+
+
+def crear_nodo(nombre: str, zona: str, cpu_pct: float) -> dict:
+    return {
+        "id": nombre, "name": nombre, "platform": "linux", "zone": zona,
+        "cpu_capacity": {"value": 8, "unit": "cores"},
+        "ram_capacity": {"value": 32.0, "unit": "GiB"},
+        "disk_capacity": {"value": 200.0, "unit": "GB"},
+        "current_usage": {
+            "cpu": {"mean": cpu_pct, "std": 4.0, "unit": "%"},
+            "ram": {"mean": 4.0, "std": 0.5, "unit": "GiB"},
+            "disk": {"used": 20.0, "unit": "GB"},
+        },
+    }
+
+
+GRANDE = {"cpu": 6, "ram_gb": 8.0, "disk_gb": 5.0, "zone": "AZ1", "platform": "linux",
+          "user_profile": "Investigador", "technical_context": "Cloud"}
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 18 - PLACEMENT POR LOTES (ORDEN Y FALLAS PARCIALES)")
+    print("=" * 78)
+
+    estado = ClusterState.from_nodes_status({
+        "host-a": crear_nodo("host-a", "AZ1", 5.0),
+        "host-b": crear_nodo("host-b", "AZ1", 15.0),
+        "host-c": crear_nodo("host-c", "AZ2", 10.0),
+    })
+    placement_api.SNAPSHOT_READER = SnapshotFijo(estado)
+    placement_api.LEDGER = PendingAllocationLedger()
+    placement_api.DECISION_CACHE = DecisionCache()
+    cliente = placement_api.app.test_client()
+    errores = 0
+
+    lote = [
+        GRANDE,
+        {"cpu": 1, "ram_gb": 1.0},                              # faltan disk_gb y zone
+        GRANDE,
+        dict(GRANDE, zone="AZ9"),                               # zona sin workers
+        GRANDE,                                                 # AZ1 ya no tiene espacio
+        dict(GRANDE, zone="AZ2", cpu=1, user_profile="Estudiante"),
+    ]
+    esperado = [
+        (True, "host-a"), (False, "Error parseando"), (True, "host-b"),
+        (False, "No hay workers"), (False, "No hay hosts disponibles"), (True, "host-c"),
+    ]
+
+    print("\n[1] Lote de 6 solicitudes:")
+    respuesta = cliente.post("/api/v1/placement/batch", json={"requests": lote})
+    cuerpo = respuesta.get_json()
+    resultados = cuerpo["results"]
+    for r in resultados:
+        detalle = r["placement"]["host"] if r["success"] else r["error"]
+        print(f"   [{r['index']}] {'OK   ' if r['success'] else 'FALLA'} {detalle}")
+
+    indices_ok = [r["index"] for r in resultados] == list(range(len(lote)))
+    contenido_ok = all(
+        r["success"] == ok and (r["placement"]["host"] == dato if ok else r["error"].startswith(dato))
+        for r, (ok, dato) in zip(resultados, esperado)
+    )
+    if respuesta.status_code == 200 and indices_ok and contenido_ok:
+        print("   OK: un resultado por solicitud, en orden y con el host esperado.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el orden o el contenido de los resultados no es el esperado.")
+
+    reservas = {a.allocation_id for a in placement_api.LEDGER.allocations()}
+    ids = {r["allocation_id"] for r in resultados if r["success"]}
+    print(f"   placed={cuerpo['placed']} total={cuerpo['total']}; reservas en el ledger: {len(reservas)}")
+    if cuerpo["placed"] == 3 and cuerpo["total"] == 6 and ids == reservas:
+        print("   OK: solo las colocadas cuentan y cada una quedó reservada.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el conteo o las reservas no coinciden con las colocadas.")
+
+    print("\n[2] Lote posterior con AZ1 ocupada por las reservas:")
+    cuerpo = cliente.post("/api/v1/placement/batch", json=[GRANDE]).get_json()
+    if cuerpo["placed"] == 0 and not cuerpo["results"][0]["success"]:
+        print("   OK: el lote nuevo ve las reservas del anterior (sin host viable).")
+    else:
+        errores += 1
+        print(f"   ADVERTENCIA: se colocó sobre capacidad ya reservada: {cuerpo['results'][0]}")
+
+    print("\n[3] Solicitudes inválidas:")
+    vacia = cliente.post("/api/v1/placement/batch", json={"requests": []}).status_code
+    malformada = cliente.post("/api/v1/placement/batch", data="{no es json",
+                              content_type="application/json").status_code
+    print(f"   lista vacía -> {vacia}, JSON malformado -> {malformada}")
+    if vacia == 400 and malformada == 400:
+        print("   OK: ambas se rechazan con 400.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: se esperaba 400 en ambos casos.")
+
+    placement_api.SNAPSHOT_READER = None
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 18 (PLACEMENT POR LOTES) ==")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 19:
+Candidatos top-k en POST /api/v1/placement.
+
+Escenario:
+- AZ1 con 5 hosts de 8 cores y carga de CPU creciente (5 %, 20 %, 35 %,
+  50 %, 90 %); el de 90 % no pasa el filtro de riesgo. Un sexto host está
+  deshabilitado. AZ2 tiene un host más que no debe aparecer.
+
+Objetivo:
+- top_k=3 devuelve exactamente 3 candidatos, ordenados por el criterio
+  Minimax (riesgo global, luego local, luego disco libre) y el primero es el
+  host de "placement".
+- top_k mayor que los viables devuelve solo los viables (4), nunca hosts
+  deshabilitados, saturados ni de otra zona.
+- Sin top_k (o top_k=1) no se agrega "candidates"; top_k se acota a
+  MAX_TOP_K y un valor inválido equivale a 1.
+- El primer candidato coincide con la decisión del motor escalar
+  (decide_vm_placement) sobre los mismos hosts.
+"""
+
+import api_placement_handler as placement_api
+from cluster_state import ClusterState
+from pending_ledger import PendingAllocationLedger
+from decision_cache import DecisionCache
+from vm_placement import decide_vm_placement
+
+
+class SnapshotFijo:
+    """Fuente de snapshot en memoria (misma interfaz que SharedSnapshotReader)."""
+
+    def __init__(self, state: ClusterState):
+        self.state = state
+        self.version = state.version
+
+    def current(self) -> ClusterState:
+        return self.state
+
+
+def crear_nodo(nombre: str, zona: str, cpu_pct: float, enabled: bool = True) -> dict:
+    return {
+        "id": nombre, "name": nombre, "platform": "linux", "zone": zona, "enabled": enabled,
+        "cpu_capacity": {"value": 8, "unit": "cores"},
+        "ram_capacity": {"value": 32.0, "unit": "GiB"},
+        "disk_capacity": {"value": 200.0, "unit": "GB"},
+        "current_usage": {
+            "cpu": {"mean": cpu_pct, "std": 6.0, "unit": "%"},
+            "ram": {"mean": 4.0, "std": 0.5, "unit": "GiB"},
+            "disk": {"used": 20.0, "unit": "GB"},
+        },
+    }
+
+
+SOLICITUD = {"cpu": 2, "ram_gb": 2.0, "disk_gb": 5.0, "zone": "AZ1", "platform": "linux",
+             "user_profile": "Profesor", "technical_context": "Cloud"}
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 19 - CANDIDATOS TOP-K")
+    print("=" * 78)
+
+    nodos = {f"h{i}": crear_nodo(f"h{i}", "AZ1", pct) for i, pct in enumerate([50.0, 5.0, 90.0, 35.0, 20.0])}
+    nodos["apagado"] = crear_nodo("apagado", "AZ1", 0.0, enabled=False)
+    nodos["otra-zona"] = crear_nodo("otra-zona", "AZ2", 0.0)
+    placement_api.SNAPSHOT_READER = SnapshotFijo(ClusterState.from_nodes_status(nodos))
+    placement_api.DECISION_CACHE = DecisionCache()
+    cliente = placement_api.app.test_client()
+    errores = 0
+
+    def pedir(query: str = "", **extra):
+        # Ledger vacío en cada consulta: solo interesa el ranking
+        placement_api.LEDGER = PendingAllocationLedger()
+        respuesta = cliente.post(f"/api/v1/placement{query}", json=dict(SOLICITUD, **extra))
+        return respuesta.status_code, respuesta.get_json()
+
+    print("\n[1] top_k=3:")
+    status, cuerpo = pedir("?top_k=3")
+    candidatos = cuerpo.get("candidates", [])
+    for c in candidatos:
+        print(f"   {c['host']:<10} global={c['cluster_risk']:.3e} local={c['local_risk']:.3e} "
+              f"disco={c['disk_free_gb']:.0f}")
+    claves = [(c["cluster_risk"], c["local_risk"], -c["disk_free_gb"]) for c in candidatos]
+    if (status == 200 and len(candidatos) == 3 and claves == sorted(claves)
+            and candidatos[0]["host"] == cuerpo["placement"]["host"]):
+        print("   OK: 3 candidatos en orden Minimax; el primero es el elegido.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: cantidad u orden de candidatos incorrecto.")
+
+    print("\n[2] top_k mayor que los hosts viables (en el JSON):")
+    status, cuerpo = pedir(top_k=10)
+    hosts = [c["host"] for c in cuerpo.get("candidates", [])]
+    print(f"   {hosts}")
+    if hosts == ["h1", "h4", "h3", "h0"]:
+        print("   OK: solo los 4 viables de AZ1, del menos al más cargado.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: se esperaban h1, h4, h3, h0.")
+
+    print("\n[3] Sin top_k, top_k acotado e inválido:")
+    _, sin_k = pedir()
+    _, grande = pedir(f"?top_k={placement_api.MAX_TOP_K + 50}")
+    _, invalido = pedir("?top_k=muchos")
+    print(f"   sin top_k: candidates={'candidates' in sin_k}; "
+          f"top_k={placement_api.MAX_TOP_K + 50}: {len(grande.get('candidates', []))}; "
+          f"top_k=muchos: candidates={'candidates' in invalido}")
+    if ("candidates" not in sin_k and "candidates" not in invalido
+            and len(grande.get("candidates", [])) == 4
+            and placement_api.parse_top_k(placement_api.MAX_TOP_K + 50) == placement_api.MAX_TOP_K
+            and sin_k["placement"]["host"] == invalido["placement"]["host"] == "h1"):
+        print("   OK: sin lista con k=1; k se acota a MAX_TOP_K.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el manejo de top_k no es el esperado.")
+
+    print("\n[4] Primer candidato frente al motor escalar:")
+    _, cuerpo = pedir("?top_k=5")
+    escalar = decide_vm_placement(
+        placement_api.parse_slice_request(SOLICITUD), placement_api.SNAPSHOT_READER.current().to_hosts()
+    )
+    print(f"   top-k: {cuerpo['candidates'][0]['host']}, decide_vm_placement: {escalar.host}")
+    if escalar is not None and cuerpo["candidates"][0]["host"] == escalar.host:
+        print("   OK: el ranking empieza por la decisión del motor escalar.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el ranking difiere del motor escalar.")
+
+    placement_api.SNAPSHOT_READER = None
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 19 (TOP-K) ==")
+
+
+if __name__ == "__main__":
+    main()
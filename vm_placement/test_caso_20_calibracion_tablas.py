@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 20:
+Calibración de PROFILE_TABLE / CONTEXT_TABLE y recarga en caliente.
+
+Escenario:
+- Observaciones sintéticas (semilla fija) generadas con tablas "reales"
+  conocidas, más bajas que las del PDF: 3 perfiles x 3 contextos, 20 VMs
+  por celda con 50 muestras de CPU y RAM cada una.
+- Un TablesWatcher "en ejecución" (hilo que llama refresh() como lo haría
+  cada solicitud de la API) vigila tablas_actuales.json.
+
+Objetivo:
+- El ajuste recupera las medias reales (mu_perfil · f_contexto) con error
+  relativo < 5 %; el contexto de referencia (Cloud) queda fijo.
+- Una celda con menos de MIN_SAMPLES muestras no modifica las tablas.
+- publish_tables es atómico: un lector que relee tablas_actuales.json
+  mientras se publican 30 versiones siempre obtiene un JSON completo y
+  coherente, y no quedan archivos temporales.
+- El watcher en ejecución carga la última versión publicada (TABLES_VERSION
+  y compute_slice_mu_sigma cambian); sin publicaciones nuevas no recarga.
+"""
+
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+
+import vm_placement
+from vm_placement import SliceRequest, compute_slice_mu_sigma
+from calibracion_tablas import TableCalibrator, TablesWatcher, publish_tables, CURRENT_TABLES_FILE, REFERENCE_CONTEXT
+
+PERFILES_REALES = {
+    "Estudiante":   {"mu_cpu": 0.05, "sigma_cpu": 0.02, "mu_ram": 0.10, "sigma_ram": 0.03},
+    "Profesor":     {"mu_cpu": 0.20, "sigma_cpu": 0.08, "mu_ram": 0.25, "sigma_ram": 0.08},
+    "Investigador": {"mu_cpu": 0.40, "sigma_cpu": 0.15, "mu_ram": 0.45, "sigma_ram": 0.12},
+}
+CONTEXTOS_REALES = {
+    "Cloud":                 {"f_cpu": 0.8, "f_ram": 0.7, "v": 1.0},
+    "SDN / Redes":           {"f_cpu": 0.6, "f_ram": 0.5, "v": 1.2},
+    "IA / Machine Learning": {"f_cpu": 1.4, "f_ram": 1.2, "v": 0.8},
+}
+
+
+def generar_observaciones(rng: random.Random):
+    for perfil, p in PERFILES_REALES.items():
+        for contexto, c in CONTEXTOS_REALES.items():
+            for vm in range(20):
+                vcpu, ram_gb = rng.choice([1, 2, 4]), rng.choice([1.0, 2.0, 4.0])
+                muestras = {}
+                for r, reservado in (("cpu", vcpu), ("ram", ram_gb)):
+                    mu = p[f"mu_{r}"] * c[f"f_{r}"]
+                    sigma = p[f"sigma_{r}"] * c[f"f_{r}"] * c["v"]
+                    muestras[r] = [max(rng.gauss(mu, sigma), 0.0) * reservado for _ in range(50)]
+                yield {"vm_id": vm, "user_profile": perfil, "technical_context": contexto,
+                       "vcpu": vcpu, "ram_gb": ram_gb,
+                       "cpu_samples": muestras["cpu"], "ram_samples": muestras["ram"]}
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 20 - CALIBRACIÓN DE TABLAS Y RECARGA EN CALIENTE")
+    print("=" * 78)
+
+    errores = 0
+    originales = (vm_placement.PROFILE_TABLE, vm_placement.CONTEXT_TABLE, vm_placement.TABLES_VERSION)
+
+    print("\n[1] Ajuste sobre observaciones sintéticas:")
+    calibrador = TableCalibrator()
+    for obs in generar_observaciones(random.Random(7)):
+        calibrador.add_observation(obs)
+    perfiles, contextos = calibrador.fit(vm_placement.PROFILE_TABLE, vm_placement.CONTEXT_TABLE)
+
+    peor = 0.0
+    for perfil, p in PERFILES_REALES.items():
+        for contexto, c in CONTEXTOS_REALES.items():
+            for r in ("cpu", "ram"):
+                real = p[f"mu_{r}"] * c[f"f_{r}"]
+                ajustado = perfiles[perfil][f"mu_{r}"] * contextos[contexto][f"f_{r}"]
+                peor = max(peor, abs(ajustado - real) / real)
+    print(f"   Investigador: {perfiles['Investigador']}")
+    print(f"   error relativo máximo de las medias: {peor:.2%}")
+    if peor < 0.05 and contextos[REFERENCE_CONTEXT] == vm_placement.CONTEXT_TABLE[REFERENCE_CONTEXT]:
+        print("   OK: se recuperan las medias reales; Cloud queda como referencia.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el ajuste no recupera las tablas reales.")
+
+    print("\n[2] Celda con pocas muestras:")
+    escaso = TableCalibrator()
+    escaso.add_observation({"user_profile": "Profesor", "technical_context": "Cloud", "vcpu": 2, "ram_gb": 2.0,
+                            "cpu_samples": [0.1] * 5, "ram_samples": [0.1] * 5})
+    if escaso.fit(vm_placement.PROFILE_TABLE, vm_placement.CONTEXT_TABLE)[0]["Profesor"] == \
+            vm_placement.PROFILE_TABLE["Profesor"]:
+        print("   OK: 5 muestras (< MIN_SAMPLES) no cambian la tabla.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: una celda sin datos suficientes modificó la tabla.")
+
+    with tempfile.TemporaryDirectory() as directorio:
+        actual = os.path.join(directorio, CURRENT_TABLES_FILE)
+        publish_tables(directorio, perfiles, contextos)
+
+        print("\n[3] Publicación atómica con un lector concurrente:")
+        lecturas = {"ok": 0, "rotas": 0}
+        terminar = threading.Event()
+
+        def lector():
+            while not terminar.is_set():
+                try:
+                    with open(actual) as f:
+                        tablas = json.load(f)
+                    coherente = tablas["PROFILE_TABLE"]["Estudiante"]["mu_cpu"] == tablas["version"]
+                    lecturas["ok" if coherente or tablas["version"] == 1 else "rotas"] += 1
+                except (ValueError, KeyError):
+                    lecturas["rotas"] += 1
+
+        hilo = threading.Thread(target=lector)
+        hilo.start()
+        for _ in range(30):
+            version = len([n for n in os.listdir(directorio) if n.startswith("tablas_v")]) + 1
+            marcadas = {k: dict(v) for k, v in perfiles.items()}
+            marcadas["Estudiante"]["mu_cpu"] = version     # permite verificar coherencia al leer
+            publish_tables(directorio, marcadas, contextos)
+        terminar.set()
+        hilo.join()
+        temporales = [n for n in os.listdir(directorio) if n.endswith(".tmp")]
+        print(f"   {lecturas['ok']} lecturas completas, {lecturas['rotas']} rotas; temporales: {len(temporales)}")
+        if lecturas["rotas"] == 0 and lecturas["ok"] > 0 and not temporales:
+            print("   OK: el lector nunca vio un JSON a medias.")
+        else:
+            errores += 1
+            print("   ADVERTENCIA: la publicación no fue atómica.")
+
+        print("\n[4] TablesWatcher en ejecución:")
+        watcher = TablesWatcher(actual, min_interval=0.0)
+        recargas = []
+        detener = threading.Event()
+
+        def servidor():
+            # Igual que el before_request de la API: refresh() en cada "solicitud"
+            while not detener.is_set():
+                if watcher.refresh():
+                    recargas.append(vm_placement.TABLES_VERSION)
+                time.sleep(0.005)
+
+        hilo = threading.Thread(target=servidor)
+        hilo.start()
+        time.sleep(0.1)
+        primera = vm_placement.TABLES_VERSION
+
+        req = SliceRequest(cpu=4, ram_gb=4.0, disk_gb=1.0, zone="AZ1", user_profile="Profesor")
+        antes = compute_slice_mu_sigma(req)["cpu"]
+        finales = {k: dict(v) for k, v in perfiles.items()}
+        finales["Profesor"]["mu_cpu"] = round(perfiles["Profesor"]["mu_cpu"] / 2, 4)
+        publicado = publish_tables(directorio, finales, contextos)
+        time.sleep(0.1)
+        n_recargas = len(recargas)
+        time.sleep(0.1)
+        detener.set()
+        hilo.join()
+        despues = compute_slice_mu_sigma(req)["cpu"]
+
+        print(f"   versiones cargadas: {recargas} ({os.path.basename(publicado)})")
+        print(f"   μ CPU del slice Profesor: {antes[0]:.3f} -> {despues[0]:.3f}")
+        if (primera == 31 and recargas[-1] == 32 and vm_placement.TABLES_VERSION == 32
+                and abs(despues[0] - antes[0] / 2) < 1e-3 and len(recargas) == n_recargas == 2):
+            print("   OK: el watcher cargó la versión nueva y no recarga sin cambios.")
+        else:
+            errores += 1
+            print("   ADVERTENCIA: el watcher no recargó las tablas como se esperaba.")
+
+    vm_placement.PROFILE_TABLE, vm_placement.CONTEXT_TABLE, vm_placement.TABLES_VERSION = originales
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 20 (CALIBRACIÓN DE TABLAS) ==")
+
+
+if __name__ == "__main__":
+    main()
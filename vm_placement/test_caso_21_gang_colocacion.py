@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 21:
+Co-ubicación de las mitades de un grupo bisecado (gang placement "topology").
+
+Escenario:
+- Plantilla en cadena vm-1 — vm-2 — vm-3 — vm-4, cuatro VMs Investigador de
+  3 vCPU: las cuatro juntas no pasan el MP en ningún host de 8 cores, así
+  que el grupo se biseca.
+- RACK-A con host-a1 (CPU 5 %) y host-a2; RACK-B con host-b1 (CPU 10 %).
+
+Objetivo:
+- Con host-a2 al 25 % la segunda mitad va a host-a2, en el rack de su
+  vecina, aunque Minimax puro elegiría host-b1 (menos cargado).
+- Con host-a2 saturado (70 %) no hay capacidad en el rack: la segunda mitad
+  cae en host-b1 y el slice igual se coloca.
+- Con bisección en dos niveles (host-b1 y host-c1 al 40 %), vm-3 se queda en
+  el host de vm-2 (host-a1) en lugar de abrir otro host: un solo enlace
+  entre hosts.
+- En todos los casos ningún host queda por encima del MP.
+"""
+
+from cluster_state import ClusterState
+from vm_placement import SliceRequest
+from gang_placement import decide_gang_placement
+from placement_engine import host_risk
+
+RECURSOS = {f"vm-{i}": {"vcpu": 3, "ram_gb": 2.0, "disk_gb": 5.0} for i in range(1, 5)}
+EDGES = [{"from": "vm-1", "to": "vm-2"}, {"from": "vm-2", "to": "vm-3"}, {"from": "vm-3", "to": "vm-4"}]
+BASE = SliceRequest(cpu=0, ram_gb=0.0, disk_gb=0.0, zone="AZ1", platform="linux",
+                    user_profile="Investigador", technical_context="Cloud")
+
+
+def crear_nodo(nombre: str, rack: str, cpu_pct: float) -> dict:
+    return {
+        "id": nombre, "name": nombre, "platform": "linux", "zone": "AZ1",
+        "cpu_capacity": {"value": 8, "unit": "cores"},
+        "ram_capacity": {"value": 32.0, "unit": "GiB"},
+        "disk_capacity": {"value": 200.0, "unit": "GB"},
+        "current_usage": {
+            "cpu": {"mean": cpu_pct, "std": 5.0, "unit": "%"},
+            "ram": {"mean": 4.0, "std": 0.5, "unit": "GiB"},
+            "disk": {"used": 20.0, "unit": "GB"},
+        },
+        "metadata": {"rack": rack},
+    }
+
+
+def colocar(nodos: dict):
+    estado = ClusterState.from_nodes_status({n["name"]: n for n in nodos})
+    gang = decide_gang_placement(RECURSOS, BASE, estado, strategy="topology", edges=EDGES)
+    if gang is None:
+        print("   sin colocación")
+        return None, False
+    hosts = {vm: d.host for vm, d in sorted(gang.placements.items())}
+    print(f"   {hosts}")
+    print(f"   {gang.reason}")
+    return gang, bool((host_risk(estado) <= BASE.max_failure_prob).all())
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 21 - CO-UBICACIÓN DE MITADES BISECADAS")
+    print("=" * 78)
+
+    errores = 0
+
+    print("\n[1] Capacidad en el rack de la primera mitad (host-a2 al 25 %):")
+    gang, mp_ok = colocar([crear_nodo("host-a1", "RACK-A", 5.0), crear_nodo("host-a2", "RACK-A", 25.0),
+                           crear_nodo("host-b1", "RACK-B", 10.0)])
+    if gang and mp_ok and set(gang.racks.values()) == {"RACK-A"} and len(gang.hosts_used()) == 2:
+        print("   OK: las dos mitades quedan en RACK-A (host-a1 y host-a2).")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: las mitades se repartieron entre racks.")
+
+    print("\n[2] Rack sin capacidad (host-a2 al 70 %):")
+    gang, mp_ok = colocar([crear_nodo("host-a1", "RACK-A", 5.0), crear_nodo("host-a2", "RACK-A", 70.0),
+                           crear_nodo("host-b1", "RACK-B", 10.0)])
+    if gang and mp_ok and gang.placements["vm-4"].host == "host-b1":
+        print("   OK: sin espacio en RACK-A la segunda mitad usa host-b1.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el slice debía colocarse con la segunda mitad en host-b1.")
+
+    print("\n[3] Bisección en dos niveles (host-b1 y host-c1 al 40 %):")
+    gang, mp_ok = colocar([crear_nodo("host-a1", "RACK-A", 5.0), crear_nodo("host-b1", "RACK-B", 40.0),
+                           crear_nodo("host-c1", "RACK-C", 40.0)])
+    if gang and mp_ok and gang.placements["vm-3"].host == "host-a1" and gang.cross_host_edges == 1:
+        print("   OK: vm-3 se queda con vm-2 en host-a1; un solo enlace entre hosts.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: vm-3 no se co-ubicó con su vecina.")
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 21 (CO-UBICACIÓN) ==")
+
+
+if __name__ == "__main__":
+    main()
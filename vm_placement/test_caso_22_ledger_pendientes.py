@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 22:
+Ledger de asignaciones pendientes (TTL, liberación y suma al snapshot).
+
+Escenario:
+- Snapshot con host-a (CPU 2 cores ± 0.5) y host-b; reloj simulado.
+- Dos slices reservados sobre host-a con TTL de 60 s y 120 s.
+
+Objetivo:
+- apply_to suma μ, σ² y disco de las dos reservas a host-a, deja host-b
+  igual y nunca modifica el snapshot original; sin pendientes devuelve el
+  mismo objeto (sin copia).
+- release libera una reserva (True); liberarla otra vez retorna False y no
+  cambia la versión ni la generación del host.
+- Al vencer el TTL la reserva restante se purga sola: el host vuelve a su
+  carga medida y la generación sube (los commits en curso la ven cambiar).
+- apply_to_hosts (motor escalar) suma exactamente lo mismo que apply_to.
+"""
+
+import math
+
+from cluster_state import ClusterState
+from pending_ledger import PendingAllocationLedger
+
+
+class RelojSimulado:
+    def __init__(self):
+        self.ahora = 0.0
+
+    def __call__(self) -> float:
+        return self.ahora
+
+
+def crear_nodo(nombre: str, cpu_pct: float) -> dict:
+    return {
+        "id": nombre, "name": nombre, "platform": "linux", "zone": "AZ1",
+        "cpu_capacity": {"value": 8, "unit": "cores"},
+        "ram_capacity": {"value": 32.0, "unit": "GiB"},
+        "disk_capacity": {"value": 200.0, "unit": "GB"},
+        "current_usage": {
+            "cpu": {"mean": cpu_pct, "std": 6.25, "unit": "%"},
+            "ram": {"mean": 4.0, "std": 0.5, "unit": "GiB"},
+            "disk": {"used": 20.0, "unit": "GB"},
+        },
+    }
+
+
+SLICE_1 = {"cpu": (1.0, 0.3), "ram": (2.0, 0.4)}
+SLICE_2 = {"cpu": (0.5, 0.4), "ram": (1.0, 0.3)}
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 22 - LEDGER DE ASIGNACIONES PENDIENTES")
+    print("=" * 78)
+
+    estado = ClusterState.from_nodes_status({
+        "host-a": crear_nodo("host-a", 25.0),
+        "host-b": crear_nodo("host-b", 10.0),
+    })
+    a, b = estado.row("host-a"), estado.row("host-b")
+    mu_a, sigma_a, disco_a = estado.mu_cpu[a], estado.sigma_cpu[a], estado.disk_gb_used[a]
+    reloj = RelojSimulado()
+    ledger = PendingAllocationLedger(ttl_seconds=60.0, clock=reloj)
+    errores = 0
+
+    print("\n[1] Sin pendientes:")
+    if ledger.apply_to(estado) is estado and len(ledger) == 0:
+        print("   OK: apply_to devuelve el mismo snapshot, sin copiar.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: se copió el snapshot sin nada que sumar.")
+
+    print("\n[2] Dos reservas sobre host-a:")
+    id_1 = ledger.reserve([("host-a", SLICE_1, 10.0)])
+    id_2 = ledger.reserve([("host-a", SLICE_2, 5.0)], ttl_seconds=120.0)
+    vista = ledger.apply_to(estado)
+    mu_esperada = mu_a + 1.0 + 0.5
+    sigma_esperada = math.sqrt(sigma_a ** 2 + 0.3 ** 2 + 0.4 ** 2)
+    print(f"   host-a μ CPU {mu_a:.2f} -> {vista.mu_cpu[a]:.2f}, σ {sigma_a:.3f} -> {vista.sigma_cpu[a]:.3f}, "
+          f"disco {disco_a:.0f} -> {vista.disk_gb_used[a]:.0f}")
+    suma_ok = (math.isclose(vista.mu_cpu[a], mu_esperada) and math.isclose(vista.sigma_cpu[a], sigma_esperada)
+               and math.isclose(vista.disk_gb_used[a], disco_a + 15.0)
+               and math.isclose(vista.mu_ram_gb[a], estado.mu_ram_gb[a] + 3.0)
+               and vista.mu_cpu[b] == estado.mu_cpu[b])
+    intacto = estado.mu_cpu[a] == mu_a and estado.disk_gb_used[a] == disco_a
+    if vista is not estado and suma_ok and intacto and ledger.generation("host-a") == 2:
+        print("   OK: se suman μ, σ² y disco en host-a; host-b y el snapshot original no cambian.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: la suma de pendientes al snapshot es incorrecta.")
+
+    hosts = ledger.apply_to_hosts(estado.to_hosts())
+    escalar = next(h for h in hosts if h.name == "host-a")
+    if math.isclose(escalar.mu_cpu, mu_esperada) and math.isclose(escalar.sigma_cpu, sigma_esperada):
+        print("   OK: apply_to_hosts coincide con apply_to.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: apply_to_hosts difiere de apply_to.")
+
+    print("\n[3] Liberación explícita y doble liberación:")
+    primera = ledger.release(id_1)
+    version, generacion = ledger.version, ledger.generation("host-a")
+    segunda = ledger.release(id_1)
+    vista = ledger.apply_to(estado)
+    print(f"   release -> {primera}, otra vez -> {segunda}; pendientes: {len(ledger)}")
+    if (primera and not segunda and len(ledger) == 1 and ledger.version == version
+            and ledger.generation("host-a") == generacion and math.isclose(vista.mu_cpu[a], mu_a + 0.5)):
+        print("   OK: la segunda liberación no hace nada y queda solo la reserva 2.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: la liberación doble alteró el ledger.")
+
+    print("\n[4] Vencimiento por TTL:")
+    reloj.ahora = 90.0
+    sigue = len(ledger.totals_by_host()) == 1
+    reloj.ahora = 120.0
+    generacion = ledger.generation("host-a")
+    vista = ledger.apply_to(estado)
+    print(f"   t=90 s: reserva vigente={sigue}; t=120 s: pendientes={len(ledger)}")
+    if (sigue and len(ledger) == 0 and vista is estado and ledger.generation("host-a") == generacion + 1
+            and not ledger.release(id_2) and ledger.purge_expired() == 0):
+        print("   OK: la reserva vence sola, el host vuelve a su carga medida y su generación sube.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: la reserva vencida sigue ocupando capacidad.")
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 22 (LEDGER DE PENDIENTES) ==")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 23:
+Ranking entre zonas (rank_placement_candidates_cross_zone y zone_mode).
+
+Escenario:
+- AZ1 saturada: 2 hosts de 8 cores al 92 % de CPU (ninguno pasa el MP).
+- AZ2 con 2 hosts al 40 % y AZ3 con 2 hosts al 20 %: AZ3 tiene más
+  holgura agregada que AZ2.
+- Slice Profesor de 2 vCPU pedido en AZ1.
+
+Objetivo:
+- zone_search_order: primero la zona pedida, luego el resto de mayor a
+  menor holgura (AZ1, AZ3, AZ2); una zona inexistente no se agrega.
+- zone_mode="preferred": como AZ1 no tiene host viable se usa AZ3 (la de
+  más holgura) y todos los candidatos son de AZ3; con AZ3 también saturada
+  se cae a AZ2.
+- zone_mode="strict" (el valor por defecto de la API): sin salir de AZ1 no
+  hay candidatos y la API responde sin placement.
+- zone_mode="any": se elige por holgura, sin importar la zona pedida.
+- Con AZ1 viable, "preferred" se queda en AZ1 aunque AZ3 tenga más holgura.
+- La API informa zone_used y zone_fallback; un modo desconocido en el motor
+  es ValueError.
+"""
+
+from dataclasses import replace
+
+import api_placement_handler as placement_api
+from cluster_state import ClusterState
+from pending_ledger import PendingAllocationLedger
+from decision_cache import DecisionCache
+from decision_trace import DecisionTrace
+from placement_engine import rank_placement_candidates_cross_zone, zone_search_order
+
+
+class SnapshotFijo:
+    """Fuente de snapshot en memoria (misma interfaz que SharedSnapshotReader)."""
+
+    def __init__(self, state: ClusterState):
+        self.state = state
+        self.version = state.version
+
+    def current(self) -> ClusterState:
+        return self.state
+
+
+def crear_nodo(nombre: str, zona: str, cpu_pct: float) -> dict:
+    return {
+        "id": nombre, "name": nombre, "platform": "linux", "zone": zona,
+        "cpu_capacity": {"value": 8, "unit": "cores"},
+        "ram_capacity": {"value": 32.0, "unit": "GiB"},
+        "disk_capacity": {"value": 200.0, "unit": "GB"},
+        "current_usage": {
+            "cpu": {"mean": cpu_pct, "std": 5.0, "unit": "%"},
+            "ram": {"mean": 4.0, "std": 0.5, "unit": "GiB"},
+            "disk": {"used": 20.0, "unit": "GB"},
+        },
+    }
+
+
+def crear_estado(carga: dict) -> ClusterState:
+    """carga: zona -> % de CPU de sus dos hosts."""
+    nodos = {}
+    for zona, pct in carga.items():
+        for i in (1, 2):
+            nombre = f"{zona.lower()}-h{i}"
+            nodos[nombre] = crear_nodo(nombre, zona, pct)
+    return ClusterState.from_nodes_status(nodos)
+
+
+SOLICITUD = {"cpu": 2, "ram_gb": 2.0, "disk_gb": 5.0, "zone": "AZ1", "platform": "linux",
+             "user_profile": "Profesor", "technical_context": "Cloud"}
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 23 - RANKING ENTRE ZONAS (ZONE_MODE)")
+    print("=" * 78)
+
+    estado = crear_estado({"AZ1": 92.0, "AZ2": 40.0, "AZ3": 20.0})
+    slice_req = placement_api.parse_slice_request(SOLICITUD)
+    errores = 0
+
+    print("\n[1] Orden de búsqueda de zonas:")
+    orden = zone_search_order(estado, "AZ1")
+    sin_zona = zone_search_order(estado, "AZ9")
+    print(f"   preferida AZ1: {orden}; preferida AZ9 (no existe): {sin_zona}")
+    if orden == ["AZ1", "AZ3", "AZ2"] and sin_zona == ["AZ3", "AZ2", "AZ1"]:
+        print("   OK: la zona pedida primero y el resto por holgura.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: orden de zonas inesperado.")
+
+    print("\n[2] zone_mode=preferred con AZ1 saturada:")
+    trace = DecisionTrace()
+    ranked = rank_placement_candidates_cross_zone(slice_req, estado, 4, "preferred", trace=trace)
+    print(f"   candidatos: {[(c.host, c.availability_zone) for c in ranked]}; zonas evaluadas: {trace.zones_evaluated}")
+    if ranked and {c.availability_zone for c in ranked} == {"AZ3"} and trace.zones_evaluated == ["AZ1", "AZ3"]:
+        print("   OK: se usa AZ3 (más holgura) y se detiene en la primera zona viable.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el fallback no eligió la zona con más holgura.")
+
+    saturada = crear_estado({"AZ1": 92.0, "AZ2": 40.0, "AZ3": 93.0})
+    ranked = rank_placement_candidates_cross_zone(slice_req, saturada, 1, "preferred")
+    print(f"   con AZ3 también saturada: {[(c.host, c.availability_zone) for c in ranked]}")
+    if ranked and ranked[0].availability_zone == "AZ2":
+        print("   OK: se cae a la siguiente zona con capacidad (AZ2).")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: se esperaba un host de AZ2.")
+
+    print("\n[3] zone_mode=strict y zone_mode=any:")
+    estricto = rank_placement_candidates_cross_zone(slice_req, estado.subset(estado.rows_for("AZ1")), 4, "strict")
+    cualquiera = rank_placement_candidates_cross_zone(replace(slice_req, zone="AZ2"), estado, 1, "any")
+    print(f"   strict: {len(estricto)} candidatos; any (pedida AZ2): {cualquiera[0].availability_zone}")
+    try:
+        rank_placement_candidates_cross_zone(slice_req, estado, 1, "cualquiera")
+        modo_invalido = False
+    except ValueError:
+        modo_invalido = True
+    if not estricto and cualquiera[0].availability_zone == "AZ3" and modo_invalido:
+        print("   OK: strict no sale de AZ1; any elige por holgura; modo desconocido -> ValueError.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: strict/any no se comportan como se esperaba.")
+
+    print("\n[4] Endpoint POST /api/v1/placement:")
+    placement_api.DECISION_CACHE = DecisionCache()
+    cliente = placement_api.app.test_client()
+
+    def pedir(snapshot: ClusterState, query: str = ""):
+        placement_api.SNAPSHOT_READER = SnapshotFijo(snapshot)
+        placement_api.LEDGER = PendingAllocationLedger()
+        return cliente.post(f"/api/v1/placement{query}", json=SOLICITUD).get_json()
+
+    por_defecto = pedir(estado)
+    preferida = pedir(estado, "?zone_mode=preferred")
+    viable = pedir(crear_estado({"AZ1": 30.0, "AZ2": 40.0, "AZ3": 20.0}), "?zone_mode=preferred")
+    print(f"   strict: success={por_defecto['success']}; "
+          f"preferred: {preferida.get('zone_used')} (fallback={preferida.get('zone_fallback')}); "
+          f"AZ1 viable: {viable.get('zone_used')} (fallback={viable.get('zone_fallback')})")
+    if (not por_defecto["success"] and "zone_used" not in por_defecto
+            and preferida["success"] and preferida["zone_used"] == "AZ3" and preferida["zone_fallback"]
+            and viable["zone_used"] == "AZ1" and not viable["zone_fallback"]):
+        print("   OK: strict no coloca; preferred informa la zona usada y si hubo fallback.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: la API no respeta zone_mode.")
+
+    placement_api.SNAPSHOT_READER = None
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 23 (RANKING ENTRE ZONAS) ==")
+
+
+if __name__ == "__main__":
+    main()
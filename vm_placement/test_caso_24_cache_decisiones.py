@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 24:
+Cache LRU de decisiones (invalidación por versión y cuantización de la clave).
+
+Escenario:
+- AZ1 con host-a (CPU 5 %) y host-b (CPU 15 %), 8 cores cada uno: cabe un
+  slice Investigador de 6 vCPU por host; uno de 8 vCPU no cabe en ninguno.
+- Un segundo snapshot con los mismos hosts ampliados a 16 cores.
+- Un tercero con host-c en AZ2.
+
+Objetivo:
+- La clave cuantiza RAM, disco y MP: 2 GB y 2.0000001 GB comparten entrada;
+  2 GB y 2.5 GB, overcommit 1.0 y 1.5 o MP 0.01 y 0.02 no.
+- Otra versión del snapshot o de las generaciones produce otra clave; la
+  parte del ledger solo incluye los hosts evaluados.
+- LRU acotada: con maxsize=2 la entrada menos usada sale primero.
+- En la API, repetir una solicitud sin cambios es un acierto; una reserva
+  nueva en la zona (generación de un host evaluado) o un snapshot nuevo
+  fuerzan a decidir de nuevo: nunca se devuelve una decisión calculada
+  sobre un estado viejo.
+- Un commit en AZ2 no invalida la decisión cacheada de una solicitud
+  estricta de AZ1.
+"""
+
+from dataclasses import replace
+
+import api_placement_handler as placement_api
+from cluster_state import ClusterState
+from pending_ledger import PendingAllocationLedger
+from decision_cache import DecisionCache, generations_key
+from vm_placement import SliceRequest
+
+
+class SnapshotFijo:
+    """Fuente de snapshot en memoria (misma interfaz que SharedSnapshotReader)."""
+
+    def __init__(self, state: ClusterState):
+        self.state = state
+        self.version = state.version
+
+    def current(self) -> ClusterState:
+        return self.state
+
+
+def crear_nodo(nombre: str, cores: int, cpu_pct: float, zona: str = "AZ1") -> dict:
+    return {
+        "id": nombre, "name": nombre, "platform": "linux", "zone": zona,
+        "cpu_capacity": {"value": cores, "unit": "cores"},
+        "ram_capacity": {"value": 32.0, "unit": "GiB"},
+        "disk_capacity": {"value": 200.0, "unit": "GB"},
+        "current_usage": {
+            "cpu": {"mean": cpu_pct, "std": 4.0, "unit": "%"},
+            "ram": {"mean": 4.0, "std": 0.5, "unit": "GiB"},
+            "disk": {"used": 20.0, "unit": "GB"},
+        },
+    }
+
+
+def crear_estado(cores: int) -> ClusterState:
+    return ClusterState.from_nodes_status({
+        "host-a": crear_nodo("host-a", cores, 5.0),
+        "host-b": crear_nodo("host-b", cores, 15.0),
+    })
+
+
+GRANDE = {"cpu": 6, "ram_gb": 8.0, "disk_gb": 5.0, "zone": "AZ1", "platform": "linux",
+          "user_profile": "Investigador", "technical_context": "Cloud"}
+ENORME = dict(GRANDE, cpu=8, ram_gb=2.0)
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 24 - CACHE DE DECISIONES")
+    print("=" * 78)
+
+    errores = 0
+
+    print("\n[1] Clave de la cache:")
+    base = SliceRequest(cpu=2, ram_gb=2.0, disk_gb=5.0, zone="AZ1", user_profile="Profesor")
+    clave = DecisionCache.make_key(base, 7, 3, 1, "strict")
+    iguales = [replace(base, ram_gb=2.0000001), replace(base, disk_gb=5.0 + 1e-9)]
+    distintas = [replace(base, ram_gb=2.5), replace(base, cpu_overcommit=1.5),
+                 replace(base, max_failure_prob=0.02), replace(base, user_profile="Investigador")]
+    comparten = all(DecisionCache.make_key(r, 7, 3, 1, "strict") == clave for r in iguales)
+    separadas = all(DecisionCache.make_key(r, 7, 3, 1, "strict") != clave for r in distintas)
+    versiones = (DecisionCache.make_key(base, 8, 3, 1, "strict") != clave
+                 and DecisionCache.make_key(base, 7, 4, 1, "strict") != clave
+                 and DecisionCache.make_key(base, 7, 3, 3, "strict") != clave)
+    zona_a = {"host-a": 0, "host-b": 1}
+    generaciones = generations_key({"host-a": 2, "host-c": 5}, zona_a)
+    solo_zona = (generaciones == (("host-a", 2),)
+                 and generations_key({"host-a": 2, "host-c": 6}, zona_a) == generaciones
+                 and generations_key({"host-a": 3, "host-c": 5}, zona_a) != generaciones)
+    print(f"   ruido de float comparte entrada: {comparten}; solicitudes distintas separadas: {separadas}; "
+          f"versiones/top_k separan: {versiones}; generaciones solo de los hosts evaluados: {solo_zona}")
+    if comparten and separadas and versiones and solo_zona:
+        print("   OK: la cuantización une el ruido sin mezclar solicitudes distintas.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: la clave mezcla o separa solicitudes incorrectamente.")
+
+    print("\n[2] LRU acotada:")
+    lru = DecisionCache(maxsize=2)
+    lru.put("a", [1])
+    lru.put("b", [2])
+    lru.get("a")
+    lru.put("c", [3])
+    print(f"   claves tras insertar c: a={lru.get('a') is not None} b={lru.get('b') is not None} "
+          f"c={lru.get('c') is not None}; {lru.stats()}")
+    if len(lru) == 2 and lru.get("b") is None and lru.get("a") == [1]:
+        print("   OK: sale la entrada menos usada (b).")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: la política LRU no se respeta.")
+
+    print("\n[3] Invalidación en la API:")
+    placement_api.SNAPSHOT_READER = SnapshotFijo(crear_estado(8))
+    placement_api.LEDGER = PendingAllocationLedger()
+    placement_api.DECISION_CACHE = cache = DecisionCache()
+    cliente = placement_api.app.test_client()
+
+    def pedir(solicitud: dict):
+        cuerpo = cliente.post("/api/v1/placement", json=solicitud).get_json()
+        return cuerpo["placement"]["host"] if cuerpo["success"] else None
+
+    primero = pedir(GRANDE)
+    segundo = pedir(GRANDE)
+    print(f"   GRANDE dos veces: {primero}, {segundo}; {cache.hits} aciertos, {cache.misses} fallos")
+    if primero == "host-a" and segundo == "host-b" and cache.hits == 0:
+        print("   OK: la reserva cambia la generación de host-a y la segunda se decide de nuevo.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: se reutilizó una decisión tomada antes de la reserva.")
+
+    sin_host = [pedir(ENORME), pedir(ENORME), pedir(dict(ENORME, ram_gb=2.0000001)), pedir(dict(ENORME, ram_gb=2.5))]
+    print(f"   ENORME x3 (+ ruido) y con 2.5 GB: {sin_host}; {cache.hits} aciertos, {cache.misses} fallos")
+    if sin_host == [None] * 4 and cache.hits == 2 and cache.misses == 4:
+        print("   OK: sin cambios de estado las repeticiones (y el ruido de float) son aciertos.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: la cache no reutilizó decisiones idénticas.")
+
+    placement_api.SNAPSHOT_READER = SnapshotFijo(crear_estado(16))
+    nuevo = pedir(ENORME)
+    print(f"   ENORME con el snapshot de 16 cores: {nuevo}; {cache.hits} aciertos, {cache.misses} fallos")
+    if nuevo is not None and cache.hits == 2:
+        print("   OK: el snapshot nuevo invalida la decisión cacheada y ahora hay host.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: se devolvió la decisión del snapshot anterior.")
+
+    print("\n[4] Commit en otra zona:")
+    placement_api.SNAPSHOT_READER = SnapshotFijo(ClusterState.from_nodes_status({
+        "host-a": crear_nodo("host-a", 8, 5.0),
+        "host-b": crear_nodo("host-b", 8, 15.0),
+        "host-c": crear_nodo("host-c", 8, 5.0, "AZ2"),
+    }))
+    placement_api.LEDGER = PendingAllocationLedger()
+    placement_api.DECISION_CACHE = cache = DecisionCache()
+    antes = pedir(ENORME)
+    otra_zona = pedir(dict(GRANDE, zone="AZ2"))
+    despues = pedir(ENORME)
+    print(f"   ENORME en AZ1: {antes}; GRANDE en AZ2 -> {otra_zona}; ENORME otra vez: {despues}; "
+          f"{cache.hits} acierto(s), {cache.misses} fallos")
+    if otra_zona == "host-c" and antes is None and despues is None and cache.hits == 1:
+        print("   OK: la reserva en AZ2 no invalida la decisión cacheada de AZ1.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: un commit en otra zona vació la cache de AZ1.")
+
+    placement_api.SNAPSHOT_READER = None
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 24 (CACHE DE DECISIONES) ==")
+
+
+if __name__ == "__main__":
+    main()
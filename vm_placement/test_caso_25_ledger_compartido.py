@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 25:
+Ledger y cola de admisión compartidos entre workers (servicio_placement.py).
+
+Escenario:
+- Snapshot publicado con SharedSnapshotWriter: AZ1 con host-a (CPU 5 %) y
+  host-b (CPU 15 %), 8 cores; a cada uno le cabe UN slice Investigador de
+  6 vCPU.
+- Coordinador y dos workers lanzados igual que en servicio_placement.py,
+  cada worker en su propio puerto para elegir a quién se le habla.
+
+Objetivo:
+- Un slice colocado por el worker A y otro por el B terminan en hosts
+  distintos: B ve la reserva de A (sin doble reserva de la misma holgura).
+- Un tercero pedido a A con ?queue=true queda en la cola y el worker B lo
+  encuentra (GET /queue/<id> -> 200, no 404).
+- B lista y libera (DELETE) la asignación hecha por A; esa liberación
+  coloca la solicitud encolada y A la ve como "placed".
+- Liberar otra vez la misma asignación desde A -> 404.
+"""
+
+import os
+import socket
+import tempfile
+import time
+
+import requests
+
+import servicio_placement as servicio
+from cluster_state import ClusterState
+from shared_snapshot import SharedSnapshotWriter
+
+
+def crear_nodo(nombre: str, cpu_pct: float) -> dict:
+    return {
+        "id": nombre, "name": nombre, "platform": "linux", "zone": "AZ1",
+        "cpu_capacity": {"value": 8, "unit": "cores"},
+        "ram_capacity": {"value": 32.0, "unit": "GiB"},
+        "disk_capacity": {"value": 200.0, "unit": "GB"},
+        "current_usage": {
+            "cpu": {"mean": cpu_pct, "std": 4.0, "unit": "%"},
+            "ram": {"mean": 4.0, "std": 0.5, "unit": "GiB"},
+            "disk": {"used": 20.0, "unit": "GB"},
+        },
+    }
+
+
+GRANDE = {"cpu": 6, "ram_gb": 8.0, "disk_gb": 5.0, "zone": "AZ1", "platform": "linux",
+          "user_profile": "Investigador", "technical_context": "Cloud"}
+
+
+def crear_socket() -> socket.socket:
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(16)
+    listener.set_inheritable(True)
+    return listener
+
+
+def esperar(url: str, timeout: float = 20.0) -> None:
+    limite = time.monotonic() + timeout
+    while True:
+        try:
+            requests.get(f"{url}/health", timeout=1).raise_for_status()
+            return
+        except requests.RequestException:
+            if time.monotonic() >= limite:
+                raise
+            time.sleep(0.1)
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 25 - LEDGER Y COLA COMPARTIDOS ENTRE WORKERS")
+    print("=" * 78)
+
+    errores = 0
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    with tempfile.TemporaryDirectory(dir=base) as directorio:
+        SharedSnapshotWriter(directorio).publish(ClusterState.from_nodes_status({
+            "host-a": crear_nodo("host-a", 5.0),
+            "host-b": crear_nodo("host-b", 15.0),
+        }))
+        authkey = os.urandom(32)
+        coordinador = servicio._start_coordinator(directorio, authkey)
+        sockets = [crear_socket(), crear_socket()]
+        workers = [servicio._start_worker(s.fileno(), directorio, authkey) for s in sockets]
+        a, b = [f"http://127.0.0.1:{s.getsockname()[1]}/api/v1" for s in sockets]
+
+        try:
+            for url in (a, b):
+                esperar(url)
+
+            print("\n[1] Un slice por el worker A y otro por el B:")
+            primero = requests.post(f"{a}/placement", json=GRANDE, timeout=10).json()
+            segundo = requests.post(f"{b}/placement", json=GRANDE, timeout=10).json()
+            hosts = [r.get("placement", {}).get("host") for r in (primero, segundo)]
+            print(f"   A -> {hosts[0]}, B -> {hosts[1]}")
+            if hosts == ["host-a", "host-b"]:
+                print("   OK: B ve la reserva de A y usa el otro host.")
+            else:
+                errores += 1
+                print("   ADVERTENCIA: los workers reservaron la misma holgura.")
+
+            print("\n[2] Tercer slice encolado en A, consultado desde B:")
+            encolado = requests.post(f"{a}/placement?queue=true", json=GRANDE, timeout=10)
+            queue_id = encolado.json().get("queue_id")
+            consulta = requests.get(f"{b}/placement/queue/{queue_id}", timeout=10)
+            print(f"   A -> {encolado.status_code} (queue_id={queue_id}); B GET /queue -> {consulta.status_code} "
+                  f"{consulta.json().get('status')}")
+            if encolado.status_code == 202 and consulta.status_code == 200 and consulta.json()["status"] == "queued":
+                print("   OK: la solicitud encolada por A es visible desde B.")
+            else:
+                errores += 1
+                print("   ADVERTENCIA: B no encuentra la solicitud encolada por A.")
+
+            print("\n[3] B libera la asignación de A:")
+            listadas = {p["allocation_id"] for p in requests.get(f"{b}/placement/allocations", timeout=10).json()["pending"]}
+            liberar = requests.delete(f"{b}/placement/allocations/{primero['allocation_id']}", timeout=10)
+            estado = requests.get(f"{a}/placement/queue/{queue_id}", timeout=10).json()
+            otra_vez = requests.delete(f"{a}/placement/allocations/{primero['allocation_id']}", timeout=10)
+            print(f"   B lista {len(listadas)} asignaciones; DELETE en B -> {liberar.status_code}; "
+                  f"cola en A -> {estado.get('status')} {estado.get('placement', {}).get('host')}; "
+                  f"DELETE otra vez en A -> {otra_vez.status_code}")
+            if (listadas == {primero["allocation_id"], segundo["allocation_id"]} and liberar.status_code == 200
+                    and estado.get("status") == "placed" and estado["placement"]["host"] == "host-a"
+                    and otra_vez.status_code == 404):
+                print("   OK: cualquier worker libera; la capacidad liberada coloca la solicitud en espera.")
+            else:
+                errores += 1
+                print("   ADVERTENCIA: la liberación entre workers no funcionó.")
+        finally:
+            for proceso in workers + [coordinador]:
+                proceso.terminate()
+                proceso.join(timeout=5)
+            for s in sockets:
+                s.close()
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 25 (LEDGER COMPARTIDO) ==")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 26:
+Commit optimista entre PROCESOS (generaciones y CAS en el coordinador).
+
+Escenario:
+- Un coordinador (shared_ledger.py) dueño del único ledger, como en
+  servicio_placement.py.
+- Dos procesos (fork) conectados con SharedLedger sobre el mismo snapshot:
+  AZ1 con host-a (CPU 5 %), 8 cores. Le cabe UN slice Investigador de
+  8 vCPU con MP = 0.05; dos slices Profesor pequeños caben los dos.
+
+Objetivo:
+- Los dos procesos leen las mismas generaciones, deciden host-a y
+  confirman a la vez (barrera): con el slice grande exactamente uno se
+  confirma y host-a no supera el MP. Se repite varias rondas, liberando
+  entre una y otra.
+- Con el slice pequeño los dos se confirman: el que pierde el CAS re-valida
+  host-a en su proceso y reintenta con la generación nueva.
+- place_optimistic en los dos procesos con host-a y host-b: el perdedor
+  reintenta y termina en el otro host.
+"""
+
+import multiprocessing
+import os
+import tempfile
+
+from cluster_state import ClusterState
+from vm_placement import SliceRequest
+from pending_ledger import PendingAllocationLedger
+from admission_queue import AdmissionQueue
+from placement_engine import decide_vm_placement_vectorized, host_risk
+from optimistic_commit import PlacementTicket, commit_placement, place_optimistic
+from shared_ledger import LedgerCoordinator, SharedLedger, connect_coordinator, start_coordinator
+
+MP = 0.05
+RONDAS = 5
+
+CONTEXTO = multiprocessing.get_context("fork")
+
+
+def crear_nodo(nombre: str, cpu_pct: float) -> dict:
+    return {
+        "id": nombre, "name": nombre, "platform": "linux", "zone": "AZ1",
+        "cpu_capacity": {"value": 8, "unit": "cores"},
+        "ram_capacity": {"value": 32.0, "unit": "GiB"},
+        "disk_capacity": {"value": 200.0, "unit": "GB"},
+        "current_usage": {
+            "cpu": {"mean": cpu_pct, "std": 4.0, "unit": "%"},
+            "ram": {"mean": 4.0, "std": 0.5, "unit": "GiB"},
+            "disk": {"used": 20.0, "unit": "GB"},
+        },
+    }
+
+
+def crear_slice(perfil: str, cpu: int) -> SliceRequest:
+    return SliceRequest(cpu=cpu, ram_gb=8.0, disk_gb=5.0, zone="AZ1", platform="linux",
+                        user_profile=perfil, technical_context="Cloud", max_failure_prob=MP)
+
+
+def competir_commit(direccion, authkey, estado, req, barrera, resultados) -> None:
+    """Proceso: decide sobre el estado compartido, espera al otro y confirma."""
+    ledger = SharedLedger(connect_coordinator(direccion, authkey))
+    generaciones = ledger.generations()
+    decision = decide_vm_placement_vectorized(req, ledger.apply_to(estado))
+    ticket = PlacementTicket.for_decision(req, decision, estado.version, generaciones)
+    barrera.wait()
+    resultados.put((decision.host, commit_placement(ticket, ledger, estado)))
+
+
+def competir_optimista(direccion, authkey, estado, req, barrera, resultados) -> None:
+    """Proceso: place_optimistic completo (decide, confirma y reintenta)."""
+    ledger = SharedLedger(connect_coordinator(direccion, authkey))
+    generaciones = ledger.generations()
+    decision = decide_vm_placement_vectorized(req, ledger.apply_to(estado))
+    barrera.wait()
+    confirmada, allocation_id, conflictos = place_optimistic(
+        req, estado, ledger, lambda vista: decide_vm_placement_vectorized(req, vista), decision, generaciones
+    )
+    resultados.put((confirmada.host if confirmada else None, allocation_id, conflictos))
+
+
+def carrera(objetivo, direccion, authkey, estado, req) -> list:
+    """Lanza dos procesos con `objetivo` y devuelve sus dos resultados."""
+    barrera = CONTEXTO.Barrier(2)
+    resultados = CONTEXTO.Queue()
+    procesos = [
+        CONTEXTO.Process(target=objetivo, args=(direccion, authkey, estado, req, barrera, resultados))
+        for _ in range(2)
+    ]
+    for p in procesos:
+        p.start()
+    salida = [resultados.get(timeout=20) for _ in procesos]
+    for p in procesos:
+        p.join(timeout=5)
+    return salida
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 26 - COMMIT OPTIMISTA ENTRE PROCESOS")
+    print("=" * 78)
+
+    errores = 0
+    estado = ClusterState.from_nodes_status({"host-a": crear_nodo("host-a", 5.0)})
+    dos_hosts = ClusterState.from_nodes_status({"host-a": crear_nodo("host-a", 5.0),
+                                                "host-b": crear_nodo("host-b", 15.0)})
+    grande = crear_slice("Investigador", 8)
+    pequeno = crear_slice("Profesor", 2)
+
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    with tempfile.TemporaryDirectory(dir=base) as directorio:
+        direccion = os.path.join(directorio, "coordinador.sock")
+        authkey = os.urandom(32)
+        coordinador = start_coordinator(
+            lambda: LedgerCoordinator(PendingAllocationLedger(), AdmissionQueue(), None), direccion, authkey
+        )
+        ledger = SharedLedger(connect_coordinator(direccion, authkey))
+
+        try:
+            print(f"\n[1] Slice grande, dos procesos confirman a la vez ({RONDAS} rondas):")
+            rondas_ok = 0
+            for _ in range(RONDAS):
+                salida = carrera(competir_commit, direccion, authkey, estado, grande)
+                confirmados = [a for _, a in salida if a is not None]
+                riesgo = host_risk(ledger.apply_to(estado))[0]
+                if all(h == "host-a" for h, _ in salida) and len(confirmados) == 1 and riesgo <= MP:
+                    rondas_ok += 1
+                for allocation_id in confirmados:
+                    ledger.release(allocation_id)
+            print(f"   rondas con un solo commit y host-a <= MP: {rondas_ok}/{RONDAS}")
+            if rondas_ok == RONDAS:
+                print("   OK: el CAS del coordinador rechaza al segundo proceso.")
+            else:
+                errores += 1
+                print("   ADVERTENCIA: dos procesos reservaron la misma holgura.")
+
+            print("\n[2] Slice pequeño, los dos caben:")
+            salida = carrera(competir_commit, direccion, authkey, estado, pequeno)
+            confirmados = [a for _, a in salida if a is not None]
+            print(f"   confirmados: {len(confirmados)}; pendientes en el coordinador: {len(ledger)}; "
+                  f"generación host-a = {ledger.generation('host-a')}")
+            if len(confirmados) == 2 and len(ledger) == 2 and host_risk(ledger.apply_to(estado))[0] <= MP:
+                print("   OK: el perdedor del CAS re-valida host-a en su proceso y se confirma.")
+            else:
+                errores += 1
+                print("   ADVERTENCIA: la re-validación entre procesos no confirmó un host viable.")
+            for allocation_id in confirmados:
+                ledger.release(allocation_id)
+
+            print("\n[3] place_optimistic en dos procesos con host-a y host-b:")
+            salida = carrera(competir_optimista, direccion, authkey, dos_hosts, grande)
+            hosts = sorted(h for h, _, _ in salida if h is not None)
+            conflictos = sum(c for _, _, c in salida)
+            riesgos = host_risk(ledger.apply_to(dos_hosts))
+            print(f"   hosts: {hosts}; conflictos: {conflictos}; riesgo máximo {riesgos.max():.4f}")
+            if hosts == ["host-a", "host-b"] and conflictos == 1 and (riesgos <= MP).all():
+                print("   OK: el proceso que pierde reintenta localmente y usa host-b.")
+            else:
+                errores += 1
+                print("   ADVERTENCIA: el reintento entre procesos no encontró el otro host.")
+        finally:
+            coordinador.terminate()
+            coordinador.join(timeout=5)
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 26 (CAS ENTRE PROCESOS) ==")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 27:
+Servicio ASGI (api_placement_async.py) con TestClient de FastAPI.
+
+Escenario:
+- metrics_api.py (raíz del repositorio) corre en un hilo sirviendo un
+  nodes_status.json de AZ1 con host-a (CPU 5 %) y host-b (CPU 15 %),
+  8 cores: a cada uno le cabe UN slice Investigador de 6 vCPU.
+- La app ASGI arranca con TestClient (lifespan completo: cliente httpx y
+  tarea de refresco cada 0.1 s contra ese metrics_api).
+
+Objetivo:
+- Al arrancar se descarga el snapshot (1 actualización) y /api/v1/health
+  informa su versión.
+- Sin cambios en el archivo las revalidaciones son condicionales (304):
+  la versión del ClusterState no cambia.
+- POST /api/v1/placement (ruta ASGI) coloca en host-a; las rutas de la app
+  Flask montada por WSGI ven el mismo snapshot y ledger: /placement/plan
+  usa host-b y /placement/allocations lista la reserva.
+- Con el archivo modificado la tarea de refresco instala una versión nueva
+  sin intervención de las solicitudes.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from fastapi.testclient import TestClient
+from werkzeug.serving import make_server
+
+import api_placement_async as api_async
+import api_placement_handler as placement_api
+from pending_ledger import PendingAllocationLedger
+from decision_cache import DecisionCache
+
+# metrics_api.py está en la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import metrics_api  # noqa: E402
+
+REFRESCO = 0.1
+
+
+def crear_nodo(nombre: str, cpu_pct: float) -> dict:
+    return {
+        "id": nombre, "name": nombre, "platform": "linux", "zone": "AZ1",
+        "cpu_capacity": {"value": 8, "unit": "cores"},
+        "ram_capacity": {"value": 32.0, "unit": "GiB"},
+        "disk_capacity": {"value": 200.0, "unit": "GB"},
+        "current_usage": {
+            "cpu": {"mean": cpu_pct, "std": 4.0, "unit": "%"},
+            "ram": {"mean": 4.0, "std": 0.5, "unit": "GiB"},
+            "disk": {"used": 20.0, "unit": "GB"},
+        },
+    }
+
+
+def escribir_nodos(cpu_a: float, mtime: float) -> None:
+    with open("nodes_status.json", "w") as f:
+        json.dump({"host-a": crear_nodo("host-a", cpu_a), "host-b": crear_nodo("host-b", 15.0)}, f)
+    os.utime("nodes_status.json", (mtime, mtime))
+
+
+def esperar(condicion, timeout: float = 5.0) -> bool:
+    limite = time.monotonic() + timeout
+    while not condicion():
+        if time.monotonic() >= limite:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+GRANDE = {"cpu": 6, "ram_gb": 8.0, "disk_gb": 5.0, "zone": "AZ1", "platform": "linux",
+          "user_profile": "Investigador", "technical_context": "Cloud"}
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 27 - SERVICIO ASGI (TESTCLIENT)")
+    print("=" * 78)
+
+    errores = 0
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directorio:
+        os.chdir(directorio)
+        escribir_nodos(5.0, time.time() - 60)
+        servidor = make_server("127.0.0.1", 0, metrics_api.app, threaded=True)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+        cache = api_async.CACHE
+        cache.url = f"http://127.0.0.1:{servidor.server_port}/nodes/status"
+        cache.ttl = REFRESCO
+        placement_api.SNAPSHOT_READER = None
+        placement_api.LEDGER = PendingAllocationLedger()
+        placement_api.DECISION_CACHE = DecisionCache()
+
+        try:
+            with TestClient(api_async.app) as cliente:
+                print("\n[1] Arranque (lifespan):")
+                version = cache.version
+                salud = cliente.get("/api/v1/health").json()
+                print(f"   snapshot v{version}; health: {salud['snapshot']}")
+                if (cache.stats()["updates"] == 1 and salud["snapshot"]["version"] == version
+                        and placement_api.NODES_CACHE is cache):
+                    print("   OK: el snapshot se descarga al arrancar y health informa su versión.")
+                else:
+                    errores += 1
+                    print("   ADVERTENCIA: el arranque no instaló el snapshot.")
+
+                print("\n[2] Revalidación sin cambios:")
+                hubo_304 = esperar(lambda: cache.stats()["not_modified"] >= 2)
+                print(f"   {cache.stats()}; versión v{cache.version}")
+                if hubo_304 and cache.version == version and cache.stats()["updates"] == 1:
+                    print("   OK: metrics_api responde 304 y se conserva la misma versión.")
+                else:
+                    errores += 1
+                    print("   ADVERTENCIA: la revalidación no fue condicional o cambió la versión.")
+
+                print("\n[3] Ruta ASGI y rutas Flask montadas por WSGI:")
+                colocado = cliente.post("/api/v1/placement", json=GRANDE).json()
+                plan = cliente.post("/api/v1/placement/plan", json={"slices": [GRANDE]}).json()
+                listadas = [p["allocation_id"] for p in cliente.get("/api/v1/placement/allocations").json()["pending"]]
+                host_plan = plan["results"][0].get("placement", {}).get("host") if plan.get("success") else None
+                print(f"   /placement (ASGI) -> {colocado.get('placement', {}).get('host')}; "
+                      f"/placement/plan (WSGI) -> {host_plan}; /allocations (WSGI) -> {len(listadas)}")
+                if (colocado.get("success") and colocado["placement"]["host"] == "host-a"
+                        and host_plan == "host-b" and listadas == [colocado["allocation_id"]]):
+                    print("   OK: la app montada usa el mismo snapshot y ve la reserva hecha por la ruta ASGI.")
+                else:
+                    errores += 1
+                    print("   ADVERTENCIA: las rutas ASGI y WSGI no comparten estado.")
+
+                print("\n[4] Archivo modificado:")
+                escribir_nodos(40.0, time.time())
+                nueva = esperar(lambda: cache.version != version)
+                print(f"   versión v{version} -> v{cache.version}; {cache.stats()}")
+                if nueva and cache.stats()["updates"] == 2:
+                    print("   OK: la tarea de refresco instala la versión nueva en segundo plano.")
+                else:
+                    errores += 1
+                    print("   ADVERTENCIA: el snapshot nuevo no se instaló.")
+
+            if placement_api.NODES_CACHE is cache:
+                errores += 1
+                print("   ADVERTENCIA: al cerrar no se restauró NODES_CACHE.")
+        finally:
+            servidor.shutdown()
+            os.chdir(cwd)
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 27 (SERVICIO ASGI) ==")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 6:
+Equivalencia entre el motor escalar y el motor vectorizado (NumPy).
+
+Escenario:
+- Clúster sintético (semilla fija) con hosts Linux y OpenStack en varias AZ,
+  algunos deshabilitados o en mantenimiento y con disco casi lleno.
+- Se generan solicitudes aleatorias con distintos perfiles, contextos y MP.
+
+Objetivo:
+- Verificar que `decide_vm_placement` (referencia escalar) y
+  `decide_vm_placement_vectorized` devuelven exactamente la misma decisión.
+- Mostrar el tiempo de cada motor para el mismo clúster.
+- Verificar que la erfc de numpy (usada sin scipy en arreglos grandes)
+  coincide con math.erfc.
+"""
+
+import math
+import random
+import time
+from typing import List
+
+import numpy as np
+
+from vm_placement import (
+    SliceRequest,
+    HostState,
+    PROFILE_TABLE,
+    CONTEXT_TABLE,
+    decide_vm_placement,
+)
+from placement_engine import decide_vm_placement_vectorized, _erfc_numpy
+from cluster_state import ClusterState
+
+
+ZONAS = ["AZ1", "AZ2", "AZ3"]
+
+
+def generar_hosts(rng: random.Random, n: int) -> List[HostState]:
+    hosts = []
+    for i in range(n):
+        cpu = rng.choice([4, 8, 16, 32])
+        ram = rng.choice([3.8, 7.8, 16.0, 64.0])
+        disk = rng.choice([9.6, 25.0, 100.0])
+        hosts.append(HostState(
+            name=f"host-{i}",
+            platform=rng.choice(["linux", "openstack"]),
+            zone=rng.choice(ZONAS),
+            cpu_capacity=cpu,
+            ram_gb_capacity=ram,
+            disk_gb_capacity=disk,
+            mu_cpu=rng.uniform(0.0, 0.9) * cpu,
+            sigma_cpu=rng.choice([0.0, rng.uniform(0.0, 0.2) * cpu]),
+            mu_ram_gb=rng.uniform(0.1, 0.9) * ram,
+            sigma_ram_gb=rng.uniform(0.0, 0.1) * ram,
+            disk_gb_used=rng.uniform(0.3, 1.0) * disk,
+            enabled=rng.random() > 0.05,
+            in_maintenance=rng.random() < 0.05,
+        ))
+    return hosts
+
+
+def generar_solicitud(rng: random.Random) -> SliceRequest:
+    return SliceRequest(
+        cpu=rng.randint(1, 8),
+        ram_gb=rng.choice([0.5, 1.0, 2.0, 4.0]),
+        disk_gb=rng.choice([1.0, 2.0, 5.0, 10.0]),
+        zone=rng.choice(ZONAS + [""]),
+        platform=rng.choice(["linux", "openstack", None]),
+        user_profile=rng.choice(list(PROFILE_TABLE)),
+        technical_context=rng.choice(list(CONTEXT_TABLE)),
+        max_failure_prob=rng.choice([0.01, 0.05, 0.2]),
+    )
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 6 - MOTOR ESCALAR vs MOTOR VECTORIZADO")
+    print("=" * 78)
+
+    rng = random.Random(2025)
+    n_hosts = 300
+    n_solicitudes = 200
+
+    hosts = generar_hosts(rng, n_hosts)
+    estado = ClusterState.from_hosts(hosts)   # snapshot columnar, se parsea una vez
+    solicitudes = [generar_solicitud(rng) for _ in range(n_solicitudes)]
+
+    print(f"\n[1] Clúster sintético: {n_hosts} hosts, {n_solicitudes} solicitudes")
+
+    diferencias = 0
+    sin_host = 0
+    t_escalar = 0.0
+    t_vector = 0.0
+
+    for i, req in enumerate(solicitudes):
+        t0 = time.perf_counter()
+        d_escalar = decide_vm_placement(req, hosts)
+        t_escalar += time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        d_vector = decide_vm_placement_vectorized(req, estado)
+        t_vector += time.perf_counter() - t0
+
+        if d_escalar is None:
+            sin_host += 1
+
+        if d_escalar != d_vector:
+            diferencias += 1
+            print(f"   ADVERTENCIA: solicitud {i} difiere")
+            print(f"       escalar   : {d_escalar}")
+            print(f"       vectorial : {d_vector}")
+
+    print("\n[2] Resultados:")
+    print(f"   - Solicitudes sin host viable : {sin_host}")
+    print(f"   - Decisiones distintas        : {diferencias}")
+    print(f"   - Tiempo motor escalar        : {t_escalar * 1000:.1f} ms")
+    print(f"   - Tiempo motor vectorizado    : {t_vector * 1000:.1f} ms")
+
+    if diferencias == 0:
+        print("   OK: ambos motores devuelven exactamente la misma PlacementDecision.")
+    else:
+        print("   ADVERTENCIA: los motores no son equivalentes.")
+
+    print("\n[3] erfc vectorizada (sin scipy) vs math.erfc:")
+    x = np.linspace(-10.0, 26.0, 200_001)
+    referencia = np.array([math.erfc(v) for v in x])
+    t0 = time.perf_counter()
+    aproximada = _erfc_numpy(x)
+    t_numpy = time.perf_counter() - t0
+    error = np.max(np.abs(aproximada - referencia) / np.maximum(referencia, 1e-300))
+    print(f"   - Error relativo máximo : {error:.2e} ({len(x)} puntos en {t_numpy * 1000:.1f} ms)")
+    if error < 1e-12:
+        print("   OK: _erfc_numpy coincide con math.erfc.")
+    else:
+        print("   ADVERTENCIA: _erfc_numpy se aleja de math.erfc.")
+
+    print("\n== FIN DEL CASO DE PRUEBA 6 (MOTOR VECTORIZADO) ==")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 7:
+Modelo de riesgo empírico (histogramas de Prometheus) vs modelo normal.
+
+Escenario:
+- host-normal : su serie de CPU es gaussiana -> ambos modelos deben coincidir
+- host-sesgado: CPU casi siempre ociosa con picos (std > mean, como en
+                nodes_status.json) -> la normal no representa la cola
+- host-sin-hist: sin histograma -> el modelo empírico usa la normal
+
+Objetivo:
+- Comparar ambos modelos contra la probabilidad "real" (Monte Carlo sobre
+  la misma serie + la normal del slice).
+- Verificar que con datos gaussianos ambos coinciden y que en la serie
+  sesgada el modelo empírico se acerca más a la probabilidad real.
+- Verificar que la carga sumada en memoria (apply_slice) aumenta el riesgo.
+"""
+
+import numpy as np
+
+from vm_placement import SliceRequest, compute_slice_mu_sigma
+from cluster_state import ClusterState
+from placement_engine import resource_tail_probability, rank_placement_candidates
+
+
+def crear_nodo(nombre: str, muestras_cpu_pct: np.ndarray, con_histograma: bool = True) -> dict:
+    """Nodo en el formato de generate_nodes_status.py (4 cores, 7.8 GiB)."""
+    cpu = {"mean": float(np.mean(muestras_cpu_pct)), "std": float(np.std(muestras_cpu_pct)), "unit": "%"}
+    if con_histograma:
+        counts, _ = np.histogram(np.clip(muestras_cpu_pct, 0, 100), bins=50, range=(0, 100))
+        cpu["histogram"] = {"lower": 0.0, "upper": 100.0, "counts": counts.tolist()}
+    return {
+        "id": nombre, "name": nombre, "platform": "linux", "zone": "AZ1",
+        "cpu_capacity": {"value": 4, "unit": "cores"},
+        "ram_capacity": {"value": 7.8, "unit": "GiB"},
+        "disk_capacity": {"value": 25.0, "unit": "GB"},
+        "current_usage": {
+            "cpu": cpu,
+            "ram": {"mean": 1.0, "std": 0.1, "unit": "GiB"},
+            "disk": {"used": 5.0, "unit": "GB"},
+        },
+    }
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 7 - RIESGO EMPÍRICO (HISTOGRAMAS) vs NORMAL")
+    print("=" * 78)
+
+    rng = np.random.default_rng(7)
+    gaussiana = rng.normal(40.0, 10.0, 20000)
+    sesgada = np.where(rng.random(20000) < 0.97, rng.uniform(0.0, 3.0, 20000), rng.uniform(20.0, 60.0, 20000))
+
+    nodes = {
+        "host-normal": crear_nodo("host-normal", gaussiana),
+        "host-sesgado": crear_nodo("host-sesgado", sesgada),
+        "host-sin-hist": crear_nodo("host-sin-hist", gaussiana, con_histograma=False),
+    }
+    estado = ClusterState.from_nodes_status(nodes)
+
+    req = SliceRequest(cpu=4, ram_gb=1.0, disk_gb=1.0, zone="AZ1", platform="linux",
+                       user_profile="Investigador", technical_context="Cloud", max_failure_prob=0.05)
+    mu_cpu, sigma_cpu = compute_slice_mu_sigma(req)["cpu"]
+
+    p_normal = resource_tail_probability(estado, "cpu", mu_cpu, sigma_cpu, "normal")
+    p_emp = resource_tail_probability(estado, "cpu", mu_cpu, sigma_cpu, "empirical")
+
+    # Probabilidad real: serie observada (en cores) + demanda del slice
+    p_real = [
+        float(np.mean(serie * 4 / 100.0 + rng.normal(mu_cpu, sigma_cpu, serie.size) > 4))
+        for serie in (gaussiana, sesgada, gaussiana)
+    ]
+
+    print("\n[1] P(congestión CPU) tras asignar el slice:")
+    for i, name in enumerate(estado.names):
+        print(f"   {name:>14}: real={p_real[i]:.4f}  normal={p_normal[i]:.4f}  empírico={p_emp[i]:.4f}")
+
+    errores = 0
+    if abs(p_normal[0] - p_emp[0]) < 0.02:
+        print("   OK: con datos gaussianos ambos modelos coinciden.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el modelo empírico no reproduce la normal.")
+
+    if abs(p_emp[1] - p_real[1]) < abs(p_normal[1] - p_real[1]):
+        print("   OK: en la serie sesgada el modelo empírico se acerca más al valor real.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el modelo empírico no mejora la estimación en el host sesgado.")
+
+    if p_emp[2] == p_normal[2]:
+        print("   OK: sin histograma se usa el modelo normal.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el host sin histograma no usa la normal.")
+
+    print(f"\n[2] Decisión solo contra el host sesgado (MP = {req.max_failure_prob}):")
+    sesgado = estado.subset(np.array([estado.row("host-sesgado")]))
+    for modelo in ("normal", "empirical"):
+        ranked = rank_placement_candidates(req, sesgado, 1, risk_model=modelo)
+        print(f"   {modelo:>9}: {'aceptado' if ranked else 'rechazado'}")
+
+    print("\n[3] Carga agregada en memoria (apply_slice) sobre el host sesgado:")
+    antes = resource_tail_probability(sesgado, "cpu", mu_cpu, sigma_cpu, "empirical")[0]
+    sesgado.apply_slice("host-sesgado", compute_slice_mu_sigma(req), req.disk_gb)
+    despues = resource_tail_probability(sesgado, "cpu", mu_cpu, sigma_cpu, "empirical")[0]
+    print(f"   antes={antes:.4f}  después={despues:.4f}")
+    if despues > antes:
+        print("   OK: el riesgo empírico incluye la carga asignada después del snapshot.")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: la carga en memoria no cambió el riesgo.")
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 7 (RIESGO EMPÍRICO) ==")
+
+
+if __name__ == "__main__":
+    main()
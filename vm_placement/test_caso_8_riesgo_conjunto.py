@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 8:
+Riesgo conjunto CPU/RAM (normal bivariada con covarianza por host).
+
+Escenario:
+- Tres hosts iguales con CPU y RAM cerca del límite, que solo difieren en
+  la correlación CPU/RAM observada: -0.6, 0 y 0.9.
+- Un slice de perfil Profesor en contexto Cloud.
+
+Objetivo:
+- Comparar P(CPU o RAM congestionados) del modelo "joint" contra Monte Carlo.
+- Verificar las cotas: max(P_cpu, P_ram) <= P(CPU o RAM) <= P_cpu + P_ram.
+- Mostrar que el riesgo "max" del modelo normal subestima la probabilidad
+  real de violar el SLA cuando la correlación no es perfecta.
+"""
+
+import numpy as np
+
+from vm_placement import SliceRequest, HostState, compute_slice_mu_sigma
+from cluster_state import ClusterState
+from placement_engine import joint_congestion_probability, evaluate_hosts
+
+
+def crear_host(nombre: str, rho: float) -> HostState:
+    sigma_cpu, sigma_ram = 0.5, 0.6
+    return HostState(
+        name=nombre, platform="linux", zone="AZ1",
+        cpu_capacity=4, ram_gb_capacity=7.8, disk_gb_capacity=25.0,
+        mu_cpu=2.4, sigma_cpu=sigma_cpu, mu_ram_gb=5.8, sigma_ram_gb=sigma_ram,
+        disk_gb_used=5.0, cov_cpu_ram=rho * sigma_cpu * sigma_ram,
+    )
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 8 - RIESGO CONJUNTO CPU/RAM (NORMAL BIVARIADA)")
+    print("=" * 78)
+
+    correlaciones = [-0.6, 0.0, 0.9]
+    hosts = [crear_host(f"host-rho{rho:+.1f}", rho) for rho in correlaciones]
+    estado = ClusterState.from_hosts(hosts)
+
+    req = SliceRequest(cpu=2, ram_gb=2.0, disk_gb=1.0, zone="AZ1", platform="linux",
+                       user_profile="Profesor", technical_context="Cloud")
+    mu_sigma = compute_slice_mu_sigma(req)
+
+    p_cpu, p_ram, p_joint = joint_congestion_probability(estado, mu_sigma)
+    p_max = evaluate_hosts(req, estado, mu_sigma, "normal").local_risk
+
+    rng = np.random.default_rng(8)
+    errores = 0
+
+    print("\n[1] P(congestión) tras asignar el slice:")
+    for i, h in enumerate(hosts):
+        mu = [h.mu_cpu + mu_sigma["cpu"][0], h.mu_ram_gb + mu_sigma["ram"][0]]
+        var_c = h.sigma_cpu ** 2 + mu_sigma["cpu"][1] ** 2
+        var_r = h.sigma_ram_gb ** 2 + mu_sigma["ram"][1] ** 2
+        muestras = rng.multivariate_normal(mu, [[var_c, h.cov_cpu_ram], [h.cov_cpu_ram, var_r]], 1_000_000)
+        p_real = float(np.mean((muestras[:, 0] > h.cpu_capacity) | (muestras[:, 1] > h.ram_gb_capacity)))
+
+        print(
+            f"   {h.name}: max={p_max[i]:.4f}  conjunto={p_joint[i]:.4f}  "
+            f"Monte Carlo={p_real:.4f}  (P_cpu={p_cpu[i]:.4f}, P_ram={p_ram[i]:.4f})"
+        )
+
+        if abs(p_joint[i] - p_real) > 0.003:
+            errores += 1
+            print("      ADVERTENCIA: el modelo conjunto no coincide con Monte Carlo.")
+        if not (max(p_cpu[i], p_ram[i]) - 1e-12 <= p_joint[i] <= p_cpu[i] + p_ram[i] + 1e-12):
+            errores += 1
+            print("      ADVERTENCIA: P(CPU o RAM) fuera de las cotas.")
+
+    if p_joint[0] > p_joint[1] > p_joint[2]:
+        print("   OK: a mayor correlación, menor P(CPU o RAM) (las congestiones coinciden).")
+    else:
+        errores += 1
+        print("   ADVERTENCIA: el riesgo conjunto no decrece con la correlación.")
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 8 (RIESGO CONJUNTO) ==")
+
+
+if __name__ == "__main__":
+    main()
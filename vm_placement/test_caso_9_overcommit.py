@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Caso de prueba 9:
+Overcommit según el SLA del slice (sla_overcommit_cpu_pct / _ram_pct).
+
+Escenario:
+- host-oc   : CPU casi llena, admite overcommit de CPU hasta 2.0
+- host-fijo : mismo estado, pero su techo de overcommit es 1.0
+- Un slice Estudiante que no cabe sin overcommit.
+
+Objetivo:
+- Sin overcommit ningún host es viable.
+- Con sla_overcommit_cpu_pct = 1.5 solo es viable host-oc, y la decisión
+  informa el ratio aplicado (1.5) para guardarlo en el slice.
+- Un ratio mayor al techo del host se acota (3.0 -> 2.0).
+- Motor escalar y vectorizado devuelven la misma decisión.
+- Los modelos empírico y conjunto también usan la capacidad efectiva en el
+  filtro de MP (admission_risk); el riesgo local del Minimax sigue siendo
+  el de la capacidad física.
+- Regresión: con cpu_overcommit=2.0, un host caliente (μ 7 de 8 cores,
+  σ 1) no le gana a uno frío (μ 1): el baseline y el riesgo tras asignar se
+  comparan sobre la misma capacidad física. Motor escalar, vectorizado y
+  plan voraz eligen el frío.
+"""
+
+from dataclasses import replace
+
+import numpy as np
+
+from vm_placement import SliceRequest, HostState, decide_vm_placement
+from cluster_state import ClusterState
+from placement_engine import decide_vm_placement_vectorized, evaluate_hosts
+from plan_placement import plan_placement
+
+
+def crear_host(nombre: str, techo_cpu: float) -> HostState:
+    return HostState(
+        name=nombre, platform="linux", zone="AZ1",
+        cpu_capacity=4, ram_gb_capacity=16.0, disk_gb_capacity=100.0,
+        mu_cpu=3.3, sigma_cpu=0.3, mu_ram_gb=4.0, sigma_ram_gb=0.5,
+        disk_gb_used=10.0, cpu_overcommit_max=techo_cpu,
+    )
+
+
+def crear_nodo(host: HostState) -> dict:
+    """El mismo host en formato nodes_status.json, con histograma de CPU."""
+    rng = np.random.default_rng(9)
+    muestras = np.clip(rng.normal(host.mu_cpu, host.sigma_cpu, 20000) / host.cpu_capacity * 100, 0, 100)
+    counts, _ = np.histogram(muestras, bins=50, range=(0, 100))
+    return {
+        "id": host.name, "name": host.name, "platform": "linux", "zone": "AZ1",
+        "cpu_capacity": {"value": host.cpu_capacity, "unit": "cores"},
+        "ram_capacity": {"value": host.ram_gb_capacity, "unit": "GiB"},
+        "disk_capacity": {"value": host.disk_gb_capacity, "unit": "GB"},
+        "overcommit": {"cpu": host.cpu_overcommit_max, "ram": host.ram_overcommit_max},
+        "current_usage": {
+            "cpu": {"mean": float(np.mean(muestras)), "std": float(np.std(muestras)), "unit": "%",
+                    "histogram": {"lower": 0.0, "upper": 100.0, "counts": counts.tolist()}},
+            "ram": {"mean": host.mu_ram_gb, "std": host.sigma_ram_gb, "unit": "GiB"},
+            "disk": {"used": host.disk_gb_used, "unit": "GB"},
+        },
+    }
+
+
+def main():
+    print("=" * 78)
+    print("CASO DE PRUEBA 9 - OVERCOMMIT SEGÚN SLA DEL SLICE")
+    print("=" * 78)
+
+    hosts = [crear_host("host-oc", 2.0), crear_host("host-fijo", 1.0)]
+    base = SliceRequest(cpu=4, ram_gb=2.0, disk_gb=5.0, zone="AZ1", platform="linux",
+                        user_profile="Estudiante", technical_context="Cloud", max_failure_prob=0.05)
+
+    errores = 0
+
+    print("\n[1] Decisión según el overcommit pedido:")
+    for ratio, esperado_host, esperado_ratio in [(1.0, None, None), (1.5, "host-oc", 1.5), (3.0, "host-oc", 2.0)]:
+        req = replace(base, cpu_overcommit=ratio)
+        escalar = decide_vm_placement(req, hosts)
+        vectorizado = decide_vm_placement_vectorized(req, hosts)
+
+        host = escalar.host if escalar else None
+        aplicado = escalar.cpu_overcommit if escalar else None
+        print(f"   sla_overcommit_cpu_pct={ratio}: host={host}  ratio aplicado={aplicado}")
+
+        if escalar != vectorizado:
+            errores += 1
+            print("      ADVERTENCIA: motor escalar y vectorizado difieren.")
+        if host != esperado_host or aplicado != esperado_ratio:
+            errores += 1
+            print(f"      ADVERTENCIA: se esperaba host={esperado_host}, ratio={esperado_ratio}.")
+
+    print("\n[2] Riesgo en host-oc por modelo (sin overcommit vs 1.5):")
+    estado = ClusterState.from_nodes_status({h.name: crear_nodo(h) for h in hosts})
+    fila = estado.row("host-oc")
+    for modelo in ("normal", "empirical", "joint"):
+        sin = evaluate_hosts(base, estado, risk_model=modelo)
+        con = evaluate_hosts(replace(base, cpu_overcommit=1.5), estado, risk_model=modelo)
+        print(f"   {modelo:>9}: filtro {sin.admission_risk[fila]:.4f} -> {con.admission_risk[fila]:.4f}  "
+              f"Minimax {sin.local_risk[fila]:.4f} -> {con.local_risk[fila]:.4f}")
+        if not (con.admission_risk[fila] < sin.admission_risk[fila] and con.local_risk[fila] == sin.local_risk[fila]):
+            errores += 1
+            print("      ADVERTENCIA: el overcommit debe bajar solo el riesgo del filtro.")
+
+    print("\n[3] Host caliente vs frío con cpu_overcommit=2.0:")
+    caliente = replace(crear_host("host-caliente", 2.0), cpu_capacity=8, mu_cpu=7.0, sigma_cpu=1.0)
+    frio = replace(crear_host("host-frio", 2.0), cpu_capacity=8, mu_cpu=1.0, sigma_cpu=1.0)
+    req = replace(base, cpu_overcommit=2.0)
+    escalar = decide_vm_placement(req, [caliente, frio])
+    vectorizado = decide_vm_placement_vectorized(req, [caliente, frio])
+    plan = plan_placement([req], ClusterState.from_hosts([caliente, frio]), method="greedy")
+    elegidos = [d.host if d else None for d in (escalar, vectorizado, plan.decisions[0])]
+    print(f"   escalar={elegidos[0]}  vectorizado={elegidos[1]}  plan voraz={elegidos[2]}")
+    if elegidos == ["host-frio"] * 3 and escalar == vectorizado:
+        print("   OK: los tres eligen el host frío.")
+    else:
+        errores += 1
+        print("      ADVERTENCIA: el Minimax prefirió el host caliente.")
+
+    print(f"\nResultado: {'OK' if errores == 0 else f'{errores} advertencia(s)'}")
+    print("\n== FIN DEL CASO DE PRUEBA 9 (OVERCOMMIT) ==")
+
+
+if __name__ == "__main__":
+    main()
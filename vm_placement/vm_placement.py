@@ -15,14 +15,28 @@ IMPORTANTE: Disco es tratado como restricción DETERMINISTA (no probabilística)
 
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Literal, Tuple
+import json
 import math
 
+from decision_trace import (
+    DecisionTrace,
+    REJECT_UNAVAILABLE, REJECT_ZONE, REJECT_PLATFORM, REJECT_DISK, REJECT_RISK,
+)
+
 # ==========================
 #   TIPOS BÁSICOS
 # ==========================
 
 Platform = Literal["linux", "openstack"]
 
+# Techo de sobreasignación por defecto de un host (si nodes_status.json no
+# trae "overcommit"): la CPU se comparte por tiempo, la RAM no se sobreasigna
+DEFAULT_CPU_OVERCOMMIT_MAX = 2.0
+DEFAULT_RAM_OVERCOMMIT_MAX = 1.0
+
+# Ratio de overcommit más alto aceptado en el SLA del slice (1.0 = sin overcommit)
+MAX_OVERCOMMIT_RATIO = 10.0
+
 @dataclass
 class SliceRequest:
     """
@@ -40,6 +54,12 @@ class SliceRequest:
     technical_context: str = "Cloud"  # contexto (Tabla 2)
     max_failure_prob: float = 0.01          # MP: prob. máxima de fallo permitida
 
+    # Sobreasignación aceptada por el SLA del slice (columnas
+    # sla_overcommit_cpu_pct / sla_overcommit_ram_pct de `slices`), como
+    # ratio: 1.5 = el slice tolera compartir sus recursos hasta 150%
+    cpu_overcommit: float = 1.0
+    ram_overcommit: float = 1.0
+
 
 @dataclass
 class HostState:
@@ -67,6 +87,14 @@ class HostState:
     # Disco usado actual (DETERMINISTA - no tiene sigma)
     disk_gb_used: float     # Disco ya usado en el host (determinista)
 
+    # Covarianza CPU/RAM observada (cores x GB); solo la usa el modelo de
+    # riesgo conjunto del motor vectorizado ("joint")
+    cov_cpu_ram: float = 0.0
+
+    # Ratio máximo de sobreasignación que admite el host (lo fija el operador)
+    cpu_overcommit_max: float = DEFAULT_CPU_OVERCOMMIT_MAX
+    ram_overcommit_max: float = DEFAULT_RAM_OVERCOMMIT_MAX
+
     enabled: bool = True
     in_maintenance: bool = False
     metadata: Dict[str, str] = field(default_factory=dict)
@@ -83,6 +111,11 @@ class PlacementDecision:
     availability_zone: str
     reason: str = ""   # explicación corta (opcional)
 
+    # Ratios de sobreasignación aplicados en el host elegido (1.0 = sin
+    # overcommit); el orquestador los guarda en sla_overcommit_*_pct del slice
+    cpu_overcommit: float = 1.0
+    ram_overcommit: float = 1.0
+
 
 # ==========================
 #   PARÁMETROS DEL MODELO
@@ -104,6 +137,33 @@ CONTEXT_TABLE = {
     "IA / Machine Learning":    {"f_cpu": 1.5, "f_ram": 1.3, "v": 1.3},
 }
 
+# Versión de las tablas en uso: 0 = las del PDF; las tablas calibradas
+# (calibracion_tablas.py) se cargan en caliente con load_model_tables
+TABLES_VERSION = 0
+
+
+def load_model_tables(path: str) -> int:
+    """
+    Reemplaza PROFILE_TABLE / CONTEXT_TABLE por las de un JSON publicado
+    por calibracion_tablas.py ({"version", "PROFILE_TABLE", "CONTEXT_TABLE"}).
+    Las tablas se reasignan completas (no se modifican en sitio), así que una
+    evaluación en curso ve la versión vieja o la nueva, nunca una mezcla.
+    Retorna la versión cargada.
+    """
+    global PROFILE_TABLE, CONTEXT_TABLE, TABLES_VERSION
+
+    with open(path, "r") as f:
+        tables = json.load(f)
+
+    profile_table = tables.get("PROFILE_TABLE", PROFILE_TABLE)
+    context_table = tables.get("CONTEXT_TABLE", CONTEXT_TABLE)
+    if "Estudiante" not in profile_table or "Cloud" not in context_table:
+        raise ValueError("Las tablas deben incluir el perfil 'Estudiante' y el contexto 'Cloud' (valores por defecto)")
+
+    PROFILE_TABLE, CONTEXT_TABLE = profile_table, context_table
+    TABLES_VERSION = int(tables.get("version", TABLES_VERSION + 1))
+    return TABLES_VERSION
+
 # ==========================
 #   FUNCIONES AUXILIARES
 # ==========================
@@ -162,6 +222,33 @@ def compute_slice_mu_sigma(slice_req: SliceRequest) -> Dict[str, Tuple[float, fl
     }
 
 
+def parse_overcommit(value) -> float:
+    """
+    Ratio de overcommit del SLA del slice. Pese al sufijo, las columnas
+    sla_overcommit_*_pct guardan SIEMPRE un ratio (1.5 = 150 % de la
+    capacidad física), como las escribe resources_api. Sin valor = 1.0 (sin
+    overcommit). Un valor fuera de [1, MAX_OVERCOMMIT_RATIO] es ValueError
+    (la API responde 400): ni 150 ni 0.5 se reinterpretan o recortan.
+    Lo usan la API y el plan por lotes para leer el mismo campo igual.
+    """
+    if value is None or value == "":
+        return 1.0
+    ratio = float(value)
+    if not 1.0 <= ratio <= MAX_OVERCOMMIT_RATIO:     # también descarta NaN
+        raise ValueError(
+            f"Overcommit fuera de rango: {value} (ratio entre 1 y {MAX_OVERCOMMIT_RATIO:g}, ej. 1.5)"
+        )
+    return ratio
+
+
+def overcommit_ratio(requested: Optional[float], ceiling: float) -> float:
+    """
+    Ratio de sobreasignación efectivo: el que acepta el slice, acotado por
+    el techo del host y nunca menor que 1 (sin overcommit).
+    """
+    return max(1.0, min(float(requested or 1.0), float(ceiling)))
+
+
 def check_disk_constraint(host: HostState, disk_requested_gb: float) -> bool:
     """
     Verifica restricción DETERMINISTA de disco:
@@ -184,7 +271,8 @@ def check_disk_constraint(host: HostState, disk_requested_gb: float) -> bool:
 
 def compute_host_risk_after_assignment(
     host: HostState,
-    slice_mu_sigma: Dict[str, Tuple[float, float]]
+    slice_mu_sigma: Dict[str, Tuple[float, float]],
+    slice_req: Optional[SliceRequest] = None
 ) -> Dict[str, float]:
     """
     Calcula la probabilidad de congestión por recurso (CPU, RAM)
@@ -193,21 +281,33 @@ def compute_host_risk_after_assignment(
     Usa:
     - CCLP (mu_host, sigma_host) existente
     - Suma normal DT = CCLP + Slice (medias y varianzas se suman)
-    - P_cong,k = Q( (CI - mu_DT) / sigma_DT )
+    - P_cong,k = Q( (CI_ef - mu_DT) / sigma_DT )
+
+    Con overcommit (`slice_req.cpu_overcommit` / `ram_overcommit` > 1) la
+    capacidad efectiva es CI_ef = CI · ratio, con el ratio acotado por el
+    techo del host: el slice acepta que la demanda supere la capacidad
+    física hasta ese factor (los recursos se comparten). Sin slice_req,
+    CI_ef = CI. decide_vm_placement usa CI_ef solo en el filtro de MP; el
+    criterio Minimax compara riesgos sobre la capacidad física.
     
     NOTA: Disco NO se evalúa aquí porque es determinista
     """
+    cpu_ratio, ram_ratio = 1.0, 1.0
+    if slice_req is not None:
+        cpu_ratio = overcommit_ratio(slice_req.cpu_overcommit, host.cpu_overcommit_max)
+        ram_ratio = overcommit_ratio(slice_req.ram_overcommit, host.ram_overcommit_max)
+
     # 1) CPU
     mu_cpu_slice, sigma_cpu_slice = slice_mu_sigma["cpu"]
     mu_dt_cpu = host.mu_cpu + mu_cpu_slice
     sigma_dt_cpu = math.sqrt(host.sigma_cpu ** 2 + sigma_cpu_slice ** 2)
-    p_cong_cpu = _normal_tail_probability(host.cpu_capacity, mu_dt_cpu, sigma_dt_cpu)
+    p_cong_cpu = _normal_tail_probability(host.cpu_capacity * cpu_ratio, mu_dt_cpu, sigma_dt_cpu)
 
     # 2) RAM
     mu_ram_slice, sigma_ram_slice = slice_mu_sigma["ram"]
     mu_dt_ram = host.mu_ram_gb + mu_ram_slice
     sigma_dt_ram = math.sqrt(host.sigma_ram_gb ** 2 + sigma_ram_slice ** 2)
-    p_cong_ram = _normal_tail_probability(host.ram_gb_capacity, mu_dt_ram, sigma_dt_ram)
+    p_cong_ram = _normal_tail_probability(host.ram_gb_capacity * ram_ratio, mu_dt_ram, sigma_dt_ram)
 
     return {
         "cpu": p_cong_cpu,
@@ -227,13 +327,82 @@ def compute_host_risk_current(host: HostState) -> float:
     return max(p_cpu, p_ram)
 
 
+def top_two_baseline_risks(baseline_risk: Dict[str, float]) -> Tuple[Optional[str], float, float]:
+    """
+    Recorre una sola vez el riesgo baseline y devuelve
+    (host con mayor riesgo, mayor riesgo, segundo mayor riesgo).
+
+    El riesgo global del clúster tras asignar el slice al host j es
+    max(riesgo_local_j, top2 si j es el host del top1, si no top1).
+    """
+    top_name: Optional[str] = None
+    top1 = 0.0
+    top2 = 0.0
+    for name, risk in baseline_risk.items():
+        if top_name is None or risk > top1:
+            if top_name is not None:
+                top2 = top1
+            top_name, top1 = name, risk
+        elif risk > top2:
+            top2 = risk
+    return top_name, top1, top2
+
+
+def minimax_key(cluster_risk: float, local_risk: float, disk_free_after: float) -> Tuple[float, float, float]:
+    """
+    Clave de orden del criterio Minimax (menor es mejor):
+    1) menor riesgo global del clúster
+    2) desempate: menor riesgo local del host
+    3) desempate: más disco libre tras la asignación
+    Si todo empata se conserva el primer host de la lista.
+    """
+    return (cluster_risk, local_risk, -disk_free_after)
+
+
+def build_placement_decision(
+    host_name: str,
+    platform: Platform,
+    zone: str,
+    max_risk: float,
+    cpu_overcommit: float = 1.0,
+    ram_overcommit: float = 1.0
+) -> PlacementDecision:
+    """
+    Construye la PlacementDecision final (distinta para Linux vs OpenStack).
+    Compartida por el motor escalar y el motor vectorizado para que ambos
+    devuelvan exactamente la misma decisión.
+    """
+    if platform == "linux":
+        # Para Linux devolvemos simplemente el host físico, el orquestador
+        # es el que creará las VMs en ese nodo KVM.
+        return PlacementDecision(
+            host=host_name,
+            platform="linux",
+            availability_zone=zone,
+            reason=f"Host Linux seleccionado con riesgo máximo {max_risk:.4f}",
+            cpu_overcommit=cpu_overcommit,
+            ram_overcommit=ram_overcommit,
+        )
+
+    # OpenStack: se usan Availability Zones como mecanismo principal de enforcement.
+    return PlacementDecision(
+        host=host_name,
+        platform="openstack",
+        availability_zone=zone,
+        reason=f"Host OpenStack en {zone} seleccionado con riesgo máximo {max_risk:.4f}",
+        cpu_overcommit=cpu_overcommit,
+        ram_overcommit=ram_overcommit,
+    )
+
+
 # ==========================
 #   FUNCIÓN PRINCIPAL
 # ==========================
 
 def decide_vm_placement(
     slice_req: SliceRequest,
-    hosts: List[HostState]
+    hosts: List[HostState],
+    trace: Optional[DecisionTrace] = None
 ) -> Optional[PlacementDecision]:
     """
     Función principal del módulo de Placement (punto de entrada).
@@ -251,6 +420,9 @@ def decide_vm_placement(
     - Retorna:
       * PlacementDecision (host elegido, plataforma, AZ y scheduler_hints si aplica)
       * None si no hay ningún host viable.
+
+    - Si se pasa `trace` (DecisionTrace), registra por host el motivo de
+      rechazo, los riesgos y el puntaje Minimax. Sin traza no se formatea texto.
     """
 
     # 1. Interpretar requerimientos de usuario → obtener μ_slice,k y σ_slice,k
@@ -259,142 +431,114 @@ def decide_vm_placement(
 
     # 2. Riesgo actual del clúster (antes de agregar el slice)
     baseline_risk = {h.name: compute_host_risk_current(h) for h in hosts}
-    
-    # MOSTRAR RIESGO INICIAL DE CADA HOST
-    print("\n" + "="*70)
-    print("RIESGO ACTUAL DE HOSTS (ANTES DE ASIGNAR SLICE)")
-    print("="*70)
-    for host in hosts:
-        risk = baseline_risk[host.name]
-        print(f"{host.name:25} | Riesgo máximo: {risk:.6f} | Zona: {host.zone} | Plataforma: {host.platform}")
-    print("="*70)
 
     # 3. Filtrado de hosts según múltiples criterios
-    candidates: List[Tuple[HostState, Dict[str, float]]] = []
-    
-    print("\n" + "="*70)
-    print("EVALUANDO CANDIDATOS")
-    print("="*70)
+    candidates: List[Tuple[HostState, Dict[str, float], Optional[float]]] = []
 
     for h in hosts:
-        print(f"\n🔍 Evaluando: {h.name}")
-        
         # 3.1 Filtros básicos
         if not h.enabled or h.in_maintenance:
-            print(f"   ❌ Rechazado: Host deshabilitado o en mantenimiento")
+            if trace is not None:
+                trace.record_host(h.name, "rejected", REJECT_UNAVAILABLE, baseline_risk=baseline_risk[h.name])
             continue
 
         if slice_req.zone and h.zone != slice_req.zone:
-            print(f"   ❌ Rechazado: Zona {h.zone} no coincide con {slice_req.zone}")
+            if trace is not None:
+                trace.record_host(h.name, "rejected", REJECT_ZONE, baseline_risk=baseline_risk[h.name])
             continue
 
         if slice_req.platform in ("linux", "openstack") and h.platform != slice_req.platform:
-            print(f"   ❌ Rechazado: Plataforma {h.platform} no coincide con {slice_req.platform}")
+            if trace is not None:
+                trace.record_host(h.name, "rejected", REJECT_PLATFORM, baseline_risk=baseline_risk[h.name])
             continue
 
         # 3.2 RESTRICCIÓN DETERMINISTA DE DISCO
-        disk_after = h.disk_gb_used + slice_req.disk_gb
         if not check_disk_constraint(h, slice_req.disk_gb):
-            print(f"   ❌ Rechazado: Disco insuficiente")
-            print(f"      Usado: {h.disk_gb_used:.1f} GB + Solicitado: {slice_req.disk_gb:.1f} GB = {disk_after:.1f} GB")
-            print(f"      Capacidad: {h.disk_gb_capacity:.1f} GB (falta {disk_after - h.disk_gb_capacity:.1f} GB)")
+            if trace is not None:
+                trace.record_host(
+                    h.name, "rejected", REJECT_DISK,
+                    baseline_risk=baseline_risk[h.name],
+                    disk_free_gb=h.disk_gb_capacity - h.disk_gb_used - slice_req.disk_gb,
+                )
             continue
-        else:
-            print(f"   ✓ Disco OK: {h.disk_gb_used:.1f} + {slice_req.disk_gb:.1f} = {disk_after:.1f} GB / {h.disk_gb_capacity:.1f} GB")
 
         # 3.3 Calcular riesgo probabilístico tras asignar el slice (CPU y RAM)
+        #     contra la capacidad física: es la misma base que el baseline,
+        #     así que es el que entra al criterio Minimax
         risks_after = compute_host_risk_after_assignment(h, slice_mu_sigma)
-        
-        print(f"   📊 Riesgos después de asignar slice:")
-        print(f"      P(congestión CPU): {risks_after['cpu']:.17g}")
-        print(f"      P(congestión RAM): {risks_after['ram']:.17g}")
+        max_risk = max(risks_after.values())
 
         # 3.4 Filtro de viabilidad probabilístico: 
-        #     Todos los recursos (CPU, RAM) deben cumplir P_cong,k <= MP
-        max_risk = max(risks_after.values())
-        if max_risk > slice_req.max_failure_prob:
-            print(f"   ❌ Rechazado: Riesgo máximo {max_risk:.6f} > {slice_req.max_failure_prob:.6f} (MP)")
+        #     Todos los recursos (CPU, RAM) deben cumplir P_cong,k <= MP.
+        #     Con overcommit se mide contra la capacidad efectiva CI · ratio
+        admission_risk = None
+        if (overcommit_ratio(slice_req.cpu_overcommit, h.cpu_overcommit_max) > 1.0
+                or overcommit_ratio(slice_req.ram_overcommit, h.ram_overcommit_max) > 1.0):
+            admission_risk = max(compute_host_risk_after_assignment(h, slice_mu_sigma, slice_req).values())
+        if (max_risk if admission_risk is None else admission_risk) > slice_req.max_failure_prob:
+            if trace is not None:
+                trace.record_host(
+                    h.name, "rejected", REJECT_RISK,
+                    baseline_risk=baseline_risk[h.name],
+                    p_cpu=risks_after["cpu"], p_ram=risks_after["ram"], local_risk=max_risk,
+                    admission_risk=admission_risk,
+                )
             continue
-        
-        print(f"   ✅ CANDIDATO VIABLE - Riesgo máximo: {max_risk:.6f}")
-        candidates.append((h, risks_after))
+
+        candidates.append((h, risks_after, admission_risk))
 
     if not candidates:
         # No hay host que cumpla todas las restricciones
-        print("\n" + "="*70)
-        print("❌ NO HAY HOSTS VIABLES")
-        print("="*70)
         return None
 
     # 4. Criterio Minimax: elegir j* que minimiza el máximo riesgo global del clúster
-    print("\n" + "="*70)
-    print("APLICANDO CRITERIO MINIMAX")
-    print("="*70)
-    
+    # Los dos mayores riesgos baseline se calculan UNA vez: así el riesgo
+    # global tras asignar a cada candidato es O(1) y la selección es O(n).
+    top_name, top1, top2 = top_two_baseline_risks(baseline_risk)
+
     best_host: Optional[HostState] = None
     best_cluster_risk: Optional[float] = None
     best_host_risks: Optional[Dict[str, float]] = None
+    best_key: Optional[Tuple[float, float, float]] = None
 
-    for host, risks_after in candidates:
+    for host, risks_after, admission_risk in candidates:
         # Riesgo local del host candidato después de la asignación
         local_max = max(risks_after.values())
 
-        # Riesgo global: max entre todos los hosts
-        cluster_max = 0.0
-        for other_name, base_risk in baseline_risk.items():
-            if other_name == host.name:
-                cluster_max = max(cluster_max, local_max)
-            else:
-                cluster_max = max(cluster_max, base_risk)
-        
-        print(f"\n  {host.name}:")
-        print(f"    Riesgo local después: {local_max:.6f}")
-        print(f"    Riesgo global clúster: {cluster_max:.6f}")
-
-        if best_cluster_risk is None or cluster_max < best_cluster_risk:
+        # Riesgo global: max(riesgo local, mayor baseline del resto de hosts)
+        others_max = top2 if host.name == top_name else top1
+        cluster_max = max(local_max, others_max)
+        disk_free_after = host.disk_gb_capacity - host.disk_gb_used - slice_req.disk_gb
+
+        if trace is not None:
+            trace.record_host(
+                host.name, "candidate",
+                baseline_risk=baseline_risk[host.name],
+                p_cpu=risks_after["cpu"], p_ram=risks_after["ram"],
+                local_risk=local_max, cluster_risk=cluster_max, disk_free_gb=disk_free_after,
+                admission_risk=admission_risk,
+            )
+
+        # Desempate determinista: menor riesgo local y luego más disco libre
+        key = minimax_key(cluster_max, local_max, disk_free_after)
+        if best_key is None or key < best_key:
+            best_key = key
             best_cluster_risk = cluster_max
             best_host = host
             best_host_risks = risks_after
-            print(f"    ⭐ Nuevo mejor candidato")
 
     if best_host is None:
         return None
-    
-    # MOSTRAR COMPARATIVA ANTES/DESPUÉS DEL HOST SELECCIONADO
-    print("\n" + "="*70)
-    print("COMPARATIVA: ANTES vs DESPUÉS DE LA ASIGNACIÓN")
-    print("="*70)
-    print(f"Host seleccionado: {best_host.name}")
-    print(f"\nANTES de asignar el slice:")
-    print(f"  Riesgo máximo del host: {baseline_risk[best_host.name]:.6f}")
-    print(f"\nDESPUÉS de asignar el slice:")
-    print(f"  P(congestión CPU): {best_host_risks['cpu']:.6f}")
-    print(f"  P(congestión RAM): {best_host_risks['ram']:.6f}")
-    print(f"  Riesgo máximo del host: {max(best_host_risks.values()):.6f}")
-    print(f"\nRiesgo global del clúster: {best_cluster_risk:.6f}")
-    print("="*70)
 
-    # 5. Construir decisión final distinta para Linux vs OpenStack
-    if best_host.platform == "linux":
-        # Para Linux devolvemos simplemente el host físico, el orquestador
-        # es el que creará las VMs en ese nodo KVM.
-        return PlacementDecision(
-            host=best_host.name,
-            platform="linux",
-            availability_zone=best_host.zone,
-            reason=f"Host Linux seleccionado con riesgo máximo {max(best_host_risks.values()):.4f}"
-        )
+    if trace is not None:
+        trace.select(best_host.name, best_cluster_risk)
 
-    else:  # OpenStack
-        # En OpenStack se debe usar Availability Zones como mecanismo principal de enforcement.
-        # Además podemos usar scheduler_hints para forzar el host si el orquestador así lo requiere.
-        hints = {
-            "availability_zone": best_host.zone,
-            "force_hosts": best_host.name  # si quieren fijar el host exacto
-        }
-        return PlacementDecision(
-            host=best_host.name,
-            platform="openstack",
-            availability_zone=best_host.zone,
-            reason=f"Host OpenStack en {best_host.zone} seleccionado con riesgo máximo {max(best_host_risks.values()):.4f}"
-        )
\ No newline at end of file
+    # 5. Construir decisión final distinta para Linux vs OpenStack
+    return build_placement_decision(
+        best_host.name,
+        best_host.platform,
+        best_host.zone,
+        max(best_host_risks.values()),
+        overcommit_ratio(slice_req.cpu_overcommit, best_host.cpu_overcommit_max),
+        overcommit_ratio(slice_req.ram_overcommit, best_host.ram_overcommit_max),
+    )